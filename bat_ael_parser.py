@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/bat_ael_parser.py
+
+"""
+BAT-AEL Table Parser
+Turns BAT-AEL / BAT-AEPL (BBT-GEN / BBT-GEPN) tables into numeric
+EmissionLimitValue records: pollutant, range low/high, unit, averaging period
+and reference conditions. Tables come from Docling (EnhancedPDFProcessor),
+from EUR-Lex HTML <table> elements or from PyMuPDF's table finder; all are
+first reduced to a grid of cell texts. Records are stored in a typed,
+indexed SQLite table so numeric screening is one query over all limits
+instead of a prompt per BAT.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bat_data_models import EmissionLimitValue, PollutantType
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regulatory_data", "bat_ael.db")
+PDF_CAPTION_HEIGHT = 40  # points above a PDF table searched for its title
+
+Grid = List[List[Optional[str]]]
+
+# Header tokens marking the associated-level columns (English and Dutch)
+_LEVEL_HEADER = re.compile(
+    r'BAT[-\s]?AE(?:P)?L|BBT[-\s]?GE(?:P)?N|associated\s+(?:emission|environmental)|emissieniveau|prestatieniveau',
+    re.IGNORECASE)
+# Official Journal running header, printed above tables at the top of a page
+_RUNNING_HEADER = re.compile(r'Publicatieblad van de Europese Unie|Official Journal of the European Union'
+                             r'|\b\d{1,2}\.\d{1,2}\.\d{4}\b|\bL\s+\d+/\d+\b|^\s*(?:NL|EN)\s*$')
+_PARAMETER_HEADER = re.compile(r'parameter|\bstof\b|pollutant|substance|verontreinig', re.IGNORECASE)
+_UNIT_HEADER = re.compile(r'^\s*(?:unit|eenheid)\b', re.IGNORECASE)
+_FOOTNOTE = re.compile(r'\(\s*\d+\s*\)|\*+')
+_NUMBER = r'\d+(?:[ \u00a0\u202f]\d{3})*(?:[.,]\d+)?'
+_VALUE = re.compile(
+    rf'^(?P<bound>[<≤]\s*)?(?P<low>{_NUMBER})(?:\s*(?:[-–—]|to|tot)\s*(?P<high>{_NUMBER}))?\s*(?P<unit>.*)$',
+    re.IGNORECASE | re.DOTALL)
+_UNIT_IN_HEADER = re.compile(r'\(([^()]*?(?:/|%)[^()]*?)\)')
+_OXYGEN = re.compile(r'(\d+(?:[.,]\d+)?)\s*(?:vol\.?\s*[-%]?\s*)?%\s*(?:vol\.?\s*)?O\s*2', re.IGNORECASE)
+# "Reference oxygen level (O2): 16 vol-%" / "Referentiezuurstofgehalte ... 6 %"
+_OXYGEN_LABELLED = re.compile(r'(?:reference\s+oxygen|referentie\s*zuurstof)[^:\d]*(?:\([^)]*\))?[^:\d]*:?\s*'
+                              r'(\d+(?:[.,]\d+)?)\s*(?:vol)?\s*[-.]?\s*%', re.IGNORECASE)
+_DRY_GAS = re.compile(r'\bdry\s+gas\b|\bdroog\s+gas\b', re.IGNORECASE)
+
+# Averaging period by header wording, checked in order
+_AVERAGING_PERIODS = [
+    (re.compile(r'half[-\s]?hour|halfuur', re.IGNORECASE), "half_hourly_average"),
+    (re.compile(r'hourly|uurgemiddelde', re.IGNORECASE), "hourly_average"),
+    (re.compile(r'daily|dag(?:elijks)?\s*gemiddelde|daggemiddelde', re.IGNORECASE), "daily_average"),
+    (re.compile(r'monthly|maandgemiddelde', re.IGNORECASE), "monthly_average"),
+    (re.compile(r'yearly|annual|jaargemiddelde', re.IGNORECASE), "yearly_average"),
+    (re.compile(r'sampling\s+period|bemonsteringsperiode', re.IGNORECASE), "sampling_period_average"),
+]
+
+# Parameter names to pollutants; more specific names first. Element symbols
+# are matched case-sensitively so the English word "as" is not arsenic;
+# the English and Dutch names in any case ("Lead", "Kwik").
+_I = re.IGNORECASE
+_POLLUTANT_ALIASES: List[Tuple[re.Pattern, PollutantType]] = [(re.compile(pattern, flags), pollutant) for pattern, flags, pollutant in [
+    (r'PCDD|dioxin', _I, PollutantType.PCDD_F),
+    (r'\bTVOC\b|vluchtige\s+organische|volatile\s+organic', _I, PollutantType.TOTAL_VOLATILE_ORGANIC_CARBON),
+    (r'\bTOC\b|organische\s+koolstof|organic\s+carbon', _I, PollutantType.TOTAL_ORGANIC_CARBON),
+    (r'\bBZV\b|\bBOD\b|biochemisch|biochemical', _I, PollutantType.BIOCHEMICAL_OXYGEN_DEMAND),
+    (r'\bCZV\b|\bCOD\b|zuurstofverbruik|oxygen\s+demand', _I, PollutantType.CHEMICAL_OXYGEN_DEMAND),
+    (r'\bTSS\b|zwevende\s+deeltjes|suspended\s+solids', _I, PollutantType.TOTAL_SUSPENDED_SOLIDS),
+    (r'anorganisch\w*\s+stikstof|inorganic\s+nitrogen|N\s*inorg', _I, PollutantType.TOTAL_INORGANIC_NITROGEN),
+    (r'totaal\s+stikstof|total\s+nitrogen|\bTN\b', _I, PollutantType.TOTAL_NITROGEN),
+    (r'fosfor|phosphorus|\bTP\b', _I, PollutantType.TOTAL_PHOSPHORUS),
+    (r'\bAOX\b|halogeenverbinding|organically\s+bound\s+halogen', _I, PollutantType.AOX),
+    (r'sulfaat|sulphate|sulfate', _I, PollutantType.SULPHATE),
+    (r'sulfiet|sulphite|sulfite', _I, PollutantType.SULPHITE),
+    (r'sulfide|sulphide', _I, PollutantType.SULPHIDE),
+    (r'\bHCl\b|waterstofchloride|hydrogen\s+chloride', _I, PollutantType.HYDROGEN_CHLORIDE),
+    (r'\bHF\b|waterstoffluoride|hydrogen\s+fluoride', _I, PollutantType.HYDROGEN_FLUORIDE),
+    (r'fluoride|\bF\s*[–-]', _I, PollutantType.FLUORIDE),
+    (r'\bNH\s*3\b|ammoni', _I, PollutantType.AMMONIA),
+    (r'\bN\s*2\s*O\b|distikstofoxide|nitrous\s+oxide', _I, PollutantType.NITROUS_OXIDE),
+    (r'\bNO\s*X\b|stikstofoxide|nitrogen\s+oxides?', _I, PollutantType.NITROGEN_OXIDES),
+    (r'\bSO\s*[2₂X]\b|zwaveldioxide|sulphur\s+dioxide|sulfur\s+dioxide', _I, PollutantType.SULFUR_DIOXIDE),
+    (r'\bCO\b|koolmonoxide|carbon\s+monoxide', _I, PollutantType.CARBON_MONOXIDE),
+    (r'\bCH\s*4\b|methaan|methane', _I, PollutantType.METHANE),
+    (r'PM\s*2[.,]5', _I, PollutantType.PARTICULATE_MATTER_25),
+    (r'PM\s*10', _I, PollutantType.PARTICULATE_MATTER_10),
+    (r'\bstof\b|\bdust\b|particulate', _I, PollutantType.DUST),
+    (r'\bHg\b', 0, PollutantType.MERCURY),
+    (r'kwik|mercury', _I, PollutantType.MERCURY),
+    (r'\bCd\b', 0, PollutantType.CADMIUM),
+    (r'cadmium', _I, PollutantType.CADMIUM),
+    (r'\bCr\b', 0, PollutantType.CHROMIUM),
+    (r'chroom|chromium', _I, PollutantType.CHROMIUM),
+    (r'\bCu\b', 0, PollutantType.COPPER),
+    (r'koper|copper', _I, PollutantType.COPPER),
+    (r'\bNi\b', 0, PollutantType.NICKEL),
+    (r'nikkel|nickel', _I, PollutantType.NICKEL),
+    (r'\bPb\b', 0, PollutantType.LEAD),
+    (r'\blood\b|\blead\b', _I, PollutantType.LEAD),
+    (r'\bZn\b', 0, PollutantType.ZINC),
+    (r'zink|zinc', _I, PollutantType.ZINC),
+    (r'\bAs\b', 0, PollutantType.ARSENIC),
+    (r'arseen|arsenic', _I, PollutantType.ARSENIC),
+]]
+
+
+@dataclass
+class BATAELRecord:
+    """One BAT-AEL cell with where it came from"""
+    value: EmissionLimitValue
+    parameter: str                      # parameter label as printed in the table
+    document_code: Optional[str] = None
+    bat_number: Optional[int] = None
+    table: str = ""                     # caption / table title
+    page: Optional[int] = None
+    source: str = "grid"                # docling, html or pdf
+    reference_conditions: str = ""
+    conditions: List[str] = field(default_factory=list)
+
+
+def clean_cell(text: Optional[str]) -> str:
+    """Cell text on one line, soft hyphens and footnote markers removed"""
+    if text is None:
+        return ""
+    text = text.replace('\xad\n', '').replace('\xad', '')
+    return re.sub(r'\s+', ' ', _FOOTNOTE.sub(' ', text)).strip()
+
+
+def _to_float(number: str) -> float:
+    return float(re.sub(r'[ \u00a0\u202f]', '', number).replace(',', '.'))
+
+
+def normalize_unit(unit: str) -> str:
+    """Comparable unit string: mg/Nm³ -> mg/Nm3, μ -> µ, no spaces around '/'"""
+    unit = unit.replace('³', '3').replace('μ', 'µ').replace('ug/', 'µg/')
+    return re.sub(r'\s*/\s*', '/', re.sub(r'\s+', ' ', unit)).strip(' .,;')
+
+
+def parse_level(text: Optional[str]) -> Optional[Tuple[Optional[float], float, str]]:
+    """(low, high, unit) from a level cell such as '10–33 mg/l (3)', '< 2-5' or '1,3-2,0 g/l'
+
+    '< X' alone has no lower end; '< X–Y' keeps X and Y as printed. Cells
+    without a number ('NI', 'No BAT-AEL') give None.
+    """
+    match = _VALUE.match(clean_cell(text))
+    if match is None:
+        return None
+    low = _to_float(match.group('low'))
+    if match.group('high') is not None:
+        return low, _to_float(match.group('high')), normalize_unit(match.group('unit'))
+    if match.group('bound'):
+        return None, low, normalize_unit(match.group('unit'))
+    return low, low, normalize_unit(match.group('unit'))
+
+
+def resolve_pollutant(label: str) -> Optional[PollutantType]:
+    for pattern, pollutant in _POLLUTANT_ALIASES:
+        if pattern.search(label):
+            return pollutant
+    return None
+
+
+def averaging_period(text: str) -> Optional[str]:
+    for pattern, period in _AVERAGING_PERIODS:
+        if pattern.search(text):
+            return period
+    return None
+
+
+def reference_conditions(text: str) -> str:
+    """Reference oxygen level and dry-gas basis mentioned in a caption or header"""
+    conditions = []
+    oxygen = _OXYGEN.search(text) or _OXYGEN_LABELLED.search(text)
+    if oxygen:
+        conditions.append(f"{oxygen.group(1).replace(',', '.')} % O2")
+    if _DRY_GAS.search(text):
+        conditions.append("dry gas")
+    return ", ".join(conditions)
+
+
+def is_bat_ael_table(grid: Grid, caption: str = "") -> bool:
+    """Caption or first rows name BAT-AELs/BBT-GEN's"""
+    head = " ".join(clean_cell(cell) for row in grid[:3] for cell in row if cell)
+    return bool(_LEVEL_HEADER.search(caption) or _LEVEL_HEADER.search(head))
+
+
+def _split_header(grid: Grid) -> Tuple[int, List[List[str]]]:
+    """Number of header rows and the header parts of every column
+
+    Header rows run until the first row with a level value beyond the first
+    column. An empty header cell right of a filled one is a column span.
+    """
+    columns = max((len(row) for row in grid), default=0)
+    header_rows = 1
+    while header_rows < len(grid) and not any(parse_level(cell) for cell in grid[header_rows][1:]):
+        header_rows += 1
+    if header_rows == len(grid):
+        header_rows = 1
+
+    parts: List[List[str]] = [[] for _ in range(columns)]
+    for row in grid[:header_rows]:
+        previous = ""
+        for index in range(columns):
+            cell = clean_cell(row[index] if index < len(row) else None)
+            if not cell and index > 0 and previous and (index >= len(row) or row[index] is None):
+                cell = previous
+            if cell and (not parts[index] or parts[index][-1] != cell):
+                parts[index].append(cell)
+            previous = cell
+    return header_rows, parts
+
+
+def parse_bat_ael_grid(grid: Grid, caption: str = "", document_code: Optional[str] = None,
+                       bat_number: Optional[int] = None, page: Optional[int] = None,
+                       source: str = "grid") -> List[BATAELRecord]:
+    """EmissionLimitValue records from one table grid (rows of cell texts, None = spanned/empty)"""
+    if not grid or not is_bat_ael_table(grid, caption):
+        return []
+    caption = clean_cell(caption)
+    header_rows, header_parts = _split_header(grid)
+    headers = [" ".join(parts) for parts in header_parts]
+    body = grid[header_rows:]
+
+    level_columns = [index for index, header in enumerate(headers) if index > 0 and _LEVEL_HEADER.search(header)]
+    if not level_columns:
+        # Only the caption names the levels: columns after the first that hold level values
+        level_columns = [index for index in range(1, len(headers))
+                         if sum(1 for row in body if index < len(row) and parse_level(row[index])) * 2 >= len(body)]
+    if not level_columns:
+        return []
+    label_columns = [index for index in range(level_columns[0]) if not _UNIT_HEADER.search(headers[index])]
+    unit_columns = [index for index, header in enumerate(headers) if _UNIT_HEADER.search(header)]
+    parameter_columns = [index for index in label_columns if _PARAMETER_HEADER.search(headers[index])]
+    condition_columns = [index for index in label_columns if index not in parameter_columns] + \
+        [index for index in range(level_columns[0], len(headers))
+         if index not in level_columns and index not in unit_columns]
+
+    caption_pollutant = resolve_pollutant(caption)
+    table_reference = reference_conditions(" ".join([caption] + headers))
+    records = []
+    filled: Dict[int, str] = {}
+    for row in body:
+        # Label, unit and condition cells span down when empty
+        for index in label_columns + unit_columns + condition_columns:
+            cell = clean_cell(row[index]) if index < len(row) else ""
+            if cell:
+                filled[index] = cell
+        labels = [filled.get(index, "") for index in parameter_columns]
+        pollutant = None
+        for label in reversed(labels):
+            pollutant = resolve_pollutant(label) if label else None
+            if pollutant:
+                break
+        pollutant = pollutant or caption_pollutant or PollutantType.OTHER
+        parameter = " / ".join(label for label in labels if label) or caption
+        row_conditions = [f"{headers[index]}: {filled[index]}" if headers[index] else filled[index]
+                          for index in condition_columns if filled.get(index)]
+
+        for index in level_columns:
+            level = parse_level(row[index] if index < len(row) else None)
+            if level is None:
+                continue
+            low, high, unit = level
+            unit = unit or next((filled[u] for u in unit_columns if filled.get(u)), "") or \
+                next(iter(_UNIT_IN_HEADER.findall(headers[index]) + _UNIT_IN_HEADER.findall(caption)), "")
+            qualifiers = [part for part in header_parts[index]
+                          if not _LEVEL_HEADER.search(part) and not averaging_period(part)]
+            conditions = row_conditions + qualifiers
+            reference = table_reference or reference_conditions(" ".join(row_conditions))
+            value = EmissionLimitValue(
+                pollutant=pollutant,
+                limit_value=high,
+                unit=normalize_unit(unit),
+                measurement_period=averaging_period(headers[index]) or averaging_period(caption) or "unspecified",
+                measurement_conditions="; ".join(([reference] if reference else []) + conditions) or None,
+                range_low=low,
+                range_high=high,
+            )
+            records.append(BATAELRecord(value=value, parameter=parameter, document_code=document_code,
+                                        bat_number=bat_number, table=caption, page=page, source=source,
+                                        reference_conditions=reference, conditions=conditions))
+    return records
+
+
+# --- Table sources ----------------------------------------------------------
+
+def docling_table_grid(table: Any) -> Grid:
+    """Cell-text grid of a Docling TableItem / TableData (or a dict with 'grid' / 'data')"""
+    if isinstance(table, dict):
+        if table.get("grid"):
+            return table["grid"]
+        table = table.get("data")
+    data = getattr(table, "data", table)
+    grid = getattr(data, "grid", None)
+    if grid:
+        return [[getattr(cell, "text", None) for cell in row] for row in grid]
+    cells = getattr(data, "table_cells", None)
+    if cells:
+        rows = max(cell.end_row_offset_idx for cell in cells)
+        columns = max(cell.end_col_offset_idx for cell in cells)
+        result: Grid = [[None] * columns for _ in range(rows)]
+        for cell in cells:
+            for row in range(cell.start_row_offset_idx, cell.end_row_offset_idx):
+                for column in range(cell.start_col_offset_idx, cell.end_col_offset_idx):
+                    result[row][column] = cell.text
+        return result
+    if isinstance(data, list) and all(isinstance(row, (list, tuple)) for row in data):
+        return [list(row) for row in data]
+    return []
+
+
+def parse_docling_tables(tables: Iterable[Any], document_code: Optional[str] = None,
+                         bat_number: Optional[int] = None) -> List[BATAELRecord]:
+    """Records from EnhancedPDFProcessor result['tables'] (or Docling TableItems)"""
+    records = []
+    for table in tables:
+        if isinstance(table, dict):
+            caption, page = table.get("caption") or "", table.get("page")
+        else:
+            caption = getattr(table, "caption", "") or ""
+            prov = getattr(table, "prov", None)
+            page = prov[0].page_no if prov else None
+        records.extend(parse_bat_ael_grid(docling_table_grid(table), str(caption), document_code,
+                                          bat_number, page, source="docling"))
+    return records
+
+
+def html_table_grid(table) -> Grid:
+    """Cell-text grid of a BeautifulSoup <table>, rowspan/colspan copied into every covered cell"""
+    rows = [tr for tr in table.find_all('tr') if tr.find_parent('table') is table]
+    grid: Grid = []
+    pending: Dict[Tuple[int, int], str] = {}
+    for row_index, tr in enumerate(rows):
+        row: List[Optional[str]] = []
+        cells = iter(tr.find_all(['td', 'th'], recursive=False))
+        column = 0
+        while True:
+            if (row_index, column) in pending:
+                row.append(pending.pop((row_index, column)))
+                column += 1
+                continue
+            cell = next(cells, None)
+            if cell is None:
+                break
+            text = cell.get_text('\n', strip=True)
+            rowspan = int(cell.get('rowspan', 1) or 1)
+            colspan = int(cell.get('colspan', 1) or 1)
+            for offset in range(colspan):
+                row.append(text)
+                for extra in range(1, rowspan):
+                    pending[(row_index + extra, column + offset)] = text
+            column += colspan
+        grid.append(row)
+    return grid
+
+
+def html_table_caption(table) -> str:
+    """<caption> or the EUR-Lex table title paragraphs (oj-ti-tbl) right before the table"""
+    caption = table.find('caption')
+    if caption is not None:
+        return caption.get_text(' ', strip=True)
+    titles = []
+    for paragraph in table.find_all_previous('p', limit=3):
+        classes = paragraph.get('class') or []
+        text = paragraph.get_text(' ', strip=True)
+        if any('ti-tbl' in name for name in classes) or re.match(r'^(?:Table|Tabel)\s+\d', text):
+            titles.insert(0, text)
+        elif titles:
+            break
+    return " ".join(titles)
+
+
+def parse_html_tables(html: Any, document_code: Optional[str] = None,
+                      bat_number: Optional[int] = None) -> List[BATAELRecord]:
+    """Records from the <table> elements of EUR-Lex HTML (string or BeautifulSoup element)"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser') if isinstance(html, (str, bytes)) else html
+    records = []
+    for table in soup.find_all('table'):
+        records.extend(parse_bat_ael_grid(html_table_grid(table), html_table_caption(table),
+                                          document_code, bat_number, source="html"))
+    return records
+
+
+def parse_pdf_tables(pdf_path: str, document_code: Optional[str] = None,
+                     pages: Optional[Sequence[int]] = None) -> List[BATAELRecord]:
+    """Records from PyMuPDF's table finder (0-indexed pages; all pages by default)"""
+    import fitz
+    records = []
+    with fitz.open(pdf_path) as doc:
+        for page_index in pages if pages is not None else range(len(doc)):
+            page = doc[page_index]
+            for table in page.find_tables().tables:
+                # The table title is printed just above the grid
+                top = table.bbox[1]
+                above = page.get_text("text", clip=fitz.Rect(0, max(0, top - PDF_CAPTION_HEIGHT), page.rect.width, top))
+                lines = (_RUNNING_HEADER.sub("", line).strip() for line in above.splitlines())
+                caption = " ".join(line for line in lines if line)
+                records.extend(parse_bat_ael_grid(table.extract(), caption, document_code,
+                                                  page=page_index + 1, source="pdf"))
+    return records
+
+
+# --- Store ------------------------------------------------------------------
+
+class BATAELStore:
+    """Typed SQLite table of BAT-AEL ranges, indexed for numeric screening"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS bat_ael (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                document_code TEXT,
+                bat_number INTEGER,
+                pollutant TEXT NOT NULL,
+                parameter TEXT NOT NULL,
+                range_low REAL,
+                range_high REAL NOT NULL,
+                unit TEXT NOT NULL,
+                averaging_period TEXT NOT NULL,
+                reference_conditions TEXT,
+                conditions TEXT,
+                table_caption TEXT,
+                page INTEGER,
+                source TEXT NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_bat_ael_pollutant ON bat_ael(pollutant, unit, averaging_period)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_bat_ael_document ON bat_ael(document_code, bat_number)')
+        self._conn.commit()
+
+    def add(self, records: Iterable[BATAELRecord]) -> int:
+        rows = [(record.document_code, record.bat_number, record.value.pollutant.value, record.parameter,
+                 record.value.range_low, record.value.range_high, record.value.unit,
+                 record.value.measurement_period, record.reference_conditions, "; ".join(record.conditions),
+                 record.table, record.page, record.source) for record in records]
+        with self._conn:
+            self._conn.executemany('''
+                INSERT INTO bat_ael (document_code, bat_number, pollutant, parameter, range_low, range_high, unit,
+                                     averaging_period, reference_conditions, conditions, table_caption, page, source)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        return len(rows)
+
+    def replace_document(self, document_code: str, records: Iterable[BATAELRecord]) -> int:
+        """Drop a document's rows and store its new records"""
+        with self._conn:
+            self._conn.execute('DELETE FROM bat_ael WHERE document_code = ?', (document_code,))
+        return self.add(records)
+
+    def limits(self, pollutant: Optional[PollutantType] = None, document_code: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = 'SELECT * FROM bat_ael WHERE 1 = 1'
+        params: List[Any] = []
+        if pollutant is not None:
+            query += ' AND pollutant = ?'
+            params.append(pollutant.value)
+        if document_code is not None:
+            query += ' AND document_code = ?'
+            params.append(document_code)
+        cursor = self._conn.execute(query + ' ORDER BY id', params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def screen(self, measurements: Iterable[Tuple[PollutantType, str, float]],
+               document_code: Optional[str] = None) -> List[Dict[str, Any]]:
+        """BAT-AELs exceeded by a batch of (pollutant, unit, measured value), in one join
+
+        Units are compared after normalize_unit; only ranges in the same unit are checked.
+        """
+        with self._conn:
+            self._conn.execute('CREATE TEMP TABLE IF NOT EXISTS screening (pollutant TEXT, unit TEXT, measured REAL)')
+            self._conn.execute('DELETE FROM screening')
+            self._conn.executemany('INSERT INTO screening VALUES (?, ?, ?)',
+                                   [(pollutant.value, normalize_unit(unit), value) for pollutant, unit, value in measurements])
+        query = '''
+            SELECT s.pollutant, s.unit, s.measured, a.range_low, a.range_high, a.averaging_period,
+                   a.document_code, a.bat_number, a.parameter, a.conditions
+            FROM screening s JOIN bat_ael a ON a.pollutant = s.pollutant AND a.unit = s.unit
+            WHERE s.measured > a.range_high
+        '''
+        params: List[Any] = []
+        if document_code is not None:
+            query += ' AND a.document_code = ?'
+            params.append(document_code)
+        cursor = self._conn.execute(query + ' ORDER BY a.id', params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        self._conn.close()
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "regulatory_data/bat_conclusions/CWW_BATC_NL.pdf"
+    if not os.path.exists(pdf_path):
+        print(f"❌ Test file not found: {pdf_path}")
+        sys.exit(1)
+
+    code = os.path.basename(pdf_path).split('_')[0].upper()
+    print(f"📊 BAT-AEL tables in {pdf_path}")
+    parsed = parse_pdf_tables(pdf_path, code)
+    for record in parsed[:15]:
+        value = record.value
+        print(f"  p{record.page} {value.pollutant.value:8} {value.range_low}-{value.range_high} {value.unit} "
+              f"({value.measurement_period}) {record.parameter[:40]}")
+    store = BATAELStore()
+    print(f"✅ {store.replace_document(code, parsed)} records stored in {store.db_path}")
+    store.close()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/bat_chapter_locator.py
+
+"""
+BAT Chapter Locator
+Finds the page span of the "Best Available Techniques" / "BAT conclusions" /
+"BBT-conclusies" chapter without reading every page:
+  1. the PDF outline (doc.get_toc())
+  2. the printed table of contents, resolved through page labels or the
+     printed page numbers (folios) with a binary search
+  3. a sampled binary search over the running "Chapter N" page headers
+"""
+
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import fitz
+
+# Chapter/section titles that hold the BAT (conclusions), after an optional "13" / "2.5" number
+BAT_TITLE_PATTERN = re.compile(
+    r'^(?:\d+(?:\.\d+)*\.?\s+)?'
+    r'(?:(?:GENERIC|COMMON)\s+)?'
+    r'(?:BEST\s+AVAILABLE\s+TECHNIQUES(?!\s+TO\s+CONSIDER)|BAT\s+CONCLUSIONS|BAT\b(?!\s+TO\s+CONSIDER))',
+    re.IGNORECASE
+)
+BBT_TITLE_PATTERN = re.compile(
+    r'BBT[-\s]CONCLUSIES|CONCLUSIES\s+OVER\s+(?:DE\s+)?BBT|BESTE\s+BESCHIKBARE\s+TECHNIEKEN(?!\s+TE\s+OVERWEGEN)',
+    re.IGNORECASE
+)
+
+# Printed table of contents: "13 \nBEST AVAILABLE TECHNIQUES .......... 251"
+PRINTED_TOC_ENTRY = re.compile(
+    r'^[ \t]*(\d{1,2})[ \t]*\n?[ \t]*([A-Z][A-Z0-9 ,()/&\-–]+?)[ \t]*\.{4,}[ \t]*(\d{1,4})[ \t]*$',
+    re.MULTILINE
+)
+DOTTED_LEADER = re.compile(r'\.{4,}[ \t]*\d{1,4}[ \t]*$', re.MULTILINE)
+RUNNING_CHAPTER_HEADER = re.compile(r'^\s*(?:Chapter|Hoofdstuk)\s+(\d+)\b', re.IGNORECASE)
+FOLIO_LINE = re.compile(r'^\s*(\d{1,4})\s*$')
+
+PRINTED_TOC_MAX_PAGES = 30  # the printed contents sit in the front matter
+HEADER_LINES = 4            # running header + folio live in the first few lines
+SAMPLE_PAGES = 32           # pages sampled before binary searching chapter starts
+KEYLESS_LOOKAHEAD = 3       # blank/title pages without header or folio to look past
+
+
+@dataclass
+class BATChapterSpan:
+    """Located BAT chapter; pages are 0-indexed, end_page exclusive"""
+    start_page: int
+    end_page: int
+    title: str
+    method: str
+    # Documents with a BAT section per chapter (e.g. LVIC-AAF) have several ranges
+    ranges: List[Tuple[int, int]] = field(default_factory=list)
+    pages_read: int = 0
+
+    @property
+    def pages(self) -> List[int]:
+        return [page for start, end in (self.ranges or [(self.start_page, self.end_page)])
+                for page in range(start, end)]
+
+    def to_dict(self) -> Dict:
+        return {
+            'start_page': self.start_page,
+            'end_page': self.end_page,
+            'title': self.title,
+            'method': self.method,
+            'ranges': self.ranges,
+            'pages_read': self.pages_read
+        }
+
+
+def is_bat_chapter_title(title: str) -> bool:
+    """True for BAT / BBT chapter titles, excluding 'techniques to consider' chapters"""
+    title = ' '.join(title.split())
+    return bool(BAT_TITLE_PATTERN.match(title) or BBT_TITLE_PATTERN.search(title))
+
+
+class _PageHeaders:
+    """Memoised access to the first lines of pages, counting how many pages were read"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._heads: Dict[int, List[str]] = {}
+        self._texts: Dict[int, str] = {}
+
+    @property
+    def pages_read(self) -> int:
+        return len(set(self._heads) | set(self._texts))
+
+    def text(self, page_num: int) -> str:
+        if page_num not in self._texts:
+            self._texts[page_num] = self.doc[page_num].get_text()
+        return self._texts[page_num]
+
+    def head(self, page_num: int) -> List[str]:
+        if page_num not in self._heads:
+            lines = [line.strip() for line in self.text(page_num).split('\n') if line.strip()]
+            self._heads[page_num] = lines[:HEADER_LINES]
+        return self._heads[page_num]
+
+    def chapter(self, page_num: int) -> Optional[int]:
+        for line in self.head(page_num)[:1]:
+            match = RUNNING_CHAPTER_HEADER.match(line)
+            if match:
+                return int(match.group(1))
+        return None
+
+    def folio(self, page_num: int) -> Optional[int]:
+        for line in self.head(page_num):
+            match = FOLIO_LINE.match(line)
+            if match:
+                return int(match.group(1))
+        return None
+
+
+def _first_page_at_least(lo: int, hi: int, target: int, key: Callable[[int], Optional[int]]) -> int:
+    """Binary search [lo, hi) for the first page whose (monotonic) key is >= target.
+
+    Pages without a key (chapter title pages, blank pages) are resolved by
+    looking at the next few pages instead.
+    """
+    end = hi
+
+    def probe(page_num: int) -> Optional[int]:
+        for offset in range(KEYLESS_LOOKAHEAD):
+            if page_num + offset >= end:
+                break
+            value = key(page_num + offset)
+            if value is not None:
+                return value
+        return None
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+        value = probe(mid)
+        if value is None or value >= target:
+            hi = mid
+        else:
+            lo = mid + 1
+
+    # Blank separator pages before a chapter belong to the previous one
+    for _ in range(KEYLESS_LOOKAHEAD):
+        if lo + 1 >= end or key(lo) is not None:
+            break
+        lo += 1
+    return lo
+
+
+def _heading_on_page(headers: _PageHeaders, page_num: int, number: Optional[int] = None) -> bool:
+    """Does the page carry the BAT chapter heading itself (not just a running header)?"""
+    text = headers.text(page_num)
+    prefix = rf'{number}\s+' if number is not None else r'(?:\d+\s+)?'
+    pattern = re.compile(
+        rf'^\s*{prefix}(?:(?:GENERIC|COMMON)\s+)?(?:BEST\s+AVAILABLE\s+TECHNIQUES|BAT\s+CONCLUSIONS|BBT[-\s]CONCLUSIES)',
+        re.MULTILINE | re.IGNORECASE
+    )
+    return bool(pattern.search(text))
+
+
+class BATChapterLocator:
+    """Locates the BAT-conclusions chapter of a BREF/BATC PDF"""
+
+    def locate(self, pdf_path: str) -> Optional[BATChapterSpan]:
+        """Page span of the BAT chapter, or None if it cannot be found"""
+        doc = fitz.open(pdf_path)
+        try:
+            return self.locate_in_doc(doc)
+        finally:
+            doc.close()
+
+    def locate_in_doc(self, doc) -> Optional[BATChapterSpan]:
+        headers = _PageHeaders(doc)
+        for strategy in (self._from_outline, self._from_printed_toc, self._from_running_headers):
+            span = strategy(doc, headers)
+            if span is not None:
+                span.pages_read = headers.pages_read
+                return span
+        return None
+
+    def _from_outline(self, doc, headers: _PageHeaders) -> Optional[BATChapterSpan]:
+        """Use the PDF bookmarks; nested BAT sections inside a matched one are skipped"""
+        toc = doc.get_toc(simple=True)
+        if not toc:
+            return None
+
+        ranges = []
+        titles = []
+        covered_until = -1
+        for index, (level, title, page) in enumerate(toc):
+            start = page - 1
+            if start < 0 or start < covered_until or not is_bat_chapter_title(title):
+                continue
+
+            end = len(doc)
+            for next_level, _, next_page in toc[index + 1:]:
+                if next_level <= level and next_page - 1 >= start:
+                    # Chapters start on a fresh page; sub-sections may share their last page
+                    end = max(start + 1, next_page - 1 if level == 1 else next_page)
+                    break
+
+            ranges.append((start, end))
+            titles.append(' '.join(title.split()))
+            covered_until = end
+
+        if not ranges:
+            return None
+        return BATChapterSpan(
+            start_page=ranges[0][0],
+            end_page=ranges[-1][1],
+            title=titles[0] if len(titles) == 1 else f"{titles[0]} (+{len(titles) - 1} more)",
+            method='outline',
+            ranges=ranges
+        )
+
+    def _from_printed_toc(self, doc, headers: _PageHeaders) -> Optional[BATChapterSpan]:
+        """Parse the printed contents pages and map printed page numbers to PDF pages"""
+        entries = []
+        for page_num in range(min(PRINTED_TOC_MAX_PAGES, len(doc))):
+            for match in PRINTED_TOC_ENTRY.finditer(headers.text(page_num)):
+                entries.append((int(match.group(1)), ' '.join(match.group(2).split()), int(match.group(3))))
+            if entries and not DOTTED_LEADER.search(headers.text(page_num)):
+                break  # past the contents pages
+
+        for index, (number, title, printed_page) in enumerate(entries):
+            if not is_bat_chapter_title(title):
+                continue
+            start = self._resolve_printed_page(doc, headers, printed_page, number)
+            if start is None:
+                continue
+
+            end = len(doc)
+            following = [entry for entry in entries[index + 1:] if entry[2] > printed_page]
+            if following:
+                resolved = self._resolve_printed_page(doc, headers, following[0][2], None, verify=False)
+                if resolved is not None and resolved > start:
+                    end = resolved
+            return BATChapterSpan(start_page=start, end_page=end, title=title, method='printed_toc',
+                                  ranges=[(start, end)])
+        return None
+
+    def _resolve_printed_page(self, doc, headers: _PageHeaders, printed_page: int,
+                              chapter_number: Optional[int], verify: bool = True) -> Optional[int]:
+        """Physical page for a printed page number: folio binary search, then page labels"""
+        candidates = []
+        start = _first_page_at_least(0, len(doc), printed_page, headers.folio)
+        if start < len(doc) and headers.folio(start) == printed_page:
+            candidates.append(start)
+        elif start < len(doc):
+            # Chapter title pages often carry no folio; the binary search lands just after
+            candidates.extend([start - 1, start])
+
+        try:
+            candidates.extend(doc.get_page_numbers(str(printed_page)))
+        except Exception:
+            pass
+
+        for candidate in candidates:
+            if not 0 <= candidate < len(doc):
+                continue
+            if not verify:
+                return candidate
+            # Labels are not always the printed numbers: only accept a page showing the heading
+            for page_num in (candidate, candidate + 1):
+                if page_num < len(doc) and _heading_on_page(headers, page_num, chapter_number):
+                    return page_num
+        return None
+
+    def _from_running_headers(self, doc, headers: _PageHeaders) -> Optional[BATChapterSpan]:
+        """Sample 'Chapter N' running headers, then binary search each chapter's first page"""
+        total = len(doc)
+        stride = max(1, total // SAMPLE_PAGES)
+        samples = [(page_num, headers.chapter(page_num)) for page_num in range(0, total, stride)]
+        samples = [(page_num, chapter) for page_num, chapter in samples if chapter is not None]
+        if not samples:
+            return None
+
+        def bracket(target: int) -> Tuple[int, int]:
+            # Search only between samples, so front/back matter without headers is never probed
+            lo = max((page_num + 1 for page_num, chapter in samples if chapter < target), default=0)
+            hi = min((page_num for page_num, chapter in samples if chapter >= target), default=total)
+            return lo, max(lo, hi)
+
+        chapters = [chapter for _, chapter in samples]
+        # The BAT chapter sits near the end of a BREF, so try the last chapters first
+        for number in range(max(chapters), min(chapters) - 1, -1):
+            start = _first_page_at_least(*bracket(number), number, headers.chapter)
+            if start >= total:
+                continue
+            # The chapter title page itself may lack the running header
+            for page_num in (start - 1, start):
+                if page_num >= 0 and _heading_on_page(headers, page_num, number):
+                    end = _first_page_at_least(start, max(start, bracket(number + 1)[1]), number + 1, headers.chapter)
+                    title = next((line for line in headers.text(page_num).split('\n')
+                                  if is_bat_chapter_title(line.strip())), f"Chapter {number}")
+                    return BATChapterSpan(start_page=page_num, end_page=end, title=title.strip(),
+                                          method='running_headers', ranges=[(page_num, end)])
+        return None
+
+
+def locate_bat_chapter(pdf_path: str) -> Optional[BATChapterSpan]:
+    """Convenience wrapper around BATChapterLocator().locate()"""
+    return BATChapterLocator().locate(pdf_path)
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or ["bref_downloads/pol_bref.pdf", "bref_downloads/cer_bref.pdf"]
+    locator = BATChapterLocator()
+    for path in paths:
+        span = locator.locate(path)
+        if span is None:
+            print(f"❌ {path}: no BAT chapter found")
+        else:
+            print(f"📍 {path}: pages {span.start_page + 1}-{span.end_page} via {span.method} "
+                  f"({span.pages_read} pages read) - {span.title}")
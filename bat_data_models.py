@@ -24,6 +24,33 @@ class PollutantType(str, Enum):
     ODOUR = "odour"
     NOISE = "noise"
     TOTAL_SUSPENDED_PARTICLES = "TSP"
+    # Industrial BAT-AEL parameters (air and water)
+    DUST = "dust"
+    HYDROGEN_CHLORIDE = "HCl"
+    HYDROGEN_FLUORIDE = "HF"
+    TOTAL_VOLATILE_ORGANIC_CARBON = "TVOC"
+    PCDD_F = "PCDD/F"
+    TOTAL_ORGANIC_CARBON = "TOC"
+    CHEMICAL_OXYGEN_DEMAND = "COD"
+    BIOCHEMICAL_OXYGEN_DEMAND = "BOD"
+    TOTAL_SUSPENDED_SOLIDS = "TSS"
+    TOTAL_NITROGEN = "TN"
+    TOTAL_INORGANIC_NITROGEN = "N_inorg"
+    TOTAL_PHOSPHORUS = "TP"
+    AOX = "AOX"
+    FLUORIDE = "F-"
+    SULPHATE = "SO4"
+    SULPHIDE = "S2-"
+    SULPHITE = "SO3"
+    ARSENIC = "As"
+    CADMIUM = "Cd"
+    CHROMIUM = "Cr"
+    COPPER = "Cu"
+    LEAD = "Pb"
+    MERCURY = "Hg"
+    NICKEL = "Ni"
+    ZINC = "Zn"
+    OTHER = "other"  # parameter kept verbatim by the caller
 
 
 class BATType(str, Enum):
@@ -127,7 +154,8 @@ class EmissionLimitValue(BaseModel):
     unit: str = Field(..., description="Unit of measurement")
     measurement_period: str = Field(..., description="Averaging period (daily, monthly, yearly)")
     measurement_conditions: Optional[str] = Field(None, description="Specific measurement conditions")
-    monitoring_frequency: MonitoringFrequency
+    # BAT-AEL tables give no frequency; it is set by the monitoring BAT
+    monitoring_frequency: Optional[MonitoringFrequency] = None
     monitoring_method: Optional[str] = Field(None, description="EN/ISO standard or method")
     
     # Performance ranges for different conditions
@@ -135,7 +163,12 @@ class EmissionLimitValue(BaseModel):
     typical_performance: Optional[float] = Field(None, description="Typical performance range")
     maximum_performance: Optional[float] = Field(None, description="Maximum performance under optimal conditions")
     
-    @validator('limit_value', 'minimum_performance', 'typical_performance', 'maximum_performance')
+    # BAT-AEL range as published (limit_value is the upper end)
+    range_low: Optional[float] = Field(None, description="Lower end of the BAT-AEL range")
+    range_high: Optional[float] = Field(None, description="Upper end of the BAT-AEL range")
+    
+    @validator('limit_value', 'minimum_performance', 'typical_performance', 'maximum_performance',
+               'range_low', 'range_high')
     def validate_positive_values(cls, v):
         if v is not None and v < 0:
             raise ValueError('Performance values must be non-negative')
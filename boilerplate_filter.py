@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/boilerplate_filter.py
+
+"""
+Boilerplate Filter
+Finds the running headers, footers, page numbers and "EN"/"NL" marks that a
+BREF or BAT conclusions PDF prints on every page, and removes them from the
+page texts before the BAT parsers run. A line counts as boilerplate when its
+fingerprint (whitespace collapsed, lowercased, digits -> '#') sits in the
+top or bottom lines of at least half of the pages, so "Chapter 3" and
+"Chapter 4" or "L 212/44" and "L 212/45" are recognised as the same header.
+Printed page numbers are recognised by a constant offset to the PDF page.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from paged_text import PagedText
+
+EDGE_LINES = 5          # non-blank lines at the top and at the bottom of a page that are checked
+MIN_PAGE_SHARE = 0.5    # share of pages a line must repeat on; table headers repeat on ~30 %
+MIN_PAGES = 3
+CHARS_PER_TOKEN = 4     # rough estimate for the prompt size saved
+
+_SPACES = re.compile(r'\s+')
+_DIGITS = re.compile(r'\d+')
+_LETTER = re.compile(r'[^\W\d_]')
+
+
+def line_fingerprint(line: str) -> str:
+    """'  Chapter 4 ' -> 'chapter #', 'L 212/44' -> 'l #/#'"""
+    return _DIGITS.sub('#', _SPACES.sub(' ', line).strip().lower())
+
+
+@dataclass
+class BoilerplateReport:
+    """What the filter removed from one document"""
+    pages: int = 0
+    chars_before: int = 0
+    chars_after: int = 0
+    lines_removed: int = 0
+    fingerprints: List[str] = field(default_factory=list)
+
+    @property
+    def chars_saved(self) -> int:
+        return self.chars_before - self.chars_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.chars_saved // CHARS_PER_TOKEN
+
+    def summary(self) -> str:
+        share = 100.0 * self.chars_saved / self.chars_before if self.chars_before else 0.0
+        return (f"{self.lines_removed} boilerplate lines removed from {self.pages} pages: "
+                f"{self.chars_saved} chars ({share:.1f}%), ~{self.tokens_saved} tokens")
+
+    def to_dict(self) -> dict:
+        return {
+            'pages': self.pages,
+            'chars_before': self.chars_before,
+            'chars_after': self.chars_after,
+            'chars_saved': self.chars_saved,
+            'tokens_saved': self.tokens_saved,
+            'lines_removed': self.lines_removed,
+            'fingerprints': self.fingerprints
+        }
+
+
+class BoilerplateFilter:
+    """Learns the repeated page furniture of one document and strips it"""
+
+    def __init__(self, edge_lines: int = EDGE_LINES, min_share: float = MIN_PAGE_SHARE, min_pages: int = MIN_PAGES):
+        self.edge_lines = edge_lines
+        self.min_share = min_share
+        self.min_pages = min_pages
+        self.fingerprints: Set[str] = set()
+        self.exact_lines: Set[str] = set()
+        self.page_number_offsets: Set[int] = set()
+
+    def _edge_indexes(self, lines: List[str]) -> List[int]:
+        filled = [index for index, line in enumerate(lines) if line.strip()]
+        if len(filled) <= 2 * self.edge_lines:
+            return filled
+        return filled[:self.edge_lines] + filled[-self.edge_lines:]
+
+    def _classify(self, line: str, page_number: int) -> Tuple[str, object]:
+        """('offset', n) for a bare page number, ('fingerprint', fp) for text, ('exact', line) for other numbers"""
+        exact = _SPACES.sub(' ', line).strip()
+        if exact.isdigit():
+            return 'offset', int(exact) - page_number
+        if _LETTER.search(exact):
+            return 'fingerprint', line_fingerprint(exact)
+        # Dates and numbers like "17.8.2017" must repeat verbatim; "4.2.3" headings differ per page
+        return 'exact', exact
+
+    def fit(self, pages: Sequence[Tuple[int, str]]) -> "BoilerplateFilter":
+        """Learn the repeated lines from (page_number, text) pairs"""
+        counts = {'offset': Counter(), 'fingerprint': Counter(), 'exact': Counter()}
+        for page_number, text in pages:
+            lines = text.split('\n')
+            seen = {(kind, key) for kind, key in (self._classify(lines[index], page_number)
+                                                  for index in self._edge_indexes(lines))}
+            for kind, key in seen:
+                counts[kind][key] += 1
+
+        threshold = max(self.min_pages, self.min_share * len(pages))
+        self.page_number_offsets = {key for key, count in counts['offset'].items() if count >= threshold}
+        self.fingerprints = {key for key, count in counts['fingerprint'].items() if count >= threshold}
+        self.exact_lines = {key for key, count in counts['exact'].items() if count >= threshold}
+        return self
+
+    def learned(self) -> List[str]:
+        """What the fitted filter removes, for the report"""
+        return sorted(self.fingerprints | self.exact_lines) + (['<page number>'] if self.page_number_offsets else [])
+
+    def is_boilerplate(self, line: str, page_number: int) -> bool:
+        kind, key = self._classify(line, page_number)
+        if kind == 'offset':
+            return key in self.page_number_offsets
+        if kind == 'fingerprint':
+            return key in self.fingerprints
+        return key in self.exact_lines
+
+    def clean_page(self, page_number: int, text: str) -> Tuple[str, int]:
+        """Page text without its header/footer lines, and the number of lines removed"""
+        lines = text.split('\n')
+        drop = {index for index in self._edge_indexes(lines) if self.is_boilerplate(lines[index], page_number)}
+        if not drop:
+            return text, 0
+        return '\n'.join(line for index, line in enumerate(lines) if index not in drop), len(drop)
+
+    def strip(self, pages: Iterable[Tuple[int, str]]) -> Tuple[List[Tuple[int, str]], BoilerplateReport]:
+        """Fit on the pages and return the cleaned pages with a report"""
+        pages = list(pages)
+        self.fit(pages)
+        report = BoilerplateReport(pages=len(pages), fingerprints=self.learned())
+
+        cleaned = []
+        for page_number, text in pages:
+            page_text, removed = self.clean_page(page_number, text)
+            report.chars_before += len(text)
+            report.chars_after += len(page_text)
+            report.lines_removed += removed
+            cleaned.append((page_number, page_text))
+        return cleaned, report
+
+
+def strip_boilerplate(paged: PagedText, boilerplate_filter: Optional[BoilerplateFilter] = None) -> Tuple[PagedText, BoilerplateReport]:
+    """PagedText without running headers/footers, plus what was saved"""
+    cleaned, report = (boilerplate_filter or BoilerplateFilter()).strip(paged.iter_pages())
+    return PagedText(cleaned), report
+
+
+if __name__ == "__main__":
+    import sys
+    import fitz
+    from extraction_benchmark import find_corpus
+
+    # Usage: python boilerplate_filter.py [file.pdf ...]  (default: the bundled corpus)
+    documents = sys.argv[1:] or find_corpus()
+    total = BoilerplateReport()
+    for pdf_path in documents:
+        try:
+            with fitz.open(pdf_path) as doc:
+                _, report = strip_boilerplate(PagedText.from_doc(doc))
+        except Exception as e:
+            print(f"❌ {pdf_path}: {e}")
+            continue
+        print(f"🧹 {pdf_path}: {report.summary()}")
+        print(f"   {', '.join(report.fingerprints) or '-'}")
+        total.pages += report.pages
+        total.chars_before += report.chars_before
+        total.chars_after += report.chars_after
+        total.lines_removed += report.lines_removed
+    print(f"\n📊 Total: {total.summary()}")
@@ -2,18 +2,18 @@
 
 import os
 import json
-import requests
-import re
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import sqlite3
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 import time
 
+from http_fetcher import Fetcher, get_default_fetcher
 from regulatory_data_manager import RegulatoryDataManager
 from pdf_processor import extract_text_and_metadata
 from llm_handler import llm_call
+from grammar_packs import DUTCH_PACK, APPLICABILITY, EMISSION_LEVELS, MONITORING, TECHNIQUES
 
 @dataclass
 class Nederlandse_BBT_Conclusie:
@@ -46,8 +46,9 @@ class BREF_Overzicht:
 class Uitgebreide_BREF_Processor:
     """Uitgebreide processor voor alle Nederlandse BREF documenten"""
     
-    def __init__(self, reg_manager: RegulatoryDataManager):
+    def __init__(self, reg_manager: RegulatoryDataManager, fetcher: Optional[Fetcher] = None):
         self.reg_manager = reg_manager
+        self._fetcher = fetcher
         
         # Uitgebreide lijst van alle Nederlandse BREF URLs
         self.alle_nederlandse_brefs = {
@@ -149,6 +150,13 @@ class Uitgebreide_BREF_Processor:
             }
         }
     
+    @property
+    def fetcher(self) -> Fetcher:
+        """Injected fetcher, else the shared one (created on first network use)"""
+        if self._fetcher is None:
+            self._fetcher = get_default_fetcher()
+        return self._fetcher
+
     def download_alle_nederlandse_brefs(self, bref_ids: List[str] = None) -> Dict[str, bool]:
         """Download alle Nederlandse BREF documenten parallel"""
         if bref_ids is None:
@@ -158,27 +166,30 @@ class Uitgebreide_BREF_Processor:
         
         print(f"=== DOWNLOADEN VAN {len(bref_ids)} NEDERLANDSE BREF DOCUMENTEN ===")
         
-        # Parallel downloaden voor snelheid
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = {}
-            for bref_id in bref_ids:
-                if bref_id in self.alle_nederlandse_brefs:
-                    future = executor.submit(self._download_enkele_bref, bref_id)
-                    futures[future] = bref_id
-            
-            for future in as_completed(futures):
-                bref_id = futures[future]
-                try:
-                    resultaat = future.result()
-                    resultaten[bref_id] = resultaat
-                    status = "✅ Succesvol" if resultaat else "❌ Mislukt"
-                    print(f"{bref_id}: {status}")
-                except Exception as e:
-                    print(f"{bref_id}: ❌ Fout - {e}")
-                    resultaten[bref_id] = False
+        # Parallel downloaden via de gedeelde fetcher (limieten per host)
+        futures = {}
+        for bref_id in bref_ids:
+            if bref_id in self.alle_nederlandse_brefs:
+                futures[self.fetcher.download(self.alle_nederlandse_brefs[bref_id]["bbt_conclusies_url"],
+                                              self._lokaal_pad(bref_id))] = bref_id
+        
+        for future in as_completed(futures):
+            bref_id = futures[future]
+            resultaat = future.result()
+            resultaten[bref_id] = resultaat.ok
+            if resultaat.not_modified:
+                status = "✅ Ongewijzigd"
+            else:
+                status = "✅ Succesvol" if resultaat.ok else f"❌ Mislukt - {resultaat.error}"
+            print(f"{bref_id}: {status}")
         
         return resultaten
     
+    def _lokaal_pad(self, bref_id: str) -> str:
+        """Lokaal pad van de BBT conclusies PDF"""
+        filename = f"{bref_id}_BBT_conclusies_NL.pdf"
+        return os.path.join(self.reg_manager.data_dir, "bat_conclusions", filename)
+    
     def _download_enkele_bref(self, bref_id: str) -> bool:
         """Download een enkel BREF document"""
         if bref_id not in self.alle_nederlandse_brefs:
@@ -187,23 +198,10 @@ class Uitgebreide_BREF_Processor:
         bref_info = self.alle_nederlandse_brefs[bref_id]
         url = bref_info["bbt_conclusies_url"]
         
-        try:
-            response = requests.get(url, timeout=60, headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            })
-            response.raise_for_status()
-            
-            filename = f"{bref_id}_BBT_conclusies_NL.pdf"
-            local_path = os.path.join(self.reg_manager.data_dir, "bat_conclusions", filename)
-            
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-            
-            return True
-            
-        except Exception as e:
-            print(f"Fout bij downloaden {bref_id}: {e}")
-            return False
+        resultaat = self.fetcher.download(url, self._lokaal_pad(bref_id)).result()
+        if not resultaat.ok:
+            print(f"Fout bij downloaden {bref_id}: {resultaat.error}")
+        return resultaat.ok
     
     def extraheer_alle_bbt_conclusies(self, bref_ids: List[str] = None) -> Dict[str, List[Nederlandse_BBT_Conclusie]]:
         """Extraheer BBT conclusies uit alle BREF documenten"""
@@ -255,16 +253,6 @@ class Uitgebreide_BREF_Processor:
         """Geavanceerde parsing van Nederlandse BBT conclusies"""
         bbt_conclusies = []
         
-        # Verschillende patronen voor verschillende BREF structuren
-        bbt_patronen = [
-            r'^BBT\s+(\d+(?:\.\d+)?)\s*[\.:]?\s*(.*?)$',  # BBT 1. Titel
-            r'^(\d+(?:\.\d+)?)\.\s*BBT\s+(.*?)$',  # 1. BBT Titel  
-            r'^\*\*BBT\s+(\d+(?:\.\d+)?)\*\*\s*(.*?)$',  # **BBT 1** Titel
-            r'^Om\s+.*?,\s*is\s+de\s+BBT\s*(.*?)$',  # Om ..., is de BBT ...
-            r'^Teneinde\s+.*?,\s*is\s+de\s+BBT\s*(.*?)$',  # Teneinde ..., is de BBT ...
-            r'Voor\s+.*?,\s*is\s+de\s+BBT\s*(.*?)$',  # Voor ..., is de BBT ...
-        ]
-        
         lines = text.split('\n')
         current_bbt = None
         current_section = ""
@@ -275,32 +263,23 @@ class Uitgebreide_BREF_Processor:
             if not line:
                 continue
             
-            # Controleer BBT patronen
-            bbt_match = None
-            for pattern in bbt_patronen:
-                bbt_match = re.match(pattern, line, re.IGNORECASE)
-                if bbt_match:
-                    break
+            # Controleer BBT kopvormen
+            bbt_match = DUTCH_PACK.header(line)
             
             if bbt_match:
                 # Vorige BBT opslaan
                 if current_bbt:
                     bbt_conclusies.append(current_bbt)
                 
-                # Nieuwe BBT starten
+                # Nieuwe BBT starten; zinskoppen ("Om ..., is de BBT ...") hebben geen nummer
                 bbt_counter += 1
-                if bbt_match.groups():
-                    bbt_nummer = bbt_match.group(1) if len(bbt_match.groups()) >= 1 else str(bbt_counter)
-                    titel = bbt_match.group(2) if len(bbt_match.groups()) >= 2 else line
-                else:
-                    bbt_nummer = str(bbt_counter)
-                    titel = line
+                bbt_nummer = bbt_match.number or str(bbt_counter)
                 
                 current_bbt = Nederlandse_BBT_Conclusie(
                     bbt_id=f"{bref_id}_BBT_{bbt_nummer}",
                     bref_bron=bref_id,
                     bbt_nummer=str(bbt_nummer),
-                    titel=titel.strip(),
+                    titel=bbt_match.title,
                     beschrijving="",
                     toepasselijkheid="",
                     bron_sectie=current_section
@@ -308,21 +287,21 @@ class Uitgebreide_BREF_Processor:
                 continue
             
             # Sectie headers bijhouden
-            if any(keyword in line.upper() for keyword in ['HOOFDSTUK', 'SECTIE', 'PARAGRAAF', 'BIJLAGE']):
+            if DUTCH_PACK.is_section(line):
                 current_section = line
                 continue
             
             # BBT inhoud verzamelen
             if current_bbt and line:
                 # Specifieke subsecties identificeren
-                line_lower = line.lower()
-                if any(keyword in line_lower for keyword in ['toepasselijkheid', 'van toepassing', 'geldt voor']):
+                categorie = DUTCH_PACK.category(line)
+                if categorie == APPLICABILITY:
                     current_bbt.toepasselijkheid += line + " "
-                elif any(keyword in line_lower for keyword in ['emissie', 'grenswaarde', 'niveau', 'mg/m³', 'μg/m³']):
+                elif categorie == EMISSION_LEVELS:
                     current_bbt.emissieniveaus = (current_bbt.emissieniveaus or "") + line + " "
-                elif any(keyword in line_lower for keyword in ['monitor', 'meting', 'controle', 'frequentie']):
+                elif categorie == MONITORING:
                     current_bbt.monitoringvereisten = (current_bbt.monitoringvereisten or "") + line + " "
-                elif any(keyword in line_lower for keyword in ['techniek', 'methode', 'procedure', 'apparatuur']):
+                elif categorie == TECHNIQUES:
                     current_bbt.technieken = (current_bbt.technieken or "") + line + " "
                 else:
                     current_bbt.beschrijving += line + " "
@@ -14,11 +14,14 @@ import json
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 
+from reference_index import ReferenceIndex
+
 class ComprehensiveBATExtractor:
     def __init__(self):
         self.bref_dir = "/Users/han/Code/MOB-BREF/regulatory_data/brefs"
         self.extracted_bats = []
         self.bref_documents = {}
+        self.reference_indexes = {}
         
     def extract_all_bats(self):
         """Extract BATs from all available BREF documents"""
@@ -89,6 +92,9 @@ class ComprehensiveBATExtractor:
             total_pages = len(doc)
             print(f"   📄 Opened {bref_id}: {total_pages} pages")
             
+            # Index headings, captions and BAT numbers once for reference resolution
+            self.reference_indexes[bref_id] = ReferenceIndex.from_document(doc)
+            
             # Extract BATs using BREF-specific logic
             if bref_id == 'ENE':
                 bats = self.extract_ene_bats(doc, bref_id)
@@ -312,21 +318,16 @@ class ComprehensiveBATExtractor:
     def find_referenced_section(self, reference: str, doc, bref_id: str) -> Optional[str]:
         """Find the text of a referenced section"""
         
-        # Simple section finding - could be enhanced
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = page.get_text()
-            
-            # Look for the section heading
-            if reference.lower() in page_text.lower():
-                # Extract some context around the reference
-                ref_pos = page_text.lower().find(reference.lower())
-                if ref_pos != -1:
-                    start = max(0, ref_pos - 100)
-                    end = min(len(page_text), ref_pos + 1000)
-                    return page_text[start:end].strip()
-        
-        return None
+        index = self.reference_indexes.get(bref_id)
+        if index is None:
+            index = self.reference_indexes[bref_id] = ReferenceIndex.from_document(doc)
+        
+        location = index.lookup(reference)
+        if location is None:
+            return None
+        
+        page_num, start, end = location
+        return doc[page_num].get_text()[start:end].strip()
     
     def remove_duplicate_bats(self, bats: List[Dict]) -> List[Dict]:
         """Remove duplicate BAT entries"""
@@ -352,7 +353,9 @@ class ComprehensiveBATExtractor:
                 'brefs_processed': list(set(bat['bref_id'] for bat in self.extracted_bats)),
                 'extractor_version': 'ComprehensiveBATExtractor v1.0'
             },
-            'bats': self.extracted_bats
+            'bats': self.extracted_bats,
+            # Reload with ReferenceIndex.from_dict() to resolve references without rescanning the PDF
+            'reference_indexes': {bref_id: index.to_dict() for bref_id, index in self.reference_indexes.items()}
         }
         
         with open(filename, 'w', encoding='utf-8') as f:
@@ -4,24 +4,35 @@ Comprehensive BATC Extractor for All EU BAT Conclusions Documents
 Extracts all BBT entries from the complete list of BATC HTML documents
 """
 
-import requests
 import json
 import re
 import os
 from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional
 from urllib.parse import urlparse
-import time
 from datetime import datetime
+from functools import partial
+from http_fetcher import Fetcher, get_default_fetcher
+from section_index import SectionBoundaryIndex
+from streaming_batc_parser import BBTSegment, LXML_AVAILABLE, STREAM_CHUNK_SIZE, iter_html_segments
 
 class ComprehensiveBATCExtractor:
     """Extracts BBT entries from all BATC documents"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+    def __init__(self, fetcher: Optional[Fetcher] = None):
+        # Shared fetcher: concurrent requests within the per-host rate limits
+        self._fetcher = fetcher
+        # Section end markers, in priority order
+        self.section_index = SectionBoundaryIndex([
+            r'BIJLAGE\s+[IVX]+',     # Dutch Annex
+            r'ANNEX\s+[IVX]+',       # English Annex
+            r'References',           # References section
+            r'Referenties',          # Dutch References
+            r'Glossary',            # Glossary
+            r'Glossarium',          # Dutch Glossary
+            r'Chapter\s+[5-9]',     # Next chapter
+            r'Hoofdstuk\s+[5-9]'    # Dutch chapter
+        ], flags=re.IGNORECASE, max_span=15000)
         
         # Complete BATC document list
         self.batc_documents = {
@@ -53,6 +64,13 @@ class ComprehensiveBATCExtractor:
         self.extraction_results = {}
         self.extraction_stats = {}
     
+    @property
+    def fetcher(self) -> Fetcher:
+        """Injected fetcher, else the shared one (created on first network use)"""
+        if self._fetcher is None:
+            self._fetcher = get_default_fetcher()
+        return self._fetcher
+
     def extract_all_batcs(self, output_dir: str = "batc_extractions") -> Dict:
         """Extract BBTs from all BATC documents"""
         
@@ -66,15 +84,24 @@ class ComprehensiveBATCExtractor:
         successful_docs = 0
         failed_docs = []
         
+        # All documents are requested at once; the fetcher spaces the requests per host
+        futures = {}
         for doc_code, url in self.batc_documents.items():
+            # Determine language
+            language = 'English' if '/EN/' in url else 'Dutch'
+            futures[doc_code] = (language, self.fetcher.submit(
+                url, partial(self._extract_bbts_from_response, source_url=url, doc_code=doc_code, language=language)))
+        
+        # Results are handled in document order so the saved files do not depend on timing
+        for doc_code, (language, future) in futures.items():
+            url = self.batc_documents[doc_code]
             print(f"\n🔍 Processing {doc_code}...")
             
             try:
-                # Determine language
-                language = 'English' if '/EN/' in url else 'Dutch'
-                
-                # Extract BBTs from this document
-                bbts = self.extract_bbts_from_url(url, doc_code, language)
+                result = future.result()
+                if not result.ok:
+                    raise RuntimeError(result.error)
+                bbts = result.value
                 
                 if bbts:
                     # Save individual document results
@@ -95,15 +122,13 @@ class ComprehensiveBATCExtractor:
                     total_bbts += len(bbts)
                     successful_docs += 1
                     
-                    print(f"  ✅ {doc_code}: {len(bbts)} BBTs extracted")
+                    print(f"  ✅ {doc_code}: {len(bbts)} BBTs extracted ({result.seconds:.1f}s, "
+                          f"{result.waited:.1f}s rate limited)")
                     
                 else:
                     failed_docs.append(doc_code)
                     print(f"  ❌ {doc_code}: No BBTs found")
                 
-                # Rate limiting
-                time.sleep(1)
-                
             except Exception as e:
                 failed_docs.append(doc_code)
                 print(f"  ❌ {doc_code}: Error - {e}")
@@ -119,18 +144,35 @@ class ComprehensiveBATCExtractor:
     def extract_bbts_from_url(self, url: str, doc_code: str, language: str) -> List[Dict]:
         """Extract BBTs from a single BATC document URL"""
         
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Use text-based extraction for consistent results
-            return self._extract_bbts_from_html(soup, url, doc_code, language)
-            
-        except Exception as e:
-            print(f"    Error fetching {doc_code}: {e}")
+        result = self.fetcher.fetch(url, partial(self._extract_bbts_from_response, source_url=url,
+                                                 doc_code=doc_code, language=language))
+        if not result.ok:
+            print(f"    Error fetching {doc_code}: {result.error}")
             return []
+        return result.value
+    
+    def _extract_bbts_from_response(self, response, source_url: str, doc_code: str, language: str) -> List[Dict]:
+        """Extract BBTs from an open (streamed) response"""
+        
+        if LXML_AVAILABLE:
+            # Parse while downloading; BBTs are cut from the text as it arrives.
+            # Without a charset header lxml reads the page's <meta charset>
+            encoding = response.encoding if 'charset' in response.headers.get('Content-Type', '') else None
+            return self._extract_bbts_streaming(response.iter_content(STREAM_CHUNK_SIZE), source_url, doc_code,
+                                                language, encoding)
+        
+        soup = BeautifulSoup(response.content, 'html.parser')
+        
+        # Use text-based extraction for consistent results
+        return self._extract_bbts_from_html(soup, source_url, doc_code, language)
+    
+    def _bbt_pattern(self, language: str) -> re.Pattern:
+        """BBT header pattern for the document language"""
+        if language == 'English':
+            # English: "BAT X" or "X. BAT"
+            return re.compile(r'(?:(\d+)\.\s*)?(?:BAT|BBT)\s+(\d+)\.?\s+[^.]*\.', re.IGNORECASE | re.MULTILINE)
+        # Dutch: "BBT X"
+        return re.compile(r'(?:BBT|BAT)\s+(\d+)\.?\s+[^.]*\.', re.IGNORECASE | re.MULTILINE)
     
     def _extract_bbts_from_html(self, soup: BeautifulSoup, source_url: str, doc_code: str, language: str) -> List[Dict]:
         """Extract BBT entries using improved HTML parsing"""
@@ -138,43 +180,50 @@ class ComprehensiveBATCExtractor:
         # Get full text content
         full_text = soup.get_text()
         
-        # Determine BBT pattern based on language
-        if language == 'English':
-            # English: "BAT X" or "X. BAT"
-            bbt_pattern = r'(?:(\d+)\.\s*)?(?:BAT|BBT)\s+(\d+)\.?\s+[^.]*\.'
-            prefix = 'BAT'
-        else:
-            # Dutch: "BBT X"
-            bbt_pattern = r'(?:BBT|BAT)\s+(\d+)\.?\s+[^.]*\.'
-            prefix = 'BBT'
-        
         # Find all BBT matches
-        bbt_matches = list(re.finditer(bbt_pattern, full_text, re.IGNORECASE | re.MULTILINE))
+        bbt_matches = list(self._bbt_pattern(language).finditer(full_text))
+        
+        segments = []
+        for i, match in enumerate(bbt_matches):
+            start_pos = match.start()
+            
+            # Find end position
+            if i + 1 < len(bbt_matches):
+                end_pos = bbt_matches[i + 1].start()
+            else:
+                end_pos = self._find_logical_end(full_text, start_pos)
+            
+            segments.append(BBTSegment(start_pos, match.groups(), full_text[start_pos:end_pos].strip()))
+        
+        return self._bbts_from_segments(segments, source_url, doc_code, language)
+    
+    def _extract_bbts_streaming(self, chunks: Iterable[bytes], source_url: str, doc_code: str, language: str,
+                                encoding: Optional[str] = None) -> List[Dict]:
+        """Extract BBT entries from raw HTML chunks without building a tree (same output as the soup path)"""
+        segments = iter_html_segments(chunks, self._bbt_pattern(language), self.section_index, encoding)
+        return self._bbts_from_segments(segments, source_url, doc_code, language)
+    
+    def _bbts_from_segments(self, segments: Iterable[BBTSegment], source_url: str, doc_code: str,
+                            language: str) -> List[Dict]:
+        """BBT dictionaries from header segments, first occurrence of each number, sorted"""
+        
+        prefix = 'BAT' if language == 'English' else 'BBT'
         
         bbts = []
         processed_numbers = set()
         
-        for i, match in enumerate(bbt_matches):
+        for segment in segments:
             # Extract BBT number
             if language == 'English':
-                bbt_num = int(match.group(2) if match.group(2) else match.group(1))
+                bbt_num = int(segment.groups[1] if segment.groups[1] else segment.groups[0])
             else:
-                bbt_num = int(match.group(1))
+                bbt_num = int(segment.groups[0])
             
             # Skip duplicates
             if bbt_num in processed_numbers:
                 continue
             
-            # Extract BBT content
-            start_pos = match.start()
-            
-            # Find end position
-            if i + 1 < len(bbt_matches):
-                end_pos = bbt_matches[i + 1].start()
-            else:
-                end_pos = self._find_logical_end(full_text, start_pos)
-            
-            bbt_text = full_text[start_pos:end_pos].strip()
+            bbt_text = segment.text
             
             # Validate content
             if len(bbt_text) > 100:  # Minimum length
@@ -211,28 +260,7 @@ class ComprehensiveBATCExtractor:
     
     def _find_logical_end(self, text: str, start_pos: int) -> int:
         """Find logical end position for BBT content"""
-        
-        search_text = text[start_pos:]
-        
-        # Look for section end patterns
-        end_patterns = [
-            r'BIJLAGE\s+[IVX]+',     # Dutch Annex
-            r'ANNEX\s+[IVX]+',       # English Annex
-            r'References',           # References section
-            r'Referenties',          # Dutch References
-            r'Glossary',            # Glossary
-            r'Glossarium',          # Dutch Glossary
-            r'Chapter\s+[5-9]',     # Next chapter
-            r'Hoofdstuk\s+[5-9]'    # Dutch chapter
-        ]
-        
-        for pattern in end_patterns:
-            match = re.search(pattern, search_text, re.IGNORECASE)
-            if match:
-                return start_pos + match.start()
-        
-        # Default limit
-        return min(len(text), start_pos + 15000)
+        return self.section_index.end_position(text, start_pos)
     
     def _extract_title(self, text: str, number: int, prefix: str) -> str:
         """Extract meaningful title from BBT text"""
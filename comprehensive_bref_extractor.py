@@ -5,7 +5,6 @@ Extracts BAT entries from English BREF documents, focusing on Chapter 5
 """
 
 import fitz
-import requests
 import json
 import re
 import os
@@ -14,10 +13,38 @@ from urllib.parse import urlparse
 import time
 from datetime import datetime
 
+from download_manifest import verify_download
+from http_fetcher import Fetcher, get_default_fetcher
+from paged_text import PagedText
+from bat_chapter_locator import BATChapterLocator
+from bat_header_scanner import BATHeaderScanner, merge_by_priority, KEEP_ALL, NEW_NUMBER
+from section_index import SectionBoundaryIndex
+from boilerplate_filter import strip_boilerplate
+from text_normalizer import normalize_text
+
+BAT_HEADER_SCANNER = BATHeaderScanner([
+    # "X. BAT is to..."
+    ('standard', re.compile(r'^\s*(\d+)\.\s*BAT\s+is\s+to\s+', re.MULTILINE | re.IGNORECASE)),
+    # "BAT X is to..." or "BAT X:"
+    ('alternative', re.compile(r'\bBAT\s+(\d+)\s+(?:is\s+to|:)', re.IGNORECASE)),
+    # "BAT for [system] is to..." (like ENE BAT 18)
+    ('specialized', re.compile(r'^\s*(\d+)\.\s*BAT\s+for\s+\w+.*?is\s+to\s+', re.MULTILINE | re.IGNORECASE)),
+])
+
 class ComprehensiveBREFExtractor:
     """Extracts BAT entries from English BREF documents (Chapter 5 focus)"""
     
-    def __init__(self):
+    def __init__(self, fetcher: Optional[Fetcher] = None):
+        self.boilerplate_report = None  # set per document by strip_boilerplate
+        # End markers after the last BAT, in priority order; indexed once per document
+        self.section_index = SectionBoundaryIndex([
+            r'Chapter\s+[6-9]',
+            r'Annex\s+[A-Z]',
+            r'References\s*$',
+            r'Glossary\s*$',
+            r'Bibliography'
+        ], max_span=20000)
+        
         # Complete BREF document list
         self.bref_documents = {
             'CER': 'https://eippcb.jrc.ec.europa.eu/sites/default/files/2019-11/cer_bref_0807.pdf',
@@ -41,7 +68,15 @@ class ComprehensiveBREFExtractor:
         # Create downloads directory
         self.downloads_dir = "bref_downloads"
         os.makedirs(self.downloads_dir, exist_ok=True)
+        self._fetcher = fetcher
     
+    @property
+    def fetcher(self) -> Fetcher:
+        """Injected fetcher, else the shared one (created on first network use)"""
+        if self._fetcher is None:
+            self._fetcher = get_default_fetcher()
+        return self._fetcher
+
     def extract_all_brefs(self, output_dir: str = "bref_extractions") -> Dict:
         """Extract BATs from all BREF documents"""
         
@@ -128,19 +163,17 @@ class ComprehensiveBREFExtractor:
         try:
             pdf_path = f"{self.downloads_dir}/{doc_code.lower()}_bref.pdf"
             
-            # Skip if already downloaded
-            if os.path.exists(pdf_path):
+            # Skip if already downloaded (and complete)
+            if verify_download(pdf_path) is None:
                 print(f"    Using cached {doc_code}")
                 return pdf_path
             
             print(f"    Downloading {doc_code}...")
-            response = requests.get(url, timeout=60)
-            response.raise_for_status()
-            
-            with open(pdf_path, 'wb') as f:
-                f.write(response.content)
+            result = self.fetcher.download(url, pdf_path).result()
+            if not result.ok:
+                raise RuntimeError(result.error)
             
-            print(f"    Downloaded {doc_code} ({len(response.content):,} bytes)")
+            print(f"    Downloaded {doc_code} ({result.bytes:,} bytes)")
             return pdf_path
             
         except Exception as e:
@@ -164,13 +197,13 @@ class ComprehensiveBREFExtractor:
                 print(f"    Found BAT conclusions in {doc_code}: pages {bat_pages[0]+1}-{bat_pages[-1]+1}")
             
             # Extract text from BAT pages
-            full_text = self.extract_text_from_pages(doc, bat_pages)
+            paged = self.extract_text_from_pages(doc, bat_pages)
             
             # Find BAT positions using multiple patterns
-            bat_positions = self.find_bat_positions(full_text)
+            bat_positions = self.find_bat_positions(paged.text)
             
             # Extract complete BAT texts
-            bats = self.extract_complete_bat_texts(full_text, bat_positions, doc_code, source_url, bat_pages)
+            bats = self.extract_complete_bat_texts(paged, bat_positions, doc_code, source_url, bat_pages)
             
             doc.close()
             return bats
@@ -182,6 +215,11 @@ class ComprehensiveBREFExtractor:
     def find_bat_conclusions_pages(self, doc) -> List[int]:
         """Find pages containing BAT conclusions (could be Chapter 4, 5, or other)"""
         
+        # Outline / printed contents / running headers first; page scanning is the fallback
+        span = BATChapterLocator().locate_in_doc(doc)
+        if span is not None:
+            return span.pages
+        
         bat_pages = []
         
         # First pass: look for BAT conclusion sections
@@ -238,58 +276,27 @@ class ComprehensiveBREFExtractor:
         
         return []
     
-    def extract_text_from_pages(self, doc, page_range: List[int]) -> str:
+    def extract_text_from_pages(self, doc, page_range: List[int]) -> PagedText:
         """Extract text from specified pages"""
         
-        texts = []
-        
-        for page_num in page_range:
-            if page_num < len(doc):
-                page = doc[page_num]
-                page_text = page.get_text()
-                
-                # Add page marker
-                page_marker = f"\n[PAGE_{page_num + 1}]\n"
-                texts.append(page_marker)
-                texts.append(page_text)
-        
-        return "".join(texts)
+        # Running headers, footers and page numbers go before the BAT patterns run
+        paged, self.boilerplate_report = strip_boilerplate(PagedText.from_page_list(doc, page_range))
+        print(f"    🧹 {self.boilerplate_report.summary()}")
+        return paged
     
     def find_bat_positions(self, text: str) -> List[tuple]:
         """Find BAT start positions using multiple patterns"""
         
-        positions = []
-        
-        # Pattern 1: "X. BAT is to..."
-        pattern1 = re.compile(r'^\s*(\d+)\.\s*BAT\s+is\s+to\s+', re.MULTILINE | re.IGNORECASE)
-        for match in pattern1.finditer(text):
-            bat_num = int(match.group(1))
-            positions.append((match.start(), bat_num, match.group(0), 'standard'))
-        
-        # Pattern 2: "BAT X is to..." or "BAT X:"
-        pattern2 = re.compile(r'\bBAT\s+(\d+)\s+(?:is\s+to|:)', re.IGNORECASE)
-        for match in pattern2.finditer(text):
-            bat_num = int(match.group(1))
-            # Avoid duplicates
-            if not any(pos[1] == bat_num and abs(pos[0] - match.start()) < 100 for pos in positions):
-                positions.append((match.start(), bat_num, match.group(0), 'alternative'))
-        
-        # Pattern 3: "BAT for [system] is to..." (like ENE BAT 18)
-        pattern3 = re.compile(r'^\s*(\d+)\.\s*BAT\s+for\s+\w+.*?is\s+to\s+', re.MULTILINE | re.IGNORECASE)
-        for match in pattern3.finditer(text):
-            bat_num = int(match.group(1))
-            if not any(pos[1] == bat_num for pos in positions):
-                positions.append((match.start(), bat_num, match.group(0), 'specialized'))
-        
-        # Sort by position
-        positions.sort(key=lambda x: x[0])
-        
-        return positions
+        # "X. BAT is to..." keeps all hits; "BAT X is to/:" is a duplicate within
+        # 100 characters of the same number; "X. BAT for ..." only adds new numbers
+        return merge_by_priority(BAT_HEADER_SCANNER.scan(text),
+                                 [('standard', KEEP_ALL), ('alternative', 100), ('specialized', NEW_NUMBER)])
     
-    def extract_complete_bat_texts(self, full_text: str, bat_positions: List[tuple], 
+    def extract_complete_bat_texts(self, paged: PagedText, bat_positions: List[tuple], 
                                  doc_code: str, source_url: str, page_range: List[int]) -> List[Dict]:
         """Extract complete BAT texts using sequential approach"""
         
+        full_text = paged.text
         bats = []
         processed_numbers = set()
         
@@ -319,7 +326,7 @@ class ComprehensiveBREFExtractor:
             title = self.extract_bat_title(bat_text, bat_num)
             
             # Find page number
-            page_num = self.find_page_number(full_text, start_pos)
+            page_num = self.find_page_number(paged, start_pos)
             
             # Detect tables and technical content
             has_tables = self.detect_tables(bat_text)
@@ -354,18 +361,7 @@ class ComprehensiveBREFExtractor:
     
     def clean_bat_text(self, text: str) -> str:
         """Clean BAT text"""
-        
-        # Remove page markers
-        text = re.sub(r'\[PAGE_\d+\]', '', text)
-        
-        # Normalize whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        
-        # Remove standalone page numbers
-        text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
-        
-        return text.strip()
+        return normalize_text(text)
     
     def extract_bat_title(self, bat_text: str, bat_num: int) -> str:
         """Extract meaningful title from BAT text"""
@@ -397,35 +393,12 @@ class ComprehensiveBREFExtractor:
     
     def find_logical_end_position(self, text: str, start_pos: int) -> int:
         """Find logical end for BAT content"""
-        
-        search_text = text[start_pos:]
-        
-        end_patterns = [
-            r'Chapter\s+[6-9]',
-            r'Annex\s+[A-Z]',
-            r'References\s*$',
-            r'Glossary\s*$',
-            r'Bibliography'
-        ]
-        
-        for pattern in end_patterns:
-            match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return start_pos + match.start()
-        
-        # Default limit
-        return min(len(text), start_pos + 20000)
+        return self.section_index.end_position(text, start_pos)
     
-    def find_page_number(self, text: str, position: int) -> int:
+    def find_page_number(self, paged: PagedText, position: int) -> int:
         """Find page number for given position"""
         
-        text_before = text[:position]
-        page_matches = list(re.finditer(r'\[PAGE_(\d+)\]', text_before))
-        
-        if page_matches:
-            return int(page_matches[-1].group(1))
-        
-        return 1
+        return paged.page_at(position)
     
     def save_document_results(self, bats: List[Dict], filename: str, doc_code: str):
         """Save results for individual document"""
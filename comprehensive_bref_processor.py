@@ -2,8 +2,6 @@
 
 import os
 import json
-import requests
-import re
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -12,6 +10,7 @@ import sqlite3
 from regulatory_data_manager import RegulatoryDataManager, BATConclusion
 from pdf_processor import extract_text_and_metadata
 from llm_handler import verify_permit_compliance_with_bat
+from grammar_packs import ENGLISH_PACK, APPLICABILITY, EMISSION_LEVELS, MONITORING, TECHNIQUES
 
 @dataclass
 class DetailedBATConclusion:
@@ -68,17 +67,14 @@ class ComprehensiveBREFProcessor:
         
         try:
             print(f"Downloading BAT conclusions for {bref_id} from {url}")
-            response = requests.get(url, timeout=60, headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            })
-            response.raise_for_status()
             
             # Save PDF
             filename = f"{bref_id}_BAT_conclusions.pdf"
             local_path = os.path.join(self.reg_manager.data_dir, "bat_conclusions", filename)
             
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
+            result = self.reg_manager.fetcher.download(url, local_path).result()
+            if not result.ok:
+                raise RuntimeError(result.error)
             
             print(f"BAT conclusions for {bref_id} saved to: {local_path}")
             return True
@@ -126,13 +122,6 @@ class ComprehensiveBREFProcessor:
         # Split text into lines for processing
         lines = text.split('\n')
         
-        # Patterns for different BREF document structures
-        bat_patterns = [
-            r'^BAT\s+(\d+(?:\.\d+)?)\.\s*(.*?)$',  # BAT 1. Title
-            r'^(\d+(?:\.\d+)?)\.\s*BAT\s*(.*?)$',  # 1. BAT Title
-            r'^\*\*BAT\s+(\d+(?:\.\d+)?)\*\*\s*(.*?)$',  # **BAT 1** Title
-        ]
-        
         current_bat = None
         current_section = ""
         in_bat_section = False
@@ -141,11 +130,7 @@ class ComprehensiveBREFProcessor:
             line = line.strip()
             
             # Check if this line starts a new BAT conclusion
-            bat_match = None
-            for pattern in bat_patterns:
-                bat_match = re.match(pattern, line, re.IGNORECASE)
-                if bat_match:
-                    break
+            bat_match = ENGLISH_PACK.header(line)
             
             if bat_match:
                 # Save previous BAT if exists
@@ -153,8 +138,8 @@ class ComprehensiveBREFProcessor:
                     bat_conclusions.append(current_bat)
                 
                 # Start new BAT
-                bat_number = bat_match.group(1)
-                title = bat_match.group(2).strip() if len(bat_match.groups()) > 1 else ""
+                bat_number = bat_match.number
+                title = bat_match.title
                 
                 current_bat = DetailedBATConclusion(
                     bat_id=f"{bref_id}_BAT_{bat_number}",
@@ -169,7 +154,7 @@ class ComprehensiveBREFProcessor:
                 continue
             
             # Track sections
-            if line.upper().startswith('CHAPTER') or line.upper().startswith('SECTION'):
+            if ENGLISH_PACK.is_section(line):
                 current_section = line
                 in_bat_section = False
                 continue
@@ -177,13 +162,14 @@ class ComprehensiveBREFProcessor:
             # Accumulate BAT content
             if current_bat and in_bat_section and line:
                 # Check for specific subsections
-                if line.lower().startswith('applicability'):
+                category = ENGLISH_PACK.category(line)
+                if category == APPLICABILITY:
                     current_bat.applicability += line + " "
-                elif any(keyword in line.lower() for keyword in ['emission', 'limit', 'level']):
+                elif category == EMISSION_LEVELS:
                     current_bat.emission_levels = (current_bat.emission_levels or "") + line + " "
-                elif any(keyword in line.lower() for keyword in ['monitor', 'measure']):
+                elif category == MONITORING:
                     current_bat.monitoring_requirements = (current_bat.monitoring_requirements or "") + line + " "
-                elif any(keyword in line.lower() for keyword in ['technique', 'method']):
+                elif category == TECHNIQUES:
                     current_bat.techniques = (current_bat.techniques or "") + line + " "
                 else:
                     current_bat.description += line + " "
@@ -0,0 +1,61 @@
+"""
+Shared test fixtures: synthetic PDFs, a local HTTP server per handler class and a fetcher
+"""
+
+import threading
+from http.server import ThreadingHTTPServer
+
+import fitz
+import pytest
+
+from http_fetcher import Fetcher
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Write a PDF with one page per text (empty text: blank page); returns its path"""
+
+    def make(texts, name: str = "tst.pdf", toc=None, fontsize: float = 10) -> str:
+        doc = fitz.open()
+        for text in texts:
+            page = doc.new_page()
+            if text:
+                page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=fontsize)
+        if toc:
+            doc.set_toc(toc)
+        path = str(tmp_path / name)
+        doc.save(path)
+        doc.close()
+        return path
+
+    return make
+
+
+@pytest.fixture
+def serve():
+    """Start a local server for a BaseHTTPRequestHandler class; returns its base URL"""
+    servers = []
+
+    def start(handler_class) -> str:
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_port}"
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture
+def fetch_cache():
+    """HTTP cache of the fetcher fixture; none unless a test module overrides this"""
+    return None
+
+
+@pytest.fixture
+def fetcher(fetch_cache):
+    """Fetcher with rate limits loose enough for a local server"""
+    with Fetcher(workers=2, default_rate=(100.0, 10), cache=fetch_cache) as fetcher:
+        yield fetcher
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/docling_converter_pool.py
+
+"""
+Docling Converter Pool
+Process-wide pool of warm Docling DocumentConverter instances.
+Building a DocumentConverter loads the layout and table models, so converters
+are created lazily once and then reused across calls and threads.
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_POOL_SIZE = 1
+
+
+def _default_converter_factory():
+    """Plain converter as used by pdf_processor.extract_text_and_metadata"""
+    from docling.document_converter import DocumentConverter
+    return DocumentConverter()
+
+
+def _enhanced_converter_factory():
+    """Converter with OCR and table structure, as used by EnhancedPDFProcessor"""
+    from docling.document_converter import DocumentConverter
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_ocr = True  # OCR voor gescande documenten
+    pipeline_options.do_table_structure = True  # Tabel extractie
+    pipeline_options.table_structure_options.do_cell_matching = True
+
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: pipeline_options,
+        }
+    )
+
+
+class DoclingConverterPool:
+    """Thread-safe pool handing out reusable DocumentConverter instances"""
+
+    def __init__(self, factory: Callable[[], Any], size: int = DEFAULT_POOL_SIZE, name: str = "default"):
+        if size < 1:
+            raise ValueError("Converter pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self.name = name
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+
+    def _create(self) -> Any:
+        converter = self.factory()
+        # Load the PDF pipeline (layout/table models) now instead of on the first convert()
+        if hasattr(converter, 'initialize_pipeline'):
+            try:
+                from docling.datamodel.base_models import InputFormat
+                converter.initialize_pipeline(InputFormat.PDF)
+            except Exception as e:
+                print(f"⚠️ Could not pre-initialise Docling pipeline ({self.name}): {e}")
+        return converter
+
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """Create converters up front so the first documents do not pay model loading"""
+        target = min(self.size, count if count is not None else self.size)
+        created = 0
+        while True:
+            with self._lock:
+                if self._created >= target:
+                    break
+                self._created += 1
+            try:
+                self._idle.put(self._create())
+                created += 1
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return created
+
+    def _acquire(self, timeout: Optional[float]) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # All converters busy: wait for one to be returned
+        self.waits += 1
+        return self._idle.get(timeout=timeout)
+
+    @contextmanager
+    def converter(self, timeout: Optional[float] = None):
+        """Check out a converter for the duration of a with-block"""
+        converter = self._acquire(timeout)
+        self.checkouts += 1
+        try:
+            yield converter
+        finally:
+            self._idle.put(converter)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage counters"""
+        return {
+            "name": self.name,
+            "size": self.size,
+            "created": self._created,
+            "idle": self._idle.qsize(),
+            "checkouts": self.checkouts,
+            "waits": self.waits
+        }
+
+
+_POOL_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "default": _default_converter_factory,
+    "enhanced": _enhanced_converter_factory,
+}
+_pools: Dict[str, DoclingConverterPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_converter_pool(name: str = "default") -> DoclingConverterPool:
+    """Return the process-wide pool for a converter configuration, creating it lazily"""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            if name not in _POOL_FACTORIES:
+                raise KeyError(f"Unknown Docling converter configuration: {name}")
+            pool = DoclingConverterPool(_POOL_FACTORIES[name], size=DEFAULT_POOL_SIZE, name=name)
+            _pools[name] = pool
+        return pool
+
+
+def configure_converter_pool(name: str = "default", size: int = DEFAULT_POOL_SIZE,
+                             prewarm: int = 0, factory: Optional[Callable[[], Any]] = None) -> DoclingConverterPool:
+    """(Re)configure a pool's size/factory and optionally pre-warm some workers.
+
+    Call this at start-up, before extraction begins; converters already
+    handed out by a replaced pool are simply dropped when returned.
+    """
+    with _pools_lock:
+        if factory is not None:
+            _POOL_FACTORIES[name] = factory
+        if name not in _POOL_FACTORIES:
+            raise KeyError(f"Unknown Docling converter configuration: {name}")
+        pool = DoclingConverterPool(_POOL_FACTORIES[name], size=size, name=name)
+        _pools[name] = pool
+
+    if prewarm:
+        print(f"🔥 Pre-warming {min(prewarm, size)} Docling converter(s) ({name})...")
+        pool.prewarm(prewarm)
+    return pool
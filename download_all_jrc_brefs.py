@@ -6,9 +6,7 @@ Download ALLE BREFs van JRC EIPPCB
 Comprehensive download van alle beschikbare EU BREFs
 """
 
-import requests
 import os
-import time
 from regulatory_data_manager import RegulatoryDataManager
 
 def get_additional_jrc_brefs():
@@ -46,27 +44,19 @@ def download_additional_brefs():
     
     results = {"success": [], "failed": []}
     
-    for bref_id, url in additional_brefs.items():
+    # All downloads are queued at once; the fetcher keeps to the per-host rate limit
+    futures = {bref_id: manager.fetcher.download(url, os.path.join(manager.data_dir, "brefs", f"{bref_id}_bref.pdf"))
+               for bref_id, url in additional_brefs.items()}
+    
+    for bref_id, future in futures.items():
         print(f"📥 Downloading {bref_id}...")
+        result = future.result()
         
-        try:
-            response = requests.get(url, timeout=60)
-            response.raise_for_status()
-            
-            # Save PDF
-            filename = f"{bref_id}_bref.pdf"
-            local_path = os.path.join(manager.data_dir, "brefs", filename)
-            
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-            
-            print(f"  ✅ Downloaded: {len(response.content):,} bytes")
+        if result.ok:
+            print(f"  ✅ Downloaded: {result.bytes:,} bytes")
             results["success"].append(bref_id)
-            
-            time.sleep(1)  # Respectful delay
-            
-        except Exception as e:
-            print(f"  ❌ Failed: {e}")
+        else:
+            print(f"  ❌ Failed: {result.error}")
             results["failed"].append(bref_id)
     
     # Summary
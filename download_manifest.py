@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/download_manifest.py
+
+"""
+Download Manifest
+Size and SHA-256 of every completed download, kept as download_manifest.json
+in the directory of the files. A PDF that was cut off, overwritten or
+damaged after the download no longer matches its entry and is caught before
+extraction spends minutes on it. The manifest also remembers the validator
+(ETag / Last-Modified) of a transfer still in progress, so the .part file can
+be resumed with a Range request.
+
+Usage:
+    python download_manifest.py <directory> [--record]    # verify (and record unknown) files
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from extraction_cache import file_sha256
+
+MANIFEST_NAME = "download_manifest.json"
+PDF_HEADER_WINDOW = 1024    # the %PDF- header may follow a little junk
+PDF_TRAILER_WINDOW = 2048   # %%EOF may be followed by padding
+
+
+def check_pdf(path: str) -> Optional[str]:
+    """Why path is not a complete PDF file, or None if it looks whole"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return "empty file"
+    with open(path, 'rb') as f:
+        head = f.read(PDF_HEADER_WINDOW)
+        f.seek(max(0, size - PDF_TRAILER_WINDOW))
+        tail = f.read()
+    if b'%PDF-' not in head:
+        return "no %PDF- header (not a PDF)"
+    if b'%%EOF' not in tail:
+        return "no %%EOF trailer (truncated)"
+    return None
+
+
+class DownloadManifest:
+    """Manifest of one download directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _update(self, filename: str, **fields):
+        with self._lock:
+            entries = self._load()
+            entry = entries.setdefault(filename, {})
+            for key, value in fields.items():
+                if value is None:
+                    entry.pop(key, None)
+                else:
+                    entry[key] = value
+            if not entry:
+                del entries[filename]
+            self._save(entries)
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Entry of a file in this directory, or None"""
+        return self._load().get(os.path.basename(path))
+
+    def record(self, path: str, url: str, size: int, sha256: str):
+        """Store a completed download"""
+        self._update(os.path.basename(path), url=url, size=size, sha256=sha256,
+                     downloaded_at=time.strftime('%Y-%m-%dT%H:%M:%S'), partial=None)
+
+    def start_partial(self, path: str, url: str, validator: Optional[str]):
+        """Remember which version of url the .part file of path holds"""
+        self._update(os.path.basename(path), partial={"url": url, "validator": validator})
+
+    def clear_partial(self, path: str):
+        self._update(os.path.basename(path), partial=None)
+
+    def resume_validator(self, path: str, url: str) -> Optional[str]:
+        """If-Range value for resuming path's .part file, None if it cannot be resumed"""
+        entry = self.get(path) or {}
+        partial = entry.get("partial")
+        if not partial or partial.get("url") != url:
+            return None
+        return partial.get("validator")
+
+    def verify(self, path: str, sha256: Optional[str] = None) -> Optional[str]:
+        """Why path does not match its entry, or None (also for files the manifest does not know)
+
+        Args:
+            sha256: the file's SHA-256 if the caller already computed it
+        """
+        entry = self.get(path)
+        if not entry or "sha256" not in entry:
+            return None
+        size = os.path.getsize(path)
+        if size != entry["size"]:
+            return f"size {size:,} bytes, manifest says {entry['size']:,}"
+        if (sha256 or file_sha256(path)) != entry["sha256"]:
+            return "SHA-256 differs from the manifest"
+        return None
+
+
+_manifests: Dict[str, DownloadManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(directory: str) -> DownloadManifest:
+    """Shared manifest object per directory, so concurrent downloads do not lose each other's entries"""
+    directory = os.path.abspath(directory or '.')
+    with _manifests_lock:
+        if directory not in _manifests:
+            _manifests[directory] = DownloadManifest(directory)
+        return _manifests[directory]
+
+
+def verify_download(path: str, sha256: Optional[str] = None) -> Optional[str]:
+    """Why a downloaded file should not be used (manifest mismatch, damaged PDF), or None"""
+    if not os.path.exists(path):
+        return "missing"
+    problem = get_manifest(os.path.dirname(path)).verify(path, sha256)
+    if problem is None and path.lower().endswith('.pdf'):
+        problem = check_pdf(path)
+    return problem
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    record = '--record' in args
+    args = [arg for arg in args if arg != '--record']
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    directory = args[0]
+    manifest = get_manifest(directory)
+    damaged = 0
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        if filename == MANIFEST_NAME or not os.path.isfile(path) or filename.endswith('.part'):
+            continue
+        known = manifest.get(path) is not None
+        problem = verify_download(path)
+        if problem:
+            damaged += 1
+            print(f"❌ {filename}: {problem}")
+        elif not known and record:
+            manifest.record(path, "", os.path.getsize(path), file_sha256(path))
+            print(f"📝 {filename}: recorded")
+        else:
+            print(f"✅ {filename}{'' if known else ' (not in manifest)'}")
+    sys.exit(1 if damaged else 0)
@@ -6,9 +6,7 @@ Download Missing BREFs met alternatieve URLs
 Probeert de laatste 3 ontbrekende BREFs te downloaden
 """
 
-import requests
 import os
-import time
 from regulatory_data_manager import RegulatoryDataManager
 
 def get_alternative_bref_urls():
@@ -42,46 +40,19 @@ def download_with_alternatives(bref_id: str, urls: list, manager: RegulatoryData
     
     for i, url in enumerate(urls, 1):
         print(f"  🔄 Attempt {i}/{len(urls)}: {url}")
-        try:
-            response = requests.get(url, timeout=30, allow_redirects=True)
-            
-            if response.status_code == 200:
-                # Check if we got a PDF
-                content_type = response.headers.get('content-type', '').lower()
-                if 'pdf' in content_type or url.endswith('.pdf'):
-                    # Save PDF
-                    filename = f"{bref_id}_bref.pdf"
-                    local_path = os.path.join(manager.data_dir, "brefs", filename)
-                    
-                    with open(local_path, 'wb') as f:
-                        f.write(response.content)
-                    
-                    print(f"  ✅ {bref_id} downloaded successfully from attempt {i}")
-                    print(f"     💾 Saved to: {local_path}")
-                    print(f"     📊 Size: {len(response.content):,} bytes")
-                    
-                    # Update database
-                    import sqlite3
-                    conn = sqlite3.connect(manager.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        UPDATE bref_documents 
-                        SET local_path = ?, last_updated = CURRENT_TIMESTAMP
-                        WHERE bref_id = ?
-                    ''', (local_path, bref_id))
-                    conn.commit()
-                    conn.close()
-                    
-                    return True
-                else:
-                    print(f"  ⚠️ Attempt {i}: Not a PDF (content-type: {content_type})")
-            else:
-                print(f"  ❌ Attempt {i}: HTTP {response.status_code}")
-                
-        except Exception as e:
-            print(f"  ❌ Attempt {i}: Error - {e}")
+        # The downloader only keeps the file if it is a complete PDF (HTML pages are rejected)
+        result = manager.fetcher.download(url, manager._bref_path(bref_id)).result()
         
-        time.sleep(1)  # Brief delay between attempts
+        if result.ok:
+            print(f"  ✅ {bref_id} downloaded successfully from attempt {i}")
+            print(f"     📊 Size: {result.bytes:,} bytes")
+            
+            # Update database
+            return manager._record_download(bref_id, result)
+        elif result.status:
+            print(f"  ❌ Attempt {i}: HTTP {result.status}")
+        else:
+            print(f"  ❌ Attempt {i}: Error - {result.error}")
     
     print(f"  💥 All attempts failed for {bref_id}")
     return False
@@ -4,11 +4,18 @@ Dutch BBT (BAT) Extractor for BATC Documents
 Extracts complete BBT texts from Dutch BAT Conclusions documents
 """
 
-import fitz
 import os
 import re
 import json
-from typing import List, Dict, Tuple, Optional
+from typing import Iterator, List, Dict, Tuple, Optional
+
+from page_stream import iter_pages_without_boilerplate, StreamingBATScanner, BBT_CHAPTER_END_PATTERNS
+from parallel_extraction import get_page_count
+from paged_text import PagedText
+from bat_header_scanner import BATHeaderScanner, merge_by_priority, KEEP_ALL, NEW_NUMBER
+from section_index import SectionBoundaryIndex
+from boilerplate_filter import BoilerplateReport, strip_boilerplate
+from text_normalizer import normalize_text
 
 class DutchBBTExtractor:
     """Extracts complete BBT texts from Dutch BATC documents"""
@@ -18,6 +25,19 @@ class DutchBBTExtractor:
         self.bbt_start_pattern = re.compile(r'^\s*BBT\s+(\d+)', re.MULTILINE | re.IGNORECASE)
         # Alternative patterns for numbered BBT entries
         self.numbered_bbt_pattern = re.compile(r'^\s*(\d+)\.\s*BBT\s+', re.MULTILINE | re.IGNORECASE)
+        self.header_scanner = BATHeaderScanner([
+            ('bbt', self.bbt_start_pattern),
+            ('numbered_bbt', self.numbered_bbt_pattern),
+        ])
+        self.boilerplate_report = None  # set per document by strip_boilerplate
+        # End markers after the last BBT in Dutch documents, in priority order
+        self.section_index = SectionBoundaryIndex([
+            r'BIJLAGE\s+[IVX]+',  # Annex/Bijlage
+            r'Hoofdstuk\s+[5-9]',  # Next chapter
+            r'^Referenties\s*$',   # References
+            r'^Glossarium\s*$',    # Glossary
+            r'^Bibliografie\s*$',  # Bibliography
+        ], max_span=50000)
         
     def extract_bbts_from_batc(self, batc_path: str, start_page: int = 0, end_page: int = None) -> List[Dict]:
         """
@@ -29,47 +49,68 @@ class DutchBBTExtractor:
             end_page: Page to end extraction (None for all pages)
             
         Returns:
-            List of extracted BBT dictionaries
+            List of extracted BBT dictionaries, sorted by BBT number
+        """
+        
+        # Pages are read one at a time; reading stops after the last BBT
+        bbts = list(self.stream_bbts(batc_path, start_page, end_page))
+        bbts.sort(key=lambda x: x['bbt_number'])
+        return bbts
+    
+    def stream_bbts(self, batc_path: str, start_page: int = 0, end_page: int = None) -> Iterator[Dict]:
+        """
+        Yield complete BBTs in document order while reading the PDF page by page
+        
+        The full text is never concatenated, and reading stops at the first
+        annex/reference heading after the BBTs.
         """
         
         if not os.path.exists(batc_path):
             raise FileNotFoundError(f"BATC not found: {batc_path}")
-            
-        doc = fitz.open(batc_path)
+        if end_page is None:
+            end_page = get_page_count(batc_path)
         
-        try:
-            if end_page is None:
-                end_page = len(doc)
-                
-            # Extract text from all relevant pages first
-            full_text = self._extract_text_from_pages(doc, start_page, end_page)
-            
-            # Find all BBT starts
-            bbt_positions = self._find_bbt_positions(full_text)
-            
-            # Extract complete BBT texts
-            bbts = self._extract_complete_bbt_texts(full_text, bbt_positions)
-            
-            return bbts
-            
-        finally:
-            doc.close()
-    
-    def _extract_text_from_pages(self, doc, start_page: int, end_page: int) -> str:
-        """Extract and concatenate text from specified page range"""
+        # "BBT X" starts a BBT every time, "X. BBT" only for a new number
+        scanner = StreamingBATScanner(
+            [self.bbt_start_pattern, self.numbered_bbt_pattern],
+            end_patterns=BBT_CHAPTER_END_PATTERNS,
+            unique_numbers=True,
+            keep_all_patterns=1
+        )
         
-        texts = []
+        # The OJ header (date, "L 212/44", Publicatieblad, NL) goes before the BBT patterns run
+        self.boilerplate_report = BoilerplateReport()
+        pages = iter_pages_without_boilerplate(batc_path, [(start_page, end_page)], self.boilerplate_report)
         
-        for page_num in range(start_page, min(end_page, len(doc))):
-            page = doc[page_num]
-            page_text = page.get_text()
+        processed_numbers = set()
+        for entry in scanner.scan(pages):
+            bbt_num = entry['number']
+            bbt_text = entry['text'].strip()
+            # A later occurrence may still be the real entry if this one is a fragment
+            if bbt_num in processed_numbers or not self._is_valid_bbt_entry(bbt_text, bbt_num):
+                continue
+            processed_numbers.add(bbt_num)
             
-            # Add page marker
-            page_marker = f"\n[PAGE_{page_num + 1}]\n"
-            texts.append(page_marker)
-            texts.append(page_text)
+            bbt_text = self._clean_bbt_text(bbt_text)
+            yield {
+                'bbt_number': bbt_num,
+                'bbt_id': f'BBT {bbt_num}',
+                'title': self._extract_bbt_title(bbt_text),
+                'full_text': bbt_text,
+                'text_length': len(bbt_text),
+                'page': entry['page'],
+                'extraction_method': 'Streaming complete text',
+                'language': 'Dutch'
+            }
+        print(f"🧹 {self.boilerplate_report.summary()}")
+    
+    def _extract_text_from_pages(self, doc, start_page: int, end_page: int) -> PagedText:
+        """Extract and concatenate text from specified page range"""
         
-        return "".join(texts)
+        # The OJ header (date, "L 212/44", Publicatieblad, NL) goes before the BBT patterns run
+        paged, self.boilerplate_report = strip_boilerplate(PagedText.from_doc(doc, start_page, end_page))
+        print(f"🧹 {self.boilerplate_report.summary()}")
+        return paged
     
     def _find_bbt_positions(self, text: str) -> List[Tuple[int, int, str]]:
         """
@@ -79,37 +120,24 @@ class DutchBBTExtractor:
             List of tuples: (start_position, bbt_number, matched_text)
         """
         
-        positions = []
-        
-        # Primary pattern: "BBT X"
-        for match in self.bbt_start_pattern.finditer(text):
-            bbt_num = int(match.group(1))
-            positions.append((match.start(), bbt_num, match.group(0)))
-        
-        # Alternative pattern: "X. BBT" 
-        for match in self.numbered_bbt_pattern.finditer(text):
-            bbt_num = int(match.group(1))
-            # Avoid duplicates
-            if not any(pos[1] == bbt_num for pos in positions):
-                positions.append((match.start(), bbt_num, match.group(0)))
-        
-        # Sort by position in text
-        positions.sort(key=lambda x: x[0])
-        
-        return positions
+        # Primary pattern "BBT X" keeps all hits, "X. BBT" only adds new numbers
+        positions = merge_by_priority(self.header_scanner.scan(text),
+                                      [('bbt', KEEP_ALL), ('numbered_bbt', NEW_NUMBER)])
+        return [(hit.position, hit.number, hit.text) for hit in positions]
     
-    def _extract_complete_bbt_texts(self, full_text: str, bbt_positions: List[Tuple[int, int, str]]) -> List[Dict]:
+    def _extract_complete_bbt_texts(self, paged: PagedText, bbt_positions: List[Tuple[int, int, str]]) -> List[Dict]:
         """
         Extract complete text for each BBT from start until next BBT
         
         Args:
-            full_text: Complete text from all pages
+            paged: Complete text from all pages
             bbt_positions: List of (position, bbt_number, match_text) tuples
             
         Returns:
             List of BBT dictionaries with complete texts
         """
         
+        full_text = paged.text
         bbts = []
         processed_numbers = set()
         
@@ -139,7 +167,7 @@ class DutchBBTExtractor:
             title = self._extract_bbt_title(bbt_text)
             
             # Determine source page
-            page_num = self._find_page_number(full_text, start_pos)
+            page_num = self._find_page_number(paged, start_pos)
             
             bbt_dict = {
                 'bbt_number': bbt_num,
@@ -186,18 +214,7 @@ class DutchBBTExtractor:
     
     def _clean_bbt_text(self, text: str) -> str:
         """Clean and normalize BBT text"""
-        
-        # Remove page markers
-        text = re.sub(r'\[PAGE_\d+\]', '', text)
-        
-        # Normalize whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)  # Max 2 newlines
-        text = re.sub(r' +', ' ', text)  # Multiple spaces to single
-        
-        # Remove common artifacts
-        text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)  # Page numbers alone
-        
-        return text.strip()
+        return normalize_text(text)
     
     def _extract_bbt_title(self, bbt_text: str) -> str:
         """Extract meaningful title from BBT text"""
@@ -217,37 +234,12 @@ class DutchBBTExtractor:
     
     def _find_logical_end_position(self, full_text: str, start_pos: int) -> int:
         """Find logical end position for the last BBT"""
-        
-        search_text = full_text[start_pos:]
-        
-        # Patterns that might indicate end of BBT content in Dutch documents
-        end_patterns = [
-            r'BIJLAGE\s+[IVX]+',  # Annex/Bijlage
-            r'Hoofdstuk\s+[5-9]',  # Next chapter
-            r'^Referenties\s*$',   # References
-            r'^Glossarium\s*$',    # Glossary
-            r'^Bibliografie\s*$',  # Bibliography
-        ]
-        
-        for pattern in end_patterns:
-            match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return start_pos + match.start()
-        
-        # If no clear end found, limit to reasonable length
-        max_length = 50000
-        return min(len(full_text), start_pos + max_length)
+        return self.section_index.end_position(full_text, start_pos)
     
-    def _find_page_number(self, full_text: str, position: int) -> int:
+    def _find_page_number(self, paged: PagedText, position: int) -> int:
         """Find which page a position corresponds to"""
         
-        text_before = full_text[:position]
-        page_matches = list(re.finditer(r'\[PAGE_(\d+)\]', text_before))
-        
-        if page_matches:
-            return int(page_matches[-1].group(1))
-        
-        return 1  # Default to page 1
+        return paged.page_at(position)
     
     def save_extracted_bbts(self, bbts: List[Dict], output_path: str):
         """Save extracted BBTs to JSON file"""
@@ -2,8 +2,6 @@
 
 import os
 import json
-import requests
-import re
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -12,6 +10,7 @@ import sqlite3
 from regulatory_data_manager import RegulatoryDataManager, BATConclusion
 from pdf_processor import extract_text_and_metadata
 from llm_handler import verify_permit_compliance_with_bat, llm_call
+from grammar_packs import DUTCH_PACK, APPLICABILITY, EMISSION_LEVELS, MONITORING, TECHNIQUES
 
 @dataclass
 class Nederlandse_BBT_Conclusie:
@@ -69,17 +68,14 @@ class Nederlandse_BREF_Processor:
         
         try:
             print(f"Downloaden van BBT conclusies voor {bref_id} van {url}")
-            response = requests.get(url, timeout=60, headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            })
-            response.raise_for_status()
             
             # PDF opslaan
             filename = f"{bref_id}_BBT_conclusies_NL.pdf"
             local_path = os.path.join(self.reg_manager.data_dir, "bat_conclusions", filename)
             
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
+            resultaat = self.reg_manager.fetcher.download(url, local_path).result()
+            if not resultaat.ok:
+                raise RuntimeError(resultaat.error)
             
             print(f"Nederlandse BBT conclusies voor {bref_id} opgeslagen in: {local_path}")
             return True
@@ -127,15 +123,6 @@ class Nederlandse_BREF_Processor:
         # Tekst splitsen in regels voor verwerking
         lines = text.split('\n')
         
-        # Patronen voor Nederlandse BREF document structuren
-        bbt_patronen = [
-            r'^BBT\s+(\d+(?:\.\d+)?)\.\s*(.*?)$',  # BBT 1. Titel
-            r'^(\d+(?:\.\d+)?)\.\s*BBT\s*(.*?)$',  # 1. BBT Titel
-            r'^\*\*BBT\s+(\d+(?:\.\d+)?)\*\*\s*(.*?)$',  # **BBT 1** Titel
-            r'^Om\s+.*?,\s*is\s+BBT\s*(.*?)$',  # Om ..., is BBT ...
-            r'^Teneinde\s+.*?,\s*is\s+BBT\s*(.*?)$',  # Teneinde ..., is BBT ...
-        ]
-        
         current_bbt = None
         current_section = ""
         in_bbt_section = False
@@ -144,11 +131,7 @@ class Nederlandse_BREF_Processor:
             line = line.strip()
             
             # Controleer of deze regel een nieuwe BBT conclusie start
-            bbt_match = None
-            for pattern in bbt_patronen:
-                bbt_match = re.match(pattern, line, re.IGNORECASE)
-                if bbt_match:
-                    break
+            bbt_match = DUTCH_PACK.header(line)
             
             if bbt_match:
                 # Vorige BBT opslaan indien aanwezig
@@ -156,8 +139,8 @@ class Nederlandse_BREF_Processor:
                     bbt_conclusies.append(current_bbt)
                 
                 # Nieuwe BBT starten
-                bbt_nummer = bbt_match.group(1) if bbt_match.groups() else str(len(bbt_conclusies) + 1)
-                titel = bbt_match.group(2).strip() if len(bbt_match.groups()) > 1 else line
+                bbt_nummer = bbt_match.number or str(len(bbt_conclusies) + 1)
+                titel = bbt_match.title
                 
                 current_bbt = Nederlandse_BBT_Conclusie(
                     bbt_id=f"{bref_id}_BBT_{bbt_nummer}",
@@ -172,7 +155,7 @@ class Nederlandse_BREF_Processor:
                 continue
             
             # Secties bijhouden
-            if any(keyword in line.upper() for keyword in ['HOOFDSTUK', 'SECTIE', 'PARAGRAAF']):
+            if DUTCH_PACK.is_section(line):
                 current_section = line
                 in_bbt_section = False
                 continue
@@ -180,13 +163,14 @@ class Nederlandse_BREF_Processor:
             # BBT inhoud verzamelen
             if current_bbt and in_bbt_section and line:
                 # Controleren op specifieke subsecties
-                if any(keyword in line.lower() for keyword in ['toepasselijkheid', 'van toepassing']):
+                categorie = DUTCH_PACK.category(line)
+                if categorie == APPLICABILITY:
                     current_bbt.toepasselijkheid += line + " "
-                elif any(keyword in line.lower() for keyword in ['emissie', 'grenswaarde', 'niveau']):
+                elif categorie == EMISSION_LEVELS:
                     current_bbt.emissieniveaus = (current_bbt.emissieniveaus or "") + line + " "
-                elif any(keyword in line.lower() for keyword in ['monitor', 'meting', 'controle']):
+                elif categorie == MONITORING:
                     current_bbt.monitoringvereisten = (current_bbt.monitoringvereisten or "") + line + " "
-                elif any(keyword in line.lower() for keyword in ['techniek', 'methode', 'procedure']):
+                elif categorie == TECHNIQUES:
                     current_bbt.technieken = (current_bbt.technieken or "") + line + " "
                 else:
                     current_bbt.beschrijving += line + " "
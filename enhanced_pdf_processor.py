@@ -6,44 +6,49 @@ Enhanced PDF Processor voor Vergunningen
 Extraheert tekst, schema's, foto's, tabellen en bijlagen
 """
 
-from docling.document_converter import DocumentConverter
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
+from docling_converter_pool import get_converter_pool
+from spill_store import SpillBudget, SpillableList
+from bat_ael_parser import docling_table_grid
 import json
 import fitz  # PyMuPDF voor afbeeldingen
 import pandas as pd
 import os
+import hashlib
+import shutil
+import tempfile
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import base64
 from PIL import Image
 import io
 
+DEFAULT_MEMORY_LIMIT_MB = 256  # result payload kept in RAM before switching to streaming output
+
 class EnhancedPDFProcessor:
     """Enhanced PDF processor die alle content types extraheert"""
     
-    def __init__(self):
-        # Configure Docling for comprehensive extraction
-        self.pipeline_options = PdfPipelineOptions()
-        self.pipeline_options.do_ocr = True  # OCR voor gescande documenten
-        self.pipeline_options.do_table_structure = True  # Tabel extractie
-        self.pipeline_options.table_structure_options.do_cell_matching = True
-        
-        self.converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: self.pipeline_options,
-            }
-        )
+    def __init__(self, bounded_memory: bool = False, memory_limit_mb: int = DEFAULT_MEMORY_LIMIT_MB):
+        # Docling converters (OCR + tabel extractie) come from a shared warm pool
+        self.converter_pool = get_converter_pool("enhanced")
+        # Bounded mode: deduplicated images on disk, tables in a sidecar, streaming past the ceiling
+        self.bounded_memory = bounded_memory
+        self.memory_limit_mb = memory_limit_mb
     
     def extract_comprehensive_content(self, pdf_path: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
         """Comprehensieve extractie van alle PDF content"""
         
         print(f"🔍 === ENHANCED PDF EXTRACTION: {os.path.basename(pdf_path)} ===")
         
+        temp_dir = None
+        if self.bounded_memory and not output_dir:
+            # Images and sidecars are referenced by path, so they need a home
+            output_dir = temp_dir = tempfile.mkdtemp(prefix="enhanced_extraction_")
+        
         if output_dir:
             os.makedirs(output_dir, exist_ok=True)
         
+        spools = self._open_spools(output_dir) if self.bounded_memory else None
+        
         result = {
             "file_info": self._get_file_info(pdf_path),
             "text_content": {},
@@ -57,7 +62,7 @@ class EnhancedPDFProcessor:
         try:
             # 1. Docling extraction voor tekst en structuur
             print("📝 Extracting text and structure with Docling...")
-            docling_result = self._extract_with_docling(pdf_path)
+            docling_result = self._extract_with_docling(pdf_path, spools)
             result["text_content"] = docling_result["text_content"]
             result["tables"].extend(docling_result.get("tables", []))
             result["structure"] = docling_result.get("structure", {})
@@ -65,9 +70,15 @@ class EnhancedPDFProcessor:
             
             # 2. PyMuPDF extraction voor afbeeldingen en schema's
             print("🖼️ Extracting images and diagrams with PyMuPDF...")
-            images_result = self._extract_images_pymupdf(pdf_path, output_dir)
-            result["images"] = images_result["images"]
-            result["extraction_stats"]["images_found"] = len(images_result["images"])
+            if spools:
+                images_result = self._extract_images_bounded(pdf_path, output_dir, spools["images"])
+                result["images"] = spools["images"].items()
+                result["extraction_stats"]["images_found"] = spools["images"].count
+                result["extraction_stats"]["image_dedupe"] = images_result["dedupe_stats"]
+            else:
+                images_result = self._extract_images_pymupdf(pdf_path, output_dir)
+                result["images"] = images_result["images"]
+                result["extraction_stats"]["images_found"] = len(images_result["images"])
             
             # 3. Detailed metadata extraction
             print("📊 Extracting detailed metadata...")
@@ -87,6 +98,8 @@ class EnhancedPDFProcessor:
                 "sections_identified": len(result["structure"].get("sections", [])),
                 "processing_success": True
             })
+            if spools:
+                self._finish_spools(result, spools)
             
             print(f"✅ Extraction complete!")
             print(f"  📄 Pages: {result['extraction_stats']['total_pages']}")
@@ -100,7 +113,44 @@ class EnhancedPDFProcessor:
             print(f"❌ Error in comprehensive extraction: {e}")
             result["extraction_stats"]["processing_success"] = False
             result["extraction_stats"]["error"] = str(e)
+            if spools:
+                # Whatever spilled before the error is on disk; point the result at it
+                self._finish_spools(result, spools)
             return result
+        
+        finally:
+            if spools:
+                for spool in spools.values():
+                    spool.close()
+            if temp_dir and not result.get("sidecars") and not result["images"]:
+                # Nothing in the result refers to the temporary directory
+                shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def _open_spools(self, output_dir: str) -> Dict[str, SpillableList]:
+        """Spillable result lists sharing one memory budget"""
+        budget = SpillBudget(self.memory_limit_mb * 1024 * 1024)
+        return {
+            "pages": SpillableList("pages", os.path.join(output_dir, "pages.jsonl"), budget),
+            "images": SpillableList("images", os.path.join(output_dir, "images.jsonl"), budget),
+            # Table payloads always go to their sidecar; the result keeps a small summary
+            "tables": SpillableList("tables", os.path.join(output_dir, "tables.jsonl"), budget, always_spill=True),
+        }
+    
+    def _finish_spools(self, result: Dict[str, Any], spools: Dict[str, SpillableList]):
+        """Point the result at sidecar files and record memory statistics"""
+        result["text_content"]["pages"] = spools["pages"].items()
+        result["sidecars"] = {
+            name: spool.reference() for name, spool in spools.items() if spool.reference()
+        }
+        budget = spools["pages"].budget
+        result["extraction_stats"].update({
+            "tables_found": spools["tables"].count,
+            "memory_limit_mb": self.memory_limit_mb,
+            "memory_ceiling_exceeded": budget.exceeded,
+            "in_memory_payload_bytes": budget.used_bytes
+        })
+        for name, reference in result["sidecars"].items():
+            print(f"  💾 {name}: {reference['count']} items in {reference['path']}")
     
     def _get_file_info(self, pdf_path: str) -> Dict[str, Any]:
         """Get basic file information"""
@@ -121,10 +171,11 @@ class EnhancedPDFProcessor:
         except:
             return 0
     
-    def _extract_with_docling(self, pdf_path: str) -> Dict[str, Any]:
+    def _extract_with_docling(self, pdf_path: str, spools: Optional[Dict[str, SpillableList]] = None) -> Dict[str, Any]:
         """Extract text and structure using Docling"""
         try:
-            result = self.converter.convert(source=pdf_path)
+            with self.converter_pool.converter() as converter:
+                result = converter.convert(source=pdf_path)
             doc = result.document
             
             docling_data = {
@@ -163,7 +214,10 @@ class EnhancedPDFProcessor:
                             }
                             page_data["elements"].append(element_data)
                     
-                    docling_data["text_content"]["pages"].append(page_data)
+                    if spools:
+                        spools["pages"].append(page_data)
+                    else:
+                        docling_data["text_content"]["pages"].append(page_data)
             
             # Extract tables
             if hasattr(doc, 'tables'):
@@ -172,9 +226,20 @@ class EnhancedPDFProcessor:
                         "page": getattr(table, 'page', None),
                         "bbox": getattr(table, 'bbox', None),
                         "data": getattr(table, 'data', []),
+                        # Plain cell texts, readable by bat_ael_parser after a JSON round trip
+                        "grid": docling_table_grid(table),
                         "caption": getattr(table, 'caption', '')
                     }
-                    docling_data["tables"].append(table_data)
+                    if spools:
+                        # Keep only a pointer to the payload line in tables.jsonl
+                        docling_data["tables"].append({
+                            "page": table_data["page"],
+                            "caption": table_data["caption"],
+                            "sidecar_index": spools["tables"].count
+                        })
+                        spools["tables"].append(table_data)
+                    else:
+                        docling_data["tables"].append(table_data)
             
             # Extract metadata
             if hasattr(doc, 'metadata'):
@@ -251,6 +316,94 @@ class EnhancedPDFProcessor:
         
         return images_data
     
+    def _extract_images_bounded(self, pdf_path: str, output_dir: str, images: SpillableList) -> Dict[str, Any]:
+        """Image extraction with dedupe by xref and content hash; each unique image is written once"""
+        images_dir = os.path.join(output_dir, "images")
+        os.makedirs(images_dir, exist_ok=True)
+        
+        by_xref = {}
+        by_hash = {}
+        stats = {"unique_images": 0, "duplicate_images": 0, "bytes_written": 0, "drawing_pages": 0}
+        
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            print(f"❌ PyMuPDF image extraction error: {e}")
+            return {"dedupe_stats": stats}
+        
+        try:
+            for page_num in range(len(doc)):
+                page = doc[page_num]
+                
+                for img_index, img in enumerate(page.get_images()):
+                    xref = img[0]
+                    try:
+                        reference = by_xref.get(xref)
+                        if reference is None:
+                            reference = self._store_unique_image(doc, xref, images_dir, by_hash, stats)
+                            if reference is None:
+                                continue
+                            by_xref[xref] = reference
+                        else:
+                            stats["duplicate_images"] += 1
+                        
+                        images.append({
+                            "page": page_num + 1,
+                            "index": img_index,
+                            "xref": xref,
+                            "type": "image",
+                            **reference
+                        })
+                    except Exception as img_e:
+                        print(f"⚠️ Error extracting image {img_index} from page {page_num + 1}: {img_e}")
+                
+                # One summary per page instead of one entry per vector path
+                drawings = page.get_drawings()
+                if drawings:
+                    stats["drawing_pages"] += 1
+                    images.append({
+                        "page": page_num + 1,
+                        "type": "drawing/diagram",
+                        "drawings_count": len(drawings),
+                        "items_count": sum(len(drawing.get("items", [])) for drawing in drawings)
+                    })
+        finally:
+            doc.close()
+        
+        print(f"  🖼️ {stats['unique_images']} unique images written, {stats['duplicate_images']} duplicates skipped")
+        return {"dedupe_stats": stats}
+    
+    def _store_unique_image(self, doc, xref: int, images_dir: str, by_hash: Dict[str, Dict],
+                            stats: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        """Write the encoded image stream once per content hash and return its reference"""
+        extracted = doc.extract_image(xref)  # original JPEG/PNG stream, no pixmap decode
+        if not extracted or not extracted.get("image"):
+            return None
+        
+        image_bytes = extracted["image"]
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        if digest in by_hash:
+            stats["duplicate_images"] += 1
+            return by_hash[digest]
+        
+        img_path = os.path.join(images_dir, f"{digest[:16]}.{extracted.get('ext', 'png')}")
+        if not os.path.exists(img_path):  # lazy: a re-run reuses what is already on disk
+            with open(img_path, 'wb') as f:
+                f.write(image_bytes)
+            stats["bytes_written"] += len(image_bytes)
+        
+        reference = {
+            "width": extracted.get("width"),
+            "height": extracted.get("height"),
+            "colorspace": extracted.get("cs-name") or extracted.get("colorspace"),
+            "size_estimate": len(image_bytes),
+            "sha256": digest,
+            "saved_path": img_path
+        }
+        by_hash[digest] = reference
+        stats["unique_images"] += 1
+        return reference
+    
     def _extract_detailed_metadata(self, pdf_path: str) -> Dict[str, Any]:
         """Extract detailed PDF metadata"""
         metadata = {}
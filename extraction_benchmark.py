@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/extraction_benchmark.py
+
+"""
+Extraction Benchmark
+Runs every extraction backend over the PDFs bundled with the repo and records
+pages/second, peak RSS, time-to-first-page and output size per document.
+Each run happens in a fresh spawned process so memory numbers do not leak
+between backends. Results are written as JSON (tagged with the git commit)
+and two result files can be compared.
+
+Usage:
+    python extraction_benchmark.py [output.json] [backend,backend,...]
+    python extraction_benchmark.py --compare baseline.json current.json
+"""
+
+import glob
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmark_results")
+CORPUS_PATTERNS = [
+    "regulatory_data/brefs/*.pdf",
+    "regulatory_data/bat_conclusions/*.pdf",
+    "bref_downloads/*.pdf",
+    "permit_sample.pdf",
+    "WT_BREF.pdf",
+]
+RUN_TIMEOUT_SECONDS = 3600
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# --- Backends -------------------------------------------------------------
+# Each returns (output, seconds until the first page was available, page count)
+
+def _run_fitz_loop(pdf_path: str) -> Tuple[Any, Optional[float], int]:
+    """The page loop the BREF extractors run (PagedText.from_doc)"""
+    import fitz
+    started = time.perf_counter()
+    first_page = None
+    pages = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(len(doc)):
+            pages.append((page_num + 1, doc[page_num].get_text()))
+            if first_page is None:
+                first_page = time.perf_counter() - started
+    from paged_text import PagedText
+    paged = PagedText(pages)
+    return paged.text, first_page, paged.page_count
+
+
+def _run_fitz_stream(pdf_path: str) -> Tuple[Any, Optional[float], int]:
+    """Lazy page generator used by the streaming BAT scanners"""
+    from page_stream import iter_pages
+    started = time.perf_counter()
+    first_page = None
+    total_chars = 0
+    count = 0
+    for record in iter_pages(pdf_path):
+        if first_page is None:
+            first_page = time.perf_counter() - started
+        total_chars += len(record.text)
+        count += 1
+    # Pages are not retained; the output is only their size
+    return {"text_chars": total_chars}, first_page, count
+
+
+def _run_docling(pdf_path: str) -> Tuple[Any, Optional[float], int]:
+    """pdf_processor.extract_text_and_metadata without the extraction cache"""
+    from pdf_processor import extract_text_and_metadata
+    result = extract_text_and_metadata(pdf_path, use_cache=False)
+    if result.get("error"):
+        raise RuntimeError(result["error"])
+    # Docling returns the whole document at once
+    return result, None, len(result.get("pages", []))
+
+
+def _run_enhanced(pdf_path: str) -> Tuple[Any, Optional[float], int]:
+    """EnhancedPDFProcessor.extract_comprehensive_content (images not written)"""
+    from enhanced_pdf_processor import EnhancedPDFProcessor
+    result = EnhancedPDFProcessor().extract_comprehensive_content(pdf_path)
+    if not result.get("extraction_stats", {}).get("processing_success"):
+        raise RuntimeError(result.get("extraction_stats", {}).get("error", "extraction failed"))
+    return result, None, result.get("extraction_stats", {}).get("total_pages", 0)
+
+
+BACKENDS: Dict[str, Tuple[Callable, List[str]]] = {
+    # name: (runner, required modules)
+    "fitz_loop": (_run_fitz_loop, ["fitz"]),
+    "fitz_stream": (_run_fitz_stream, ["fitz"]),
+    "docling": (_run_docling, ["docling"]),
+    "enhanced": (_run_enhanced, ["docling", "pandas"]),
+}
+
+
+def backend_available(name: str) -> bool:
+    return all(importlib.util.find_spec(module) is not None for module in BACKENDS[name][1])
+
+
+def _output_size(output: Any) -> int:
+    if isinstance(output, str):
+        return len(output.encode('utf-8'))
+    return len(json.dumps(output, default=str, ensure_ascii=False).encode('utf-8'))
+
+
+def _benchmark_worker(args: Tuple[str, str]) -> Dict[str, Any]:
+    """One backend on one document (runs in a freshly spawned process)"""
+    backend, pdf_path = args
+    sys.path.insert(0, REPO_DIR)
+    runner = BACKENDS[backend][0]
+    baseline_rss = _peak_rss_mb()
+
+    started = time.perf_counter()
+    output, first_page, page_count = runner(pdf_path)
+    seconds = time.perf_counter() - started
+
+    return {
+        "seconds": round(seconds, 4),
+        "pages": page_count,
+        "pages_per_second": round(page_count / seconds, 2) if seconds > 0 else None,
+        # Backends without page streaming deliver the first page with the last
+        "time_to_first_page": round(first_page if first_page is not None else seconds, 4),
+        "output_bytes": _output_size(output),
+        "baseline_rss_mb": round(baseline_rss, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _process_entry(sender, func: Callable[[Any], Any], args: Any):
+    try:
+        sender.send(("ok", func(args)))
+    except BaseException as e:
+        sender.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        sender.close()
+
+
+def _run_isolated(func: Callable[[Any], Any], args: Any, timeout: float = RUN_TIMEOUT_SECONDS) -> Any:
+    """func(args) in a freshly spawned process; a run over timeout is terminated and raises TimeoutError"""
+    spawn = multiprocessing.get_context("spawn")
+    receiver, sender = spawn.Pipe(duplex=False)
+    process = spawn.Process(target=_process_entry, args=(sender, func, args), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        # poll() also returns when the worker dies and the pipe closes (recv then raises EOFError)
+        if not receiver.poll(timeout):
+            raise TimeoutError(f"no result after {timeout:g}s, worker terminated")
+        try:
+            status, payload = receiver.recv()
+        except EOFError:
+            process.join(5)
+            raise RuntimeError(f"worker exited with code {process.exitcode}")
+    finally:
+        if process.is_alive():
+            process.terminate()
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+        process.join()
+        receiver.close()
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
+
+
+def find_corpus(repo_dir: str = REPO_DIR) -> List[str]:
+    """Bundled PDFs, relative to the repo, in a stable order"""
+    documents = []
+    for pattern in CORPUS_PATTERNS:
+        for path in sorted(glob.glob(os.path.join(repo_dir, pattern))):
+            documents.append(os.path.relpath(path, repo_dir))
+    return documents
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(backends: Optional[List[str]] = None, documents: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Benchmark each available backend on each document"""
+    backends = backends or list(BACKENDS)
+    documents = documents or find_corpus()
+    runs = []
+    for backend in backends:
+        if not backend_available(backend):
+            print(f"⚠️ Skipping {backend}: requires {', '.join(BACKENDS[backend][1])}")
+            runs.append({"backend": backend, "document": None, "status": "unavailable"})
+            continue
+
+        print(f"⏱️ {backend}: {len(documents)} documents")
+        for document in documents:
+            run = {"backend": backend, "document": document,
+                   "size_bytes": os.path.getsize(os.path.join(REPO_DIR, document))}
+            try:
+                run.update(_run_isolated(_benchmark_worker, (backend, os.path.join(REPO_DIR, document))))
+                run["status"] = "ok"
+                print(f"  📄 {document}: {run['pages']} pages, {run['pages_per_second']} pages/s, "
+                      f"peak {run['peak_rss_mb']} MB")
+            except TimeoutError as e:
+                run.update({"status": "timeout", "error": str(e)})
+                print(f"  ⏰ {document}: {e}")
+            except Exception as e:
+                run.update({"status": "error", "error": str(e)})
+                print(f"  ❌ {document}: {e}")
+            runs.append(run)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "runs": runs,
+    }
+
+
+def save_results(results: Dict[str, Any], output_path: Optional[str] = None) -> str:
+    if output_path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output_path = os.path.join(RESULTS_DIR, f"extraction_{results.get('commit') or 'nogit'}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return output_path
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per (backend, document): speed and memory of current relative to baseline"""
+    def index(results):
+        return {(run["backend"], run["document"]): run for run in results["runs"] if run.get("status") == "ok"}
+
+    before, after = index(baseline), index(current)
+    rows = []
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        rows.append({
+            "backend": key[0],
+            "document": key[1],
+            "speedup": round(old["seconds"] / new["seconds"], 2) if new["seconds"] else None,
+            "time_to_first_page_delta": round(new["time_to_first_page"] - old["time_to_first_page"], 4),
+            "peak_rss_delta_mb": round(new["peak_rss_mb"] - old["peak_rss_mb"], 1),
+            "output_bytes_delta": new["output_bytes"] - old["output_bytes"],
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--compare":
+        with open(sys.argv[2], 'r', encoding='utf-8') as f:
+            baseline_results = json.load(f)
+        with open(sys.argv[3], 'r', encoding='utf-8') as f:
+            current_results = json.load(f)
+        print(f"📊 {baseline_results.get('commit')} -> {current_results.get('commit')}")
+        for row in compare_results(baseline_results, current_results):
+            print(f"  {row['backend']:12} {row['document']:50} {row['speedup']}x, "
+                  f"peak RSS {row['peak_rss_delta_mb']:+} MB, output {row['output_bytes_delta']:+} bytes")
+        sys.exit(0)
+
+    output_path = sys.argv[1] if len(sys.argv) > 1 else None
+    selected = sys.argv[2].split(",") if len(sys.argv) > 2 else None
+    benchmark = run_benchmarks(selected)
+    print(f"✅ Results written to {save_results(benchmark, output_path)}")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/extraction_cache.py
+
+"""
+Extraction Cache
+Content-addressed on-disk cache for PDF extraction results.
+Entries are keyed by the PDF's SHA-256 plus extractor name and version,
+and evicted least-recently-used once the cache exceeds its size budget.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extraction_cache")
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in chunks so large BREFs never sit in memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Persistent LRU cache for extraction output dicts (full_text/pages/title)"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.db")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._init_index()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _init_index(self):
+        """Create the entry index if it does not exist yet"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                cache_key TEXT PRIMARY KEY,
+                file_sha256 TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                source_path TEXT,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def make_key(sha256: str, extractor: str, extractor_version: str) -> str:
+        """Cache key for one (document, extractor, version) combination"""
+        return f"{sha256}_{extractor}_{extractor_version}".replace(os.sep, "-")
+
+    def _entry_path(self, cache_key: str) -> str:
+        return os.path.join(self.cache_dir, cache_key[:2], f"{cache_key}.json")
+
+    def get(self, pdf_path: str, extractor: str, extractor_version: str,
+            sha256: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the stored extraction for pdf_path, or None on a miss"""
+        sha256 = sha256 or file_sha256(pdf_path)
+        cache_key = self.make_key(sha256, extractor, extractor_version)
+        entry_path = self._entry_path(cache_key)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute('SELECT cache_key FROM entries WHERE cache_key = ?', (cache_key,)).fetchone()
+                if row is None or not os.path.exists(entry_path):
+                    if row is not None:
+                        # Index points to a payload that was removed by hand
+                        conn.execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,))
+                        conn.commit()
+                    self.misses += 1
+                    return None
+
+                try:
+                    with open(entry_path, 'r', encoding='utf-8') as f:
+                        payload = json.load(f)
+                except (OSError, ValueError):
+                    conn.execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,))
+                    conn.commit()
+                    self.misses += 1
+                    return None
+
+                conn.execute('UPDATE entries SET last_access = ? WHERE cache_key = ?', (time.time(), cache_key))
+                conn.commit()
+                self.hits += 1
+                return payload
+            finally:
+                conn.close()
+
+    def put(self, pdf_path: str, extractor: str, extractor_version: str, payload: Dict[str, Any],
+            sha256: Optional[str] = None) -> str:
+        """Store an extraction result and evict old entries if over budget"""
+        sha256 = sha256 or file_sha256(pdf_path)
+        cache_key = self.make_key(sha256, extractor, extractor_version)
+        entry_path = self._entry_path(cache_key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write to a temp file first so readers never see a half-written entry
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+        size_bytes = os.path.getsize(entry_path)
+
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute('''
+                    INSERT OR REPLACE INTO entries
+                    (cache_key, file_sha256, extractor, extractor_version, source_path,
+                     size_bytes, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (cache_key, sha256, extractor, extractor_version, os.path.abspath(pdf_path),
+                      size_bytes, now, now))
+                conn.commit()
+                self._evict(conn, keep=cache_key)
+            finally:
+                conn.close()
+
+        return cache_key
+
+    def _evict(self, conn: sqlite3.Connection, keep: Optional[str] = None):
+        """Drop least-recently-used entries until the cache fits in max_bytes"""
+        total = conn.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute('SELECT cache_key, size_bytes FROM entries ORDER BY last_access ASC').fetchall()
+        for cache_key, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            if cache_key == keep:
+                continue
+            try:
+                os.remove(self._entry_path(cache_key))
+            except FileNotFoundError:
+                pass
+            conn.execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,))
+            total -= size_bytes
+            self.evictions += 1
+        conn.commit()
+
+    def invalidate(self, pdf_path: str, extractor: Optional[str] = None) -> int:
+        """Remove all cached entries for a PDF (optionally for one extractor only)"""
+        sha256 = file_sha256(pdf_path)
+        with self._lock:
+            conn = self._connect()
+            try:
+                if extractor:
+                    rows = conn.execute('SELECT cache_key FROM entries WHERE file_sha256 = ? AND extractor = ?',
+                                        (sha256, extractor)).fetchall()
+                else:
+                    rows = conn.execute('SELECT cache_key FROM entries WHERE file_sha256 = ?', (sha256,)).fetchall()
+                for (cache_key,) in rows:
+                    try:
+                        os.remove(self._entry_path(cache_key))
+                    except FileNotFoundError:
+                        pass
+                    conn.execute('DELETE FROM entries WHERE cache_key = ?', (cache_key,))
+                conn.commit()
+                return len(rows)
+            finally:
+                conn.close()
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                for (cache_key,) in conn.execute('SELECT cache_key FROM entries').fetchall():
+                    try:
+                        os.remove(self._entry_path(cache_key))
+                    except FileNotFoundError:
+                        pass
+                conn.execute('DELETE FROM entries')
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus current on-disk usage"""
+        conn = self._connect()
+        try:
+            entries, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries').fetchone()
+        finally:
+            conn.close()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "cache_dir": self.cache_dir
+        }
+
+    def print_stats(self):
+        """Print cache statistics"""
+        stats = self.stats()
+        print(f"🗄️ Extraction cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"(hit rate {stats['hit_rate']:.0%}), {stats['entries']} entries, "
+              f"{stats['size_bytes'] / (1024 * 1024):.1f} / {stats['max_bytes'] / (1024 * 1024):.0f} MB")
+
+
+_default_cache: Optional[ExtractionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ExtractionCache:
+    """Process-wide cache instance shared by all extractors"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ExtractionCache()
+        return _default_cache
+
+
+if __name__ == "__main__":
+    get_default_cache().print_stats()
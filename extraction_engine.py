@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/extraction_engine.py
+
+"""
+Unified BAT Extraction Engine
+One entry point for the BAT/BBT extractors that each had their own page
+loop, corpus loop and save logic. A strategy per BREF code (ENE, WT, WI,
+EMS, generic, Dutch BATC, ...) is selected from configuration, documents are
+extracted concurrently in a process pool, and every strategy's records are
+normalised to one schema and written in a deterministic order. Documents
+whose BAT numbering has gaps get a targeted second pass over only the pages
+between the neighbouring BATs (gap_recovery).
+
+Usage:
+    python extraction_engine.py [output.json] [--workers N] [--config strategies.json]
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from download_manifest import verify_download
+from extraction_cache import file_sha256
+from gap_recovery import DEFAULT_RECOVERY_ORDER, RECOVERY_STRATEGIES, recover_gaps
+
+ENGINE_VERSION = "3"
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_OUTPUT = os.path.join("bref_extractions", "unified_bat_extraction.json")
+
+# Searched in this order; the first path of byte-identical copies is the one extracted
+CORPUS_DIRS = [
+    "regulatory_data/bat_conclusions",
+    "regulatory_data/brefs",
+    "bref_downloads",
+]
+
+DEFAULT_STRATEGY_CONFIG: Dict[str, Any] = {
+    # Strategy per BREF code; codes not listed use "default"
+    "codes": {
+        "ENE": "ene",
+        "WT": "wt",
+        "WI": "wi",
+        "EMS": "ems",
+    },
+    # Located BAT chapter + proven header patterns (ProvenBREFExtractor)
+    "default": "generic",
+    # Dutch BAT conclusions (BBT-conclusies) regardless of code
+    "dutch_batc": "dutch_batc",
+    # Recovery strategies tried, in order, on the page window of each numbering gap; [] disables
+    "gap_recovery": DEFAULT_RECOVERY_ORDER,
+}
+
+# Fields of every record in the engine output, in this order
+RECORD_FIELDS = [
+    "document_code", "record_type", "bat_number", "bat_id", "title", "full_text", "text_length",
+    "page", "language", "strategy", "extraction_method", "source_file",
+]
+
+StrategyFunc = Callable[[str, str], List[Dict[str, Any]]]
+STRATEGIES: Dict[str, StrategyFunc] = {}
+
+
+def register_strategy(name: str):
+    """Register a strategy: func(pdf_path, doc_code) -> raw records of the underlying extractor"""
+    def decorator(func: StrategyFunc) -> StrategyFunc:
+        STRATEGIES[name] = func
+        return func
+    return decorator
+
+
+# --- Strategies -------------------------------------------------------------
+# Thin adapters around the existing extractors; imports stay inside the
+# functions so a worker only loads the extractor it runs.
+
+def _enhanced_multi(method_name: str) -> StrategyFunc:
+    def run(pdf_path: str, doc_code: str) -> List[Dict[str, Any]]:
+        import fitz
+        from enhanced_multi_bref_extractor import EnhancedMultiBREFExtractor
+        with fitz.open(pdf_path) as doc:
+            return getattr(EnhancedMultiBREFExtractor(), method_name)(doc, doc_code)
+    return run
+
+
+for _name, _method in [("ene", "extract_ene_bats_enhanced"), ("wt", "extract_wt_bats_enhanced"),
+                       ("wi", "extract_wi_bats_enhanced"), ("ems", "extract_ems_bats_enhanced"),
+                       ("enhanced_generic", "extract_generic_bats_enhanced")]:
+    register_strategy(_name)(_enhanced_multi(_method))
+
+
+@register_strategy("generic")
+@register_strategy("proven")
+def _proven(pdf_path: str, doc_code: str) -> List[Dict[str, Any]]:
+    from proven_bref_extractor import ProvenBREFExtractor
+    return ProvenBREFExtractor().extract_bats_proven_method(pdf_path, doc_code, source_url="")
+
+
+@register_strategy("sequential")
+def _sequential(pdf_path: str, doc_code: str) -> List[Dict[str, Any]]:
+    from sequential_bat_extractor import SequentialBATExtractor
+    return SequentialBATExtractor().extract_bats_from_bref(pdf_path)
+
+
+@register_strategy("improved")
+def _improved(pdf_path: str, doc_code: str) -> List[Dict[str, Any]]:
+    from improved_bref_extractor import ImprovedBREFExtractor
+    return ImprovedBREFExtractor().extract_bats_comprehensive(pdf_path, doc_code, source_url="")
+
+
+@register_strategy("technical_guidance")
+def _technical_guidance(pdf_path: str, doc_code: str) -> List[Dict[str, Any]]:
+    from final_bref_extractor import FinalBREFExtractor
+    return FinalBREFExtractor().extract_technical_guidance(pdf_path, doc_code)
+
+
+@register_strategy("dutch_batc")
+def _dutch_batc(pdf_path: str, doc_code: str) -> List[Dict[str, Any]]:
+    from dutch_bbt_extractor import DutchBBTExtractor
+    return DutchBBTExtractor().extract_bbts_from_batc(pdf_path)
+
+
+# --- Schema -----------------------------------------------------------------
+
+def document_code(filename: str) -> str:
+    """BREF code from a corpus filename: 'lvic-aaf_bref.pdf' -> 'LVIC-AAF', 'CWW_BATC_NL.pdf' -> 'CWW'"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return re.split(r'_', stem, maxsplit=1)[0].upper()
+
+
+def is_dutch_batc(filename: str) -> bool:
+    """Dutch BAT conclusions by filename (BBT-conclusies, *_NL)"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return bool(re.search(r'(?:^|_)(?:BBT|NL)(?:_|$)|conclusies', stem, re.IGNORECASE))
+
+
+def normalize_record(raw: Dict[str, Any], doc_code: str, strategy: str, source_file: str) -> Dict[str, Any]:
+    """Map one extractor record (BAT, BBT or technique) to the engine schema"""
+    if "bbt_number" in raw:
+        record_type, number = "bbt", raw["bbt_number"]
+    elif "technique_number" in raw:
+        record_type, number = "technical_guidance", raw["technique_number"]
+    else:
+        record_type, number = "bat", raw.get("bat_number")
+    try:
+        number = int(number)
+    except (TypeError, ValueError):
+        number = None
+
+    text = raw.get("full_text") or raw.get("raw_text") or ""
+    prefix = {"bat": "BAT", "bbt": "BBT", "technical_guidance": "Technique"}[record_type]
+    language = raw.get("language") or ("Dutch" if record_type == "bbt" else "English")
+    record = {
+        "document_code": doc_code,
+        "record_type": record_type,
+        "bat_number": number,
+        "bat_id": f"{doc_code} {prefix} {number}",
+        "title": raw.get("title", ""),
+        "full_text": text,
+        "text_length": len(text),
+        "page": raw.get("page"),
+        "language": language,
+        "strategy": strategy,
+        "extraction_method": raw.get("extraction_method", ""),
+        "source_file": source_file,
+    }
+    return {field: record[field] for field in RECORD_FIELDS}
+
+
+def _record_order(record: Dict[str, Any]) -> Tuple[str, bool, int]:
+    """Records of a document by type, then BAT/BBT number (unnumbered last)"""
+    return record["record_type"], record["bat_number"] is None, record["bat_number"] or 0
+
+
+def fill_numbering_gaps(pdf_path: str, records: List[Dict[str, Any]], doc_code: str, strategy: str,
+                        source_file: str, recovery: List[str]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Records with recovered BATs merged in, and the gap report per record type"""
+    reports = {}
+    for record_type in ("bat", "bbt"):
+        typed = [record for record in records if record["record_type"] == record_type]
+        if not typed:
+            continue
+        recovered, replaced, report = recover_gaps(pdf_path, typed, record_type, recovery)
+        if report.has_gaps:
+            reports[record_type] = report.to_dict()
+        if not recovered:
+            continue
+        replaced_ids = {id(record) for record in replaced.values()}
+        merged = [record for record in typed if id(record) not in replaced_ids]
+        merged += [normalize_record(raw, doc_code, strategy, source_file) for raw in recovered]
+        records = [record for record in records if record["record_type"] != record_type] + merged
+    return records, reports
+
+
+def _extract_document_worker(args: Tuple[str, str, str, str, List[str]]) -> Dict[str, Any]:
+    """Run one strategy on one document, then recover numbering gaps (runs in a worker process)"""
+    pdf_path, source_file, doc_code, strategy, recovery = args
+    started = time.perf_counter()
+    try:
+        raw_records = STRATEGIES[strategy](pdf_path, doc_code)
+        records = [normalize_record(raw, doc_code, strategy, source_file) for raw in raw_records]
+        gaps = {}
+        if recovery and records:
+            records, gaps = fill_numbering_gaps(pdf_path, records, doc_code, strategy, source_file, recovery)
+        return {"records": records, "gaps": gaps, "error": None, "seconds": time.perf_counter() - started}
+    except Exception as e:
+        return {"records": [], "gaps": {}, "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - started}
+
+
+class ExtractionEngine:
+    """Extracts the BAT/BBT corpus with one configured strategy per document"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, workers: int = DEFAULT_WORKERS,
+                 repo_dir: Optional[str] = None):
+        """
+        Args:
+            config: strategy configuration, see DEFAULT_STRATEGY_CONFIG
+            workers: process pool size; 1 extracts in this process
+            repo_dir: root the corpus directories and source_file paths are relative to
+        """
+        self.config = {**DEFAULT_STRATEGY_CONFIG, **(config or {})}
+        unknown = {self.config["default"], self.config["dutch_batc"], *self.config["codes"].values()} - set(STRATEGIES)
+        if unknown:
+            raise ValueError(f"Unknown extraction strategies in config: {sorted(unknown)}")
+        unknown = set(self.config["gap_recovery"]) - set(RECOVERY_STRATEGIES)
+        if unknown:
+            raise ValueError(f"Unknown gap recovery strategies in config: {sorted(unknown)}")
+        self.workers = max(1, workers)
+        self.repo_dir = repo_dir or os.path.dirname(os.path.abspath(__file__))
+
+    @classmethod
+    def from_config_file(cls, config_path: str, **kwargs) -> "ExtractionEngine":
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def strategy_for(self, source_file: str, doc_code: str) -> str:
+        if is_dutch_batc(source_file):
+            return self.config["dutch_batc"]
+        return self.config["codes"].get(doc_code, self.config["default"])
+
+    def find_documents(self) -> List[Dict[str, str]]:
+        """Corpus PDFs with code and strategy, skipping byte-identical copies and damaged downloads"""
+        documents = []
+        seen_hashes = set()
+        for corpus_dir in CORPUS_DIRS:
+            directory = os.path.join(self.repo_dir, corpus_dir)
+            if not os.path.isdir(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                if not filename.lower().endswith('.pdf'):
+                    continue
+                path = os.path.join(directory, filename)
+                sha256 = file_sha256(path)
+                if sha256 in seen_hashes:
+                    continue
+                problem = verify_download(path, sha256)
+                if problem:
+                    # Cut off, not a PDF or changed since the download; extracting it would give a partial record set
+                    print(f"  ⚠️ Skipping {os.path.relpath(path, self.repo_dir)}: {problem}")
+                    continue
+                seen_hashes.add(sha256)
+                code = document_code(filename)
+                source_file = os.path.relpath(path, self.repo_dir)
+                documents.append({"path": path, "source_file": source_file, "document_code": code,
+                                  "strategy": self.strategy_for(source_file, code)})
+        return documents
+
+    def run(self, documents: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Extract every document and return the combined, deterministically ordered result"""
+        documents = self.find_documents() if documents is None else documents
+        started = time.perf_counter()
+        recovery = list(self.config["gap_recovery"])
+        tasks = {doc["source_file"]: (doc["path"], doc["source_file"], doc["document_code"], doc["strategy"], recovery)
+                 for doc in documents}
+        results: Dict[str, Dict[str, Any]] = {}
+
+        print(f"🔍 Extracting {len(tasks)} documents with {self.workers} worker(s)")
+        if self.workers == 1 or len(tasks) <= 1:
+            for source_file, task in tasks.items():
+                results[source_file] = _extract_document_worker(task)
+                self._report(task, results[source_file])
+        else:
+            # Largest documents first so the pool does not end on one long straggler
+            order = sorted(tasks, key=lambda source_file: os.path.getsize(tasks[source_file][0]), reverse=True)
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+                futures = {executor.submit(_extract_document_worker, tasks[source_file]): source_file
+                           for source_file in order}
+                for future in as_completed(futures):
+                    source_file = futures[future]
+                    try:
+                        results[source_file] = future.result()
+                    except Exception as e:
+                        # Worker process died
+                        results[source_file] = {"records": [], "gaps": {}, "error": f"{type(e).__name__}: {e}",
+                                                "seconds": 0.0}
+                    self._report(tasks[source_file], results[source_file])
+
+        return self._combine(documents, results, time.perf_counter() - started)
+
+    @staticmethod
+    def _report(task: Tuple[str, str, str, str, List[str]], result: Dict[str, Any]):
+        _, source_file, doc_code, strategy, _ = task
+        if result["error"]:
+            print(f"  ❌ {doc_code} ({strategy}): {result['error']}")
+            return
+        print(f"  ✅ {doc_code} ({strategy}): {len(result['records'])} records in {result['seconds']:.1f}s")
+        for record_type, gaps in result["gaps"].items():
+            print(f"     🩹 {record_type}: {len(gaps['recovered'])} recovered, still missing {gaps['still_missing'] or '-'}")
+
+    def _combine(self, documents: List[Dict[str, str]], results: Dict[str, Dict[str, Any]],
+                 seconds: float) -> Dict[str, Any]:
+        # Output order depends only on the corpus, not on which worker finished first
+        ordered = sorted(documents, key=lambda doc: (doc["document_code"], doc["source_file"]))
+        records = []
+        summaries = []
+        for doc in ordered:
+            result = results[doc["source_file"]]
+            # Number order for every document, whether or not gap recovery changed it
+            records.extend(sorted(result["records"], key=_record_order))
+            summary = {
+                "document_code": doc["document_code"],
+                "source_file": doc["source_file"],
+                "strategy": doc["strategy"],
+                "record_count": len(result["records"]),
+                "status": "error" if result["error"] else "ok",
+            }
+            if result["error"]:
+                summary["error"] = result["error"]
+            if result.get("gaps"):
+                summary["numbering_gaps"] = result["gaps"]
+            summaries.append(summary)
+
+        return {
+            "metadata": {
+                "engine_version": ENGINE_VERSION,
+                "strategy_config": self.config,
+                "document_count": len(summaries),
+                "total_records": len(records),
+                "record_fields": RECORD_FIELDS,
+            },
+            "documents": summaries,
+            "records": records,
+            # Timing is reported but kept out of the saved file, which stays byte-identical across runs
+            "run_seconds": round(seconds, 2),
+        }
+
+
+def save_extraction(extraction: Dict[str, Any], output_path: str = DEFAULT_OUTPUT) -> str:
+    """Write the engine output without run-dependent fields"""
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = {key: value for key, value in extraction.items() if key != "run_seconds"}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    return output_path
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    workers = DEFAULT_WORKERS
+    config_path = None
+    if "--workers" in args:
+        index = args.index("--workers")
+        workers = int(args[index + 1])
+        del args[index:index + 2]
+    if "--config" in args:
+        index = args.index("--config")
+        config_path = args[index + 1]
+        del args[index:index + 2]
+    output_path = args[0] if args else DEFAULT_OUTPUT
+
+    engine = ExtractionEngine.from_config_file(config_path, workers=workers) if config_path \
+        else ExtractionEngine(workers=workers)
+    extraction = engine.run()
+    print(f"\n📊 {extraction['metadata']['total_records']} records from "
+          f"{extraction['metadata']['document_count']} documents in {extraction['run_seconds']}s")
+    print(f"✅ Saved to {save_extraction(extraction, output_path)}")
@@ -4,11 +4,15 @@ Final BREF Extractor - Technical Guidance Focus
 Extracts technical guidance and BAT information from Chapter 5 and other BAT sections
 """
 
-import fitz
 import json
 import re
 import os
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Tuple
+
+from page_stream import iter_pages, PageRecord
+from paged_text import PagedText
+from bat_chapter_locator import locate_bat_chapter
+from boilerplate_filter import strip_boilerplate
 
 class FinalBREFExtractor:
     """Extracts technical guidance from BREFs (Chapter 5 focus)"""
@@ -18,6 +22,7 @@ class FinalBREFExtractor:
         self.remaining_brefs = ['CER', 'ECM', 'LVIC-AAF', 'OFC', 'ROM', 'SIC', 'STM']
         self.downloads_dir = "bref_downloads"
         self.results = {}
+        self.boilerplate_report = None  # set per document by strip_boilerplate
     
     def extract_final_brefs(self) -> Dict:
         """Extract technical guidance from remaining BREFs"""
@@ -67,72 +72,67 @@ class FinalBREFExtractor:
     def extract_technical_guidance(self, pdf_path: str, doc_code: str) -> List[Dict]:
         """Extract technical guidance focusing on Chapter 5"""
         
-        doc = fitz.open(pdf_path)
+        # Locate Chapter 5 and collect its text in one lazy pass over the pages
+        chapter5_text = PagedText((record.number, record.text) for record in self.iter_chapter5_pages(pdf_path))
+        chapter5_pages = [page_number - 1 for page_number in chapter5_text.page_numbers]
         
-        try:
-            # Find Chapter 5 or BAT sections
-            chapter5_pages = self.find_chapter5_pages(doc)
-            
-            if not chapter5_pages:
-                print(f"    No Chapter 5 found, using fallback strategy")
-                # Fallback: search for technical content throughout document
-                return self.extract_fallback_techniques(doc, doc_code)
-            
-            print(f"    Found Chapter 5: pages {chapter5_pages[0]+1}-{chapter5_pages[-1]+1}")
-            
-            # Extract content from Chapter 5
-            chapter5_text = self.extract_chapter5_text(doc, chapter5_pages)
-            
-            # Find technical sections
-            techniques = self.extract_techniques_from_chapter5(chapter5_text, doc_code, chapter5_pages)
-            
-            return techniques
-            
-        finally:
-            doc.close()
+        if not chapter5_pages:
+            print(f"    No Chapter 5 found, using fallback strategy")
+            # Fallback: search for technical content throughout document
+            return self.extract_fallback_techniques(pdf_path, doc_code)
+        
+        print(f"    Found Chapter 5: pages {chapter5_pages[0]+1}-{chapter5_pages[-1]+1}")
+        
+        # Running headers, footers and page numbers go before the technique patterns run
+        chapter5_text, self.boilerplate_report = strip_boilerplate(chapter5_text)
+        print(f"    🧹 {self.boilerplate_report.summary()}")
+        
+        # Find technical sections
+        techniques = self.extract_techniques_from_chapter5(chapter5_text, doc_code, chapter5_pages)
+        
+        return techniques
     
-    def find_chapter5_pages(self, doc) -> List[int]:
-        """Find Chapter 5 pages"""
+    def iter_chapter5_pages(self, pdf_path: str) -> Iterator[PageRecord]:
+        """Yield the Chapter 5 pages, stopping at the next chapter or annex"""
+        
+        # Located BAT chapter: read only its pages
+        span = locate_bat_chapter(pdf_path)
+        if span is not None:
+            for start_page, end_page in span.ranges:
+                yield from iter_pages(pdf_path, start_page, end_page)
+            return
         
-        chapter5_pages = []
         found_start = False
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text().lower()
+        for record in iter_pages(pdf_path):
+            text = record.text.lower()
             
             # Look for Chapter 5 start
             if not found_start:
                 if re.search(r'chapter\s+5\b', text) or re.search(r'5\.\s+.*bat', text):
                     found_start = True
-                    chapter5_pages.append(page_num)
-                    continue
+                    yield record
+                continue
             
             # If we found start, continue until next chapter or end
-            if found_start:
-                if re.search(r'chapter\s+[6-9]', text) or re.search(r'annex', text):
-                    break
-                chapter5_pages.append(page_num)
+            if re.search(r'chapter\s+[6-9]', text) or re.search(r'annex', text):
+                break
+            yield record
+    
+    def find_chapter5_pages(self, doc) -> List[int]:
+        """Find Chapter 5 pages"""
         
-        return chapter5_pages
+        return [record.number - 1 for record in self.iter_chapter5_pages(doc.name)]
     
-    def extract_chapter5_text(self, doc, pages: List[int]) -> str:
+    def extract_chapter5_text(self, doc, pages: List[int]) -> PagedText:
         """Extract text from Chapter 5 pages"""
         
-        texts = []
-        
-        for page_num in pages:
-            if page_num < len(doc):
-                page = doc[page_num]
-                page_text = page.get_text()
-                texts.append(f"\\n[PAGE_{page_num + 1}]\\n")
-                texts.append(page_text)
-        
-        return "".join(texts)
+        return PagedText.from_page_list(doc, pages)
     
-    def extract_techniques_from_chapter5(self, text: str, doc_code: str, pages: List[int]) -> List[Dict]:
+    def extract_techniques_from_chapter5(self, paged: PagedText, doc_code: str, pages: List[int]) -> List[Dict]:
         """Extract techniques from Chapter 5 text"""
         
+        text = paged.text
         techniques = []
         
         # Look for different patterns of technical guidance
@@ -165,7 +165,7 @@ class FinalBREFExtractor:
                     title = self.extract_technique_title(technique_text)
                     
                     # Find page
-                    page_num = self.find_page_in_text(text, match.start())
+                    page_num = self.find_page_in_text(paged, match.start())
                     
                     technique = {
                         'technique_number': technique_count,
@@ -186,16 +186,16 @@ class FinalBREFExtractor:
         # Deduplicate by similarity
         return self.deduplicate_techniques(techniques)
     
-    def extract_fallback_techniques(self, doc, doc_code: str) -> List[Dict]:
+    def extract_fallback_techniques(self, pdf_path: str, doc_code: str) -> List[Dict]:
         """Fallback: extract any technical content from entire document"""
         
         techniques = []
         technique_count = 0
         
-        # Search entire document for technical content
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
+        # Search entire document for technical content, stopping once enough is found
+        for record in iter_pages(pdf_path):
+            page_num = record.number - 1
+            text = record.text
             
             # Look for technical sentences
             sentences = re.split(r'[.!?]+', text)
@@ -248,16 +248,10 @@ class FinalBREFExtractor:
         
         return title[:150] if title else "Technical guidance"
     
-    def find_page_in_text(self, text: str, position: int) -> int:
+    def find_page_in_text(self, paged: PagedText, position: int) -> int:
         """Find page number for position in text"""
         
-        text_before = text[:position]
-        page_matches = list(re.finditer(r'\\[PAGE_(\\d+)\\]', text_before))
-        
-        if page_matches:
-            return int(page_matches[-1].group(1))
-        
-        return 1
+        return paged.page_at(position)
     
     def deduplicate_techniques(self, techniques: List[Dict]) -> List[Dict]:
         """Remove duplicate or very similar techniques"""
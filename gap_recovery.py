@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/gap_recovery.py
+
+"""
+Gap Recovery
+Post-extraction check on the BAT/BBT numbering of one document. Numbers that
+are missing (BAT 1-17, then 19-29) or out of order (a "BBT 7" table cell on a
+page before BBT 6) are located between their neighbouring BATs, and only that
+page window is searched again with progressively more expensive strategies:
+relaxed header patterns on the PyMuPDF text, OCR of image-only pages, and
+Docling. Recovered entries are merged back into the extraction, replacing
+out-of-order records whose number was found in the right place.
+
+Usage:
+    python gap_recovery.py extraction.json    # report gaps in an engine output file
+"""
+
+import importlib.util
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from paged_text import PagedText
+from text_normalizer import normalize_text
+
+DEFAULT_RECOVERY_ORDER = ["patterns", "ocr", "docling"]
+TRAILING_WINDOW_PAGES = 3      # searched after the last trusted BAT for higher out-of-order numbers
+MAX_RECOVERED_CHARS = 20000    # cap on a recovered BAT text when no next header is found
+HEADER_LABELS = {"bat": "BAT", "bbt": "BBT"}
+
+
+@dataclass
+class NumberingGap:
+    """Consecutive missing numbers and the pages between their trusted neighbours"""
+    missing: List[int]
+    first_page: int
+    last_page: Optional[int]      # None: up to TRAILING_WINDOW_PAGES after first_page
+    after: Optional[int] = None   # trusted number before the gap
+    before: Optional[int] = None  # trusted number after the gap
+
+
+@dataclass
+class GapReport:
+    """What the check found and recovered for one document"""
+    missing: List[int] = field(default_factory=list)
+    out_of_order: List[int] = field(default_factory=list)
+    recovered: Dict[int, str] = field(default_factory=dict)   # number -> recovery strategy
+    still_missing: List[int] = field(default_factory=list)
+    pages_searched: int = 0
+
+    @property
+    def has_gaps(self) -> bool:
+        return bool(self.missing or self.out_of_order)
+
+    def summary(self) -> str:
+        return (f"{len(self.missing)} missing, {len(self.out_of_order)} out of order, "
+                f"{len(self.recovered)} recovered from {self.pages_searched} pages, "
+                f"{len(self.still_missing)} still missing")
+
+    def to_dict(self) -> dict:
+        return {
+            'missing': self.missing,
+            'out_of_order': self.out_of_order,
+            'recovered': {str(number): strategy for number, strategy in sorted(self.recovered.items())},
+            'still_missing': self.still_missing,
+            'pages_searched': self.pages_searched
+        }
+
+
+def _longest_non_decreasing(values: Sequence[int]) -> List[int]:
+    """Indexes of one longest non-decreasing subsequence (patience sorting, O(n log n))"""
+    tails: List[int] = []       # tails[k]: value ending the best run of length k + 1
+    tail_index: List[int] = []
+    previous = [-1] * len(values)
+    for index, value in enumerate(values):
+        position = bisect_right(tails, value)
+        if position == len(tails):
+            tails.append(value)
+            tail_index.append(index)
+        else:
+            tails[position] = value
+            tail_index[position] = index
+        previous[index] = tail_index[position - 1] if position else -1
+    result = []
+    index = tail_index[-1] if tail_index else -1
+    while index != -1:
+        result.append(index)
+        index = previous[index]
+    return result[::-1]
+
+
+def find_numbering_gaps(records: List[Dict[str, Any]]) -> Tuple[List[NumberingGap], List[int]]:
+    """Gaps between trusted BATs and the out-of-order numbers of one document's records
+
+    A record is trusted when its page fits the order of the other numbers
+    (longest run of non-decreasing pages by number); the others are out of order
+    and their numbers are searched again like missing ones.
+    """
+    pages: Dict[int, int] = {}
+    for record in records:
+        number, page = record.get("bat_number"), record.get("page")
+        if isinstance(number, int) and number > 0 and isinstance(page, int) and number not in pages:
+            pages[number] = page
+    if not pages:
+        return [], []
+
+    numbers = sorted(pages)
+    trusted_indexes = set(_longest_non_decreasing([pages[number] for number in numbers]))
+    trusted = [number for index, number in enumerate(numbers) if index in trusted_indexes]
+    out_of_order = [number for index, number in enumerate(numbers) if index not in trusted_indexes]
+
+    gaps = []
+    trusted_set = set(trusted)
+    previous: Optional[int] = None
+    run: List[int] = []
+    for number in range(1, numbers[-1] + 1):
+        if number in trusted_set:
+            if run:
+                gaps.append(NumberingGap(run, pages[previous] if previous else 1, pages[number], previous, number))
+                run = []
+            previous = number
+        else:
+            run.append(number)
+    if run:
+        gaps.append(NumberingGap(run, pages[previous] if previous else 1, None, previous, None))
+    return gaps, out_of_order
+
+
+# --- Recovery strategies ----------------------------------------------------
+# Each returns the text of the requested pages (1-based) or None when the
+# strategy is not available here; cheapest first in DEFAULT_RECOVERY_ORDER.
+
+RecoveryFunc = Callable[[str, List[int]], Optional[PagedText]]
+RECOVERY_STRATEGIES: Dict[str, RecoveryFunc] = {}
+
+
+def register_recovery(name: str):
+    """Register a recovery strategy: func(pdf_path, page_numbers) -> PagedText or None"""
+    def decorator(func: RecoveryFunc) -> RecoveryFunc:
+        RECOVERY_STRATEGIES[name] = func
+        return func
+    return decorator
+
+
+@register_recovery("patterns")
+def _pymupdf_pages(pdf_path: str, page_numbers: List[int]) -> Optional[PagedText]:
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return PagedText.from_page_list(doc, [page_number - 1 for page_number in page_numbers])
+
+
+@register_recovery("ocr")
+def _ocr_pages(pdf_path: str, page_numbers: List[int]) -> Optional[PagedText]:
+    import fitz
+    from ocr_lane import OCRLane, image_page_hash, is_image_only, ocr_available
+    if not ocr_available():
+        return None
+    with fitz.open(pdf_path) as doc:
+        pages = {page_number: doc[page_number - 1].get_text() for page_number in page_numbers if page_number <= len(doc)}
+        image_pages = {page_number: image_page_hash(doc, doc[page_number - 1])
+                       for page_number, text in pages.items() if is_image_only(doc[page_number - 1], text)}
+    if not image_pages:
+        return None
+    for page_number, result in OCRLane().submit(pdf_path, image_pages).wait().items():
+        if not result.get("error"):
+            pages[page_number] = result["text"]
+    return PagedText(sorted(pages.items()))
+
+
+@register_recovery("docling")
+def _docling_pages(pdf_path: str, page_numbers: List[int]) -> Optional[PagedText]:
+    if importlib.util.find_spec("docling") is None:
+        return None
+    from pdf_processor import _extract_with_docling
+    converted = _extract_with_docling(pdf_path, page_range=(page_numbers[0], page_numbers[-1]))
+    if converted.get("error") or not converted.get("full_text"):
+        return None
+    # Docling's page split is unreliable; the window counts as starting on its first page
+    return PagedText([(page_numbers[0], converted["full_text"])])
+
+
+# --- Locating and merging ---------------------------------------------------
+
+def _header_pattern(label: str) -> re.Pattern:
+    """Relaxed BAT/BBT header: label and number may be split over two lines, markdown prefixes allowed"""
+    return re.compile(
+        rf'^[ \t]*(?:#+[ \t]*|[-*][ \t]+)?(?:\*\*)?{label}\s*(?P<number>\d+)[ \t]*(?:\*\*)?[ \t]*[.:]'
+        rf'|^[ \t]*(?P<number_first>\d+)\.[ \t]*{label}\b',
+        re.MULTILINE)
+
+
+def locate_headers(paged: PagedText, numbers: Sequence[int], record_type: str,
+                   strategy: str = "patterns") -> Dict[int, Dict[str, Any]]:
+    """Raw extractor-style records for the requested numbers found in the window text"""
+    label = HEADER_LABELS[record_type]
+    text = paged.text
+    hits = [(match.start(), int(match.group('number') or match.group('number_first')), match.end())
+            for match in _header_pattern(label).finditer(text)]
+    wanted = set(numbers)
+    found: Dict[int, Dict[str, Any]] = {}
+    for index, (start, number, header_end) in enumerate(hits):
+        if number not in wanted or number in found:
+            continue
+        # The BAT runs to the next header in the window, whatever its number
+        end = hits[index + 1][0] if index + 1 < len(hits) else min(len(text), start + MAX_RECOVERED_CHARS)
+        body = normalize_text(text[start:end])
+        # Title: first line after the header ("BAT 1." often stands on a line of its own)
+        title = normalize_text(text[header_end:end]).lstrip('.: ').split('\n', 1)[0]
+        found[number] = {
+            f"{record_type}_number": number,
+            f"{record_type}_id": f"{label} {number}",
+            "title": title[:200],
+            "full_text": body,
+            "text_length": len(body),
+            "page": paged.page_at(start),
+            "extraction_method": f"gap_recovery_{strategy}",
+        }
+    return found
+
+
+def recover_gaps(pdf_path: str, records: List[Dict[str, Any]], record_type: str,
+                 strategies: Sequence[str] = DEFAULT_RECOVERY_ORDER,
+                 page_count: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Dict[int, Dict[str, Any]], GapReport]:
+    """Search the gap windows and return (raw records found, numbers they replace, report)
+
+    Args:
+        records: normalised engine records of one document (bat_number, page)
+        record_type: 'bat' or 'bbt'; other record types are not numbered BATs
+        strategies: recovery strategies to try per gap, in order
+        page_count: pages in the PDF (read from the file when None)
+
+    Returns:
+        Raw records (extractor schema), the out-of-order records they replace by
+        number, and the report
+    """
+    report = GapReport()
+    if record_type not in HEADER_LABELS:
+        return [], {}, report
+    gaps, out_of_order = find_numbering_gaps(records)
+    report.out_of_order = out_of_order
+    report.missing = [number for gap in gaps for number in gap.missing if number not in out_of_order]
+    if not gaps:
+        return [], {}, report
+
+    if page_count is None:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            page_count = len(doc)
+
+    recovered: List[Dict[str, Any]] = []
+    for gap in gaps:
+        last_page = gap.last_page if gap.last_page is not None else gap.first_page + TRAILING_WINDOW_PAGES
+        window = list(range(max(1, gap.first_page), min(page_count, last_page) + 1))
+        if not window:
+            continue
+        report.pages_searched += len(window)
+        pending = list(gap.missing)
+        for strategy in strategies:
+            paged = RECOVERY_STRATEGIES[strategy](pdf_path, window)
+            if paged is None:
+                continue
+            found = locate_headers(paged, pending, record_type, strategy=strategy)
+            for number, raw in sorted(found.items()):
+                recovered.append(raw)
+                report.recovered[number] = strategy
+            pending = [number for number in pending if number not in found]
+            if not pending:
+                break
+
+    report.still_missing = [number for gap in gaps for number in gap.missing
+                            if number not in report.recovered and number not in out_of_order]
+    replaced = {record["bat_number"]: record for record in records
+                if record.get("bat_number") in report.recovered and record.get("bat_number") in out_of_order}
+    return recovered, replaced, report
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from collections import defaultdict
+
+    if len(sys.argv) < 2:
+        print("Usage: python gap_recovery.py extraction.json")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        extraction = json.load(f)
+    by_document = defaultdict(list)
+    for record in extraction.get("records", []):
+        by_document[(record["source_file"], record["record_type"])].append(record)
+    for (source_file, record_type), document_records in sorted(by_document.items()):
+        gaps, out_of_order = find_numbering_gaps(document_records)
+        if not gaps:
+            print(f"✅ {source_file}: {len(document_records)} {record_type} records, numbering complete")
+            continue
+        print(f"⚠️ {source_file}: out of order {out_of_order or '-'}")
+        for gap in gaps:
+            window = f"pages {gap.first_page}-{gap.last_page}" if gap.last_page else f"from page {gap.first_page}"
+            print(f"   missing {gap.missing} between {gap.after} and {gap.before} ({window})")
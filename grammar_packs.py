@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/grammar_packs.py
+
+"""
+Grammar Packs
+Precompiled line grammar for the line-oriented BAT/BBT parsers, one pack per
+language. A pack recognises every BAT/BBT header form with one regex match
+per line ("BBT 1.", "1. BBT", "**BBT 1**", "Om ..., is de BBT ..."), tells
+section headers apart ("HOOFDSTUK", "BIJLAGE", "Chapter", ...) and sorts body
+lines into applicability / emission levels / monitoring / techniques.
+The parsers used to call re.match() with five or six pattern strings per
+line and scan keyword lists with any(); the pack does the same work with
+compiled patterns and a single keyword test for most lines.
+
+Usage:
+    python grammar_packs.py [file.pdf ...]    # corpus benchmark, old loop vs pack
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Body line categories, in the order the parsers test them
+APPLICABILITY = "applicability"
+EMISSION_LEVELS = "emission_levels"
+MONITORING = "monitoring"
+TECHNIQUES = "techniques"
+
+
+class HeaderMatch(NamedTuple):
+    """A line that starts a BAT/BBT; number is None for sentence headers without one"""
+    form: str
+    number: Optional[str]
+    title: str
+
+
+class GrammarPack:
+    """Header forms, section headers and body line vocabulary of one language"""
+
+    def __init__(self, language: str, header_forms: Sequence[Tuple[str, str]], section_pattern: str,
+                 categories: Sequence[Tuple[str, Sequence[str]]]):
+        """
+        Args:
+            language: 'nl' or 'en'
+            header_forms: (form name, pattern) in priority order; a pattern may define
+                (?P<number>...) and (?P<title>...) and is matched at the start of a stripped line
+            section_pattern: matched at the start of a line
+            categories: (category, lowercase keywords) in priority order, searched in the
+                lowercased line; a keyword starting with '^' only counts at the start of the line
+        """
+        self.language = language
+        self.forms = [name for name, _ in header_forms]
+        # One alternation; every form is wrapped in a group named after it so lastgroup
+        # tells which form fired, and its number/title groups get a per-form prefix
+        self._header = re.compile("|".join(
+            f"(?P<{name}>{pattern.replace('(?P<number>', f'(?P<{name}__number>').replace('(?P<title>', f'(?P<{name}__title>')})"
+            for name, pattern in header_forms), re.IGNORECASE)
+        self._groups = {name: (f"{name}__number" if f"{name}__number" in self._header.groupindex else None,
+                               f"{name}__title" if f"{name}__title" in self._header.groupindex else None)
+                        for name in self.forms}
+        self._section = re.compile(section_pattern, re.IGNORECASE)
+        self._categories = [
+            (category, re.compile("|".join('^' + re.escape(word[1:]) if word.startswith('^') else re.escape(word)
+                                           for word in words)))
+            for category, words in categories]
+        # Most body lines contain none of the keywords: one search settles them. A flat
+        # alternation of literals lets the regex engine skip to the keywords' first letters.
+        self._any_keyword = re.compile("|".join(re.escape(word.lstrip('^'))
+                                                for _, words in categories for word in words))
+
+    def header(self, line: str) -> Optional[HeaderMatch]:
+        """HeaderMatch when the (stripped) line starts a BAT/BBT"""
+        match = self._header.match(line)
+        if match is None:
+            return None
+        form = match.lastgroup
+        number_group, title_group = self._groups[form]
+        number = match.group(number_group) if number_group else None
+        title = match.group(title_group) if title_group else line
+        return HeaderMatch(form, number, (title or "").strip())
+
+    def is_section(self, line: str) -> bool:
+        return self._section.match(line) is not None
+
+    def category(self, line: str) -> Optional[str]:
+        """First matching body category of the line, None for plain description"""
+        lower = line.lower()
+        if self._any_keyword.search(lower) is None:
+            return None
+        for category, pattern in self._categories:
+            if pattern.search(lower):
+                return category
+        return None
+
+
+# "BBT n" needs a '.' or ':' after the number: table cells ("BBT 12") and sentences
+# ("BBT 9 is alleen toepasbaar ...") in the EUR-Lex texts do not open a BBT
+DUTCH_PACK = GrammarPack(
+    language="nl",
+    header_forms=[
+        ("bbt_number", r'BBT\s+(?P<number>\d+(?:\.\d+)?)\s*[.:]\s*(?P<title>.*)'),
+        ("number_bbt", r'(?P<number>\d+(?:\.\d+)?)\.\s*BBT\b\s*(?P<title>.*)'),
+        ("bold_bbt", r'\*\*BBT\s+(?P<number>\d+(?:\.\d+)?)\*\*\s*(?P<title>.*)'),
+        ("purpose", r'(?:Om|Teneinde|Voor)\s+.*?,\s*is\s+(?:de\s+)?BBT\b\s*(?P<title>.*)'),
+    ],
+    section_pattern=r'(?:HOOFDSTUK|SECTIE|PARAGRAAF|BIJLAGE)\b',
+    categories=[
+        (APPLICABILITY, ['toepasselijkheid', 'van toepassing', 'geldt voor']),
+        (EMISSION_LEVELS, ['emissie', 'grenswaarde', 'niveau', 'mg/m³', 'μg/m³']),
+        (MONITORING, ['monitor', 'meting', 'controle', 'frequentie']),
+        (TECHNIQUES, ['techniek', 'methode', 'procedure', 'apparatuur']),
+    ],
+)
+
+ENGLISH_PACK = GrammarPack(
+    language="en",
+    header_forms=[
+        ("bat_number", r'BAT\s+(?P<number>\d+(?:\.\d+)?)\.\s*(?P<title>.*)'),
+        ("number_bat", r'(?P<number>\d+(?:\.\d+)?)\.\s*BAT\b\s*(?P<title>.*)'),
+        ("bold_bat", r'\*\*BAT\s+(?P<number>\d+(?:\.\d+)?)\*\*\s*(?P<title>.*)'),
+    ],
+    section_pattern=r'(?:CHAPTER|SECTION)',
+    categories=[
+        (APPLICABILITY, ['^applicability']),
+        (EMISSION_LEVELS, ['emission', 'limit', 'level']),
+        (MONITORING, ['monitor', 'measure']),
+        (TECHNIQUES, ['technique', 'method']),
+    ],
+)
+
+PACKS: Dict[str, GrammarPack] = {pack.language: pack for pack in (DUTCH_PACK, ENGLISH_PACK)}
+
+
+# The per-line loops the packs replace (Uitgebreide_BREF_Processor / ComprehensiveBREFProcessor)
+LEGACY_LINE_GRAMMAR = {
+    "nl": (
+        [r'^BBT\s+(\d+(?:\.\d+)?)\s*[\.:]?\s*(.*?)$', r'^(\d+(?:\.\d+)?)\.\s*BBT\s+(.*?)$',
+         r'^\*\*BBT\s+(\d+(?:\.\d+)?)\*\*\s*(.*?)$', r'^Om\s+.*?,\s*is\s+de\s+BBT\s*(.*?)$',
+         r'^Teneinde\s+.*?,\s*is\s+de\s+BBT\s*(.*?)$', r'Voor\s+.*?,\s*is\s+de\s+BBT\s*(.*?)$'],
+        ['HOOFDSTUK', 'SECTIE', 'PARAGRAAF', 'BIJLAGE'],
+        [['toepasselijkheid', 'van toepassing', 'geldt voor'], ['emissie', 'grenswaarde', 'niveau', 'mg/m³', 'μg/m³'],
+         ['monitor', 'meting', 'controle', 'frequentie'], ['techniek', 'methode', 'procedure', 'apparatuur']],
+    ),
+    "en": (
+        [r'^BAT\s+(\d+(?:\.\d+)?)\.\s*(.*?)$', r'^(\d+(?:\.\d+)?)\.\s*BAT\s*(.*?)$',
+         r'^\*\*BAT\s+(\d+(?:\.\d+)?)\*\*\s*(.*?)$'],
+        ['CHAPTER', 'SECTION'],
+        [['applicability'], ['emission', 'limit', 'level'], ['monitor', 'measure'], ['technique', 'method']],
+    ),
+}
+
+
+def _legacy_scan(lines: Iterable[str], language: str) -> int:
+    patterns, section_words, keyword_lists = LEGACY_LINE_GRAMMAR[language]
+    headers = 0
+    for line in lines:
+        line = line.strip()
+        bat_match = None
+        for pattern in patterns:
+            bat_match = re.match(pattern, line, re.IGNORECASE)
+            if bat_match:
+                break
+        if bat_match:
+            headers += 1
+            continue
+        if any(keyword in line.upper() for keyword in section_words):
+            continue
+        for keywords in keyword_lists:
+            if any(keyword in line.lower() for keyword in keywords):
+                break
+    return headers
+
+
+def _pack_scan(lines: Iterable[str], pack: GrammarPack) -> int:
+    headers = 0
+    for line in lines:
+        line = line.strip()
+        if pack.header(line):
+            headers += 1
+            continue
+        if pack.is_section(line):
+            continue
+        pack.category(line)
+    return headers
+
+
+def benchmark(lines: List[str], language: str, repeats: int = 3) -> Dict[str, float]:
+    """Seconds for the old per-line loop and the pack over the same lines (best of repeats)"""
+    pack = PACKS[language]
+    results = {}
+    for name, scan in (('legacy', lambda: _legacy_scan(lines, language)), ('pack', lambda: _pack_scan(lines, pack))):
+        best: Optional[float] = None
+        for _ in range(repeats):
+            started = time.perf_counter()
+            results[f"{name}_headers"] = scan()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best
+    return results
+
+
+def document_language(pdf_path: str) -> str:
+    """'nl' for the Dutch BBT conclusions (file names contain NL), else 'en'"""
+    name = pdf_path.rsplit('/', 1)[-1].upper()
+    return "nl" if "_NL" in name or "BBT" in name else "en"
+
+
+if __name__ == "__main__":
+    import glob
+    import sys
+    import fitz
+
+    documents = sys.argv[1:] or sorted(glob.glob("regulatory_data/bat_conclusions/*.pdf"))
+    totals = {'read': 0.0, 'legacy': 0.0, 'pack': 0.0}
+    for pdf_path in documents:
+        started = time.perf_counter()
+        try:
+            with fitz.open(pdf_path) as doc:
+                lines = "\n".join(page.get_text() for page in doc).split('\n')
+        except Exception as e:
+            print(f"❌ {pdf_path}: {e}")
+            continue
+        read = time.perf_counter() - started
+        language = document_language(pdf_path)
+        timings = benchmark(lines, language)
+        totals['read'] += read
+        totals['legacy'] += timings['legacy']
+        totals['pack'] += timings['pack']
+        print(f"📄 {pdf_path} [{language}] {len(lines)} lines: read {read:.3f}s, "
+              f"legacy {timings['legacy']:.3f}s ({timings['legacy_headers']} headers), "
+              f"pack {timings['pack']:.3f}s ({timings['pack_headers']} headers)")
+
+    if totals['pack']:
+        print(f"\n📊 read {totals['read']:.3f}s, legacy parse {totals['legacy']:.3f}s, pack parse {totals['pack']:.3f}s "
+              f"({totals['legacy'] / totals['pack']:.1f}x); parsing is now "
+              f"{100 * totals['pack'] / (totals['read'] + totals['pack']):.0f}% of read + parse")
@@ -10,6 +10,8 @@ import re
 from bs4 import BeautifulSoup, Tag
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
+from section_index import SectionBoundaryIndex
+from html_text_map import HTMLTextMap
 
 class HTMLBATExtractor:
     """Extracts BAT/BBT entries from HTML documents using structural parsing"""
@@ -19,6 +21,13 @@ class HTMLBATExtractor:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
+        # Dutch end markers for text-based extraction, in priority order
+        self.section_index = SectionBoundaryIndex([
+            r'BIJLAGE\s+[IVX]+',     # Annex
+            r'Hoofdstuk\s+[5-9]',    # Next chapter
+            r'Referenties\s*$',      # References
+            r'Glossarium\s*$',       # Glossary
+        ], max_span=10000)
     
     def extract_bats_from_html_url(self, url: str, language: str = 'en') -> List[Dict]:
         """
@@ -51,8 +60,10 @@ class HTMLBATExtractor:
     def _extract_dutch_bbts(self, soup: BeautifulSoup, source_url: str) -> List[Dict]:
         """Extract Dutch BBT entries from HTML using text-based parsing"""
         
-        # Get all text content and split by BBT patterns
-        full_text = soup.get_text()
+        # Get all text content and split by BBT patterns; the map walks the DOM once
+        # and gives each BBT's HTML by text offsets
+        text_map = HTMLTextMap(soup)
+        full_text = text_map.text
         
         # Split text into BBT sections using regex
         bbt_pattern = r'(BBT\s+(\d+)\.?\s+[^.]+\.)'
@@ -79,7 +90,7 @@ class HTMLBATExtractor:
             # Validate and create BBT entry
             if len(bbt_text) > 100:  # Minimum length check
                 # Extract corresponding HTML for tables
-                bbt_html = self._extract_html_for_text_range(soup, match.group(1), bbt_text[:500])
+                bbt_html = self._extract_html_for_text_range(text_map, start_pos, end_pos)
                 
                 # Count tables in this section
                 table_count = bbt_text.count('Tabel') + bbt_text.count('Table')
@@ -111,37 +122,11 @@ class HTMLBATExtractor:
     
     def _find_text_end_position(self, full_text: str, start_pos: int) -> int:
         """Find logical end position for text-based extraction"""
-        
-        # Look for end indicators in Dutch
-        search_text = full_text[start_pos:]
-        
-        end_patterns = [
-            r'BIJLAGE\s+[IVX]+',     # Annex
-            r'Hoofdstuk\s+[5-9]',    # Next chapter  
-            r'Referenties\s*$',      # References
-            r'Glossarium\s*$',       # Glossary
-        ]
-        
-        for pattern in end_patterns:
-            match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return start_pos + match.start()
-        
-        # Default: limit to reasonable length
-        max_length = 10000
-        return min(len(full_text), start_pos + max_length)
+        return self.section_index.end_position(full_text, start_pos)
     
-    def _extract_html_for_text_range(self, soup: BeautifulSoup, start_marker: str, text_sample: str) -> str:
-        """Extract HTML that corresponds to the text range"""
-        
-        # Find elements that contain the start marker or sample text
-        matching_elements = []
-        
-        for element in soup.find_all(['p', 'div', 'table', 'td', 'tr']):
-            if start_marker in element.get_text() or any(word in element.get_text() for word in text_sample.split()[:5]):
-                matching_elements.append(str(element))
-        
-        return '\n'.join(matching_elements[:10])  # Limit to first 10 elements
+    def _extract_html_for_text_range(self, text_map: HTMLTextMap, start_pos: int, end_pos: int) -> str:
+        """Extract HTML that corresponds to the text range (outermost elements, tables included)"""
+        return text_map.html_for_range(start_pos, end_pos)
     
     def _extract_title_from_text(self, text: str, bbt_num: int) -> str:
         """Extract title from BBT text"""
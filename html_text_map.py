@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/html_text_map.py
+
+"""
+HTML Text Map
+One walk over a parsed HTML document that produces its flattened text (the
+same string as soup.get_text()) together with the character span of every
+block element (p, div, table, tr, td, ...) and the innermost block around
+every text node. The HTML of a text range - a BBT found by regex in the
+flattened text - is then an interval lookup: the outermost blocks inside the
+range, plus the block the range starts in. Tables come along as whole <table>
+elements.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+BLOCK_TAGS = ('p', 'div', 'table', 'tr', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'ul', 'ol', 'dl')
+
+
+class HTMLTextMap:
+    """Flattened text of a soup with an offset -> element map, built in one DOM walk"""
+
+    def __init__(self, soup: BeautifulSoup, block_tags: Sequence[str] = BLOCK_TAGS):
+        self.soup = soup
+        block_tags = frozenset(block_tags)
+        string_types = soup.interesting_string_types or (NavigableString, CData)
+
+        parts: List[str] = []
+        offset = 0
+        # Block elements in document order with their [start, end) span in the text
+        self.elements: List[Tag] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        # Start offset of every text node and the index of its innermost block (-1: none)
+        self.string_starts: List[int] = []
+        self.string_blocks: List[int] = []
+
+        blocks: List[int] = []   # open block elements, innermost last
+        stack: List[Tuple[Optional[int], object]] = [(None, iter(soup.contents))]
+        while stack:
+            block_index, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if block_index is not None:
+                    self.ends[block_index] = offset
+                    blocks.pop()
+                continue
+            if isinstance(child, Tag):
+                child_block = None
+                if child.name in block_tags:
+                    child_block = len(self.elements)
+                    self.elements.append(child)
+                    self.starts.append(offset)
+                    self.ends.append(offset)
+                    blocks.append(child_block)
+                stack.append((child_block, iter(child.contents)))
+            elif type(child) in string_types and child:
+                self.string_starts.append(offset)
+                self.string_blocks.append(blocks[-1] if blocks else -1)
+                parts.append(child)
+                offset += len(child)
+
+        self.text = "".join(parts)
+
+    def element_at(self, offset: int) -> Optional[Tag]:
+        """Innermost block element containing the character at offset"""
+        index = bisect_right(self.string_starts, offset) - 1
+        if index < 0 or offset >= len(self.text):
+            return None
+        block = self.string_blocks[index]
+        return self.elements[block] if block >= 0 else None
+
+    def elements_for_range(self, start: int, end: int) -> List[Tag]:
+        """Outermost block elements covering text[start:end], in document order
+
+        Every outermost block that starts inside the range is included, so is
+        the block the range starts in when it begins earlier (a BBT header in
+        the middle of a table cell). The HTML therefore always covers the text.
+        """
+        selected: List[Tag] = []
+        covered_until = start
+        first = self.element_at(start)
+        index = bisect_right(self.string_starts, start) - 1
+        if first is not None and self.starts[self.string_blocks[index]] < start:
+            selected.append(first)
+            covered_until = self.ends[self.string_blocks[index]]
+
+        for index in range(bisect_left(self.starts, start), bisect_left(self.starts, end)):
+            element_start, element_end = self.starts[index], self.ends[index]
+            # Elements are in document order: one starting before covered_until is nested
+            if element_start < covered_until or element_start == element_end:
+                continue
+            selected.append(self.elements[index])
+            covered_until = element_end
+        return selected
+
+    def html_for_range(self, start: int, end: int) -> str:
+        """HTML of the blocks covering text[start:end], one element per line"""
+        return '\n'.join(str(element) for element in self.elements_for_range(start, end))
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/http_cache.py
+
+"""
+HTTP Cache
+On-disk conditional-GET cache for the regulatory downloads. For every URL
+the validators (ETag / Last-Modified) of the last 200 are stored next to the
+SHA-256, size and mtime of the body on disk; the next request for the URL
+sends If-None-Match / If-Modified-Since and a 304 is answered from the file
+on disk. A refresh of an unchanged corpus is then one small round trip per
+document, and a changed document shows up as a 200 with a different SHA-256.
+
+Downloads to a file use that file as the cached body (no second copy);
+pages that are only parsed (BATC HTML) get their body stored in the cache
+directory so a 304 can be replayed into the parser.
+
+Usage:
+    python http_cache.py          # fetch metadata per URL
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+DEFAULT_HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache")
+
+
+@dataclass
+class CacheEntry:
+    """Validators and fetch metadata of one URL (and download target)"""
+    url: str
+    target: str                  # download target, '' when the body is kept in the cache directory
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_type: Optional[str]
+    status: int
+    body_path: Optional[str]
+    size_bytes: int
+    mtime_ns: int
+    sha256: Optional[str]
+    fetched_at: float            # last 200
+    validated_at: float          # last 200 or 304
+    changed_at: float            # last time the body differed from the one before
+    fetches: int
+    not_modified: int
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for this entry"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def body_intact(self) -> bool:
+        """True if the body on disk is still the one the validators describe"""
+        if not self.body_path:
+            return False
+        try:
+            stat = os.stat(self.body_path)
+        except OSError:
+            return False
+        return stat.st_size == self.size_bytes and stat.st_mtime_ns == self.mtime_ns
+
+
+class BodyRecorder:
+    """Stands in for response.raw: hashes (and optionally stores) what the handler reads
+
+    requests' iter_content() and .content read through raw.stream(), so every
+    decoded chunk passes here on its way to the handler.
+    """
+
+    def __init__(self, raw, sink_path: Optional[str] = None):
+        self._raw = raw
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.sink_path = sink_path
+        self._tmp_path = None
+        self._sink = None
+        if sink_path:
+            os.makedirs(os.path.dirname(sink_path), exist_ok=True)
+            self._tmp_path = f"{sink_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            self._sink = open(self._tmp_path, 'wb')
+
+    def seed(self, path: str):
+        """Count the bytes of path as already read (the start of a resumed download)"""
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(2 ** 20), b''):
+                self.sha256.update(chunk)
+                self.size += len(chunk)
+
+    def _record(self, data: bytes) -> bytes:
+        if data:
+            self.sha256.update(data)
+            self.size += len(data)
+            if self._sink is not None:
+                self._sink.write(data)
+        return data
+
+    def stream(self, amt: int = 2 ** 16, decode_content: Optional[bool] = None):
+        for chunk in self._raw.stream(amt, decode_content=decode_content):
+            yield self._record(chunk)
+
+    def read(self, amt: Optional[int] = None, decode_content: Optional[bool] = None, **kwargs) -> bytes:
+        return self._record(self._raw.read(amt, decode_content=decode_content, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def finish(self, chunk_size: int = 2 ** 16):
+        """Read what the handler left unread and move the stored body into place"""
+        for _ in self.stream(chunk_size, decode_content=True):
+            pass
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+            os.replace(self._tmp_path, self.sink_path)
+
+    def discard(self):
+        """Drop the partly stored body (handler or transfer failed)"""
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+            try:
+                os.remove(self._tmp_path)
+            except FileNotFoundError:
+                pass
+
+
+class HTTPCache:
+    """Per-URL validators and bodies on disk, indexed in sqlite"""
+
+    def __init__(self, cache_dir: str = DEFAULT_HTTP_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.db")
+        self._lock = threading.Lock()
+        self.revalidated = 0     # 304s answered from disk in this process
+        self.changed = 0         # 200s with a body that differs from the cached one
+        self.unchanged = 0       # 200s with the same body (server without validators)
+        self.new = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._init_index()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _init_index(self):
+        """Create the URL index if it does not exist yet"""
+        conn = self._connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT NOT NULL,
+                target TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                status INTEGER NOT NULL,
+                body_path TEXT,
+                size_bytes INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT,
+                fetched_at REAL NOT NULL,
+                validated_at REAL NOT NULL,
+                changed_at REAL NOT NULL,
+                fetches INTEGER NOT NULL,
+                not_modified INTEGER NOT NULL,
+                PRIMARY KEY (url, target)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _target(target: Optional[str]) -> str:
+        return os.path.abspath(target) if target else ''
+
+    def body_path(self, url: str) -> str:
+        """Where the cache keeps the body of a URL that is not downloaded to a file"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, "bodies", key[:2], key)
+
+    def lookup(self, url: str, target: Optional[str] = None) -> Optional[CacheEntry]:
+        """Stored entry for url (downloaded to target), or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM responses WHERE url = ? AND target = ?',
+                               (url, self._target(target))).fetchone()
+        finally:
+            conn.close()
+        return CacheEntry(*row) if row else None
+
+    def store(self, url: str, target: Optional[str], headers, status: int, body_path: Optional[str],
+              sha256: str, size_bytes: int, previous: Optional[CacheEntry] = None) -> Optional[bool]:
+        """Record a 200; returns whether the body changed (None if there was nothing to compare)"""
+        mtime_ns = os.stat(body_path).st_mtime_ns if body_path else 0
+
+        now = time.time()
+        changed = None if previous is None or previous.sha256 is None else previous.sha256 != sha256
+        with self._lock:
+            if changed is None:
+                self.new += 1
+            elif changed:
+                self.changed += 1
+            else:
+                self.unchanged += 1
+            conn = self._connect()
+            try:
+                conn.execute('''
+                    INSERT OR REPLACE INTO responses
+                    (url, target, etag, last_modified, content_type, status, body_path, size_bytes, mtime_ns,
+                     sha256, fetched_at, validated_at, changed_at, fetches, not_modified)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (url, self._target(target), headers.get('ETag'), headers.get('Last-Modified'),
+                      headers.get('Content-Type'), status, body_path, size_bytes, mtime_ns, sha256,
+                      now, now, previous.changed_at if changed is False else now,
+                      (previous.fetches if previous else 0) + 1,
+                      previous.not_modified if previous else 0))
+                conn.commit()
+            finally:
+                conn.close()
+        return changed
+
+    def mark_not_modified(self, entry: CacheEntry, headers) -> None:
+        """Record a 304 for entry; a 304 may carry updated validators"""
+        with self._lock:
+            self.revalidated += 1
+            conn = self._connect()
+            try:
+                conn.execute('''
+                    UPDATE responses
+                    SET etag = ?, last_modified = ?, validated_at = ?, not_modified = not_modified + 1
+                    WHERE url = ? AND target = ?
+                ''', (headers.get('ETag') or entry.etag, headers.get('Last-Modified') or entry.last_modified,
+                      time.time(), entry.url, entry.target))
+                conn.commit()
+            finally:
+                conn.close()
+
+    def entries(self) -> List[CacheEntry]:
+        """All entries, most recently validated first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT * FROM responses ORDER BY validated_at DESC').fetchall()
+        finally:
+            conn.close()
+        return [CacheEntry(*row) for row in rows]
+
+    def clear(self):
+        """Forget every URL and remove the bodies kept in the cache directory"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                for (body_path,) in conn.execute("SELECT body_path FROM responses WHERE target = ''").fetchall():
+                    try:
+                        os.remove(body_path)
+                    except (FileNotFoundError, TypeError):
+                        pass
+                conn.execute('DELETE FROM responses')
+                conn.commit()
+            finally:
+                conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Revalidation counters for this process plus what is on disk"""
+        conn = self._connect()
+        try:
+            entries, total, not_modified = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(not_modified), 0) FROM responses'
+            ).fetchone()
+        finally:
+            conn.close()
+        return {
+            "not_modified": self.revalidated,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "new": self.new,
+            "entries": entries,
+            "size_bytes": total,
+            "not_modified_total": not_modified,
+            "cache_dir": self.cache_dir
+        }
+
+    def print_stats(self):
+        """Print cache statistics"""
+        stats = self.stats()
+        print(f"🌐 HTTP cache: {stats['not_modified']} not modified, {stats['changed']} changed, "
+              f"{stats['unchanged']} unchanged, {stats['new']} new; {stats['entries']} URLs, "
+              f"{stats['size_bytes'] / (1024 * 1024):.1f} MB on disk")
+
+
+_default_cache: Optional[HTTPCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_http_cache() -> HTTPCache:
+    """Process-wide HTTP cache shared by all downloaders"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+        return _default_cache
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+
+    cache = get_default_http_cache()
+    for entry in cache.entries():
+        checked = datetime.fromtimestamp(entry.validated_at).strftime('%Y-%m-%d %H:%M')
+        changed = datetime.fromtimestamp(entry.changed_at).strftime('%Y-%m-%d %H:%M')
+        print(f"{checked}  changed {changed}  {entry.fetches:3d} x 200  {entry.not_modified:3d} x 304  "
+              f"{entry.size_bytes / 1e6:6.1f} MB  {entry.url}")
+    cache.print_stats()
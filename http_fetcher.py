@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/http_fetcher.py
+
+"""
+HTTP Fetcher
+Shared download layer for the EUR-Lex / EIPPCB corpus refreshes. Requests
+run concurrently in a thread pool over one pooled requests.Session
+(keep-alive connections are reused), while a token bucket per host spaces
+out request starts and a semaphore per host caps the downloads in flight.
+A refresh then takes as long as the politeness limits allow instead of the
+sum of every response time plus a fixed sleep between requests.
+
+Responses are streamed: a handler gets the open response and reads it as it
+arrives (BBT segmentation, writing to disk), nothing is buffered in memory
+unless the default handler is used.
+
+With an HTTPCache (the default fetcher has one) every request is
+conditional on the validators of the previous 200 and a 304 is answered
+from disk, see http_cache.py.
+
+Downloads never leave a truncated file behind: the body is streamed to a
+.part file, resumed with a Range request after an interruption, and renamed
+onto the target only when complete. Size and SHA-256 of the result go into
+the directory's download manifest, see download_manifest.py.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from download_manifest import check_pdf, get_manifest
+from http_cache import BodyRecorder, CacheEntry, HTTPCache, get_default_http_cache
+
+DEFAULT_FETCH_WORKERS = 8
+DEFAULT_PER_HOST_CONCURRENCY = 4
+DEFAULT_HOST_RATE: Tuple[float, int] = (1.0, 2)     # requests per second, burst
+# Per-host (rate, burst); hosts not listed use DEFAULT_HOST_RATE
+HOST_RATES: Dict[str, Tuple[float, int]] = {
+    "eur-lex.europa.eu": (1.0, 2),
+    "eippcb.jrc.ec.europa.eu": (0.5, 2),
+}
+DEFAULT_TIMEOUT = 60
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_ATTEMPTS = 3       # an interrupted download is resumed this many times in one call
+PART_SUFFIX = '.part'
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up"""
+
+    def __init__(self, rate: float, capacity: int = 1, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token now, or reserve the next one; returns the seconds to wait for it"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds waited"""
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one request"""
+    url: str
+    ok: bool
+    status: Optional[int] = None
+    value: Any = None            # what the handler returned (bytes for the default handler)
+    path: Optional[str] = None   # download target
+    bytes: int = 0
+    seconds: float = 0.0
+    waited: float = 0.0          # time spent in the host's rate limit
+    error: Optional[str] = None
+    not_modified: bool = False   # 304: served from the copy on disk
+    changed: Optional[bool] = None   # 200 with a body that differs from the cached one (None: nothing cached)
+    sha256: Optional[str] = None     # of the whole body (downloads, or with a cache)
+
+
+ResponseHandler = Callable[[requests.Response], Any]
+
+
+class Fetcher:
+    """Concurrent GETs with connection reuse and per-host rate and concurrency limits"""
+
+    def __init__(self, workers: int = DEFAULT_FETCH_WORKERS, per_host: int = DEFAULT_PER_HOST_CONCURRENCY,
+                 host_rates: Optional[Dict[str, Tuple[float, int]]] = None,
+                 default_rate: Tuple[float, int] = DEFAULT_HOST_RATE, timeout: float = DEFAULT_TIMEOUT,
+                 session: Optional[requests.Session] = None, cache: Optional[HTTPCache] = None):
+        """
+        Args:
+            workers: requests in flight over all hosts
+            per_host: requests in flight per host
+            host_rates: per-host (requests per second, burst), see HOST_RATES
+            default_rate: (rate, burst) of hosts not in host_rates
+            timeout: connect/read timeout per request
+            session: session to use (its adapters are replaced to pool `workers` connections)
+            cache: HTTP cache for conditional requests; None fetches everything unconditionally
+        """
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.host_rates = {**HOST_RATES, **(host_rates or {})}
+        self.default_rate = default_rate
+        self.timeout = timeout
+        self.cache = cache
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', USER_AGENT)
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_limits(self, url: str) -> Tuple[TokenBucket, threading.Semaphore]:
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.host_rates.get(host, self.default_rate)
+                self._buckets[host] = TokenBucket(rate, burst)
+                self._slots[host] = threading.Semaphore(self.per_host)
+            return self._buckets[host], self._slots[host]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch")
+            return self._executor
+
+    def fetch(self, url: str, handler: Optional[ResponseHandler] = None, target: Optional[str] = None,
+              **request_kwargs) -> FetchResult:
+        """GET url in this thread within the host's limits and hand the streamed response to handler
+
+        With a cache the request is conditional. On a 304 handler gets the body
+        stored on disk, or, for a download (target is the file handler writes),
+        is not called at all because target already holds the body.
+        """
+        bucket, slot = self._host_limits(url)
+        started = time.perf_counter()
+        entry = self.cache.lookup(url, target) if self.cache is not None else None
+        revalidate = entry is not None and entry.body_intact()
+        headers = dict(request_kwargs.pop('headers', None) or {})
+        if revalidate:
+            headers.update(entry.validators())
+        with slot:
+            waited = bucket.acquire()
+            recorder = None
+            try:
+                with self.session.get(url, stream=True, timeout=self.timeout, headers=headers,
+                                      **request_kwargs) as response:
+                    if response.status_code == 304 and revalidate:
+                        self.cache.mark_not_modified(entry, response.headers)
+                        value = target if target else self._replay(entry, handler)
+                        return FetchResult(url, True, 304, value, bytes=entry.size_bytes,
+                                           seconds=time.perf_counter() - started, waited=waited,
+                                           not_modified=True, sha256=entry.sha256)
+                    response.raise_for_status()
+                    if self.cache is not None or target:
+                        # Without validators a stored body could never be revalidated
+                        keep = (self.cache is not None and not target
+                                and ('ETag' in response.headers or 'Last-Modified' in response.headers))
+                        recorder = BodyRecorder(response.raw, self.cache.body_path(url) if keep else None)
+                        if target and response.status_code == 206:
+                            recorder.seed(target + PART_SUFFIX)
+                        response.raw = recorder
+                    value = handler(response) if handler else response.content
+                    changed, sha256 = None, None
+                    if recorder is not None:
+                        recorder.finish()
+                        sha256, size = recorder.sha256.hexdigest(), recorder.size
+                        if self.cache is not None:
+                            changed = self.cache.store(url, target, response.headers, response.status_code,
+                                                       target or recorder.sink_path, sha256, size, entry)
+                    elif isinstance(value, (bytes, str)):
+                        size = len(value)
+                    else:
+                        size = int(response.headers.get('Content-Length') or 0)
+                    return FetchResult(url, True, response.status_code, value, bytes=size,
+                                       seconds=time.perf_counter() - started, waited=waited, changed=changed,
+                                       sha256=sha256)
+            except Exception as e:
+                if recorder is not None:
+                    recorder.discard()
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                return FetchResult(url, False, status, seconds=time.perf_counter() - started, waited=waited,
+                                   error=f"{type(e).__name__}: {e}")
+
+    @staticmethod
+    def _replay(entry: CacheEntry, handler: Optional[ResponseHandler]) -> Any:
+        """Hand the cached body to handler as if it had just been downloaded"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry.url
+        response.headers = CaseInsensitiveDict({'Content-Length': str(entry.size_bytes)})
+        if entry.content_type:
+            response.headers['Content-Type'] = entry.content_type
+        response.encoding = get_encoding_from_headers(response.headers)
+        with open(entry.body_path, 'rb') as f:
+            response.raw = f
+            return handler(response) if handler else response.content
+
+    def submit(self, url: str, handler: Optional[ResponseHandler] = None, **request_kwargs) -> "Future[FetchResult]":
+        """Start fetch() in the pool"""
+        return self._pool().submit(self.fetch, url, handler, **request_kwargs)
+
+    def download(self, url: str, path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> "Future[FetchResult]":
+        """Stream url to path in the pool; FetchResult.path, .bytes and .sha256 describe the file
+
+        The body goes to path + '.part' and replaces path only once it is
+        complete (and, for a .pdf, looks like a whole PDF). A transfer that
+        breaks off is resumed from the .part file with Range/If-Range, here or
+        in a later call. With a cache, an unchanged document (304) leaves the
+        file at path as it is.
+        """
+        part = path + PART_SUFFIX
+        manifest = get_manifest(os.path.dirname(path))
+
+        def write(response: requests.Response) -> str:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if response.status_code == 206:
+                offset, have = _range_start(response), os.path.getsize(part)
+                if offset != have:
+                    os.remove(part)
+                    manifest.clear_partial(path)
+                    raise IOError(f"server resumed at byte {offset:,}, .part file has {have:,}")
+                mode = 'ab'
+            else:
+                mode = 'wb'
+                etag = response.headers.get('ETag')
+                # If-Range needs a strong validator
+                validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified')
+                manifest.start_partial(path, url, validator)
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
+            size = os.path.getsize(part)
+            expected = _expected_size(response)
+            if expected is not None and size != expected:
+                raise IOError(f"incomplete download: {size:,} of {expected:,} bytes")
+            if path.lower().endswith('.pdf'):
+                problem = check_pdf(part)
+                if problem:
+                    os.remove(part)
+                    manifest.clear_partial(path)
+                    raise ValueError(f"not a complete PDF: {problem}")
+            os.replace(part, path)
+            return path
+
+        def run() -> FetchResult:
+            for _ in range(DOWNLOAD_ATTEMPTS):
+                headers = {}
+                resumable = os.path.exists(part) and os.path.getsize(part) > 0
+                validator = manifest.resume_validator(path, url) if resumable else None
+                if validator:
+                    headers = {'Range': f"bytes={os.path.getsize(part)}-", 'If-Range': validator}
+                result = self.fetch(url, write, target=path, headers=headers)
+                if result.ok or not os.path.exists(part):
+                    break
+                if result.status == 416:
+                    # The .part file does not fit the document any more
+                    os.remove(part)
+            if result.ok:
+                result.path, result.value, result.bytes = path, path, os.path.getsize(path)
+                if result.not_modified and os.path.exists(part):
+                    os.remove(part)
+                if not result.not_modified or manifest.get(path) is None:
+                    manifest.record(path, url, result.bytes, result.sha256)
+            return result
+
+        return self._pool().submit(run)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self) -> "Fetcher":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _range_start(response: requests.Response) -> int:
+    """First byte of a 206 response ("Content-Range: bytes 100-199/200")"""
+    content_range = response.headers.get('Content-Range', '')
+    try:
+        return int(content_range.split()[1].split('-')[0])
+    except (IndexError, ValueError):
+        raise IOError(f"unusable Content-Range: {content_range!r}")
+
+
+def _expected_size(response: requests.Response) -> Optional[int]:
+    """Size the file should have after this response, None if the server did not say"""
+    if response.status_code == 206:
+        total = response.headers.get('Content-Range', '').rpartition('/')[2]
+        return int(total) if total.isdigit() else None
+    if 'Content-Encoding' in response.headers or 'Content-Length' not in response.headers:
+        return None     # Content-Length counts the compressed bytes
+    return int(response.headers['Content-Length'])
+
+
+_default_fetcher: Optional[Fetcher] = None
+_default_lock = threading.Lock()
+
+
+def get_default_fetcher() -> Fetcher:
+    """Process-wide fetcher, so every downloader shares the same per-host limits and HTTP cache"""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = Fetcher(cache=get_default_http_cache())
+        return _default_fetcher
@@ -5,17 +5,41 @@ Searches entire BREF documents for BAT content using multiple strategies
 """
 
 import fitz
-import requests
 import json
 import re
 import os
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 
+from download_manifest import verify_download
+from http_fetcher import Fetcher, get_default_fetcher
+from parallel_extraction import extract_page_texts_parallel
+from paged_text import PagedText
+from bat_header_scanner import BATHeaderScanner, dedupe_sliding_window
+from section_index import SectionBoundaryIndex
+from boilerplate_filter import strip_boilerplate
+from text_normalizer import normalize_text
+
+DUPLICATE_WINDOW_CHARS = 500
+
 class ImprovedBREFExtractor:
     """Improved BREF extractor that searches entire documents intelligently"""
     
-    def __init__(self):
+    def __init__(self, extraction_workers: int = 1, fetcher: Optional[Fetcher] = None):
+        # >1 extracts page text in shards across a process pool
+        self.extraction_workers = extraction_workers
+        self.boilerplate_report = None  # set per document by strip_boilerplate
+        # Next section indicators, in priority order; indexed once per document
+        self.section_index = SectionBoundaryIndex([
+            r'\n\s*\d+\.\s*BAT\s+',  # Next numbered BAT
+            r'\n\s*BAT\s+\d+',       # Next BAT reference
+            r'\n\s*\d+\.\s*When\s+', # Next "When" clause
+            r'\n\s*Chapter\s+\d+',   # Next chapter
+            r'\n\s*\d+\.\d+\s+',     # Next numbered section
+            r'\n\s*Annex\s+',        # Annex
+            r'\n\s*References\s*$',  # References
+        ], max_span=15000)
+        
         # BREF documents that failed in previous extraction
         self.failed_brefs = {
             'CER': 'https://eippcb.jrc.ec.europa.eu/sites/default/files/2019-11/cer_bref_0807.pdf',
@@ -45,10 +69,19 @@ class ImprovedBREFExtractor:
             re.compile(r'Best\s+Available\s+Technique\s+(\d+)', re.IGNORECASE),
             re.compile(r'Technique\s+(\d+):\s*BAT', re.IGNORECASE),
         ]
+        self.header_scanner = BATHeaderScanner.from_patterns(self.bat_patterns)
         
         self.downloads_dir = "bref_downloads"
+        self._fetcher = fetcher
         self.results = {}
     
+    @property
+    def fetcher(self) -> Fetcher:
+        """Injected fetcher, else the shared one (created on first network use)"""
+        if self._fetcher is None:
+            self._fetcher = get_default_fetcher()
+        return self._fetcher
+
     def extract_remaining_brefs(self) -> Dict:
         """Extract BATs from previously failed BREFs using improved method"""
         
@@ -66,8 +99,9 @@ class ImprovedBREFExtractor:
                 # Use cached PDF
                 pdf_path = f"{self.downloads_dir}/{doc_code.lower()}_bref.pdf"
                 
-                if not os.path.exists(pdf_path):
-                    print(f"    PDF not found, downloading...")
+                problem = verify_download(pdf_path)
+                if problem:
+                    print(f"    PDF {problem}, downloading...")
                     pdf_path = self.download_pdf(url, doc_code)
                 
                 # Extract using improved comprehensive method
@@ -107,10 +141,10 @@ class ImprovedBREFExtractor:
             print(f"    Document: {len(doc)} pages")
             
             # Strategy 1: Full document text extraction
-            full_text = self.extract_full_document_text(doc)
+            paged = self.extract_full_document_text(doc)
             
             # Strategy 2: Find all potential BAT locations using multiple patterns
-            all_bat_matches = self.find_all_bat_patterns(full_text)
+            all_bat_matches = self.find_all_bat_patterns(paged.text)
             
             print(f"    Found {len(all_bat_matches)} potential BAT matches")
             
@@ -119,7 +153,7 @@ class ImprovedBREFExtractor:
                 return []
             
             # Strategy 3: Extract complete BAT texts
-            bats = self.extract_complete_bats_comprehensive(full_text, all_bat_matches, doc_code, source_url)
+            bats = self.extract_complete_bats_comprehensive(paged, all_bat_matches, doc_code, source_url)
             
             # Strategy 4: Validate and deduplicate
             validated_bats = self.validate_and_deduplicate_bats(bats)
@@ -129,64 +163,31 @@ class ImprovedBREFExtractor:
         finally:
             doc.close()
     
-    def extract_full_document_text(self, doc) -> str:
-        """Extract text from entire document with page markers"""
-        
-        texts = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = page.get_text()
-            
-            # Add page marker
-            page_marker = f"\n[PAGE_{page_num + 1}]\n"
-            texts.append(page_marker)
-            texts.append(page_text)
-        
-        return "".join(texts)
+    def extract_full_document_text(self, doc) -> PagedText:
+        """Extract text from entire document with page offsets"""
+        
+        if self.extraction_workers > 1:
+            paged = PagedText(extract_page_texts_parallel(doc.name, 0, len(doc), self.extraction_workers))
+        else:
+            paged = PagedText.from_doc(doc)
+        
+        # Running headers, footers and page numbers go before the BAT patterns run
+        paged, self.boilerplate_report = strip_boilerplate(paged)
+        print(f"    🧹 {self.boilerplate_report.summary()}")
+        return paged
     
     def find_all_bat_patterns(self, text: str) -> List[Tuple[int, int, str, str]]:
         """Find all BAT matches using multiple patterns"""
         
-        all_matches = []
-        
-        for i, pattern in enumerate(self.bat_patterns):
-            for match in pattern.finditer(text):
-                try:
-                    bat_num = int(match.group(1))
-                    match_info = (
-                        match.start(),
-                        bat_num,
-                        match.group(0),
-                        f'pattern_{i+1}'
-                    )
-                    all_matches.append(match_info)
-                except (ValueError, IndexError):
-                    # Skip invalid matches
-                    continue
-        
-        # Sort by position and remove nearby duplicates
-        all_matches.sort(key=lambda x: x[0])
-        
-        # Remove duplicates (same BAT number within 500 characters)
-        deduplicated = []
-        for match in all_matches:
-            is_duplicate = False
-            for existing in deduplicated:
-                if (match[1] == existing[1] and  # Same BAT number
-                    abs(match[0] - existing[0]) < 500):  # Within 500 chars
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate:
-                deduplicated.append(match)
-        
-        return deduplicated
+        # One pass over the text for all patterns, hits tagged pattern_1..pattern_8;
+        # same BAT number within 500 characters is a duplicate
+        return dedupe_sliding_window(self.header_scanner.scan(text), DUPLICATE_WINDOW_CHARS)
     
-    def extract_complete_bats_comprehensive(self, full_text: str, bat_matches: List[Tuple], 
+    def extract_complete_bats_comprehensive(self, paged: PagedText, bat_matches: List[Tuple], 
                                          doc_code: str, source_url: str) -> List[Dict]:
         """Extract complete BAT texts using comprehensive approach"""
         
+        full_text = paged.text
         bats = []
         
         for i, (start_pos, bat_num, match_text, pattern_type) in enumerate(bat_matches):
@@ -211,7 +212,7 @@ class ImprovedBREFExtractor:
             title = self.extract_intelligent_title(bat_text, bat_num, match_text)
             
             # Find page number
-            page_num = self.find_page_number(full_text, start_pos)
+            page_num = self.find_page_number(paged, start_pos)
             
             # Analyze content
             content_analysis = self.analyze_bat_content(bat_text)
@@ -237,46 +238,11 @@ class ImprovedBREFExtractor:
     
     def find_intelligent_end_position(self, text: str, start_pos: int) -> int:
         """Find intelligent end position for BAT content"""
-        
-        search_text = text[start_pos:]
-        
-        # Look for next section indicators
-        end_patterns = [
-            r'\n\s*\d+\.\s*BAT\s+',  # Next numbered BAT
-            r'\n\s*BAT\s+\d+',       # Next BAT reference
-            r'\n\s*\d+\.\s*When\s+', # Next "When" clause
-            r'\n\s*Chapter\s+\d+',   # Next chapter
-            r'\n\s*\d+\.\d+\s+',     # Next numbered section
-            r'\n\s*Annex\s+',        # Annex
-            r'\n\s*References\s*$',  # References
-        ]
-        
-        for pattern in end_patterns:
-            match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return start_pos + match.start()
-        
-        # Default: reasonable length limit
-        return min(len(text), start_pos + 15000)
+        return self.section_index.end_position(text, start_pos)
     
     def clean_bat_text_comprehensive(self, text: str) -> str:
         """Comprehensive text cleaning"""
-        
-        # Remove page markers
-        text = re.sub(r'\[PAGE_\d+\]', '', text)
-        
-        # Normalize whitespace
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        
-        # Remove standalone page numbers and footers
-        text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^\s*Page\s+\d+\s*$', '', text, flags=re.MULTILINE | re.IGNORECASE)
-        
-        # Remove common PDF artifacts
-        text = re.sub(r'\x0c', '', text)  # Form feed characters
-        
-        return text.strip()
+        return normalize_text(text)
     
     def extract_intelligent_title(self, bat_text: str, bat_num: int, match_text: str) -> str:
         """Extract intelligent title from BAT content"""
@@ -338,27 +304,19 @@ class ImprovedBREFExtractor:
         
         return result
     
-    def find_page_number(self, text: str, position: int) -> int:
+    def find_page_number(self, paged: PagedText, position: int) -> int:
         """Find page number for position"""
         
-        text_before = text[:position]
-        page_matches = list(re.finditer(r'\[PAGE_(\d+)\]', text_before))
-        
-        if page_matches:
-            return int(page_matches[-1].group(1))
-        
-        return 1
+        return paged.page_at(position)
     
     def download_pdf(self, url: str, doc_code: str) -> str:
         """Download PDF if needed"""
         
         pdf_path = f"{self.downloads_dir}/{doc_code.lower()}_bref.pdf"
         
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        
-        with open(pdf_path, 'wb') as f:
-            f.write(response.content)
+        result = self.fetcher.download(url, pdf_path).result()
+        if not result.ok:
+            raise RuntimeError(f"Download of {doc_code} failed: {result.error}")
         
         return pdf_path
     
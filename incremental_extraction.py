@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/incremental_extraction.py
+
+"""
+Incremental Extraction
+Stores a content hash per page next to the BAT records extracted from a
+BREF/BATC. When a corrected version of the same document comes in, pages are
+matched by hash, BATs whose pages are all unchanged are reused (renumbered to
+the new page positions) and only the regions around changed pages are parsed
+again and spliced in between them.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bat_chapter_locator import locate_bat_chapter
+from extraction_cache import DEFAULT_CACHE_DIR, file_sha256
+from page_stream import iter_pages
+
+DEFAULT_MANIFEST_DIR = os.path.join(DEFAULT_CACHE_DIR, "page_manifests")
+MANIFEST_VERSION = 1
+_WHITESPACE = re.compile(r'\s+')
+
+# (pdf_path, start_page, end_page) -> records, pages 0-indexed with end exclusive
+RecordStream = Callable[[str, int, int], Iterable[Dict[str, Any]]]
+
+
+def page_hash(text: str) -> str:
+    """Hash of a page's text with whitespace collapsed, so re-typesetting alone is no change"""
+    normalized = _WHITESPACE.sub(' ', text).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def compute_page_hashes(pdf_path: str) -> List[str]:
+    """Content hash of every page, in page order"""
+    return [page_hash(record.text) for record in iter_pages(pdf_path)]
+
+
+def map_unchanged_pages(old_hashes: List[str], new_hashes: List[str]) -> Dict[int, int]:
+    """Old page -> new page (1-based) for pages whose content did not change
+
+    Uses an order-preserving diff, so inserted or removed pages shift the
+    mapping instead of breaking it.
+    """
+    matcher = difflib.SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+    page_map = {}
+    for old_start, new_start, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            page_map[old_start + offset + 1] = new_start + offset + 1
+    return page_map
+
+
+def _map_page_floor(page: int, page_map: Dict[int, int]) -> int:
+    """New position of an old page, estimated from the nearest unchanged page before it"""
+    for candidate in range(page, 0, -1):
+        if candidate in page_map:
+            return page_map[candidate] + (page - candidate)
+    return page
+
+
+class PageManifestStore:
+    """One JSON manifest per document lineage (e.g. 'pol_bref'), overwritten per version"""
+
+    def __init__(self, manifest_dir: str = DEFAULT_MANIFEST_DIR):
+        self.manifest_dir = manifest_dir
+        os.makedirs(manifest_dir, exist_ok=True)
+
+    def _path(self, doc_key: str) -> str:
+        return os.path.join(self.manifest_dir, f"{doc_key.replace(os.sep, '-')}.json")
+
+    def load(self, doc_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(doc_key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, doc_key: str, manifest: Dict[str, Any]):
+        path = self._path(doc_key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class IncrementalBATExtractor:
+    """Re-extracts only the changed regions of a revised BREF/BATC"""
+
+    def __init__(self, stream_records: Optional[RecordStream] = None, extractor_name: Optional[str] = None,
+                 number_key: str = 'bat_number', store: Optional[PageManifestStore] = None):
+        """
+        Args:
+            stream_records: callable yielding BAT records with a 1-based 'page';
+                defaults to SequentialBATExtractor.stream_bats
+            extractor_name: stored in the manifest; a different name forces a full run
+            number_key: record field holding the BAT/BBT number
+            store: manifest store, defaults to extraction_cache/page_manifests
+        """
+        if stream_records is None:
+            from sequential_bat_extractor import SequentialBATExtractor
+            stream_records = SequentialBATExtractor().stream_bats
+            extractor_name = extractor_name or "SequentialBATExtractor"
+        self.stream_records = stream_records
+        self.extractor_name = extractor_name or getattr(stream_records, '__qualname__', 'custom')
+        self.number_key = number_key
+        self.store = store or PageManifestStore()
+
+    def extract(self, pdf_path: str, doc_key: Optional[str] = None) -> Dict[str, Any]:
+        """Extract BAT records, reusing the previous version's records where pages are unchanged
+
+        Returns:
+            {"records": [...], "page_hashes": [...], "stats": {...}}
+        """
+        started = time.perf_counter()
+        doc_key = doc_key or os.path.splitext(os.path.basename(pdf_path))[0]
+        sha256 = file_sha256(pdf_path)
+        manifest = self.store.load(doc_key)
+
+        if self._manifest_usable(manifest) and manifest["file_sha256"] == sha256:
+            print(f"♻️ {doc_key}: unchanged, reusing {len(manifest['records'])} records")
+            return self._result(manifest, "unchanged", 0, len(manifest["records"]), 0, started)
+
+        page_hashes = compute_page_hashes(pdf_path)
+
+        if not self._manifest_usable(manifest):
+            scan_range = self._locate_scan_range(pdf_path, len(page_hashes))
+            records = list(self.stream_records(pdf_path, scan_range[0], scan_range[1]))
+            manifest = self._save(doc_key, sha256, page_hashes, scan_range, records)
+            print(f"📄 {doc_key}: full extraction, {len(records)} records")
+            return self._result(manifest, "full", scan_range[1] - scan_range[0], 0, len(records), started)
+
+        records, scan_range, pages_parsed, reused = self._splice(pdf_path, manifest, page_hashes)
+        manifest = self._save(doc_key, sha256, page_hashes, scan_range, records)
+        print(f"🧩 {doc_key}: {pages_parsed} pages re-parsed, {reused}/{len(records)} records reused")
+        return self._result(manifest, "incremental", pages_parsed, reused, len(records) - reused, started)
+
+    def _manifest_usable(self, manifest: Optional[Dict[str, Any]]) -> bool:
+        return bool(manifest) and manifest.get("version") == MANIFEST_VERSION \
+            and manifest.get("extractor") == self.extractor_name
+
+    @staticmethod
+    def _locate_scan_range(pdf_path: str, page_count: int) -> Tuple[int, int]:
+        """0-indexed [start, end) page range holding the BAT conclusions"""
+        span = locate_bat_chapter(pdf_path)
+        if span is not None:
+            return span.start_page, span.end_page
+        return 0, page_count
+
+    def _save(self, doc_key: str, sha256: str, page_hashes: List[str], scan_range: Tuple[int, int],
+              records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "doc_key": doc_key,
+            "extractor": self.extractor_name,
+            "file_sha256": sha256,
+            "scan_range": list(scan_range),
+            "page_hashes": page_hashes,
+            "records": records
+        }
+        self.store.save(doc_key, manifest)
+        return manifest
+
+    @staticmethod
+    def _result(manifest: Dict[str, Any], mode: str, pages_parsed: int, reused: int, parsed: int,
+                started: float) -> Dict[str, Any]:
+        return {
+            "records": manifest["records"],
+            "page_hashes": manifest["page_hashes"],
+            "stats": {
+                "mode": mode,
+                "pages_parsed": pages_parsed,
+                "records_reused": reused,
+                "records_parsed": parsed,
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+        }
+
+    def _splice(self, pdf_path: str, manifest: Dict[str, Any],
+                new_hashes: List[str]) -> Tuple[List[Dict[str, Any]], Tuple[int, int], int, int]:
+        """Reuse records on unchanged pages and re-parse the gaps between them"""
+        old_hashes = manifest["page_hashes"]
+        page_map = map_unchanged_pages(old_hashes, new_hashes)
+        old_start, old_end = manifest["scan_range"]
+        # 1-based first/last page of the BAT chapter in the new version
+        new_first = max(1, min(len(new_hashes), _map_page_floor(old_start + 1, page_map)))
+        new_last = max(new_first, min(len(new_hashes), _map_page_floor(old_end, page_map)))
+
+        old_records = sorted(manifest["records"], key=lambda record: record["page"])
+
+        # A record can be reused if every page it touches (its own start page up to
+        # the next record's start page) is unchanged and still consecutive
+        reusable = []  # (old index, new first page, new last page, record)
+        for index, record in enumerate(old_records):
+            first = record["page"]
+            last = old_records[index + 1]["page"] if index + 1 < len(old_records) else old_end
+            last = max(first, last)
+            if all(page in page_map for page in range(first, last + 1)) \
+                    and page_map[last] - page_map[first] == last - first:
+                reusable.append((index, page_map[first], page_map[last], {**record, "page": page_map[first]}))
+
+        unchanged = set(page_map.values())
+        changed = [page for page in range(new_first, new_last + 1) if page not in unchanged]
+
+        # Gaps between consecutive reusable records (and the chapter edges) are
+        # parsed again when a record was dropped there or a page in them changed.
+        # Records are assembled in document order: gap records, then the next reused one.
+        records = []
+        pages_parsed = 0
+        bounds = [None] + reusable + [None]
+        for before, after in zip(bounds, bounds[1:]):
+            window_first = before[2] if before else new_first
+            window_last = after[1] if after else new_last
+            expected_index = before[0] + 1 if before else 0
+            dropped = (after[0] if after else len(old_records)) != expected_index
+            touched = any(window_first < page < window_last for page in changed) \
+                or (before is None and window_first in changed) or (after is None and window_last in changed)
+
+            if (dropped or touched) and window_first <= window_last:
+                pages_parsed += window_last - window_first + 1
+                parsed = list(self.stream_records(pdf_path, window_first - 1, window_last))
+                records.extend(self._between(parsed, before, after))
+            if after is not None:
+                records.append(after[3])
+
+        scan_range = (new_first - 1, new_last)
+        return records, scan_range, pages_parsed, len(reusable)
+
+    def _between(self, parsed: List[Dict[str, Any]], before: Optional[Tuple], after: Optional[Tuple]) -> List[Dict[str, Any]]:
+        """Window records strictly between the reused records bounding the window
+
+        The window starts and ends on pages shared with those records, so the
+        scanner also returns them (and their neighbours on the same page).
+        """
+        def position(bound: Tuple) -> Optional[int]:
+            key = (bound[3][self.number_key], bound[1])
+            for index, record in enumerate(parsed):
+                if (record.get(self.number_key), record.get("page")) == key:
+                    return index
+            return None
+
+        first, last = 0, len(parsed)
+        if before is not None:
+            index = position(before)
+            first = index + 1 if index is not None else first
+        if after is not None:
+            index = position(after)
+            last = index if index is not None else last
+        return parsed[first:last]
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "bref_downloads/pol_bref.pdf"
+    if not os.path.exists(pdf_path):
+        print(f"❌ Test file not found: {pdf_path}")
+        sys.exit(1)
+
+    extraction = IncrementalBATExtractor().extract(pdf_path)
+    stats = extraction["stats"]
+    print(f"  📊 Mode: {stats['mode']}")
+    print(f"  📄 Pages parsed: {stats['pages_parsed']} of {len(extraction['page_hashes'])}")
+    print(f"  ♻️ Records reused: {stats['records_reused']}, parsed: {stats['records_parsed']}")
+    print(f"  ⏱️ {stats['seconds']}s")
@@ -14,6 +14,8 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 
+from text_normalizer import normalize_text
+
 class ManageableTextsGenerator:
     """Creates manageable PDFs for BAT/BBT verification"""
     
@@ -293,7 +295,8 @@ class ManageableTextsGenerator:
         if not text:
             return "No text available"
         
-        text = str(text)
+        # Same whitespace, hyphenation and page-marker cleanup as the extractors, then escape
+        text = normalize_text(str(text))
         text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
         text = text.replace('\n', '<br/>')
         
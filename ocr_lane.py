@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/ocr_lane.py
+
+"""
+OCR Lane
+Image-only pages (scanned besluiten, aanvraag annexes) are detected up front
+and OCR'd in batches by a separate process pool using the locally installed
+Tesseract (through PyMuPDF). Results are cached per page content hash and
+merged back into the page stream; text pages never wait for OCR work.
+"""
+
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import fitz
+
+from extraction_cache import get_default_cache
+
+OCR_EXTRACTOR_NAME = "ocr_page"
+OCR_VERSION = "1"
+DEFAULT_OCR_LANGUAGE = "nld+eng"
+DEFAULT_OCR_DPI = 300
+DEFAULT_OCR_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # leave a core for the text pages
+OCR_BATCH_PAGES = 8       # pages per worker task; amortises opening the PDF in the worker
+MIN_TEXT_CHARS = 40       # same threshold as the tiered extractor's image_only tier
+
+_tesseract_checked = None
+
+
+def ocr_available() -> bool:
+    """True if PyMuPDF can find a local Tesseract installation (tessdata)"""
+    global _tesseract_checked
+    if _tesseract_checked is None:
+        try:
+            _tesseract_checked = bool(fitz.get_tessdata())
+        except Exception:
+            _tesseract_checked = False
+    return _tesseract_checked
+
+
+def is_image_only(page, text: Optional[str] = None) -> bool:
+    """Page with (almost) no text layer but at least one raster image"""
+    if text is None:
+        text = page.get_text()
+    return len(text.strip()) < MIN_TEXT_CHARS and bool(page.get_images())
+
+
+def image_page_hash(doc, page) -> str:
+    """Content hash of an image-only page: its raw image streams plus geometry"""
+    digest = hashlib.sha256(f"{page.rect}|{page.rotation}".encode())
+    for img in page.get_images():
+        try:
+            digest.update(doc.xref_stream_raw(img[0]) or b"")
+        except Exception:
+            digest.update(str(img).encode())
+    return digest.hexdigest()
+
+
+def _ocr_batch_worker(args: Tuple[str, List[int], str, int]) -> List[Tuple[int, str, Optional[str]]]:
+    """OCR a batch of pages (runs in a worker process); returns (page_number, text, error)"""
+    pdf_path, page_numbers, language, dpi = args
+    results = []
+    with fitz.open(pdf_path) as doc:
+        for page_number in page_numbers:
+            try:
+                page = doc[page_number - 1]
+                textpage = page.get_textpage_ocr(language=language, dpi=dpi, full=True)
+                results.append((page_number, page.get_text(textpage=textpage), None))
+            except Exception as e:
+                results.append((page_number, "", str(e)))
+    return results
+
+
+class OCRJob:
+    """OCR work for the image-only pages of one PDF, running in the background"""
+
+    def __init__(self, lane: "OCRLane", pdf_path: str, page_hashes: Dict[int, str]):
+        self.lane = lane
+        self.pdf_path = pdf_path
+        self.page_hashes = page_hashes
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self._futures: Dict[Future, List[int]] = {}
+        self._executor = None
+        self.cache_hits = 0
+
+        pending = []
+        for page_number, page_hash in sorted(page_hashes.items()):
+            cached = lane._cache_get(pdf_path, page_hash)
+            if cached is not None:
+                self.results[page_number] = {**cached, "source": "ocr_cache"}
+                self.cache_hits += 1
+            else:
+                pending.append(page_number)
+
+        if pending:
+            batches = [pending[i:i + lane.batch_pages] for i in range(0, len(pending), lane.batch_pages)]
+            self._executor = ProcessPoolExecutor(max_workers=min(lane.workers, len(batches)))
+            for batch in batches:
+                future = self._executor.submit(_ocr_batch_worker, (pdf_path, batch, lane.language, lane.dpi))
+                self._futures[future] = batch
+
+    def _store(self, batch_results: List[Tuple[int, str, Optional[str]]]):
+        for page_number, text, error in batch_results:
+            entry = {"text": text, "source": "ocr"}
+            if error:
+                entry["error"] = error
+            else:
+                self.lane._cache_put(self.pdf_path, self.page_hashes[page_number], {"text": text})
+            self.results[page_number] = entry
+
+    def _collect(self, future: Future):
+        batch = self._futures.pop(future)
+        try:
+            self._store(future.result())
+        except Exception as e:
+            # Worker crashed: report every page of the batch as failed
+            self._store([(page_number, "", str(e)) for page_number in batch])
+        if not self._futures:
+            self.close()
+
+    def result(self, page_number: int) -> Dict[str, Any]:
+        """OCR result for one page, waiting only for the batch that holds it"""
+        if page_number not in self.results:
+            for future, batch in list(self._futures.items()):
+                if page_number in batch:
+                    self._collect(future)
+                    break
+        return self.results.get(page_number, {"text": "", "source": "ocr", "error": "page was not submitted"})
+
+    def as_completed(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(page_number, result) pairs: cache hits first, then batches as they finish"""
+        done = set()
+        for page_number in sorted(self.results):
+            done.add(page_number)
+            yield page_number, self.results[page_number]
+        for future in as_completed(list(self._futures)):
+            batch = self._futures[future]
+            self._collect(future)
+            for page_number in batch:
+                if page_number not in done:
+                    done.add(page_number)
+                    yield page_number, self.results[page_number]
+
+    def wait(self) -> Dict[int, Dict[str, Any]]:
+        """All results, page_number -> {"text", "source"[, "error"]}"""
+        for _ in self.as_completed():
+            pass
+        return self.results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+class OCRLane:
+    """Batched, cached OCR of image-only pages in a separate worker pool"""
+
+    def __init__(self, workers: int = DEFAULT_OCR_WORKERS, batch_pages: int = OCR_BATCH_PAGES,
+                 language: str = DEFAULT_OCR_LANGUAGE, dpi: int = DEFAULT_OCR_DPI, use_cache: bool = True):
+        self.workers = max(1, workers)
+        self.batch_pages = max(1, batch_pages)
+        self.language = language
+        self.dpi = dpi
+        self.use_cache = use_cache
+
+    @property
+    def cache_version(self) -> str:
+        return f"{OCR_VERSION}-{self.language}-{self.dpi}"
+
+    def _cache_get(self, pdf_path: str, page_hash: str) -> Optional[Dict[str, Any]]:
+        if not self.use_cache:
+            return None
+        try:
+            return get_default_cache().get(pdf_path, OCR_EXTRACTOR_NAME, self.cache_version, sha256=page_hash)
+        except OSError:
+            return None
+
+    def _cache_put(self, pdf_path: str, page_hash: str, payload: Dict[str, Any]):
+        if not self.use_cache:
+            return
+        try:
+            get_default_cache().put(pdf_path, OCR_EXTRACTOR_NAME, self.cache_version, payload, sha256=page_hash)
+        except OSError as cache_e:
+            print(f"⚠️ Could not cache OCR result: {cache_e}")
+
+    def submit(self, pdf_path: str, page_hashes: Dict[int, str]) -> OCRJob:
+        """Start OCR of the given pages (1-based page number -> page hash) in the background"""
+        return OCRJob(self, pdf_path, page_hashes)
+
+    def iter_pages(self, pdf_path: str, ordered: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield {"page_number", "text", "tier"} for every page
+
+        Image-only pages are queued for OCR before the first page is yielded.
+        With ordered=False all text pages come out immediately and OCR pages
+        follow as their batches finish; ordered=True keeps document order.
+        """
+        text_pages = []
+        image_pages = {}
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                text = page.get_text()
+                if is_image_only(page, text):
+                    image_pages[page.number + 1] = image_page_hash(doc, page)
+                else:
+                    text_pages.append({"page_number": page.number + 1, "text": text, "tier": "text"})
+
+        if image_pages and not ocr_available():
+            print("⚠️ Tesseract not found, image-only pages are left without text")
+            image_pages = {}
+
+        job = self.submit(pdf_path, image_pages)
+        try:
+            if ordered:
+                by_number = {page["page_number"]: page for page in text_pages}
+                for page_number in sorted(set(by_number) | set(image_pages)):
+                    if page_number in by_number:
+                        yield by_number[page_number]
+                    else:
+                        yield self._ocr_page(page_number, job.result(page_number))
+            else:
+                yield from text_pages
+                for page_number, ocr_result in job.as_completed():
+                    yield self._ocr_page(page_number, ocr_result)
+        finally:
+            job.close()
+
+    @staticmethod
+    def _ocr_page(page_number: int, ocr_result: Dict[str, Any]) -> Dict[str, Any]:
+        page = {"page_number": page_number, "text": ocr_result.get("text", ""), "tier": ocr_result["source"]}
+        if ocr_result.get("error"):
+            page["tier"] = "ocr_failed"
+            page["error"] = ocr_result["error"]
+        return page
+
+    def extract(self, pdf_path: str) -> Dict[str, Any]:
+        """Same shape as pdf_processor.extract_text_and_metadata, plus ocr_stats"""
+        started = time.perf_counter()
+        try:
+            pages = sorted(self.iter_pages(pdf_path), key=lambda page: page["page_number"])
+            with fitz.open(pdf_path) as doc:
+                title = (doc.metadata or {}).get("title") or None
+        except Exception as e:
+            return {"error": f"Could not open PDF: {e}", "title": None, "full_text": None, "pages": []}
+
+        tiers = {}
+        for page in pages:
+            tiers[page["tier"]] = tiers.get(page["tier"], 0) + 1
+        return {
+            "title": title,
+            "full_text": "\n\n".join(page["text"] for page in pages if page["text"]),
+            "pages": pages,
+            "ocr_stats": {
+                "pages_per_tier": tiers,
+                "total_seconds": round(time.perf_counter() - started, 3)
+            }
+        }
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "regulatory_data/bat_conclusions/LCP_BBT_conclusies_NL.pdf"
+    if not os.path.exists(pdf_path):
+        print(f"❌ Test file not found: {pdf_path}")
+        sys.exit(1)
+
+    print(f"🔍 OCR lane: {pdf_path} (Tesseract {'available' if ocr_available() else 'not found'})")
+    extraction = OCRLane().extract(pdf_path)
+    stats = extraction.get("ocr_stats", {})
+    print(f"  📄 Pages: {len(extraction.get('pages', []))}")
+    print(f"  🗂️ Tiers: {stats.get('pages_per_tier')}")
+    print(f"  ⏱️ {stats.get('total_seconds')}s")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/page_stream.py
+
+"""
+Page Stream
+Lazy, generator-based page iteration over PDFs plus a streaming BAT/BBT
+scanner that carries state across page boundaries. Consumers only ever hold
+the current page and the BAT being assembled, and can stop as soon as the
+BAT-conclusions chapter ends.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+import fitz
+
+from bat_header_scanner import BATHeaderScanner
+from boilerplate_filter import BoilerplateFilter, BoilerplateReport
+
+DEFAULT_MAX_BAT_CHARS = 50000  # same cap the batch extractors use for the last BAT
+BOILERPLATE_SAMPLE_PAGES = 40  # pages the boilerplate filter is fitted on before streaming
+
+
+def compile_line_patterns(patterns: List[str], flags: int = re.IGNORECASE) -> List[Pattern]:
+    """Compile end-of-chapter patterns so they only match at the start of a line"""
+    return [re.compile(pattern, flags | re.MULTILINE) for pattern in patterns]
+
+
+# Headings that follow the BAT chapter. Line-anchored and whole-line on purpose:
+# BREF pages carry running "Chapter N" headers, so chapter numbers are not used.
+BAT_CHAPTER_END_PATTERNS = compile_line_patterns([
+    r'^\s*\d+\s+EMERGING\s+TECHNIQUES\b',
+    r'^\s*\d+\s+CONCLUDING\s+REMARKS\b',
+    r'^\s*Annex\s+[A-Z]\s*$',
+    r'^\s*References\s*$',
+    r'^\s*Glossary\s*$',
+    r'^\s*Bibliography\s*$',
+])
+BBT_CHAPTER_END_PATTERNS = compile_line_patterns([
+    r'^\s*BIJLAGE\s+[IVX]+\s*$',
+    r'^\s*Referenties\s*$',
+    r'^\s*Glossarium\s*$',
+    r'^\s*Bibliografie\s*$',
+])
+
+
+@dataclass
+class PageRecord:
+    """One PDF page as yielded by iter_pages"""
+    number: int                  # 1-based page number
+    text: str
+    blocks: Optional[List[Tuple[float, float, float, float, str]]] = None
+
+
+def iter_pages(pdf_path: str, start: int = 0, end: Optional[int] = None,
+               with_blocks: bool = False) -> Iterator[PageRecord]:
+    """Yield pages start..end-1 (0-indexed) lazily; the PDF is closed when the generator is"""
+    doc = fitz.open(pdf_path)
+    try:
+        end = len(doc) if end is None else min(end, len(doc))
+        for page_num in range(max(0, start), end):
+            page = doc[page_num]
+            blocks = None
+            if with_blocks:
+                blocks = [(b[0], b[1], b[2], b[3], b[4]) for b in page.get_text("blocks")]
+            yield PageRecord(number=page_num + 1, text=page.get_text(), blocks=blocks)
+    finally:
+        doc.close()
+
+
+def iter_pages_without_boilerplate(pdf_path: str, ranges: List[Tuple[int, int]],
+                                  report: Optional[BoilerplateReport] = None,
+                                  sample_pages: int = BOILERPLATE_SAMPLE_PAGES) -> Iterator[PageRecord]:
+    """iter_pages over (start, end) ranges with running headers, footers and page numbers removed
+
+    The filter is fitted on up to sample_pages pages spread over the ranges, so
+    only those are read twice; report (if given) is filled as the pages stream by.
+    """
+    page_nums = [page_num for start, end in ranges for page_num in range(max(0, start), end)]
+    doc = fitz.open(pdf_path)
+    try:
+        page_nums = [page_num for page_num in page_nums if page_num < len(doc)]
+        sample = page_nums[::max(1, len(page_nums) // sample_pages)][:sample_pages]
+        boilerplate_filter = BoilerplateFilter().fit([(page_num + 1, doc[page_num].get_text()) for page_num in sample])
+    finally:
+        doc.close()
+
+    if report is not None:
+        report.fingerprints = boilerplate_filter.learned()
+    for start, end in ranges:
+        for record in iter_pages(pdf_path, start, end):
+            text, removed = boilerplate_filter.clean_page(record.number, record.text)
+            if report is not None:
+                report.pages += 1
+                report.chars_before += len(record.text)
+                report.chars_after += len(text)
+                report.lines_removed += removed
+            record.text = text
+            yield record
+
+
+@dataclass
+class _OpenEntry:
+    number: int
+    page: int
+    header: str
+    parts: List[str] = field(default_factory=list)
+    pages: List[int] = field(default_factory=list)
+    length: int = 0
+
+
+class StreamingBATScanner:
+    """Detects numbered BAT/BBT headers page by page and yields each entry once it is complete"""
+
+    def __init__(self, header_patterns: List[Pattern], end_patterns: Optional[List[Pattern]] = None,
+                 max_chars: int = DEFAULT_MAX_BAT_CHARS, stop_at_end: bool = True,
+                 unique_numbers: bool = False, keep_all_patterns: int = 0):
+        """
+        Args:
+            header_patterns: compiled patterns whose group(1) is the BAT/BBT number
+            end_patterns: compiled patterns marking the end of the BAT-conclusions chapter;
+                only honoured once at least one entry has been found
+            max_chars: cap on the text collected for a single entry
+            stop_at_end: stop reading pages once an end pattern is hit
+            unique_numbers: treat a number seen before as content (cross-reference,
+                running header) instead of starting a new entry
+            keep_all_patterns: with unique_numbers, the first this many header patterns
+                still start an entry for a number seen before (the batch extractors'
+                KEEP_ALL primary pattern next to NEW_NUMBER secondary ones)
+        """
+        self.header_patterns = header_patterns
+        self._header_scanner = BATHeaderScanner([(str(index), pattern) for index, pattern in enumerate(header_patterns)])
+        self.end_patterns = end_patterns or []
+        self.max_chars = max_chars
+        self.stop_at_end = stop_at_end
+        self.unique_numbers = unique_numbers
+        self.keep_all_patterns = keep_all_patterns
+        self.pages_read = 0
+        self.stopped_at_page = None
+
+    def _find_headers(self, text: str) -> List[Tuple[int, int, str, int]]:
+        """Header hits on one page as (position, number, text, pattern index), one per position"""
+        # Earlier patterns take precedence at the same position
+        return [(hit.position, hit.number, hit.text, int(hit.rule))
+                for hit in self._header_scanner.first_per_position(text)]
+
+    def _find_end(self, text: str, start: int = 0) -> Optional[int]:
+        positions = []
+        for pattern in self.end_patterns:
+            match = pattern.search(text, start)
+            if match:
+                positions.append(match.start())
+        return min(positions) if positions else None
+
+    def _append(self, entry: _OpenEntry, text: str, page_number: int):
+        if entry.length >= self.max_chars or not text:
+            return
+        text = text[:self.max_chars - entry.length]
+        entry.parts.append(text)
+        entry.length += len(text)
+        if page_number not in entry.pages:
+            entry.pages.append(page_number)
+
+    @staticmethod
+    def _finish(entry: _OpenEntry) -> Dict:
+        return {
+            'number': entry.number,
+            'page': entry.page,
+            'pages': entry.pages,
+            'header': entry.header,
+            'text': "".join(entry.parts)
+        }
+
+    def scan(self, pages: Iterable[PageRecord]) -> Iterator[Dict]:
+        """Yield raw entries ({number, page, pages, header, text}) in document order"""
+        current = None
+        seen = set()
+
+        for record in pages:
+            self.pages_read += 1
+            text = record.text
+            cursor = 0
+
+            for position, number, header, pattern_index in self._find_headers(text):
+                if self.unique_numbers and number in seen and pattern_index >= self.keep_all_patterns:
+                    # Repeated number (cross-reference, running header): keep as content
+                    continue
+                if seen:
+                    end_pos = self._find_end(text, cursor)
+                    if end_pos is not None and end_pos < position:
+                        break
+                if current is not None:
+                    self._append(current, text[cursor:position], record.number)
+                    yield self._finish(current)
+                current = _OpenEntry(number=number, page=record.number, header=header)
+                cursor = position
+                seen.add(number)
+
+            end_pos = self._find_end(text, cursor) if seen else None
+            if end_pos is not None:
+                if current is not None:
+                    self._append(current, text[cursor:end_pos], record.number)
+                    yield self._finish(current)
+                    current = None
+                if self.stop_at_end:
+                    self.stopped_at_page = record.number
+                    return
+                continue
+
+            if current is not None:
+                self._append(current, text[cursor:], record.number)
+
+        if current is not None:
+            yield self._finish(current)
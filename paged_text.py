@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/paged_text.py
+
+"""
+Paged Text
+Page texts stored once plus a sorted array of page start offsets, so the
+extractors can search one marker-free string and map any offset back to its
+page with a binary search instead of embedding and rescanning [PAGE_n] markers.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+
+PAGE_SEPARATOR = "\n"  # keeps line-anchored (^...) patterns working across page boundaries
+_NON_SPACE = re.compile(r'\S')
+
+
+class PagedText:
+    """Concatenated page texts with O(log n) offset-to-page lookups"""
+
+    def __init__(self, pages: Iterable[Tuple[int, str]], separator: str = PAGE_SEPARATOR):
+        """
+        Args:
+            pages: (page_number, text) pairs in document order, page numbers 1-based
+            separator: inserted between pages in the concatenated text
+        """
+        self.page_numbers: List[int] = []
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self._index = {}
+
+        parts = []
+        offset = 0
+        for page_number, page_text in pages:
+            if parts:
+                parts.append(separator)
+                offset += len(separator)
+            self._index[page_number] = len(self.page_numbers)
+            self.page_numbers.append(page_number)
+            self.starts.append(offset)
+            parts.append(page_text)
+            offset += len(page_text)
+            self.ends.append(offset)
+
+        self.text = "".join(parts)
+
+    @classmethod
+    def from_doc(cls, doc, start_page: int = 0, end_page: Optional[int] = None) -> "PagedText":
+        """Build from an open fitz document, pages start_page..end_page-1 (0-indexed)"""
+        end_page = len(doc) if end_page is None else min(end_page, len(doc))
+        return cls((page_num + 1, doc[page_num].get_text()) for page_num in range(max(0, start_page), end_page))
+
+    @classmethod
+    def from_page_list(cls, doc, page_list: List[int]) -> "PagedText":
+        """Build from an open fitz document and an explicit list of 0-indexed pages"""
+        return cls((page_num + 1, doc[page_num].get_text()) for page_num in page_list if page_num < len(doc))
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __str__(self) -> str:
+        return self.text
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_numbers)
+
+    def page_at(self, offset: int) -> int:
+        """Page number of the first non-blank character at or after offset.
+
+        Patterns like ^\\s*BAT can start on the blank tail of the previous
+        page; skipping that whitespace reports the page the match is printed on.
+        """
+        if not self.page_numbers:
+            return 1
+        match = _NON_SPACE.search(self.text, offset)
+        if match:
+            offset = match.start()
+        index = bisect_right(self.starts, offset) - 1
+        return self.page_numbers[max(0, index)]
+
+    def pages_between(self, start: int, end: int) -> List[int]:
+        """Page numbers overlapped by text[start:end]"""
+        if not self.page_numbers or end <= start:
+            return []
+        first = max(0, bisect_right(self.starts, start) - 1)
+        last = max(first, bisect_right(self.starts, end - 1) - 1)
+        return self.page_numbers[first:last + 1]
+
+    def page_span(self, page_number: int) -> Tuple[int, int]:
+        """(start, end) offsets of a page in the concatenated text"""
+        index = self._index[page_number]
+        return self.starts[index], self.ends[index]
+
+    def page_text(self, page_number: int) -> str:
+        """Text of a single page (a slice of the shared text, not a stored copy)"""
+        start, end = self.page_span(page_number)
+        return self.text[start:end]
+
+    def iter_pages(self) -> Iterable[Tuple[int, str]]:
+        """(page_number, text) pairs in document order"""
+        for page_number in self.page_numbers:
+            yield page_number, self.page_text(page_number)
+
+    def marked_text(self) -> str:
+        """Legacy "\\n[PAGE_n]\\n" + text rendering for output that still expects markers"""
+        return "".join(f"\n[PAGE_{page_number}]\n{text}" for page_number, text in self.iter_pages())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/parallel_extraction.py
+
+"""
+Parallel (page-sharded) PDF extraction
+Splits large BREF documents into page ranges, extracts them in a process pool
+and merges the results back in page order with the usual [PAGE_n] markers.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+MIN_SHARD_PAGES = 16          # fitz shards smaller than this cost more in IPC than they save
+SHARDS_PER_WORKER = 4         # several shards per worker keeps the pool balanced
+DOCLING_MIN_SHARD_PAGES = 32  # Docling shards carry model start-up cost per worker
+SHARDED_MIN_PAGES = 64        # below this, serial extraction is faster
+
+
+def get_page_count(pdf_path: str) -> int:
+    """Page count using PyMuPDF"""
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def split_page_ranges(start_page: int, end_page: int, workers: int,
+                      min_shard_pages: int = MIN_SHARD_PAGES,
+                      shards_per_worker: int = SHARDS_PER_WORKER) -> List[Tuple[int, int]]:
+    """Split [start_page, end_page) (0-indexed) into contiguous shards"""
+    total = max(0, end_page - start_page)
+    if total == 0:
+        return []
+
+    target_shards = max(1, workers * shards_per_worker)
+    shard_size = max(min_shard_pages, -(-total // target_shards))
+
+    ranges = []
+    for shard_start in range(start_page, end_page, shard_size):
+        ranges.append((shard_start, min(shard_start + shard_size, end_page)))
+    return ranges
+
+
+def _fitz_shard_worker(args: Tuple[str, int, int]) -> List[Tuple[int, str]]:
+    """Extract (page_number, text) pairs for one shard (runs in a worker process)"""
+    import fitz
+    pdf_path, start_page, end_page = args
+    pages = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(start_page, min(end_page, len(doc))):
+            pages.append((page_num + 1, doc[page_num].get_text()))
+    return pages
+
+
+def extract_page_texts_parallel(pdf_path: str, start_page: int = 0, end_page: Optional[int] = None,
+                                workers: int = DEFAULT_WORKERS) -> List[Tuple[int, str]]:
+    """Plain-text extraction of a page range as ordered (page_number, text) pairs"""
+    total_pages = get_page_count(pdf_path)
+    end_page = total_pages if end_page is None else min(end_page, total_pages)
+
+    shards = split_page_ranges(start_page, end_page, workers)
+    if workers <= 1 or len(shards) <= 1:
+        return _fitz_shard_worker((pdf_path, start_page, end_page))
+
+    pages = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+        # map() preserves shard order, so pages come back in document order
+        for shard_pages in executor.map(_fitz_shard_worker, [(pdf_path, s, e) for s, e in shards]):
+            pages.extend(shard_pages)
+    return pages
+
+
+def extract_text_with_markers_parallel(pdf_path: str, start_page: int = 0, end_page: Optional[int] = None,
+                                       workers: int = DEFAULT_WORKERS) -> str:
+    """Same output as the serial fitz loops: "\\n[PAGE_n]\\n" followed by the page text"""
+    texts = []
+    for page_number, page_text in extract_page_texts_parallel(pdf_path, start_page, end_page, workers):
+        texts.append(f"\n[PAGE_{page_number}]\n")
+        texts.append(page_text)
+    return "".join(texts)
+
+
+def to_document_page_numbers(pages: List[Dict], first_page: int) -> List[Dict]:
+    """Renumber the pages of a Docling page_range conversion to document page numbers
+
+    Older Docling versions number pages relative to the requested range.
+    """
+    if pages and first_page > 1 and min(p["page_number"] for p in pages) < first_page:
+        for page in pages:
+            page["page_number"] += first_page - 1
+    return pages
+
+
+def _docling_shard_worker(args: Tuple[str, int, int]) -> Dict:
+    """Convert one page range with Docling (runs in a worker process)"""
+    from pdf_processor import _extract_with_docling
+    pdf_path, first_page, last_page = args
+    result = _extract_with_docling(pdf_path, page_range=(first_page, last_page))
+    to_document_page_numbers(result.get("pages", []), first_page)
+    return result
+
+
+def extract_docling_sharded(pdf_path: str, workers: int = DEFAULT_WORKERS) -> Dict:
+    """Docling extraction in page shards; returns the extract_text_and_metadata dict"""
+    from pdf_processor import _extract_with_docling
+
+    try:
+        total_pages = get_page_count(pdf_path)
+    except Exception:
+        return _extract_with_docling(pdf_path)
+
+    shards = split_page_ranges(0, total_pages, workers,
+                               min_shard_pages=DOCLING_MIN_SHARD_PAGES, shards_per_worker=1)
+    if workers <= 1 or total_pages < SHARDED_MIN_PAGES or len(shards) <= 1:
+        return _extract_with_docling(pdf_path)
+
+    print(f"DEBUG: converting {total_pages} pages in {len(shards)} shards on {workers} workers")
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+        shard_results = list(executor.map(_docling_shard_worker,
+                                          [(pdf_path, s + 1, e) for s, e in shards]))
+
+    failed = [r.get("error") for r in shard_results if r.get("error")]
+    if failed:
+        print(f"DEBUG: {len(failed)} shard(s) failed ({failed[0]}), falling back to serial conversion")
+        return _extract_with_docling(pdf_path)
+
+    merged = {
+        "title": next((r.get("title") for r in shard_results if r.get("title")), None),
+        "full_text": "\n\n".join(r.get("full_text") or "" for r in shard_results),
+        "pages": []
+    }
+    for result in shard_results:
+        merged["pages"].extend(result.get("pages", []))
+    merged["pages"].sort(key=lambda p: p["page_number"])
+    return merged
+
+
+def benchmark_sharded_extraction(pdf_path: str, workers: int = DEFAULT_WORKERS,
+                                 start_page: int = 0, end_page: Optional[int] = None) -> Dict:
+    """Pages/second of the serial fitz loop versus the sharded process pool"""
+    total_pages = get_page_count(pdf_path)
+    end_page = total_pages if end_page is None else min(end_page, total_pages)
+    page_count = end_page - start_page
+
+    started = time.perf_counter()
+    serial_text = extract_text_with_markers_parallel(pdf_path, start_page, end_page, workers=1)
+    serial_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parallel_text = extract_text_with_markers_parallel(pdf_path, start_page, end_page, workers=workers)
+    parallel_seconds = time.perf_counter() - started
+
+    return {
+        "document": os.path.basename(pdf_path),
+        "pages": page_count,
+        "workers": workers,
+        "serial_seconds": round(serial_seconds, 3),
+        "parallel_seconds": round(parallel_seconds, 3),
+        "serial_pages_per_second": round(page_count / serial_seconds, 1) if serial_seconds else None,
+        "parallel_pages_per_second": round(page_count / parallel_seconds, 1) if parallel_seconds else None,
+        "speedup": round(serial_seconds / parallel_seconds, 2) if parallel_seconds else None,
+        "identical_output": serial_text == parallel_text
+    }
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "bref_downloads/lvic-aaf_bref.pdf"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WORKERS
+
+    print(f"⏱️ Benchmarking sharded extraction: {pdf_path} ({workers} workers)")
+    result = benchmark_sharded_extraction(pdf_path, workers)
+    print(f"  📄 Pages: {result['pages']}")
+    print(f"  🐢 Serial:   {result['serial_pages_per_second']} pages/s ({result['serial_seconds']}s)")
+    print(f"  🚀 Parallel: {result['parallel_pages_per_second']} pages/s ({result['parallel_seconds']}s)")
+    print(f"  ⚡ Speedup:  {result['speedup']}x, identical output: {result['identical_output']}")
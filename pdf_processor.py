@@ -1,12 +1,68 @@
 # /home/ubuntu/bat_rie_checker/core_logic/pdf_processor.py
 
-from docling.document_converter import DocumentConverter
 import json
 
-def extract_text_and_metadata(pdf_path: str) -> dict:
+from docling_converter_pool import get_converter_pool
+from extraction_cache import get_default_cache, file_sha256
+
+EXTRACTOR_NAME = "docling_markdown"
+EXTRACTOR_VERSION = "1"
+
+def _extractor_version() -> str:
+    # Include the Docling release so an upgrade invalidates old cache entries
+    try:
+        from importlib.metadata import version
+        return f"{EXTRACTOR_VERSION}-docling{version('docling')}"
+    except Exception:
+        return EXTRACTOR_VERSION
+
+def extract_text_and_metadata(pdf_path: str, use_cache: bool = True, workers: int = 1) -> dict:
+    """Extract title, full text and pages, reusing a cached result for an identical PDF.
+
+    With workers > 1 large documents are converted in page shards across a
+    process pool (see parallel_extraction.extract_docling_sharded).
+    """
+    extractor_name = EXTRACTOR_NAME
+    extract = _extract_with_docling
+    if workers > 1:
+        from parallel_extraction import extract_docling_sharded
+        # Shard boundaries can change Docling's markdown slightly, so cache separately
+        extractor_name = f"{EXTRACTOR_NAME}_sharded"
+        extract = lambda path: extract_docling_sharded(path, workers=workers)
+
+    if not use_cache:
+        return extract(pdf_path)
+
+    try:
+        cache = get_default_cache()
+        sha256 = file_sha256(pdf_path)
+        cached = cache.get(pdf_path, extractor_name, _extractor_version(), sha256=sha256)
+    except OSError as cache_e:
+        # Missing/unreadable file or cache dir problems: fall back to a plain extraction
+        print(f"DEBUG: extraction cache unavailable for {pdf_path}: {cache_e}")
+        return extract(pdf_path)
+
+    if cached is not None:
+        print(f"DEBUG: extraction cache hit for {pdf_path}")
+        return cached
+
+    extracted_data = extract(pdf_path)
+    if not extracted_data.get("error"):
+        try:
+            cache.put(pdf_path, extractor_name, _extractor_version(), extracted_data, sha256=sha256)
+        except OSError as cache_e:
+            print(f"DEBUG: could not store extraction in cache: {cache_e}")
+    return extracted_data
+
+def _extract_with_docling(pdf_path: str, page_range: tuple = None) -> dict:
     try:
-        converter = DocumentConverter()
-        result = converter.convert(source=pdf_path)
+        # Reuse a warm converter instead of reloading the Docling models per call
+        with get_converter_pool().converter() as converter:
+            if page_range:
+                # 1-based, inclusive (first_page, last_page)
+                result = converter.convert(source=pdf_path, page_range=page_range)
+            else:
+                result = converter.convert(source=pdf_path)
         doc = result.document # This should be a DoclingDocument instance
 
         extracted_data = {
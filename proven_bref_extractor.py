@@ -4,18 +4,38 @@ Proven BREF Extractor using Sequential Approach
 Uses the exact method that successfully extracted 29 BATs from ENE BREF
 """
 
-import fitz
-import requests
 import json
 import re
 import os
-from typing import List, Dict, Tuple, Optional
+from typing import Iterator, List, Dict, Tuple, Optional
 from datetime import datetime
 
+from download_manifest import verify_download
+from http_fetcher import Fetcher, get_default_fetcher
+from parallel_extraction import extract_page_texts_parallel, get_page_count
+from paged_text import PagedText
+from bat_chapter_locator import BATChapterLocator, locate_bat_chapter
+from page_stream import iter_pages_without_boilerplate, PageRecord, StreamingBATScanner, BAT_CHAPTER_END_PATTERNS
+from bat_header_scanner import BATHeaderScanner, merge_by_priority, KEEP_ALL, NEW_NUMBER
+from section_index import SectionBoundaryIndex
+from boilerplate_filter import BoilerplateReport, strip_boilerplate
+from text_normalizer import normalize_text
+
 class ProvenBREFExtractor:
     """Uses proven sequential extraction method from ENE success"""
     
-    def __init__(self):
+    def __init__(self, extraction_workers: int = 1, fetcher: Optional[Fetcher] = None):
+        # >1 extracts page text in shards across a process pool
+        self.extraction_workers = extraction_workers
+        # End markers after the last BAT, in priority order; indexed once per document
+        self.section_index = SectionBoundaryIndex([
+            r'Chapter\s+[5-9]',
+            r'Annex\s+[A-Z]',
+            r'^References\s*$',
+            r'^Glossary\s*$',
+            r'^Bibliography\s*$'
+        ], max_span=50000)
+        
         # BREF documents
         self.bref_documents = {
             'CER': 'https://eippcb.jrc.ec.europa.eu/sites/default/files/2019-11/cer_bref_0807.pdf',
@@ -37,12 +57,30 @@ class ProvenBREFExtractor:
         self.alternative_bat_pattern = re.compile(r'^\s*(\d+)\.\s*BAT\s+', re.MULTILINE | re.IGNORECASE)
         self.when_pattern = re.compile(r'^\s*(\d+)\.\s*When\s+', re.MULTILINE | re.IGNORECASE)
         self.bat_for_pattern = re.compile(r'^\s*(\d+)\.\s*BAT\s+for\s+\w+\s+.*?is\s+to\s+', re.MULTILINE | re.IGNORECASE)
+        self.header_scanner = BATHeaderScanner([
+            ('bat_start', self.bat_start_pattern),
+            ('alternative', self.alternative_bat_pattern),
+            ('when', self.when_pattern),
+            ('bat_for', self.bat_for_pattern),
+        ])
+        
+        self.chapter_locator = BATChapterLocator()
         
         self.downloads_dir = "bref_downloads"
         os.makedirs(self.downloads_dir, exist_ok=True)
+        # Conditional GETs: an unchanged BREF costs one 304 round trip
+        self._fetcher = fetcher
         
         self.results = {}
+        self.boilerplate_report = None  # set per document by strip_boilerplate
     
+    @property
+    def fetcher(self) -> Fetcher:
+        """Injected fetcher, else the shared one (created on first network use)"""
+        if self._fetcher is None:
+            self._fetcher = get_default_fetcher()
+        return self._fetcher
+
     def extract_all_brefs(self) -> Dict:
         """Extract BATs from all BREF documents using proven method"""
         
@@ -89,108 +127,162 @@ class ProvenBREFExtractor:
         return self.results
     
     def download_if_needed(self, url: str, doc_code: str) -> str:
-        """Download PDF if not already cached"""
+        """Download PDF unless the local copy is still current (304)"""
         
         pdf_path = f"{self.downloads_dir}/{doc_code.lower()}_bref.pdf"
         
-        if os.path.exists(pdf_path):
-            return pdf_path
-        
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        
-        with open(pdf_path, 'wb') as f:
-            f.write(response.content)
+        result = self.fetcher.download(url, pdf_path).result()
+        if not result.ok:
+            problem = verify_download(pdf_path)
+            if problem is None:
+                # Offline or server error: keep working with the copy we have
+                print(f"  ⚠️ {doc_code}: using local copy ({result.error})")
+                return pdf_path
+            raise RuntimeError(f"Download of {doc_code} failed: {result.error}; local copy: {problem}")
+        if result.changed:
+            print(f"  🔄 {doc_code}: document changed upstream")
         
         return pdf_path
     
     def extract_bats_proven_method(self, pdf_path: str, doc_code: str, source_url: str) -> List[Dict]:
-        """Extract BATs using the exact proven method from ENE"""
+        """Extract BATs using the exact proven method from ENE (pages are read lazily, one at a time)"""
         
-        doc = fitz.open(pdf_path)
+        total_pages = get_page_count(pdf_path)
         
-        try:
-            # Use broad page range like successful ENE extraction
-            # ENE BATs were found around pages 302-350, so search last third of document
-            total_pages = len(doc)
-            start_page = max(0, int(total_pages * 0.6))  # Start at 60% through document
-            end_page = total_pages
-            
-            print(f"    Searching pages {start_page+1}-{end_page} of {total_pages}")
-            
-            # Extract text with page markers (proven approach)
-            full_text = self.extract_text_with_markers(doc, start_page, end_page)
-            
-            # Find BAT positions using proven patterns
-            bat_positions = self.find_bat_positions_proven(full_text)
-            
-            if not bat_positions:
-                print(f"    No BAT patterns found, trying full document search...")
-                # Fallback: search entire document
-                full_text = self.extract_text_with_markers(doc, 0, total_pages)
-                bat_positions = self.find_bat_positions_proven(full_text)
-            
-            # Extract complete BAT texts using proven method
-            bats = self.extract_complete_bat_texts_proven(full_text, bat_positions, doc_code, source_url)
-            
-            return bats
-            
-        finally:
-            doc.close()
+        # Outline / printed contents / running headers give the exact BAT chapter
+        span = self.chapter_locator.locate(pdf_path)
+        if span is not None:
+            print(f"    BAT chapter: pages {span.start_page+1}-{span.end_page} of {total_pages} ({span.method})")
+            bats = list(self._stream_page_ranges(pdf_path, doc_code, source_url,
+                                                 span.ranges or [(span.start_page, span.end_page)]))
+            if bats:
+                return sorted(bats, key=lambda x: x['bat_number'])
+            print(f"    No BAT patterns in located chapter, falling back to page heuristic...")
+        
+        # Use broad page range like successful ENE extraction
+        # ENE BATs were found around pages 302-350, so search last third of document
+        start_page = max(0, int(total_pages * 0.6))  # Start at 60% through document
+        end_page = total_pages
+        
+        print(f"    Searching pages {start_page+1}-{end_page} of {total_pages}")
+        bats = list(self._stream_page_ranges(pdf_path, doc_code, source_url, [(start_page, end_page)]))
+        
+        if not bats:
+            print(f"    No BAT patterns found, trying full document search...")
+            # Fallback: search entire document
+            bats = list(self._stream_page_ranges(pdf_path, doc_code, source_url, [(0, total_pages)]))
+        
+        # Sort by BAT number
+        return sorted(bats, key=lambda x: x['bat_number'])
     
-    def extract_text_with_markers(self, doc, start_page: int, end_page: int) -> str:
-        """Extract text with page markers (proven method)"""
+    def stream_bats_proven(self, pdf_path: str, doc_code: str, source_url: str,
+                           start_page: Optional[int] = None, end_page: Optional[int] = None) -> Iterator[Dict]:
+        """Yield BATs as soon as each one is complete, reading pages lazily (located chapter, else the last 40%)"""
+        
+        if start_page is None or end_page is None:
+            span = locate_bat_chapter(pdf_path)
+            if span is not None and start_page is None and end_page is None:
+                yield from self._stream_page_ranges(pdf_path, doc_code, source_url,
+                                                    span.ranges or [(span.start_page, span.end_page)])
+                return
+            if span is not None:
+                located = (span.start_page, span.end_page)
+            else:
+                total_pages = get_page_count(pdf_path)
+                located = (max(0, int(total_pages * 0.6)), total_pages)
+            start_page = located[0] if start_page is None else start_page
+            end_page = located[1] if end_page is None else end_page
         
-        texts = []
+        yield from self._stream_page_ranges(pdf_path, doc_code, source_url, [(start_page, end_page)])
+    
+    def _stream_page_ranges(self, pdf_path: str, doc_code: str, source_url: str,
+                            ranges: List[Tuple[int, int]]) -> Iterator[Dict]:
+        """Scan (start, end) page ranges (0-indexed, end exclusive) with the proven patterns"""
+        
+        # "X. BAT is to" starts a BAT every time, the other patterns only for a new number
+        scanner = StreamingBATScanner(
+            [self.bat_start_pattern, self.bat_for_pattern, self.when_pattern, self.alternative_bat_pattern],
+            end_patterns=BAT_CHAPTER_END_PATTERNS,
+            # Separate BAT sections per chapter: an end heading closes a section, not the scan
+            stop_at_end=len(ranges) == 1,
+            unique_numbers=True,
+            keep_all_patterns=1
+        )
         
-        for page_num in range(start_page, min(end_page, len(doc))):
-            page = doc[page_num]
-            page_text = page.get_text()
+        processed_numbers = set()
+        for entry in scanner.scan(self._clean_pages(pdf_path, ranges)):
+            # Skip duplicates
+            if entry['number'] in processed_numbers:
+                continue
+            processed_numbers.add(entry['number'])
             
-            # Add page marker
-            page_marker = f"\n[PAGE_{page_num + 1}]\n"
-            texts.append(page_marker)
-            texts.append(page_text)
+            bat_text = self.clean_bat_text_proven(entry['text'])
+            yield {
+                'bat_number': entry['number'],
+                'bat_id': f"BAT {entry['number']}",
+                'title': self.extract_bat_title_proven(bat_text, entry['number']),
+                'full_text': bat_text,
+                'text_length': len(bat_text),
+                'page': entry['page'],
+                'document_code': doc_code,
+                'extraction_method': 'Proven streaming parsing',
+                'source_url': source_url,
+                'language': 'English'
+            }
         
-        return "".join(texts)
+        if self.boilerplate_report is not None:
+            print(f"    🧹 {self.boilerplate_report.summary()}")
     
-    def find_bat_positions_proven(self, text: str) -> List[Tuple[int, int, str]]:
-        """Find BAT positions using proven patterns"""
-        
-        positions = []
+    def _clean_pages(self, pdf_path: str, ranges: List[Tuple[int, int]]) -> Iterator[PageRecord]:
+        """Pages of the ranges without running headers and footers, read lazily unless sharded"""
+        
+        if self.extraction_workers > 1:
+            # Sharded extraction returns all page texts at once
+            paged, self.boilerplate_report = strip_boilerplate(PagedText(
+                page for start, end in ranges
+                for page in extract_page_texts_parallel(pdf_path, start, end, self.extraction_workers)))
+            for page_number, text in paged.iter_pages():
+                yield PageRecord(number=page_number, text=text)
+            return
+        
+        self.boilerplate_report = BoilerplateReport()
+        yield from iter_pages_without_boilerplate(pdf_path, ranges, self.boilerplate_report)
+    
+    def extract_paged_text(self, doc, start_page: int, end_page: int) -> PagedText:
+        """Extract page texts with their page offsets (proven method)"""
         
-        # Primary pattern: "X. BAT is to..."
-        for match in self.bat_start_pattern.finditer(text):
-            bat_num = int(match.group(1))
-            positions.append((match.start(), bat_num, match.group(0)))
+        if self.extraction_workers > 1:
+            paged = PagedText(extract_page_texts_parallel(doc.name, start_page, end_page, self.extraction_workers))
+        else:
+            paged = PagedText.from_doc(doc, start_page, end_page)
         
-        # Alternative pattern: "X. BAT..."
-        if len(positions) < 25:  # Expect substantial number of BATs
-            for match in self.alternative_bat_pattern.finditer(text):
-                bat_num = int(match.group(1))
-                if not any(pos[1] == bat_num for pos in positions):
-                    positions.append((match.start(), bat_num, match.group(0)))
+        return self.remove_boilerplate(paged)
+    
+    def remove_boilerplate(self, paged: PagedText) -> PagedText:
+        """Drop running headers, footers and page numbers before the BAT patterns run"""
         
-        # Special patterns
-        for match in self.when_pattern.finditer(text):
-            bat_num = int(match.group(1))
-            if not any(pos[1] == bat_num for pos in positions):
-                positions.append((match.start(), bat_num, match.group(0)))
+        paged, self.boilerplate_report = strip_boilerplate(paged)
+        print(f"    🧹 {self.boilerplate_report.summary()}")
+        return paged
+    
+    def find_bat_positions_proven(self, text: str) -> List[Tuple[int, int, str]]:
+        """Find BAT positions using proven patterns"""
         
-        for match in self.bat_for_pattern.finditer(text):
-            bat_num = int(match.group(1))
-            if not any(pos[1] == bat_num for pos in positions):
-                positions.append((match.start(), bat_num, match.group(0)))
+        hits = self.header_scanner.scan(text)
         
-        # Sort by position
-        positions.sort(key=lambda x: x[0])
+        # Primary pattern: "X. BAT is to..." (all hits); the other patterns only add new numbers
+        policies = [('bat_start', KEEP_ALL)]
+        if sum(1 for hit in hits if hit.rule == 'bat_start') < 25:  # Expect substantial number of BATs
+            policies.append(('alternative', NEW_NUMBER))
+        policies += [('when', NEW_NUMBER), ('bat_for', NEW_NUMBER)]
         
-        return positions
+        return [(hit.position, hit.number, hit.text) for hit in merge_by_priority(hits, policies)]
     
-    def extract_complete_bat_texts_proven(self, full_text: str, bat_positions: List[Tuple[int, int, str]], 
+    def extract_complete_bat_texts_proven(self, paged: PagedText, bat_positions: List[Tuple[int, int, str]], 
                                         doc_code: str, source_url: str) -> List[Dict]:
         """Extract complete BAT texts using proven method"""
         
+        full_text = paged.text
         bats = []
         processed_numbers = set()
         
@@ -216,7 +308,7 @@ class ProvenBREFExtractor:
             title = self.extract_bat_title_proven(bat_text, bat_num)
             
             # Find page number
-            page_num = self.find_page_number_proven(full_text, start_pos)
+            page_num = self.find_page_number_proven(paged, start_pos)
             
             bat_dict = {
                 'bat_number': bat_num,
@@ -241,18 +333,7 @@ class ProvenBREFExtractor:
     
     def clean_bat_text_proven(self, text: str) -> str:
         """Clean BAT text using proven method"""
-        
-        # Remove page markers
-        text = re.sub(r'\[PAGE_\d+\]', '', text)
-        
-        # Normalize whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        
-        # Remove standalone page numbers
-        text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
-        
-        return text.strip()
+        return normalize_text(text)
     
     def extract_bat_title_proven(self, bat_text: str, bat_num: int) -> str:
         """Extract title using proven method"""
@@ -270,35 +351,12 @@ class ProvenBREFExtractor:
     
     def find_logical_end_position_proven(self, full_text: str, start_pos: int) -> int:
         """Find logical end using proven method"""
-        
-        search_text = full_text[start_pos:]
-        
-        end_patterns = [
-            r'Chapter\s+[5-9]',
-            r'Annex\s+[A-Z]',
-            r'^References\s*$',
-            r'^Glossary\s*$',
-            r'^Bibliography\s*$'
-        ]
-        
-        for pattern in end_patterns:
-            match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                return start_pos + match.start()
-        
-        # Default limit
-        return min(len(full_text), start_pos + 50000)
+        return self.section_index.end_position(full_text, start_pos)
     
-    def find_page_number_proven(self, full_text: str, position: int) -> int:
+    def find_page_number_proven(self, paged: PagedText, position: int) -> int:
         """Find page number using proven method"""
         
-        text_before = full_text[:position]
-        page_matches = list(re.finditer(r'\[PAGE_(\d+)\]', text_before))
-        
-        if page_matches:
-            return int(page_matches[-1].group(1))
-        
-        return 1
+        return paged.page_at(position)
     
     def save_individual_results(self, bats: List[Dict], doc_code: str):
         """Save individual document results"""
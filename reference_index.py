@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/reference_index.py
+
+"""
+Reference Index
+Maps section numbers, chapters, annexes, tables, figures and BAT/BBT numbers
+("section 4.2.3", "table 5.1", "bat 12") to the page and character span where
+they are defined. The pages are scanned once per document; resolving a
+reference in a BAT is then a dictionary lookup instead of a lowercase
+substring search over every page. The index is plain JSON so it can be
+stored next to the extraction output and loaded again without the PDF scan.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Characters kept around a reference position (same window as the old page search)
+CONTEXT_BEFORE = 100
+CONTEXT_AFTER = 1000
+
+# Dutch labels are indexed under the English key
+_KIND_ALIASES = {
+    'tabel': 'table',
+    'figuur': 'figure',
+    'hoofdstuk': 'chapter',
+    'bijlage': 'annex',
+    'paragraaf': 'section',
+}
+
+# "Section 4.2.3", "Table 3.36:", "BAT 12.", "Annex A", "Bijlage II"
+_LABELLED = re.compile(
+    r'\b(?:([Ss]ection|SECTION|[Cc]hapter|CHAPTER|[Tt]able|[Tt]abel|[Ff]igure|[Ff]iguur|[Hh]oofdstuk|[Pp]aragraaf|BAT|BBT)'
+    r'\s+(\d+(?:\.\d+)*)'
+    r'|([Aa]nnex|ANNEX|[Bb]ijlage|BIJLAGE)\s+([A-Z]{1,4}|\d+)\b)'
+)
+# Numbered heading: "4.3.4.5 \nActivated carbon filters" or "1\nGENERAL INFORMATION"
+_HEADING = re.compile(r'^[ \t]*(\d+(?:\.\d+)*)\.?[ \t]*\n?[ \t]*([A-Z][^\n]*)$', re.MULTILINE)
+_TOP_LEVEL_TITLE = re.compile(r'^[A-Z][A-Z0-9 ,;:&/()\'\-]{3,}$')
+_DEFINITION_FOLLOWS = re.compile(r'[ \t]*(?:$|[:.\-–]|[A-Z])', re.MULTILINE)
+# Table of contents lines end in a dot leader and a page number
+_DOT_LEADER = re.compile(r'\.{4,}[ \t]*[\dIVXLCivxlc]*[ \t]*$', re.MULTILINE)
+TOC_MIN_LEADERS = 3  # dot leaders on a page before its headings count as contents entries
+
+# Lower wins: definitions (headings, captions, numbered BATs) before mentions
+DEFINITION, MENTION = 0, 1
+
+Location = Tuple[int, int, int]  # page index, start, end in that page's text
+
+
+def reference_key(reference: str) -> str:
+    """Normalised lookup key: 'Tabel 5.1.' -> 'table 5.1'"""
+    parts = reference.strip().rstrip('.:').split()
+    if not parts:
+        return ''
+    kind = parts[0].lower()
+    kind = _KIND_ALIASES.get(kind, kind)
+    number = " ".join(parts[1:]).rstrip('.')
+    return f"{kind} {number.upper() if kind == 'annex' else number}".strip()
+
+
+class ReferenceIndex:
+    """Where each numbered heading, caption and BAT/BBT of one document starts"""
+
+    def __init__(self, entries: Optional[Dict[str, Location]] = None, page_count: int = 0):
+        self.entries: Dict[str, Location] = dict(entries or {})
+        self.page_count = page_count
+        self._rank: Dict[str, Tuple[int, int, int]] = {}
+
+    @classmethod
+    def from_pages(cls, page_texts: Iterable[str]) -> "ReferenceIndex":
+        """Build the index in one pass over the page texts"""
+        index = cls()
+        for page_number, text in enumerate(page_texts):
+            index.add_page(page_number, text)
+            index.page_count += 1
+        return index
+
+    @classmethod
+    def from_document(cls, doc) -> "ReferenceIndex":
+        """Build the index from an open PyMuPDF document"""
+        return cls.from_pages(page.get_text() for page in doc)
+
+    def add_page(self, page_number: int, text: str):
+        # Contents / list-of-tables pages only mention what is defined later
+        heading_rank = MENTION if len(_DOT_LEADER.findall(text)) >= TOC_MIN_LEADERS else DEFINITION
+
+        for match in _HEADING.finditer(text):
+            number, title = match.group(1), match.group(2).strip()
+            if '.' in number:
+                self._add(f"section {number}", page_number, match.start(1), len(text), heading_rank)
+            elif len(number) <= 2 and _TOP_LEVEL_TITLE.match(title):
+                self._add(f"chapter {number}", page_number, match.start(1), len(text), heading_rank)
+                self._add(f"section {number}", page_number, match.start(1), len(text), heading_rank)
+
+        for match in _LABELLED.finditer(text):
+            kind, number = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            line_end = text.find('\n', match.end())
+            line = text[line_start:line_end if line_end != -1 else len(text)]
+            # "Table 3.36: ...", "BAT 12." or a bare label define it; "Chapter 4 describes ..." mentions it
+            at_line_start = not text[line_start:match.start()].strip()
+            defines = _DEFINITION_FOLLOWS.match(text, match.end()) and not _DOT_LEADER.search(line)
+            rank = heading_rank if at_line_start and defines else MENTION
+            self._add(reference_key(f"{kind} {number}"), page_number, match.start(), len(text), rank)
+
+    def _add(self, key: str, page_number: int, position: int, page_length: int, rank: int):
+        order = (rank, page_number, position)
+        if key in self._rank and self._rank[key] <= order:
+            return
+        self._rank[key] = order
+        self.entries[key] = (page_number, max(0, position - CONTEXT_BEFORE), min(page_length, position + CONTEXT_AFTER))
+
+    def lookup(self, reference: str) -> Optional[Location]:
+        """(page index, start, end) of a reference such as 'section 4.2.3', or None"""
+        return self.entries.get(reference_key(reference))
+
+    def __contains__(self, reference: str) -> bool:
+        return reference_key(reference) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def to_dict(self) -> Dict:
+        """JSON-serialisable form for the extraction output"""
+        return {
+            'page_count': self.page_count,
+            'entries': {key: list(location) for key, location in sorted(self.entries.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ReferenceIndex":
+        """Load an index saved with to_dict()"""
+        entries = {key: tuple(location) for key, location in data.get('entries', {}).items()}
+        return cls(entries, data.get('page_count', 0))
+
+    def keys(self, kind: Optional[str] = None) -> List[str]:
+        """All indexed references, optionally only one kind ('table', 'bat', ...)"""
+        return sorted(key for key in self.entries if kind is None or key.split(' ', 1)[0] == kind)
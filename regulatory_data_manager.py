@@ -2,14 +2,14 @@
 
 import os
 import json
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 import sqlite3
 from urllib.parse import urljoin, urlparse
-import time
+from concurrent.futures import as_completed
 
+from http_fetcher import FetchResult, Fetcher, get_default_fetcher
 from pdf_processor import extract_text_and_metadata
 
 @dataclass
@@ -47,9 +47,10 @@ class BREFDocument:
 class RegulatoryDataManager:
     """Manages RIE and BREF regulatory data for permit compliance checking"""
     
-    def __init__(self, data_dir: str = "regulatory_data"):
+    def __init__(self, data_dir: str = "regulatory_data", fetcher: Optional[Fetcher] = None):
         self.data_dir = data_dir
         self.db_path = os.path.join(data_dir, "regulatory.db")
+        self._fetcher = fetcher
         self.ensure_directories()
         self.init_database()
         
@@ -84,6 +85,13 @@ class RegulatoryDataManager:
             "IRPP": "Intensive Rearing of Poultry or Pigs"
         }
     
+    @property
+    def fetcher(self) -> Fetcher:
+        """Injected fetcher, else the shared one (created on first network use)"""
+        if self._fetcher is None:
+            self._fetcher = get_default_fetcher()
+        return self._fetcher
+
     def ensure_directories(self):
         """Create necessary directories"""
         os.makedirs(self.data_dir, exist_ok=True)
@@ -155,18 +163,22 @@ class RegulatoryDataManager:
             rie_url = "https://eur-lex.europa.eu/legal-content/EN/TXT/HTML/?uri=CELEX:02010L0075-20240804"
             
             print("Downloading RIE regulation...")
-            response = requests.get(rie_url, timeout=30)
-            response.raise_for_status()
-            
-            # Save raw HTML
+            # Save raw HTML; an unchanged page (304) keeps the saved copy
             rie_path = os.path.join(self.data_dir, "rie", "rie_regulation.html")
-            with open(rie_path, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            result = self.fetcher.download(rie_url, rie_path).result()
+            if not result.ok:
+                raise RuntimeError(result.error)
             
-            print(f"RIE regulation saved to: {rie_path}")
+            if result.not_modified:
+                print(f"RIE regulation unchanged: {rie_path}")
+            else:
+                print(f"RIE regulation saved to: {rie_path}")
+            
+            with open(rie_path, 'r', encoding='utf-8', errors='replace') as f:
+                html_content = f.read()
             
             # Parse Annex I activities (this would need more sophisticated parsing)
-            self._parse_rie_activities(response.text)
+            self._parse_rie_activities(html_content)
             
             return True
             
@@ -225,36 +237,37 @@ class RegulatoryDataManager:
     
     def download_bref_document(self, bref_id: str, document_url: str) -> bool:
         """Download a specific BREF document"""
-        try:
-            print(f"Downloading BREF {bref_id}...")
-            response = requests.get(document_url, timeout=60)
-            response.raise_for_status()
-            
-            # Save PDF
-            filename = f"{bref_id}_bref.pdf"
-            local_path = os.path.join(self.data_dir, "brefs", filename)
-            
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-            
-            print(f"BREF {bref_id} saved to: {local_path}")
-            
-            # Update database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE bref_documents 
-                SET local_path = ?, last_updated = CURRENT_TIMESTAMP
-                WHERE bref_id = ?
-            ''', (local_path, bref_id))
-            conn.commit()
-            conn.close()
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error downloading BREF {bref_id}: {e}")
+        print(f"Downloading BREF {bref_id}...")
+        result = self.fetcher.download(document_url, self._bref_path(bref_id)).result()
+        return self._record_download(bref_id, result)
+    
+    def _bref_path(self, bref_id: str) -> str:
+        return os.path.join(self.data_dir, "brefs", f"{bref_id}_bref.pdf")
+    
+    def _record_download(self, bref_id: str, result: FetchResult) -> bool:
+        """Store the local path of a finished download in the catalog"""
+        if not result.ok:
+            print(f"Error downloading BREF {bref_id}: {result.error}")
             return False
+        
+        local_path = result.path
+        if result.not_modified:
+            print(f"BREF {bref_id} unchanged: {local_path}")
+        else:
+            print(f"BREF {bref_id} saved to: {local_path}")
+        
+        # Update database
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE bref_documents 
+            SET local_path = ?, last_updated = CURRENT_TIMESTAMP
+            WHERE bref_id = ?
+        ''', (local_path, bref_id))
+        conn.commit()
+        conn.close()
+        
+        return True
     
     def extract_bat_conclusions_from_bref(self, bref_id: str) -> List[BATConclusion]:
         """Extract BAT conclusions from a downloaded BREF document"""
@@ -440,19 +453,16 @@ class RegulatoryDataManager:
         success_count = 0
         failed_brefs = []
         
-        for bref_id, url in bref_urls.items():
-            print(f"\n📥 Downloading {bref_id}...")
-            try:
-                if self.download_bref_document(bref_id, url):
-                    success_count += 1
-                    print(f"✅ {bref_id} downloaded successfully")
-                    time.sleep(2)  # Respectful delay between downloads
-                else:
-                    failed_brefs.append(bref_id)
-                    print(f"❌ {bref_id} download failed")
-            except Exception as e:
+        # All downloads are queued at once; the fetcher keeps to the per-host rate limit
+        futures = {self.fetcher.download(url, self._bref_path(bref_id)): bref_id for bref_id, url in bref_urls.items()}
+        for future in as_completed(futures):
+            bref_id = futures[future]
+            if self._record_download(bref_id, future.result()):
+                success_count += 1
+                print(f"✅ {bref_id} downloaded successfully")
+            else:
                 failed_brefs.append(bref_id)
-                print(f"❌ {bref_id} failed with error: {e}")
+                print(f"❌ {bref_id} download failed")
         
         print(f"\n📊 === DOWNLOAD SAMENVATTING ===")
         print(f"✅ Successful: {success_count}/{len(bref_urls)}")
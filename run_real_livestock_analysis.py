@@ -7,7 +7,7 @@ from typing import Dict, List, Any
 
 from regulatory_data_manager import RegulatoryDataManager
 from comprehensive_all_bref_system import Uitgebreide_BREF_Processor
-from pdf_processor import extract_text_and_metadata
+from tiered_pdf_extractor import extract_text_and_metadata_tiered
 
 def analyseer_echte_veehouderij_vergunning():
     """Analyseer de echte veehouderij vergunning tegen alle toepasselijke BREFs"""
@@ -172,8 +172,8 @@ def extraheer_vergunning_inhoud(permit_folder: str) -> str:
         print(f"  📄 Verwerken: {filename}")
         
         try:
-            # Extract content using existing PDF processor
-            extracted = extract_text_and_metadata(file_path)
+            # Text pages via PyMuPDF; image-only pages (scanned besluit/annex) go to the OCR lane
+            extracted = extract_text_and_metadata_tiered(file_path)
             
             if extracted and 'full_text' in extracted:
                 content = extracted['full_text']
@@ -217,7 +217,7 @@ def test_quick_version():
     print(f"📄 Analyseren: {besluit_files[0]}")
     
     try:
-        extracted = extract_text_and_metadata(besluit_path)
+        extracted = extract_text_and_metadata_tiered(besluit_path)
         
         if extracted and 'full_text' in extracted:
             content = extracted['full_text']
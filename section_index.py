@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/section_index.py
+
+"""
+Section Boundary Index
+The chapter, annex/BIJLAGE, Hoofdstuk, References and Glossary boundaries of
+a document are found once, in one finditer() pass per end marker over the
+full text, and kept as sorted position lists. The end of a BAT/BBT is then a
+bisect lookup from its start position instead of slicing text[start_pos:]
+and running every end marker over the copy again.
+"""
+
+import re
+from bisect import bisect_left
+from typing import List, Optional, Pattern, Sequence, Tuple, Union
+
+
+class SectionBoundaryIndex:
+    """Sorted end-marker positions of one document, rebuilt when a different text comes in"""
+
+    def __init__(self, end_patterns: Sequence[Union[str, Pattern]], flags: int = re.IGNORECASE | re.MULTILINE,
+                 max_span: int = 50000):
+        """
+        Args:
+            end_patterns: end markers in priority order; the first marker found
+                anywhere after the start wins, not the nearest one
+            flags: regex flags for patterns given as strings
+            max_span: characters to keep when no end marker follows the start
+        """
+        self.patterns = [pattern if hasattr(pattern, 'finditer') else re.compile(pattern, flags)
+                         for pattern in end_patterns]
+        self.max_span = max_span
+        self._text: Optional[str] = None
+        self._positions: List[List[int]] = []
+        self._ends: List[List[int]] = []
+
+    def build(self, text: str) -> "SectionBoundaryIndex":
+        """Index the text (no-op if this exact string is already indexed)"""
+        if text is not self._text:
+            self._positions, self._ends = [], []
+            for pattern in self.patterns:
+                matches = [match.span() for match in pattern.finditer(text)]
+                self._positions.append([start for start, _ in matches])
+                self._ends.append([end for _, end in matches])
+            self._text = text
+        return self
+
+    def next_boundary(self, text: str, start_pos: int) -> Optional[Tuple[int, int]]:
+        """(pattern index, position) of the first end marker, in priority order, at or after start_pos"""
+        self.build(text)
+        for index, positions in enumerate(self._positions):
+            found = bisect_left(positions, start_pos)
+            if found and self._ends[index][found - 1] > start_pos:
+                # start_pos lies inside an earlier marker match; a shorter match may start within it
+                match = self.patterns[index].search(text, start_pos)
+                if match:
+                    return index, match.start()
+            if found < len(positions):
+                return index, positions[found]
+        return None
+
+    def end_position(self, text: str, start_pos: int) -> int:
+        """End of the content starting at start_pos: the first end marker, or start_pos + max_span"""
+        boundary = self.next_boundary(text, start_pos)
+        if boundary is not None:
+            return boundary[1]
+        return min(len(text), start_pos + self.max_span)
+
+    def boundaries(self, text: str) -> List[Tuple[int, int]]:
+        """All (position, pattern index) pairs of the text, sorted by position"""
+        self.build(text)
+        return sorted((position, index) for index, positions in enumerate(self._positions) for position in positions)
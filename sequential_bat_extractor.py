@@ -9,27 +9,61 @@ import fitz
 import os
 import re
 import json
-from typing import List, Dict, Tuple, Optional
+from typing import Iterator, List, Dict, Tuple, Optional
+
+from parallel_extraction import extract_page_texts_parallel
+from paged_text import PagedText
+from bat_chapter_locator import locate_bat_chapter
+from page_stream import iter_pages, StreamingBATScanner, BAT_CHAPTER_END_PATTERNS
+from bat_header_scanner import BATHeaderScanner, merge_by_priority, KEEP_ALL, NEW_NUMBER
+from section_index import SectionBoundaryIndex
+from boilerplate_filter import strip_boilerplate
+from text_normalizer import normalize_text
+
+# Page window used when no BAT chapter can be located (ENE BREF layout)
+FALLBACK_START_PAGE = 270
+FALLBACK_END_PAGE = 350
+
 
 class SequentialBATExtractor:
     """Extracts complete BAT texts using sequential parsing approach"""
     
-    def __init__(self):
+    def __init__(self, extraction_workers: int = 1):
+        # >1 extracts page text in shards across a process pool
+        self.extraction_workers = extraction_workers
+        self.boilerplate_report = None  # set per document by strip_boilerplate
+        # End markers after the last BAT, in priority order; indexed once per document.
+        # Restrictive on purpose, to avoid cutting off tables and detailed content
+        self.section_index = SectionBoundaryIndex([
+            r'Chapter\s+[5-9]',  # Next chapter (but not Chapter 4 content)
+            r'Annex\s+[A-Z]',    # Annex section with letter
+            r'^References\s*$', # References section (start of line)
+            r'^Glossary\s*$',   # Glossary (start of line)
+            r'^Bibliography\s*$', # Bibliography (start of line)
+        ], max_span=50000)  # last BAT with tables
+        
         self.bat_start_pattern = re.compile(r'^\s*(\d+)\.\s*BAT\s+is\s+to\s+', re.MULTILINE | re.IGNORECASE)
         self.alternative_bat_pattern = re.compile(r'^\s*(\d+)\.\s*BAT\s+', re.MULTILINE | re.IGNORECASE)
         # Pattern for "When carrying out..." which might be BAT 4
         self.when_pattern = re.compile(r'^\s*(\d+)\.\s*When\s+', re.MULTILINE | re.IGNORECASE)
         # Pattern for "BAT for [system] is to..." like BAT 18
         self.bat_for_pattern = re.compile(r'^\s*(\d+)\.\s*BAT\s+for\s+\w+\s+.*?is\s+to\s+', re.MULTILINE | re.IGNORECASE)
-        
-    def extract_bats_from_bref(self, bref_path: str, start_page: int = 270, end_page: int = 350) -> List[Dict]:
+        self.header_scanner = BATHeaderScanner([
+            ('bat_start', self.bat_start_pattern),
+            ('alternative', self.alternative_bat_pattern),
+            ('when', self.when_pattern),
+            ('bat_for', self.bat_for_pattern),
+        ])
+        
+    def extract_bats_from_bref(self, bref_path: str, start_page: Optional[int] = None,
+                               end_page: Optional[int] = None) -> List[Dict]:
         """
         Extract complete BAT texts from BREF using sequential approach
         
         Args:
             bref_path: Path to BREF PDF file
-            start_page: Page to start extraction (0-indexed)
-            end_page: Page to end extraction
+            start_page: Page to start extraction (0-indexed), None = start of the BAT chapter
+            end_page: Page to end extraction, None = end of the BAT chapter
             
         Returns:
             List of extracted BAT dictionaries
@@ -38,41 +72,83 @@ class SequentialBATExtractor:
         if not os.path.exists(bref_path):
             raise FileNotFoundError(f"BREF not found: {bref_path}")
             
+        start_page, end_page = self._resolve_page_range(bref_path, start_page, end_page)
         doc = fitz.open(bref_path)
         
         try:
             # Extract text from all relevant pages first
-            full_text = self._extract_text_from_pages(doc, start_page, end_page)
+            paged = self._extract_text_from_pages(doc, start_page, end_page)
             
             # Find all BAT starts
-            bat_positions = self._find_bat_positions(full_text)
+            bat_positions = self._find_bat_positions(paged.text)
             
             # Extract complete BAT texts
-            bats = self._extract_complete_bat_texts(full_text, bat_positions)
+            bats = self._extract_complete_bat_texts(paged, bat_positions)
             
             return bats
             
         finally:
             doc.close()
     
-    def _extract_text_from_pages(self, doc, start_page: int, end_page: int) -> str:
+    def stream_bats(self, bref_path: str, start_page: Optional[int] = None,
+                    end_page: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yield complete BATs one by one while reading the PDF page by page
+        
+        Only the current page and the BAT being assembled are held in memory,
+        and reading stops at the end of the BAT-conclusions chapter.
+        """
+        
+        if not os.path.exists(bref_path):
+            raise FileNotFoundError(f"BREF not found: {bref_path}")
+        
+        start_page, end_page = self._resolve_page_range(bref_path, start_page, end_page)
+        scanner = StreamingBATScanner(
+            [self.bat_start_pattern, self.alternative_bat_pattern],
+            end_patterns=BAT_CHAPTER_END_PATTERNS
+        )
+        
+        for entry in scanner.scan(iter_pages(bref_path, start_page, end_page)):
+            bat_text = self._clean_bat_text(entry['text'])
+            yield {
+                'bat_number': entry['number'],
+                'bat_id': f"BAT {entry['number']}",
+                'title': self._extract_bat_title(bat_text),
+                'full_text': bat_text,
+                'text_length': len(bat_text),
+                'page': entry['page'],
+                'extraction_method': 'Streaming complete text'
+            }
+    
+    def _resolve_page_range(self, bref_path: str, start_page: Optional[int],
+                            end_page: Optional[int]) -> Tuple[int, int]:
+        """Explicit pages win; otherwise use the located BAT chapter, else the fallback window"""
+        
+        if start_page is not None and end_page is not None:
+            return start_page, end_page
+        
+        span = locate_bat_chapter(bref_path)
+        if span is not None:
+            print(f"📍 BAT chapter: pages {span.start_page + 1}-{span.end_page} ({span.method})")
+            located = (span.start_page, span.end_page)
+        else:
+            located = (FALLBACK_START_PAGE, FALLBACK_END_PAGE)
+        
+        return (start_page if start_page is not None else located[0],
+                end_page if end_page is not None else located[1])
+    
+    def _extract_text_from_pages(self, doc, start_page: int, end_page: int) -> PagedText:
         """Extract and concatenate text from specified page range"""
         
-        texts = []
-        page_markers = {}  # Track which text belongs to which page
+        if self.extraction_workers > 1:
+            paged = PagedText(extract_page_texts_parallel(doc.name, start_page, end_page, self.extraction_workers))
+        else:
+            paged = PagedText.from_doc(doc, start_page, end_page)
         
-        for page_num in range(start_page, min(end_page, len(doc))):
-            page = doc[page_num]
-            page_text = page.get_text()
-            
-            # Add page marker
-            page_marker = f"\n[PAGE_{page_num + 1}]\n"
-            texts.append(page_marker)
-            page_markers[len("".join(texts))] = page_num + 1
-            texts.append(page_text)
-        
-        full_text = "".join(texts)
-        return full_text
+        # Running headers, footers and page numbers go before the BAT patterns run
+        paged, self.boilerplate_report = strip_boilerplate(paged)
+        print(f"🧹 {self.boilerplate_report.summary()}")
+        return paged
     
     def _find_bat_positions(self, text: str) -> List[Tuple[int, int, str]]:
         """
@@ -82,51 +158,31 @@ class SequentialBATExtractor:
             List of tuples: (start_position, bat_number, matched_text)
         """
         
-        positions = []
-        
-        # Primary pattern: "X. BAT is to..."
-        for match in self.bat_start_pattern.finditer(text):
-            bat_num = int(match.group(1))
-            positions.append((match.start(), bat_num, match.group(0)))
-        
-        # Alternative pattern: "X. BAT..." (if primary pattern doesn't find enough)
-        if len(positions) < 25:  # Expect close to 29 BATs
-            for match in self.alternative_bat_pattern.finditer(text):
-                bat_num = int(match.group(1))
-                # Avoid duplicates
-                if not any(pos[1] == bat_num for pos in positions):
-                    positions.append((match.start(), bat_num, match.group(0)))
+        hits = self.header_scanner.scan(text)
         
-        # Special pattern for "When carrying out..." which might be BAT 4
-        for match in self.when_pattern.finditer(text):
-            bat_num = int(match.group(1))
-            if bat_num == 4:  # Only interested in BAT 4
-                if not any(pos[1] == bat_num for pos in positions):
-                    positions.append((match.start(), bat_num, match.group(0)))
+        # Primary pattern: "X. BAT is to..." (all hits); the other patterns only add new numbers
+        policies = [('bat_start', KEEP_ALL)]
+        if sum(1 for hit in hits if hit.rule == 'bat_start') < 25:  # Expect close to 29 BATs
+            policies.append(('alternative', NEW_NUMBER))
+        policies += [('when', NEW_NUMBER), ('bat_for', NEW_NUMBER)]
         
-        # Pattern for "BAT for [system] is to..." like BAT 18
-        for match in self.bat_for_pattern.finditer(text):
-            bat_num = int(match.group(1))
-            if not any(pos[1] == bat_num for pos in positions):
-                positions.append((match.start(), bat_num, match.group(0)))
-        
-        # Sort by position in text
-        positions.sort(key=lambda x: x[0])
-        
-        return positions
+        # "When carrying out..." is only of interest as BAT 4
+        positions = merge_by_priority(hits, policies, accept={'when': lambda hit: hit.number == 4})
+        return [(hit.position, hit.number, hit.text) for hit in positions]
     
-    def _extract_complete_bat_texts(self, full_text: str, bat_positions: List[Tuple[int, int, str]]) -> List[Dict]:
+    def _extract_complete_bat_texts(self, paged: PagedText, bat_positions: List[Tuple[int, int, str]]) -> List[Dict]:
         """
         Extract complete text for each BAT from start until next BAT
         
         Args:
-            full_text: Complete text from all pages
+            paged: Complete text from all pages
             bat_positions: List of (position, bat_number, match_text) tuples
             
         Returns:
             List of BAT dictionaries with complete texts
         """
         
+        full_text = paged.text
         bats = []
         
         for i, (start_pos, bat_num, match_text) in enumerate(bat_positions):
@@ -147,7 +203,7 @@ class SequentialBATExtractor:
             title = self._extract_bat_title(bat_text)
             
             # Determine source page
-            page_num = self._find_page_number(full_text, start_pos)
+            page_num = self._find_page_number(paged, start_pos)
             
             bat_dict = {
                 'bat_number': bat_num,
@@ -167,18 +223,7 @@ class SequentialBATExtractor:
     
     def _clean_bat_text(self, text: str) -> str:
         """Clean and normalize BAT text"""
-        
-        # Remove page markers
-        text = re.sub(r'\[PAGE_\d+\]', '', text)
-        
-        # Normalize whitespace
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)  # Max 2 newlines
-        text = re.sub(r' +', ' ', text)  # Multiple spaces to single
-        
-        # Remove common artifacts
-        text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)  # Page numbers alone
-        
-        return text.strip()
+        return normalize_text(text)
     
     def _extract_bat_title(self, bat_text: str) -> str:
         """Extract meaningful title from BAT text"""
@@ -198,41 +243,12 @@ class SequentialBATExtractor:
     
     def _find_logical_end_position(self, full_text: str, start_pos: int) -> int:
         """Find logical end position for the last BAT to avoid capturing too much"""
-        
-        # Look for indicators that we've reached the end of BAT content
-        search_text = full_text[start_pos:]
-        
-        # Patterns that might indicate end of BAT content
-        # Be more restrictive to avoid cutting off tables and detailed content
-        end_patterns = [
-            r'Chapter\s+[5-9]',  # Next chapter (but not Chapter 4 content)
-            r'Annex\s+[A-Z]',    # Annex section with letter
-            r'^References\s*$', # References section (start of line)
-            r'^Glossary\s*$',   # Glossary (start of line)
-            r'^Bibliography\s*$', # Bibliography (start of line)
-        ]
-        
-        for pattern in end_patterns:
-            match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
-            if match:
-                # Return position relative to full text
-                return start_pos + match.start()
-        
-        # If no clear end found, limit to reasonable length (e.g., 50,000 chars for last BAT with tables)
-        max_length = 50000
-        return min(len(full_text), start_pos + max_length)
+        return self.section_index.end_position(full_text, start_pos)
     
-    def _find_page_number(self, full_text: str, position: int) -> int:
+    def _find_page_number(self, paged: PagedText, position: int) -> int:
         """Find which page a position corresponds to"""
         
-        # Look backwards from position to find last page marker
-        text_before = full_text[:position]
-        page_matches = list(re.finditer(r'\[PAGE_(\d+)\]', text_before))
-        
-        if page_matches:
-            return int(page_matches[-1].group(1))
-        
-        return 1  # Default to page 1
+        return paged.page_at(position)
     
     def save_extracted_bats(self, bats: List[Dict], output_path: str):
         """Save extracted BATs to JSON file"""
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/spill_store.py
+
+"""
+Spill Store
+Result lists that stay in memory until a shared byte budget is used up and
+then continue as JSON Lines sidecar files on disk. Used by the bounded-memory
+mode of EnhancedPDFProcessor.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def _estimate_size(item: Any) -> int:
+    """Serialized size in bytes, a stable stand-in for the item's memory footprint"""
+    return len(json.dumps(item, default=str, ensure_ascii=False).encode('utf-8'))
+
+
+class SpillBudget:
+    """Byte budget shared by all spillable lists of one extraction"""
+
+    def __init__(self, limit_bytes: int):
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+        self.exceeded = False
+
+    def reserve(self, size: int) -> bool:
+        """Account for size bytes; False once the ceiling has been reached"""
+        if self.exceeded or self.used_bytes + size > self.limit_bytes:
+            self.exceeded = True
+            return False
+        self.used_bytes += size
+        return True
+
+    def release(self, size: int):
+        self.used_bytes = max(0, self.used_bytes - size)
+
+
+class SpillableList:
+    """Append-only list that moves to a .jsonl sidecar when the budget runs out"""
+
+    def __init__(self, name: str, sidecar_path: str, budget: SpillBudget, always_spill: bool = False):
+        """
+        Args:
+            name: label used in the result ("images", "tables", ...)
+            sidecar_path: JSON Lines file the items go to once spilled
+            budget: shared memory budget
+            always_spill: write straight to the sidecar (large payloads such as tables)
+        """
+        self.name = name
+        self.sidecar_path = sidecar_path
+        self.budget = budget
+        self.count = 0
+        self._items: List[Any] = []
+        self._held_bytes = 0
+        self._file = None
+        if always_spill:
+            self._open_sidecar()
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    def _open_sidecar(self):
+        os.makedirs(os.path.dirname(self.sidecar_path) or '.', exist_ok=True)
+        self._file = open(self.sidecar_path, 'w', encoding='utf-8')
+
+    def _write(self, item: Any):
+        self._file.write(json.dumps(item, default=str, ensure_ascii=False))
+        self._file.write('\n')
+
+    def append(self, item: Any):
+        self.count += 1
+        if self.spilled:
+            self._write(item)
+            return
+
+        size = _estimate_size(item)
+        if self.budget.reserve(size):
+            self._items.append(item)
+            self._held_bytes += size
+            return
+
+        # Ceiling reached: switch this list to streaming output
+        print(f"💾 Memory ceiling reached, streaming {self.name} to {self.sidecar_path}")
+        self._open_sidecar()
+        for held in self._items:
+            self._write(held)
+        self._write(item)
+        self._items = []
+        self.budget.release(self._held_bytes)
+        self._held_bytes = 0
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self._file.close()
+
+    def items(self) -> List[Any]:
+        """Items still held in memory (empty once spilled)"""
+        return self._items
+
+    def __iter__(self) -> Iterator[Any]:
+        """All items, reading them back from the sidecar if spilled"""
+        if not self.spilled:
+            yield from self._items
+            return
+        if self._file is not None and not self._file.closed:
+            self._file.flush()
+        with open(self.sidecar_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def reference(self) -> Optional[Dict[str, Any]]:
+        """Sidecar reference for the result dict, None while held in memory"""
+        if not self.spilled:
+            return None
+        return {"path": self.sidecar_path, "count": self.count, "format": "jsonl"}
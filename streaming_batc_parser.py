@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/streaming_batc_parser.py
+
+"""
+Streaming BATC Parser
+Incremental EUR-Lex HTML parsing for the BBT extractors. The page is fed to
+lxml's HTML parser chunk by chunk as it downloads; a parser target turns the
+parse events into the same flattened text BeautifulSoup's get_text() gives
+(script/style skipped, whitespace-only strings collapsed to one space or
+newline), and the BBT segmenter cuts that text into BBT segments as soon as
+the next BBT header has been read. No tree and no second full-text copy are
+built: the text buffer only holds the BBT being read (and the front matter
+before BBT 1).
+
+lxml is optional; without it the extractors keep the BeautifulSoup path.
+
+Usage:
+    python streaming_batc_parser.py [page.html ...] [--language English|Dutch]    # benchmark
+"""
+
+import importlib.util
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+
+from section_index import SectionBoundaryIndex
+
+LXML_AVAILABLE = importlib.util.find_spec("lxml") is not None
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Strings BeautifulSoup keeps out of get_text() (Script, Stylesheet, TemplateString, ruby annotations)
+SKIPPED_TAGS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+# Tags inside which BeautifulSoup keeps whitespace-only strings as they are
+PRESERVE_WHITESPACE_TAGS = frozenset({'pre', 'textarea'})
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+class BBTSegment(NamedTuple):
+    """Text from one BBT header up to the next header (or the section end), stripped"""
+    start: int           # offset of the header in the flattened text
+    groups: Tuple[Optional[str], ...]   # groups of the header match
+    text: str
+
+
+class _GetTextTarget:
+    """lxml parser target that collects text the way BeautifulSoup's get_text() joins it"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self._data: List[str] = []
+        self._skip = 0
+        self._preserve = 0
+
+    def _flush(self):
+        if not self._data:
+            return
+        data = "".join(self._data)
+        self._data = []
+        if self._skip:
+            return
+        if not self._preserve and not data.strip(ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        self.parts.append(data)
+
+    def start(self, tag, attrib):
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skip += 1
+        elif tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve += 1
+
+    def end(self, tag):
+        self._flush()
+        if tag in SKIPPED_TAGS:
+            self._skip -= 1
+        elif tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve -= 1
+
+    def data(self, data):
+        self._data.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def pi(self, target, data=None):
+        self._flush()
+
+    def doctype(self, *args):
+        self._flush()
+
+    def take(self) -> str:
+        """Text completed since the last call (a string still being read stays pending)"""
+        text = "".join(self.parts)
+        self.parts = []
+        return text
+
+    def close(self) -> str:
+        self._flush()
+        return self.take()
+
+
+class BBTSegmenter:
+    """Cuts text that arrives in pieces into BBT segments, same as finditer() over the whole text
+
+    A header match is only accepted once text follows it, so a header cut off
+    at the end of a piece is matched again when the rest arrives. Each segment
+    ends where the next header starts; the last one at the section end marker.
+    """
+
+    def __init__(self, pattern: Pattern, section_index: SectionBoundaryIndex):
+        self.pattern = pattern
+        self.section_index = section_index
+        self._buffer = ""
+        self._base = 0      # offset of _buffer[0] in the whole text
+        self._scan = 0      # where the next header search starts, in _buffer
+        self._pending: Optional[Tuple[int, Tuple[Optional[str], ...]]] = None   # header not yet closed
+
+    def feed(self, text: str) -> List[BBTSegment]:
+        """Add text, return the segments it completed"""
+        self._buffer += text
+        return self._cut(final=False)
+
+    def close(self) -> List[BBTSegment]:
+        """Segments left at the end of the text, including the last BBT"""
+        segments = self._cut(final=True)
+        if self._pending is not None:
+            start, groups = self._pending
+            end = self.section_index.end_position(self._buffer, start)
+            segments.append(BBTSegment(self._base + start, groups, self._buffer[start:end].strip()))
+            self._pending = None
+        self._buffer = ""
+        return segments
+
+    def _cut(self, final: bool) -> List[BBTSegment]:
+        segments = []
+        buffer = self._buffer
+        for match in self.pattern.finditer(buffer, self._scan):
+            if not final and match.end() >= len(buffer):
+                break
+            if self._pending is not None:
+                start, groups = self._pending
+                segments.append(BBTSegment(self._base + start, groups, buffer[start:match.start()].strip()))
+            self._pending = (match.start(), match.groups())
+            self._scan = match.end()
+        if self._pending is not None and not final:
+            # Keep one character before the open BBT for \b and lookbehinds in the end markers
+            cut = self._pending[0] - 1
+            if cut > 0:
+                self._buffer = buffer[cut:]
+                self._base += cut
+                self._scan -= cut
+                self._pending = (self._pending[0] - cut, self._pending[1])
+        return segments
+
+
+def iter_html_segments(chunks: Iterable[bytes], pattern: Pattern, section_index: SectionBoundaryIndex,
+                       encoding: Optional[str] = None) -> Iterator[BBTSegment]:
+    """BBT segments of an HTML page given as byte chunks, yielded while the page is read
+
+    Args:
+        chunks: raw HTML, e.g. response.iter_content()
+        pattern: compiled BBT header pattern
+        section_index: end markers for the last BBT
+        encoding: page encoding; None lets lxml use the <meta charset>
+    """
+    from lxml import etree
+
+    target = _GetTextTarget()
+    parser = etree.HTMLParser(target=target, encoding=encoding)
+    segmenter = BBTSegmenter(pattern, section_index)
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+            yield from segmenter.feed(target.take())
+    # The parser closes the target, which hands over the text after the last tag
+    yield from segmenter.feed(parser.close())
+    yield from segmenter.close()
+
+
+def html_text(raw: bytes, encoding: Optional[str] = None, chunk_size: int = STREAM_CHUNK_SIZE) -> str:
+    """Flattened text of an HTML page through the streaming target (for comparisons)"""
+    from lxml import etree
+
+    target = _GetTextTarget()
+    parser = etree.HTMLParser(target=target, encoding=encoding)
+    parts = []
+    for offset in range(0, len(raw), chunk_size):
+        parser.feed(raw[offset:offset + chunk_size])
+        parts.append(target.take())
+    parts.append(parser.close())
+    return "".join(parts)
+
+
+def benchmark(raw: bytes, language: str = 'Dutch', doc_code: str = 'TEST',
+              chunk_size: int = STREAM_CHUNK_SIZE) -> Dict[str, Any]:
+    """Seconds and peak traced memory of the BeautifulSoup and streaming paths on one page"""
+    from bs4 import BeautifulSoup
+    from comprehensive_batc_extractor import ComprehensiveBATCExtractor
+
+    extractor = ComprehensiveBATCExtractor()
+    runs = {
+        'beautifulsoup': lambda: extractor._extract_bbts_from_html(
+            BeautifulSoup(raw, 'html.parser'), 'local', doc_code, language),
+        'streaming': lambda: extractor._extract_bbts_streaming(
+            (raw[offset:offset + chunk_size] for offset in range(0, len(raw), chunk_size)),
+            'local', doc_code, language),
+    }
+    results: Dict[str, Any] = {}
+    outputs = {}
+    for name, run in runs.items():
+        started = time.perf_counter()
+        outputs[name] = run()
+        results[name] = time.perf_counter() - started
+        # Second run for the peak: tracing slows the pure-Python parser down far more than lxml
+        tracemalloc.start()
+        run()
+        results[f"{name}_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    results['bbts'] = len(outputs['streaming'])
+    results['identical'] = outputs['beautifulsoup'] == outputs['streaming']
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    language = 'Dutch'
+    if '--language' in args:
+        index = args.index('--language')
+        language = args[index + 1]
+        del args[index:index + 2]
+    if not LXML_AVAILABLE:
+        print("❌ lxml is not installed")
+        sys.exit(1)
+
+    for path in args or ["regulatory_data/rie/rie_regulation.html"]:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        timings = benchmark(raw, language)
+        print(f"📄 {path} ({len(raw) / 1e6:.1f} MB, {timings['bbts']} BBTs, "
+              f"{'identical' if timings['identical'] else 'DIFFERENT'} output)")
+        for name in ('beautifulsoup', 'streaming'):
+            print(f"   {name:14} {timings[name]:.3f}s  peak {timings[f'{name}_peak_mb']:.1f} MB")
+        print(f"   speed-up: {timings['beautifulsoup'] / timings['streaming']:.1f}x")
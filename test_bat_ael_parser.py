@@ -0,0 +1,110 @@
+"""
+Test suite for the BAT-AEL table parser
+"""
+
+from bs4 import BeautifulSoup
+
+from bat_ael_parser import (BATAELStore, html_table_grid, normalize_unit, parse_bat_ael_grid, parse_html_tables,
+                            parse_level, resolve_pollutant)
+from bat_data_models import PollutantType
+
+# FDM Table 4 layout: two-row header, BAT-AEL split into new / existing plants
+FDM_GRID = [
+    ['Parameter', 'Specific process', 'Unit', 'BAT-AEL\n(average over the sampling period)', None],
+    [None, None, None, 'New plants', 'Existing plants'],
+    ['Dust', 'Grinding of grain', 'mg/Nm3', '< 2–5', '< 2–10'],
+]
+
+# CWW Tabel 1 layout: Dutch parameter names, footnote markers, daily averages
+CWW_GRID = [
+    ['Parameter', "BBT-GEN (daggemiddelde)"],
+    ['Totaal organische koolstof (TOC) (1) (2)', '10-33 mg/l (3) (4)'],
+    ['Chemisch zuurstofverbruik (CZV) (1) (2)', '30-100 mg/l (3) (4)'],
+    ['Totaal zwevende deeltjes (TSS)', '5,0-35 mg/l (5)'],
+]
+
+HTML_TABLE = """
+<p class="oj-ti-tbl">Table 3</p>
+<table>
+  <tr><th rowspan="2">Parameter</th><th rowspan="2">Unit</th><th colspan="2">BAT-AEL (daily average)</th></tr>
+  <tr><th>New plants</th><th>Existing plants</th></tr>
+  <tr><td>NOX</td><td>mg/Nm3</td><td>50–85</td><td>50–100</td></tr>
+  <tr><td>SO2</td><td>mg/Nm3</td><td>&lt; 10</td><td>&lt; 10–20</td></tr>
+</table>
+"""
+
+
+class TestCellParsing:
+    """Test level cells and units"""
+
+    def test_parse_level(self):
+        assert parse_level('2–5 mg/Nm3') == (2.0, 5.0, 'mg/Nm3')
+        assert parse_level('< 2-10') == (2.0, 10.0, '')
+        assert parse_level('< 0,5') == (None, 0.5, '')
+        assert parse_level('1 000–1 500 (1)') == (1000.0, 1500.0, '')
+        assert parse_level('No BAT-AEL') is None
+
+    def test_resolve_pollutant(self):
+        assert resolve_pollutant('Lead and its compounds, expressed as Pb') == PollutantType.LEAD
+        assert resolve_pollutant('Mercury') == PollutantType.MERCURY
+        assert resolve_pollutant('Kwik en kwikverbindingen') == PollutantType.MERCURY
+        assert resolve_pollutant('Nickel') == PollutantType.NICKEL
+        assert resolve_pollutant('Zink') == PollutantType.ZINC
+        assert resolve_pollutant('Chroom') == PollutantType.CHROMIUM
+        assert resolve_pollutant('As') == PollutantType.ARSENIC
+        assert resolve_pollutant('expressed as carbon') is None
+        assert resolve_pollutant('Stof') == PollutantType.DUST
+        assert resolve_pollutant('Totaal gehalte organische stoffen') != PollutantType.DUST
+
+    def test_normalize_unit(self):
+        assert normalize_unit('mg/Nm³') == 'mg/Nm3'
+        assert normalize_unit('kg / tonne of seeds  processed') == 'kg/tonne of seeds processed'
+
+
+class TestGrids:
+    """Test grids from Docling, PyMuPDF and EUR-Lex HTML"""
+
+    def test_multi_row_header(self):
+        records = parse_bat_ael_grid(FDM_GRID, "BAT-AELs for channelled dust emissions to air", "FDM", 5)
+        assert [(r.value.range_low, r.value.range_high, r.conditions) for r in records] == [
+            (2.0, 5.0, ['Specific process: Grinding of grain', 'New plants']),
+            (2.0, 10.0, ['Specific process: Grinding of grain', 'Existing plants'])]
+        value = records[0].value
+        assert value.pollutant == PollutantType.DUST
+        assert value.unit == 'mg/Nm3'
+        assert value.measurement_period == 'sampling_period_average'
+        assert value.limit_value == 5.0
+
+    def test_dutch_grid(self):
+        records = parse_bat_ael_grid(CWW_GRID, "Tabel 1 BBT-GEN's voor directe lozingen", "CWW")
+        assert [(r.value.pollutant, r.value.range_high, r.value.unit) for r in records] == [
+            (PollutantType.TOTAL_ORGANIC_CARBON, 33.0, 'mg/l'),
+            (PollutantType.CHEMICAL_OXYGEN_DEMAND, 100.0, 'mg/l'),
+            (PollutantType.TOTAL_SUSPENDED_SOLIDS, 35.0, 'mg/l')]
+        assert all(r.value.measurement_period == 'daily_average' for r in records)
+
+    def test_html_rowspan_colspan(self):
+        soup = BeautifulSoup(HTML_TABLE, 'html.parser')
+        assert html_table_grid(soup.find('table'))[1] == ['Parameter', 'Unit', 'New plants', 'Existing plants']
+        records = parse_html_tables(HTML_TABLE, "LCP", 12)
+        assert [(r.value.pollutant, r.value.range_low, r.value.range_high) for r in records] == [
+            (PollutantType.NITROGEN_OXIDES, 50.0, 85.0), (PollutantType.NITROGEN_OXIDES, 50.0, 100.0),
+            (PollutantType.SULFUR_DIOXIDE, None, 10.0), (PollutantType.SULFUR_DIOXIDE, 10.0, 20.0)]
+        assert records[0].table == 'Table 3'
+        assert records[0].source == 'html'
+
+
+class TestStore:
+    """Test the typed BAT-AEL table"""
+
+    def test_screen_measurements(self, tmp_path):
+        store = BATAELStore(str(tmp_path / "bat_ael.db"))
+        assert store.replace_document("LCP", parse_html_tables(HTML_TABLE, "LCP", 12)) == 4
+        assert store.replace_document("LCP", parse_html_tables(HTML_TABLE, "LCP", 12)) == 4
+        assert len(store.limits(PollutantType.NITROGEN_OXIDES)) == 2
+
+        exceeded = store.screen([(PollutantType.NITROGEN_OXIDES, 'mg/Nm³', 90.0),
+                                 (PollutantType.SULFUR_DIOXIDE, 'mg/Nm3', 5.0),
+                                 (PollutantType.DUST, 'mg/Nm3', 50.0)])
+        assert [(row['pollutant'], row['range_high']) for row in exceeded] == [('NOx', 85.0)]
+        store.close()
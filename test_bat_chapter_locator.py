@@ -0,0 +1,68 @@
+"""
+Test suite for locating the BAT chapter
+"""
+
+from typing import List
+
+from bat_chapter_locator import BATChapterLocator, is_bat_chapter_title
+
+# Physical page -> chapter; printed page numbers (folios) run two ahead of the physical pages
+CHAPTERS = [(1, 0, "GENERAL INFORMATION"), (2, 3, "APPLIED PROCESSES"), (5, 7, "BEST AVAILABLE TECHNIQUES"),
+            (6, 10, "EMERGING TECHNIQUES")]
+PAGE_COUNT = 14
+FOLIO_OFFSET = 2
+
+
+def _chapter_of(page_num: int):
+    return [chapter for chapter in CHAPTERS if chapter[1] <= page_num][-1]
+
+
+def _page_texts(contents: bool = False, headers: bool = True) -> List[str]:
+    """Body pages with running 'Chapter N' headers and folios; optional printed contents page"""
+    texts = []
+    if contents:
+        texts.append("\n".join(["Contents", ""] + [f"{number} {title} {'.' * 20} {start + FOLIO_OFFSET}"
+                                                   for number, start, title in CHAPTERS]))
+    for page_num in range(PAGE_COUNT):
+        number, start, title = _chapter_of(page_num)
+        lines = [f"Chapter {number}"] if headers else []
+        lines.append(str(page_num + FOLIO_OFFSET))
+        if page_num == start:
+            lines.append(f"{number} {title}")
+        lines.append(f"Text of chapter {number}, page {page_num}.")
+        texts.append("\n".join(lines))
+    return texts
+
+
+class TestTitles:
+    """Test which chapter titles count as BAT chapters"""
+
+    def test_titles(self):
+        assert is_bat_chapter_title("5 BEST AVAILABLE TECHNIQUES")
+        assert is_bat_chapter_title("BAT CONCLUSIONS")
+        assert is_bat_chapter_title("BBT-conclusies")
+        assert not is_bat_chapter_title("4 TECHNIQUES TO CONSIDER IN THE DETERMINATION OF BAT")
+        assert not is_bat_chapter_title("BEST AVAILABLE TECHNIQUES TO CONSIDER")
+
+
+class TestStrategies:
+    """Test each way of finding the chapter on a synthetic BREF"""
+
+    def test_outline(self, make_pdf):
+        outline = [[1, f"{number} {title}", start + 1] for number, start, title in CHAPTERS]
+        span = BATChapterLocator().locate(make_pdf(_page_texts(), toc=outline))
+        assert (span.start_page, span.end_page, span.method) == (7, 10, 'outline')
+        assert span.pages == [7, 8, 9]
+
+    def test_printed_contents(self, make_pdf):
+        span = BATChapterLocator().locate(make_pdf(_page_texts(contents=True)))
+        # Shifted one page by the contents page
+        assert (span.start_page, span.end_page, span.method) == (8, 11, 'printed_toc')
+        assert span.title == "BEST AVAILABLE TECHNIQUES"
+
+    def test_running_headers(self, make_pdf):
+        span = BATChapterLocator().locate(make_pdf(_page_texts()))
+        assert (span.start_page, span.end_page, span.method) == (7, 10, 'running_headers')
+
+    def test_not_found(self, make_pdf):
+        assert BATChapterLocator().locate(make_pdf(_page_texts(headers=False))) is None
@@ -0,0 +1,82 @@
+"""
+Test suite for the single-pass BAT/BBT header scanner
+"""
+
+import re
+
+from bat_header_scanner import (
+    BATHeaderScanner, HeaderHit, dedupe_sliding_window, merge_by_priority, KEEP_ALL, NEW_NUMBER
+)
+
+SAMPLE_TEXT = """5.1 General BAT conclusions
+1. BAT is to implement an environmental management system.
+  2. BAT is to monitor emissions, see BAT 1: monitoring.
+3. When carrying out maintenance, BAT is to
+BAT 4 - reduce emissions
+Best Available Technique 5
+  18. BAT for storage tanks is to use floating roofs.
+Technique 6: BAT applies here
+2. BAT is to repeat a number
+"""
+
+PATTERNS = [
+    re.compile(r'^\s*(\d+)\.\s*BAT\s+is\s+to\s+', re.MULTILINE | re.IGNORECASE),
+    re.compile(r'^\s*(\d+)\.\s*BAT\s+for\s+.*?is\s+to\s+', re.MULTILINE | re.IGNORECASE),
+    re.compile(r'^\s*(\d+)\.\s*When\s+.*?BAT\s+', re.MULTILINE | re.IGNORECASE),
+    re.compile(r'BAT\s+(\d+)\s*[:\-]\s*', re.IGNORECASE),
+    re.compile(r'^\s*BAT\s+(\d+)\b', re.MULTILINE | re.IGNORECASE),
+    re.compile(r'Best\s+Available\s+Technique\s+(\d+)', re.IGNORECASE),
+    re.compile(r'Technique\s+(\d+):\s*BAT', re.IGNORECASE),
+]
+
+
+def separate_passes(patterns, text):
+    """Reference: one finditer() per pattern, merged by position (stable on pattern order)"""
+    hits = []
+    for index, pattern in enumerate(patterns, 1):
+        for match in pattern.finditer(text):
+            hits.append(HeaderHit(match.start(), int(match.group(1)), match.group(0), f"pattern_{index}"))
+    hits.sort(key=lambda hit: hit.position)
+    return hits
+
+
+class TestBATHeaderScanner:
+    """Test single-pass scanning against the per-pattern passes it replaces"""
+
+    def test_same_hits_as_separate_passes(self):
+        scanner = BATHeaderScanner.from_patterns(PATTERNS)
+        assert scanner.scan(SAMPLE_TEXT) == separate_passes(PATTERNS, SAMPLE_TEXT)
+
+    def test_hits_are_tagged_with_rule(self):
+        scanner = BATHeaderScanner([('numbered', PATTERNS[0]), ('reference', PATTERNS[3])])
+        rules = {(hit.number, hit.rule) for hit in scanner.scan(SAMPLE_TEXT)}
+        assert (1, 'numbered') in rules
+        assert (1, 'reference') in rules
+        assert (4, 'reference') in rules
+
+    def test_first_per_position_prefers_earlier_rule(self):
+        generic = re.compile(r'^\s*(\d+)\.\s*BAT\s+', re.MULTILINE | re.IGNORECASE)
+        scanner = BATHeaderScanner.from_patterns([PATTERNS[0], generic])
+        hits = scanner.first_per_position(SAMPLE_TEXT)
+        assert len({hit.position for hit in hits}) == len(hits)
+        assert [hit.rule for hit in hits if hit.number == 1] == ['pattern_1']
+
+
+class TestDeduplication:
+    """Test window deduplication and priority merging"""
+
+    def test_sliding_window_drops_nearby_repeats(self):
+        hits = [HeaderHit(0, 1, 'a', 'r'), HeaderHit(100, 1, 'b', 'r'), HeaderHit(200, 2, 'c', 'r'),
+                HeaderHit(700, 1, 'd', 'r')]
+        assert [hit.text for hit in dedupe_sliding_window(hits, 500)] == ['a', 'c', 'd']
+
+    def test_merge_by_priority(self):
+        hits = [
+            HeaderHit(0, 1, 'primary 1', 'primary'),
+            HeaderHit(50, 1, 'near 1', 'secondary'),
+            HeaderHit(400, 1, 'far 1', 'secondary'),
+            HeaderHit(500, 2, 'new 2', 'fallback'),
+            HeaderHit(900, 1, 'old 1', 'fallback'),
+        ]
+        merged = merge_by_priority(hits, [('primary', KEEP_ALL), ('secondary', 100), ('fallback', NEW_NUMBER)])
+        assert [hit.text for hit in merged] == ['primary 1', 'far 1', 'new 2']
@@ -0,0 +1,53 @@
+"""
+Test suite for the repeated header/footer filter
+"""
+
+from boilerplate_filter import BoilerplateFilter, line_fingerprint, strip_boilerplate
+from paged_text import PagedText
+
+
+def oj_page(page_number, body):
+    """BAT conclusions page as PyMuPDF returns it: OJ header first"""
+    return f"17.8.2017 \nL 212/{page_number + 10} \nPublicatieblad van de Europese Unie \nNL \n{body}"
+
+
+def bref_page(page_number, body):
+    """Old-style BREF page: chapter header, title, printed page number (PDF page + 20)"""
+    return f"Chapter {2 + page_number // 3} \nPolymers \n{page_number + 20} \n{body}"
+
+
+class TestBoilerplateFilter:
+    """Test which lines are learned as page furniture"""
+
+    def test_fingerprint(self):
+        assert line_fingerprint("  Chapter   12 ") == "chapter #"
+        assert line_fingerprint("L 212/44") == "l #/#"
+
+    def test_oj_header_removed_body_kept(self):
+        pages = [
+            (1, oj_page(1, "Techniek \nBeschrijving \nBBT 1. Om de milieuprestaties te verbeteren")),
+            (2, oj_page(2, "BBT 2. Om de energie-efficiëntie te verbeteren")),
+            (3, oj_page(3, "3.1.2 \nMonitoring \nBBT 3. Monitoring van emissies")),
+            (4, oj_page(4, "Techniek \nBBT 4. Om de emissies naar lucht te verminderen")),
+        ]
+        cleaned, report = BoilerplateFilter().strip(pages)
+
+        assert cleaned[0][1] == "Techniek \nBeschrijving \nBBT 1. Om de milieuprestaties te verbeteren"
+        assert cleaned[2][1] == "3.1.2 \nMonitoring \nBBT 3. Monitoring van emissies"
+        assert report.lines_removed == 16
+        assert report.fingerprints == ['17.8.2017', 'l #/#', 'nl', 'publicatieblad van de europese unie']
+        assert report.chars_saved == sum(len(text) for _, text in pages) - sum(len(text) for _, text in cleaned)
+        assert report.tokens_saved == report.chars_saved // 4
+
+    def test_page_numbers_by_offset(self):
+        bodies = ["reduce dust", "monitor emissions", "use a fabric filter", "recycle water", "reduce noise", "store waste"]
+        paged = PagedText((page_number, bref_page(page_number, f"12 \nBAT {page_number} is to {body}"))
+                          for page_number, body in enumerate(bodies, start=1))
+        cleaned, report = strip_boilerplate(paged)
+
+        # '12' in the body is not the printed page number of any page
+        assert cleaned.page_text(1) == "12 \nBAT 1 is to reduce dust"
+        assert cleaned.page_text(6) == "12 \nBAT 6 is to store waste"
+        assert cleaned.page_numbers == paged.page_numbers
+        assert cleaned.page_at(cleaned.text.index("BAT 5")) == 5
+        assert report.fingerprints == ['chapter #', 'polymers', '<page number>']
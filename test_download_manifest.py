@@ -0,0 +1,95 @@
+"""
+Test suite for resumable downloads and the download manifest
+"""
+
+import hashlib
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from download_manifest import check_pdf, get_manifest, verify_download
+
+PDF = b"%PDF-1.7\n" + b"stream BAT 1 ... endstream\n" * 8000 + b"%%EOF\n"
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    drop_after = None    # bytes to send before breaking off the next transfer
+    ranges = []
+
+    def do_GET(self):
+        if self.path == "/page.html":
+            body = b"<html><body>Document not found</body></html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        _Handler.ranges.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range") and self.headers.get("If-Range") == ETAG:
+            start = int(self.headers["Range"].split("=")[1].split("-")[0])
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(PDF) - 1}/{len(PDF)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(PDF) - start))
+        self.end_headers()
+        if _Handler.drop_after is not None:
+            self.wfile.write(PDF[start:start + _Handler.drop_after])
+            _Handler.drop_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(PDF[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(serve):
+    _Handler.ranges = []
+    _Handler.drop_after = None
+    return serve(_Handler)
+
+
+class TestResumableDownload:
+    """Test resuming, atomic replacement and the manifest entry"""
+
+    def test_interrupted_transfer_is_resumed(self, server, fetcher, tmp_path):
+        target = tmp_path / "TST_bref.pdf"
+        _Handler.drop_after = 50000
+        result = fetcher.download(f"{server}/doc.pdf", str(target), chunk_size=8192).result()
+        assert result.ok and result.status == 206
+        # Resumed after the last whole chunk that arrived
+        first, resumed = _Handler.ranges
+        assert first is None and 0 < int(resumed[len("bytes="):-1]) <= 50000
+        assert target.read_bytes() == PDF and not (tmp_path / "TST_bref.pdf.part").exists()
+
+        entry = get_manifest(str(tmp_path)).get(str(target))
+        assert entry["size"] == len(PDF) and entry["sha256"] == hashlib.sha256(PDF).hexdigest()
+        assert result.sha256 == entry["sha256"] and "partial" not in entry
+
+    def test_non_pdf_is_not_kept(self, server, fetcher, tmp_path):
+        target = tmp_path / "TST_bref.pdf"
+        result = fetcher.download(f"{server}/page.html", str(target)).result()
+        assert not result.ok and "not a complete PDF" in result.error
+        assert not target.exists() and not (tmp_path / "TST_bref.pdf.part").exists()
+        assert get_manifest(str(tmp_path)).get(str(target)) is None
+
+
+class TestVerification:
+    """Test that damaged downloads are caught before extraction"""
+
+    def test_truncated_and_modified_files(self, server, fetcher, tmp_path):
+        target = tmp_path / "TST_bref.pdf"
+        fetcher.download(f"{server}/doc.pdf", str(target)).result()
+        assert verify_download(str(target)) is None
+
+        target.write_bytes(PDF[:100000])
+        assert "truncated" in check_pdf(str(target))
+        assert "manifest says" in verify_download(str(target))
+
+        target.write_bytes(PDF.replace(b"BAT 1", b"BAT 2", 1))
+        assert verify_download(str(target)) == "SHA-256 differs from the manifest"
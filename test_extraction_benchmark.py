@@ -0,0 +1,26 @@
+"""
+Test suite for the isolated benchmark runs
+"""
+
+import time
+
+import pytest
+
+from extraction_benchmark import _run_isolated
+
+
+class TestIsolatedRun:
+    """Test that a run returns its result or is terminated at the timeout"""
+
+    def test_result_is_returned(self):
+        assert _run_isolated(sorted, [3, 1, 2], timeout=60) == [1, 2, 3]
+
+    def test_hung_worker_is_terminated(self):
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            _run_isolated(time.sleep, 60, timeout=1)
+        assert time.monotonic() - start < 15
+
+    def test_worker_error_is_raised(self):
+        with pytest.raises(RuntimeError, match="ValueError"):
+            _run_isolated(int, "geen getal", timeout=60)
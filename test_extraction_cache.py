@@ -0,0 +1,68 @@
+"""
+Test suite for the content-addressed extraction cache
+"""
+
+import pytest
+
+from extraction_cache import ExtractionCache, file_sha256
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "sample.pdf"
+    path.write_bytes(b"%PDF-1.4 sample content")
+    return str(path)
+
+
+class TestExtractionCache:
+    """Test cache hits, misses, keys and LRU eviction"""
+
+    def test_miss_then_hit(self, tmp_path, pdf_file):
+        cache = ExtractionCache(cache_dir=str(tmp_path / "cache"))
+        payload = {"title": "Sample", "full_text": "BAT 1", "pages": [{"page_number": 1, "text": "BAT 1"}]}
+
+        assert cache.get(pdf_file, "docling_markdown", "1") is None
+        cache.put(pdf_file, "docling_markdown", "1", payload)
+        assert cache.get(pdf_file, "docling_markdown", "1") == payload
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_key_includes_extractor_version(self, tmp_path, pdf_file):
+        cache = ExtractionCache(cache_dir=str(tmp_path / "cache"))
+        cache.put(pdf_file, "docling_markdown", "1", {"full_text": "old"})
+        assert cache.get(pdf_file, "docling_markdown", "2") is None
+        assert cache.get(pdf_file, "pymupdf", "1") is None
+
+    def test_content_change_is_a_miss(self, tmp_path, pdf_file):
+        cache = ExtractionCache(cache_dir=str(tmp_path / "cache"))
+        cache.put(pdf_file, "docling_markdown", "1", {"full_text": "v1"})
+        with open(pdf_file, 'ab') as f:
+            f.write(b" corrigendum")
+        assert cache.get(pdf_file, "docling_markdown", "1") is None
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        cache = ExtractionCache(cache_dir=str(tmp_path / "cache"), max_bytes=2500)
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"doc_{i}.pdf"
+            path.write_bytes(f"document {i}".encode())
+            paths.append(str(path))
+
+        cache.put(paths[0], "x", "1", {"full_text": "a" * 1000})
+        cache.put(paths[1], "x", "1", {"full_text": "b" * 1000})
+        # Touch doc_0 so doc_1 becomes least recently used
+        assert cache.get(paths[0], "x", "1") is not None
+        cache.put(paths[2], "x", "1", {"full_text": "c" * 1000})
+
+        assert cache.get(paths[1], "x", "1") is None
+        assert cache.get(paths[0], "x", "1") is not None
+        assert cache.get(paths[2], "x", "1") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_file_sha256_matches_hashlib(self, pdf_file):
+        import hashlib
+        with open(pdf_file, 'rb') as f:
+            assert file_sha256(pdf_file) == hashlib.sha256(f.read()).hexdigest()
@@ -0,0 +1,66 @@
+"""
+Test suite for the unified extraction engine
+"""
+
+import pytest
+
+from extraction_engine import (
+    ExtractionEngine, RECORD_FIELDS, STRATEGIES, document_code, is_dutch_batc, normalize_record, register_strategy
+)
+
+
+@register_strategy("test_fixed")
+def _fixed_strategy(pdf_path, doc_code):
+    return [{'bat_number': 2, 'title': 'Second', 'full_text': 'BAT is to reduce', 'page': 5},
+            {'bat_number': 1, 'title': 'First', 'full_text': 'BAT is to monitor', 'page': 3}]
+
+
+class TestDocumentSelection:
+    """Test document codes and strategy selection"""
+
+    def test_document_code_from_filename(self):
+        assert document_code('bref_downloads/lvic-aaf_bref.pdf') == 'LVIC-AAF'
+        assert document_code('CWW_BATC_NL.pdf') == 'CWW'
+        assert document_code('ENE_bref.pdf') == 'ENE'
+
+    def test_strategy_per_code(self):
+        engine = ExtractionEngine()
+        assert is_dutch_batc('LCP_BBT_conclusies_NL.pdf')
+        assert not is_dutch_batc('FDM_BAT_conclusions.pdf')
+        assert engine.strategy_for('LCP_BBT_conclusies_NL.pdf', 'LCP') == 'dutch_batc'
+        assert engine.strategy_for('ENE_bref.pdf', 'ENE') == 'ene'
+        assert engine.strategy_for('CER_bref.pdf', 'CER') == 'generic'
+
+    def test_unknown_strategy_rejected(self):
+        with pytest.raises(ValueError):
+            ExtractionEngine({'codes': {'ENE': 'does_not_exist'}})
+
+
+class TestSchema:
+    """Test normalisation and deterministic output"""
+
+    def test_normalize_bbt_record(self):
+        raw = {'bbt_number': '7', 'bbt_id': 'BBT 7', 'title': 'Geur', 'full_text': 'BBT 7 ...', 'page': 12,
+               'extraction_date': '2025-01-01T00:00:00'}
+        record = normalize_record(raw, 'IRPP', 'dutch_batc', 'IRPP_BBT_conclusies_NL.pdf')
+        assert list(record) == RECORD_FIELDS
+        assert record['record_type'] == 'bbt'
+        assert record['bat_number'] == 7
+        assert record['bat_id'] == 'IRPP BBT 7'
+        assert record['language'] == 'Dutch'
+
+    def test_run_orders_documents_by_code(self, make_pdf, tmp_path):
+        corpus = tmp_path / "regulatory_data" / "brefs"
+        corpus.mkdir(parents=True)
+        make_pdf(["ZZZ"], name="regulatory_data/brefs/ZZZ_bref.pdf")
+        make_pdf(["AAA"], name="regulatory_data/brefs/AAA_bref.pdf")
+        pdf_bytes = (corpus / "AAA_bref.pdf").read_bytes()
+        (corpus / "AAA_copy.pdf").write_bytes(pdf_bytes)  # identical bytes, skipped
+        (corpus / "BBB_bref.pdf").write_bytes(pdf_bytes[:200])  # truncated download, skipped
+
+        engine = ExtractionEngine({'default': 'test_fixed'}, workers=1, repo_dir=str(tmp_path))
+        extraction = engine.run()
+        assert [doc['document_code'] for doc in extraction['documents']] == ['AAA', 'ZZZ']
+        assert [record['bat_id'] for record in extraction['records']] == [
+            'AAA BAT 1', 'AAA BAT 2', 'ZZZ BAT 1', 'ZZZ BAT 2']
+        assert 'test_fixed' in STRATEGIES
@@ -0,0 +1,51 @@
+"""
+Test suite for the numbering-gap detector and windowed re-extraction
+"""
+
+from gap_recovery import find_numbering_gaps, locate_headers, recover_gaps, register_recovery
+from paged_text import PagedText
+
+
+def _records(pages):
+    return [{'bat_number': number, 'page': page} for number, page in pages]
+
+
+@register_recovery("test_window")
+def _window_strategy(pdf_path, page_numbers):
+    return PagedText([(6, "Inleiding\nBBT 1.\nOm de milieuprestaties te verbeteren\n"),
+                      (8, "BBT 2. Monitoring van emissies\nBBT 3. Zie tabel BBT 7\n")])
+
+
+class TestGapDetection:
+    """Test missing and out-of-order numbers and their page windows"""
+
+    def test_missing_numbers_between_neighbours(self):
+        gaps, out_of_order = find_numbering_gaps(_records([(3, 9), (5, 12), (6, 12), (9, 20)]))
+        assert out_of_order == []
+        assert [(gap.missing, gap.first_page, gap.last_page) for gap in gaps] == [
+            ([1, 2], 1, 9), ([4], 9, 12), ([7, 8], 12, 20)]
+
+    def test_table_cell_out_of_order(self):
+        # "BBT 7" in a table on page 14 of a document where BBT 6 is on page 18
+        gaps, out_of_order = find_numbering_gaps(_records([(5, 16), (6, 18), (7, 14), (8, 19), (9, 20)]))
+        assert out_of_order == [7]
+        assert [(gap.missing, gap.after, gap.before, gap.first_page, gap.last_page) for gap in gaps] == [
+            ([1, 2, 3, 4], None, 5, 1, 16), ([7], 6, 8, 18, 19)]
+
+
+class TestRecovery:
+    """Test header location in a window and the merge bookkeeping"""
+
+    def test_locate_headers(self):
+        found = locate_headers(_window_strategy("", [6, 8]), [1, 3, 7], 'bbt')
+        assert sorted(found) == [1, 3]
+        assert found[1]['page'] == 6 and found[1]['title'] == "Om de milieuprestaties te verbeteren"
+        assert found[3]['page'] == 8 and found[3]['extraction_method'] == "gap_recovery_patterns"
+
+    def test_recover_replaces_out_of_order(self):
+        records = _records([(3, 20), (4, 9), (5, 10)])
+        recovered, replaced, report = recover_gaps("unused.pdf", records, 'bbt', ["test_window"], page_count=40)
+        assert [raw['bbt_number'] for raw in recovered] == [1, 2, 3]
+        assert list(replaced) == [3] and replaced[3] is records[0]
+        assert report.missing == [1, 2] and report.out_of_order == [3]
+        assert report.still_missing == [] and report.pages_searched == 9
@@ -0,0 +1,41 @@
+"""
+Test suite for the compiled Dutch/English line grammar
+"""
+
+from grammar_packs import (APPLICABILITY, DUTCH_PACK, EMISSION_LEVELS, ENGLISH_PACK, MONITORING,
+                           TECHNIQUES, document_language)
+
+
+class TestGrammarPacks:
+    """Test header forms, section headers and body line categories"""
+
+    def test_dutch_header_forms(self):
+        assert DUTCH_PACK.header("BBT 12. Om stofemissies te verminderen") == ("bbt_number", "12", "Om stofemissies te verminderen")
+        assert DUTCH_PACK.header("3. BBT voor het opslaan van afval").number == "3"
+        assert DUTCH_PACK.header("**BBT 4** Monitoring").form == "bold_bbt"
+        purpose = DUTCH_PACK.header("Teneinde geurhinder te voorkomen, is de BBT het volgende toe te passen")
+        assert purpose == ("purpose", None, "het volgende toe te passen")
+        # Table cells and sentences about a BBT do not start one
+        assert DUTCH_PACK.header("BBT 12") is None
+        assert DUTCH_PACK.header("BBT 9 is alleen toepasbaar in gevallen waar") is None
+
+    def test_english_header_forms(self):
+        assert ENGLISH_PACK.header("BAT 1. In order to improve the overall performance") == (
+            "bat_number", "1", "In order to improve the overall performance")
+        assert ENGLISH_PACK.header("12. BAT is to use a fabric filter").number == "12"
+        assert ENGLISH_PACK.header("12. BATTERY storage") is None
+        assert ENGLISH_PACK.header("Om stof te verminderen, is de BBT") is None
+
+    def test_sections_and_categories(self):
+        assert DUTCH_PACK.is_section("BIJLAGE")
+        assert not DUTCH_PACK.is_section("De in de bijlage bij dit besluit opgenomen BBT-conclusies")
+        assert DUTCH_PACK.category("Algemeen van toepassing.") == APPLICABILITY
+        assert DUTCH_PACK.category("BBT-GEN (mg/Nm3) per emissieniveau") == EMISSION_LEVELS
+        assert DUTCH_PACK.category("Frequentie van de meting") == MONITORING
+        assert DUTCH_PACK.category("Zie de beschrijving in punt 8.3") is None
+        assert ENGLISH_PACK.category("Applicability: generally applicable") == APPLICABILITY
+        assert ENGLISH_PACK.category("Generally applicable to new plants") is None
+        assert ENGLISH_PACK.category("The technique consists of") == TECHNIQUES
+        assert ENGLISH_PACK.is_section("Chapter 4")
+        assert document_language("regulatory_data/bat_conclusions/LCP_BBT_conclusies_NL.pdf") == "nl"
+        assert document_language("regulatory_data/bat_conclusions/FDM_BAT_conclusions.pdf") == "en"
@@ -0,0 +1,41 @@
+"""
+Test suite for the HTML text offset map
+"""
+
+from bs4 import BeautifulSoup
+
+from html_text_map import HTMLTextMap
+
+HTML = """<html><head><style>p {}</style></head><body><div class="doc">
+<p>BBT 1. Om emissies te verminderen</p>
+<p>is de BBT het toepassen van:</p>
+<table><tr><td><p>Stof</p></td><td><p>5 mg/Nm3</p></td></tr></table>
+<!-- opmerking -->
+<table><tr><td>Zie ook BBT 2. Monitoring van de emissies</td></tr></table>
+<p>BBT 3. Geur</p>
+</div></body></html>"""
+
+
+class TestHTMLTextMap:
+    """Test the flattened text and the range lookups"""
+
+    def test_text_matches_get_text(self):
+        soup = BeautifulSoup(HTML, 'html.parser')
+        text_map = HTMLTextMap(soup)
+        assert text_map.text == soup.get_text()
+        assert text_map.element_at(text_map.text.index("5 mg")).name == 'p'
+        assert text_map.element_at(text_map.text.index("Zie ook")).name == 'td'
+
+    def test_range_gives_outermost_elements_and_tables(self):
+        text_map = HTMLTextMap(BeautifulSoup(HTML, 'html.parser'))
+        text = text_map.text
+        elements = text_map.elements_for_range(text.index("BBT 1"), text.index("BBT 2"))
+        assert [element.name for element in elements] == ['p', 'p', 'table', 'table']
+        assert "5 mg/Nm3" in text_map.html_for_range(text.index("BBT 1"), text.index("BBT 2"))
+
+    def test_range_starting_inside_a_cell(self):
+        text_map = HTMLTextMap(BeautifulSoup(HTML, 'html.parser'))
+        text = text_map.text
+        elements = text_map.elements_for_range(text.index("BBT 2"), text.index("BBT 3"))
+        assert [element.name for element in elements] == ['td']
+        assert text_map.elements_for_range(text.index("BBT 3"), len(text))[0].get_text() == "BBT 3. Geur"
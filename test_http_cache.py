@@ -0,0 +1,94 @@
+"""
+Test suite for the conditional-GET HTTP cache
+"""
+
+import hashlib
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from http_cache import HTTPCache
+
+
+class _Handler(BaseHTTPRequestHandler):
+    body = b""
+    requests = []    # (path, If-None-Match) per request
+
+    def do_GET(self):
+        etag = '"%s"' % hashlib.sha256(_Handler.body).hexdigest()[:16]
+        _Handler.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(_Handler.body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(_Handler.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(serve):
+    _Handler.body = ("%PDF-1.7\n" + "BBT 1. Één milieubeheersysteem\n" * 500 + "%%EOF\n").encode("utf-8")
+    _Handler.requests = []
+    return serve(_Handler)
+
+
+@pytest.fixture
+def fetch_cache(tmp_path):
+    return HTTPCache(str(tmp_path / "cache"))
+
+
+class TestDownloads:
+    """Test that downloads revalidate instead of downloading again"""
+
+    def test_not_modified_keeps_file(self, server, fetcher, tmp_path):
+        target = tmp_path / "brefs" / "TST_bref.pdf"
+        first = fetcher.download(f"{server}/doc.pdf", str(target)).result()
+        assert first.ok and first.status == 200 and first.changed is None
+        mtime = target.stat().st_mtime_ns
+
+        second = fetcher.download(f"{server}/doc.pdf", str(target)).result()
+        assert second.ok and second.not_modified and second.path == str(target)
+        assert target.stat().st_mtime_ns == mtime and target.read_bytes() == _Handler.body
+        assert _Handler.requests[0][1] is None and _Handler.requests[1][1] is not None
+
+        entry = fetcher.cache.lookup(f"{server}/doc.pdf", str(target))
+        assert entry.fetches == 1 and entry.not_modified == 1
+        assert entry.sha256 == hashlib.sha256(_Handler.body).hexdigest()
+
+    def test_changed_upstream_and_local_edits(self, server, fetcher, tmp_path):
+        target = tmp_path / "TST_bref.pdf"
+        fetcher.download(f"{server}/doc.pdf", str(target)).result()
+        _Handler.body = b"%PDF-1.7 nieuwe versie\n%%EOF\n"
+        changed = fetcher.download(f"{server}/doc.pdf", str(target)).result()
+        assert changed.status == 200 and changed.changed is True
+        assert target.read_bytes() == _Handler.body
+
+        # A copy edited or truncated on disk no longer matches the validators
+        target.write_bytes(b"%PDF-1.7 kapot")
+        repaired = fetcher.download(f"{server}/doc.pdf", str(target)).result()
+        assert repaired.status == 200 and repaired.changed is False
+        assert _Handler.requests[-1][1] is None
+        assert target.read_bytes() == _Handler.body
+
+
+class TestHandlerFetches:
+    """Test that a 304 replays the stored page into the handler"""
+
+    def test_replay(self, server, fetcher):
+        def handler(response):
+            return b"".join(response.iter_content(100)).decode(response.encoding)
+
+        first = fetcher.fetch(f"{server}/batc.html", handler)
+        second = fetcher.fetch(f"{server}/batc.html", handler)
+        assert second.not_modified and second.status == 304
+        assert second.value == first.value == _Handler.body.decode("utf-8")
+        assert fetcher.fetch(f"{server}/batc.html").value == _Handler.body
+        assert fetcher.cache.stats()["not_modified"] == 2
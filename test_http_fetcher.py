@@ -0,0 +1,84 @@
+"""
+Test suite for the shared HTTP fetch layer
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from http_fetcher import Fetcher, TokenBucket
+
+PAYLOAD = b"%PDF-1.7 " + b"x" * 5000 + b"\n%%EOF\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        with _Handler.lock:
+            _Handler.in_flight += 1
+            _Handler.peak = max(_Handler.peak, _Handler.in_flight)
+        time.sleep(0.05)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+        with _Handler.lock:
+            _Handler.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(serve):
+    _Handler.peak = 0
+    return serve(_Handler)
+
+
+class TestTokenBucket:
+    """Test the rate limit arithmetic with a fake clock"""
+
+    def test_burst_then_rate(self):
+        now = [0.0]
+        waits = []
+
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+        assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 0.5]
+        now[0] += 10   # idle time refills only up to the burst
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+
+class TestFetcher:
+    """Test concurrent fetching against a local server"""
+
+    def test_download_and_errors(self, server, fetcher, tmp_path):
+        target = tmp_path / "brefs" / "TST_bref.pdf"
+        result = fetcher.download(f"{server}/doc.pdf", str(target)).result()
+        assert result.ok and result.path == str(target) and result.bytes == len(PAYLOAD)
+        assert target.read_bytes() == PAYLOAD
+        missing = fetcher.submit(f"{server}/missing").result()
+        assert not missing.ok and missing.status == 404
+
+    def test_per_host_limits(self, server):
+        with Fetcher(workers=8, per_host=2, default_rate=(20.0, 1)) as fetcher:
+            started = time.perf_counter()
+            futures = [fetcher.submit(f"{server}/doc{index}.html", lambda response: len(response.content))
+                       for index in range(6)]
+            results = [future.result() for future in futures]
+            elapsed = time.perf_counter() - started
+        assert all(result.ok and result.value == len(PAYLOAD) for result in results)
+        assert _Handler.peak <= 2
+        # 6 request starts at 20/s with a burst of 1: at least 5 intervals of 50 ms
+        assert elapsed >= 0.25
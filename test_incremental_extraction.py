@@ -0,0 +1,84 @@
+"""
+Test suite for incremental re-extraction of revised documents
+"""
+
+from typing import List
+
+from incremental_extraction import IncrementalBATExtractor, PageManifestStore, map_unchanged_pages
+from sequential_bat_extractor import SequentialBATExtractor
+
+PAGE_COUNT = 8
+
+
+def _bat_text(number: int, revision: str = "") -> str:
+    return (f"{number}. BAT is to reduce emissions to air from unit {number} by applying one or a "
+            f"combination of the techniques given below{revision}, such as a bag filter or a scrubber.")
+
+
+def _page_texts(revised_page: int = None) -> List[str]:
+    """Introduction on page 1, BAT n on page n + 1"""
+    texts = ["General information on the sector and the scope of these conclusions."]
+    for page_num in range(1, PAGE_COUNT):
+        texts.append(_bat_text(page_num, " (corrected)" if page_num == revised_page else ""))
+    return texts
+
+
+class _RecordingStream:
+    """SequentialBATExtractor.stream_bats that remembers which page ranges it parsed"""
+
+    def __init__(self):
+        self.extractor = SequentialBATExtractor()
+        self.ranges = []
+
+    def __call__(self, pdf_path, start_page, end_page):
+        self.ranges.append((start_page, end_page))
+        return self.extractor.stream_bats(pdf_path, start_page, end_page)
+
+
+def _extractor(store_dir: str) -> tuple:
+    stream = _RecordingStream()
+    incremental = IncrementalBATExtractor(stream, extractor_name="test",
+                                          store=PageManifestStore(store_dir))
+    incremental._locate_scan_range = lambda pdf_path, page_count: (0, page_count)
+    return incremental, stream
+
+
+class TestPageMap:
+    """Test matching pages between versions"""
+
+    def test_inserted_page_shifts_mapping(self):
+        assert map_unchanged_pages(["a", "b", "c"], ["a", "x", "b", "c"]) == {1: 1, 2: 3, 3: 4}
+
+
+class TestSplice:
+    """Test that a one-page edit re-parses only around that page"""
+
+    def test_edited_page_matches_full_extraction(self, make_pdf, tmp_path):
+        incremental, stream = _extractor(str(tmp_path / "manifests"))
+
+        first = incremental.extract(make_pdf(_page_texts(), name="tst_bref.pdf"), doc_key="tst")
+        assert first["stats"]["mode"] == "full"
+        assert [record["bat_number"] for record in first["records"]] == list(range(1, PAGE_COUNT))
+
+        stream.ranges = []
+        pdf_path = make_pdf(_page_texts(revised_page=4), name="tst_bref.pdf")
+        revised = incremental.extract(pdf_path, doc_key="tst")
+        stats = revised["stats"]
+        assert stats["mode"] == "incremental"
+        # Only BAT 3 (page 4, running onto page 5) and the edited BAT 4 (page 5) are parsed again
+        assert stream.ranges == [(3, 6)] and stats["pages_parsed"] == 3
+        assert stats["records_reused"] == PAGE_COUNT - 3 and stats["records_parsed"] == 2
+
+        full, _ = _extractor(str(tmp_path / "fresh"))
+        assert revised["records"] == full.extract(pdf_path, doc_key="tst")["records"]
+        assert "(corrected)" in revised["records"][3]["full_text"]
+        for index in (0, 1, 4, 5, 6):
+            assert revised["records"][index] == first["records"][index]
+
+    def test_unchanged_file_is_not_parsed(self, make_pdf, tmp_path):
+        pdf_path = make_pdf(_page_texts(), name="tst_bref.pdf")
+        incremental, stream = _extractor(str(tmp_path / "manifests"))
+        incremental.extract(pdf_path, doc_key="tst")
+        stream.ranges = []
+        again = incremental.extract(pdf_path, doc_key="tst")
+        assert again["stats"]["mode"] == "unchanged" and stream.ranges == []
@@ -0,0 +1,100 @@
+"""
+Test suite for lazy page iteration and the streaming BAT scanner
+"""
+
+import re
+
+import dutch_bbt_extractor
+from boilerplate_filter import BoilerplateReport
+from dutch_bbt_extractor import DutchBBTExtractor
+from page_stream import (BAT_CHAPTER_END_PATTERNS, PageRecord, StreamingBATScanner, iter_pages,
+                         iter_pages_without_boilerplate)
+
+HEADER = re.compile(r'^\s*(\d+)\.\s*BAT\s+is\s+to\s+', re.MULTILINE | re.IGNORECASE)
+
+
+def _pages(*texts: str):
+    return [PageRecord(number=index, text=text) for index, text in enumerate(texts, 1)]
+
+
+class TestScanner:
+    """Test entries spanning pages and stopping at the end of the chapter"""
+
+    def test_entry_spans_pages_and_stops_at_end(self):
+        pages = _pages("Annex A\n1. BAT is to monitor dust.\n",
+                       "continued on page two.\n2. BAT is to reduce NOX.\n",
+                       "6 EMERGING TECHNIQUES\nnot read further",
+                       "3. BAT is to never be reached.\n")
+        scanner = StreamingBATScanner([HEADER], end_patterns=BAT_CHAPTER_END_PATTERNS)
+        entries = list(scanner.scan(pages))
+        # The annex heading before the first BAT does not end the chapter
+        assert [(entry['number'], entry['page'], entry['pages']) for entry in entries] == [(1, 1, [1, 2]), (2, 2, [2])]
+        assert entries[0]['text'] == "1. BAT is to monitor dust.\ncontinued on page two.\n"
+        assert entries[1]['text'] == "2. BAT is to reduce NOX.\n"
+        assert scanner.pages_read == 3 and scanner.stopped_at_page == 3
+
+    def test_unique_numbers_and_cap(self):
+        pages = _pages("1. BAT is to use a bag filter " + "x" * 100 + "\n",
+                       "1. BAT is to (see above)\n2. BAT is to scrub.\n")
+        scanner = StreamingBATScanner([HEADER], max_chars=40, unique_numbers=True)
+        entries = list(scanner.scan(pages))
+        assert [entry['number'] for entry in entries] == [1, 2]
+        assert len(entries[0]['text']) == 40
+
+    def test_keep_all_patterns(self):
+        secondary = re.compile(r'^\s*(\d+)\.\s*When\s+', re.MULTILINE)
+        pages = _pages("1. BAT is to monitor.\n1. When a repeated number is content.\n1. BAT is to again.\n")
+        scanner = StreamingBATScanner([HEADER, secondary], unique_numbers=True, keep_all_patterns=1)
+        entries = list(scanner.scan(pages))
+        assert [entry['text'] for entry in entries] == [
+            "1. BAT is to monitor.\n1. When a repeated number is content.\n", "1. BAT is to again.\n"]
+
+
+class TestIterPages:
+    """Test lazy page iteration over a PDF"""
+
+    def test_range_and_blocks(self, make_pdf):
+        path = make_pdf([f"Pagina {page_num + 1}" for page_num in range(4)])
+        records = list(iter_pages(path, 1, 10, with_blocks=True))
+        assert [record.number for record in records] == [2, 3, 4]
+        assert records[0].text.strip() == "Pagina 2" and records[0].blocks[0][4].strip() == "Pagina 2"
+
+
+BBT_PAGES = [
+    "L 212/44 Publicatieblad\nInleiding tot de BBT-conclusies.",
+    "L 212/44 Publicatieblad\nBBT 1. Om de algehele milieuprestaties te verbeteren, is de BBT het invoeren "
+    "van een milieubeheersysteem.",
+    "L 212/44 Publicatieblad\nvervolg van het milieubeheersysteem.\nBBT 2. Om de emissies naar water te "
+    "verminderen, is de BBT het monitoren van de procesparameters.",
+    "L 212/44 Publicatieblad\nBIJLAGE II\nBBT 9. Om de geur te verminderen is de BBT niet meer gelezen.",
+    "L 212/44 Publicatieblad\nBBT 8. Om iets anders te voorkomen is de BBT ook niet meer gelezen.",
+]
+
+
+class TestStreamingExtractors:
+    """Test that the batch extractors read pages lazily and stop after the chapter"""
+
+    def test_boilerplate_is_stripped_while_streaming(self, make_pdf):
+        report = BoilerplateReport()
+        pdf_path = make_pdf(BBT_PAGES)
+        records = list(iter_pages_without_boilerplate(pdf_path, [(0, 2), (3, 5)], report, sample_pages=4))
+        assert [record.number for record in records] == [1, 2, 4, 5]
+        assert all("Publicatieblad" not in record.text for record in records)
+        assert report.pages == 4 and report.lines_removed == 4
+
+    def test_dutch_batch_extraction_streams(self, make_pdf, monkeypatch):
+        pdf_path = make_pdf(BBT_PAGES, name="tst_batc.pdf")
+        read = []
+
+        def counting(*args, **kwargs):
+            for record in iter_pages_without_boilerplate(*args, **kwargs):
+                read.append(record.number)
+                yield record
+
+        monkeypatch.setattr(dutch_bbt_extractor, "iter_pages_without_boilerplate", counting)
+        bbts = DutchBBTExtractor().extract_bbts_from_batc(pdf_path)
+        assert [bbt['bbt_number'] for bbt in bbts] == [1, 2]
+        assert bbts[0]['full_text'].endswith("vervolg van het milieubeheersysteem.")
+        assert "Publicatieblad" not in bbts[0]['full_text']
+        # Reading stopped at the annex
+        assert read == [1, 2, 3, 4]
@@ -0,0 +1,57 @@
+"""
+Test suite for paged text and offset-to-page lookups
+"""
+
+import fitz
+
+from paged_text import PagedText
+
+
+def _paged() -> PagedText:
+    return PagedText([(3, "BAT 1 text"), (4, "\n\n  "), (7, "  \n2. BAT is to"), (8, "")])
+
+
+class TestOffsets:
+    """Test page attribution at and around page boundaries"""
+
+    def test_page_boundaries(self):
+        paged = _paged()
+        assert paged.text == "BAT 1 text\n\n\n  \n  \n2. BAT is to\n"
+        assert paged.starts == [0, 11, 16, 32] and paged.ends == [10, 15, 31, 32]
+        assert paged.page_at(0) == 3 and paged.page_at(9) == 3
+        assert paged.page_text(7) == "  \n2. BAT is to" and paged.page_span(8) == (32, 32)
+
+    def test_blank_text_is_attributed_to_the_next_printed_page(self):
+        paged = _paged()
+        # The separator after page 3 and the blank page 4 belong to where "2. BAT" is printed
+        assert paged.page_at(10) == 7 and paged.page_at(12) == 7
+        assert paged.page_at(paged.text.index("2. BAT")) == 7
+        # Nothing printed after the offset: the page the offset falls in
+        assert paged.page_at(len(paged.text)) == 8
+
+    def test_blank_leading_text(self):
+        paged = PagedText([(1, "   \n\n"), (2, "1. BAT is to")])
+        assert paged.page_at(0) == 2
+        assert PagedText([]).page_at(0) == 1 and PagedText([]).pages_between(0, 5) == []
+
+    def test_pages_between(self):
+        paged = _paged()
+        assert paged.pages_between(0, 10) == [3]
+        assert paged.pages_between(0, 11) == [3]
+        assert paged.pages_between(5, 20) == [3, 4, 7]
+        assert paged.pages_between(20, 20) == []
+
+
+class TestFromDoc:
+    """Test building from a fitz document"""
+
+    def test_non_contiguous_page_list(self, make_pdf):
+        doc = fitz.open(make_pdf([f"Pagina {page_num + 1}" for page_num in range(6)]))
+        paged = PagedText.from_page_list(doc, [1, 4, 9])
+        assert paged.page_numbers == [2, 5]
+        assert paged.page_text(5).strip() == "Pagina 5"
+        assert paged.page_at(paged.text.index("Pagina 5")) == 5
+        assert paged.pages_between(0, len(paged)) == [2, 5]
+        assert "[PAGE_5]" in paged.marked_text()
+        assert PagedText.from_doc(doc, 4).page_numbers == [5, 6]
+        doc.close()
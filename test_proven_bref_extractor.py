@@ -0,0 +1,34 @@
+"""
+Test suite for the proven BREF extractor
+"""
+
+from proven_bref_extractor import ProvenBREFExtractor
+
+BAT_PAGES = {
+    8: ["1. BAT is to implement an environmental management system that incorporates all of the "
+        "following features, including commitment of the management and a review of the plant.",
+        "2. BAT is to reduce emissions to air by applying one or a combination of the techniques "
+        "given below, such as a bag filter or an electrostatic precipitator on the main stack."],
+    9: ["3. BAT is to monitor the channelled emissions to air with at least the frequency given "
+        "below and in accordance with EN standards, including dust, NOX and SO2 measurements."],
+}
+
+
+# Ten pages, BATs on pages 9-10; the outline points the BAT chapter at pages 2-3
+PAGE_TEXTS = ["\n\n".join(BAT_PAGES.get(page_num, [f"Chapter {page_num + 1} general information on the sector."]))
+              for page_num in range(10)]
+OUTLINE = [[1, "1 GENERAL INFORMATION", 1], [1, "5 BEST AVAILABLE TECHNIQUES", 2], [1, "6 EMERGING TECHNIQUES", 4]]
+
+
+class TestProvenMethod:
+    """Test the fallbacks behind the chapter locator"""
+
+    def test_mislocated_chapter_falls_back(self, make_pdf, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        pdf_path = make_pdf(PAGE_TEXTS, name="tst_bref.pdf", toc=OUTLINE)
+        extractor = ProvenBREFExtractor()
+        span = extractor.chapter_locator.locate(pdf_path)
+        assert (span.start_page, span.end_page) == (1, 3)
+
+        bats = extractor.extract_bats_proven_method(pdf_path, 'TST', 'local')
+        assert [bat['bat_number'] for bat in bats] == [1, 2, 3]
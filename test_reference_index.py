@@ -0,0 +1,69 @@
+"""
+Test suite for the heading/section reference index
+"""
+
+import json
+
+from reference_index import ReferenceIndex, reference_key
+
+CONTENTS_PAGE = """Contents
+4
+TECHNIQUES TO CONSIDER IN THE DETERMINATION OF BAT ..........137
+4.2.3 Fabric filters .......................................145
+Table 4.1: Information breakdown ...........................139
+"""
+
+TECHNIQUES_PAGE = """Chapter 4
+Ceramic Manufacturing Industry
+137
+4
+TECHNIQUES TO CONSIDER IN THE DETERMINATION OF BAT
+Chapter 4 describes the techniques; see also Section 4.2.3 and Table 4.1.
+"""
+
+FILTER_PAGE = """Chapter 4
+4.2.3
+Fabric filters
+Dust is collected on the filter cake.
+Table 4.1: Information breakdown for each technique
+BAT 12. In order to reduce dust emissions, BAT is to use a fabric filter.
+"""
+
+DUTCH_PAGE = """2.2.2.  Deflagraties
+BBT 27. De BBT om deflagraties te voorkomen, zie Tabel 5.1.
+Tabel 5.1: BBT-GEN's voor stof
+Bijlage II
+"""
+
+
+class TestReferenceIndex:
+    """Test that references resolve to definitions, not to contents entries or mentions"""
+
+    def test_definitions_win_over_contents_and_mentions(self):
+        pages = [CONTENTS_PAGE, TECHNIQUES_PAGE, FILTER_PAGE]
+        index = ReferenceIndex.from_pages(pages)
+
+        page, start, end = index.lookup("section 4.2.3")
+        assert page == 2
+        assert pages[page][start:end].startswith("Chapter 4\n4.2.3\nFabric filters")
+        assert index.lookup("Chapter 4")[0] == 1
+        assert index.lookup("table 4.1")[0] == 2
+        assert index.lookup("BAT 12")[0] == 2
+        assert index.lookup("section 9.9") is None
+
+    def test_reference_keys(self):
+        assert reference_key("Tabel 5.1.") == "table 5.1"
+        assert reference_key("annex ii") == "annex II"
+        assert reference_key("section  4.2.") == "section 4.2"
+
+        index = ReferenceIndex.from_pages([DUTCH_PAGE])
+        assert index.keys() == ["annex II", "bbt 27", "section 2.2.2", "table 5.1"]
+        page, start, end = index.lookup("Table 5.1")
+        assert DUTCH_PAGE[start:end].find("Tabel 5.1:") == DUTCH_PAGE.index("Tabel 5.1:") - start
+
+    def test_round_trip_through_json(self):
+        index = ReferenceIndex.from_pages([CONTENTS_PAGE, TECHNIQUES_PAGE, FILTER_PAGE])
+        loaded = ReferenceIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+        assert loaded.entries == index.entries
+        assert loaded.page_count == 3
+        assert "section 4.2.3" in loaded
@@ -0,0 +1,52 @@
+"""
+Test suite for the section boundary index
+"""
+
+import re
+
+from section_index import SectionBoundaryIndex
+
+END_PATTERNS = [
+    r'Chapter\s+[5-9]',
+    r'Annex\s+[A-Z]',
+    r'^References\s*$',
+]
+
+SAMPLE_TEXT = """4.1 BAT conclusions
+1. BAT is to monitor emissions.
+Annex A lists the techniques.
+2. BAT is to reduce dust.
+References
+Chapter 6 Emerging techniques
+"""
+
+
+def slice_search(text, start_pos, patterns=END_PATTERNS, max_span=50000):
+    """Reference: the text[start_pos:] search the index replaces"""
+    search_text = text[start_pos:]
+    for pattern in patterns:
+        match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            return start_pos + match.start()
+    return min(len(text), start_pos + max_span)
+
+
+class TestSectionBoundaryIndex:
+    """Test bisect lookups against the slice-and-search they replace"""
+
+    def test_same_end_as_slice_search(self):
+        index = SectionBoundaryIndex(END_PATTERNS)
+        for start_pos in range(len(SAMPLE_TEXT)):
+            assert index.end_position(SAMPLE_TEXT, start_pos) == slice_search(SAMPLE_TEXT, start_pos)
+
+    def test_priority_order_beats_nearest_marker(self):
+        index = SectionBoundaryIndex(END_PATTERNS)
+        start_pos = SAMPLE_TEXT.index("2. BAT")
+        assert index.end_position(SAMPLE_TEXT, start_pos) == SAMPLE_TEXT.index("Chapter 6")
+
+    def test_default_span_and_rebuild(self):
+        index = SectionBoundaryIndex(END_PATTERNS, max_span=10)
+        assert index.end_position("1. BAT is to monitor emissions", 0) == 10
+        assert index.end_position(SAMPLE_TEXT, 0) == SAMPLE_TEXT.index("Chapter 6")
+        assert [position for position, _ in index.boundaries(SAMPLE_TEXT)] == sorted(
+            SAMPLE_TEXT.index(marker) for marker in ("Annex A", "References", "Chapter 6"))
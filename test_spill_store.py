@@ -0,0 +1,46 @@
+"""
+Test suite for the spillable result lists
+"""
+
+import json
+
+from spill_store import SpillBudget, SpillableList
+
+
+def _item(index: int) -> dict:
+    return {"page": index, "text": "BAT " * 10}
+
+
+class TestSpill:
+    """Test holding items in memory and moving them to the sidecar"""
+
+    def test_held_within_budget(self, tmp_path):
+        images = SpillableList("images", str(tmp_path / "images.jsonl"), SpillBudget(10000))
+        for index in range(3):
+            images.append(_item(index))
+        assert not images.spilled and images.reference() is None
+        assert list(images) == images.items() == [_item(index) for index in range(3)]
+        assert not (tmp_path / "images.jsonl").exists()
+
+    def test_shared_budget_spills_in_order(self, tmp_path):
+        budget = SpillBudget(300)
+        pages = SpillableList("pages", str(tmp_path / "pages.jsonl"), budget)
+        images = SpillableList("images", str(tmp_path / "images.jsonl"), budget)
+        pages.append(_item(0))
+        for index in range(5):
+            images.append(_item(index))
+        assert images.spilled and images.items() == [] and budget.exceeded
+        assert list(images) == [_item(index) for index in range(5)]
+        assert images.reference() == {"path": str(tmp_path / "images.jsonl"), "count": 5, "format": "jsonl"}
+        # The spilled list gave its reservation back
+        assert budget.used_bytes == len(json.dumps(_item(0)).encode('utf-8'))
+
+    def test_always_spill_and_iterate_after_close(self, tmp_path):
+        tables = SpillableList("tables", str(tmp_path / "out" / "tables.jsonl"), SpillBudget(10 ** 6),
+                               always_spill=True)
+        tables.append(_item(1))
+        tables.append(_item(2))
+        assert tables.spilled and tables.count == 2
+        tables.close()
+        tables.close()
+        assert list(tables) == [_item(1), _item(2)]
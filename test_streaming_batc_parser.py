@@ -0,0 +1,77 @@
+"""
+Test suite for the streaming EUR-Lex HTML parser
+"""
+
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+pytest.importorskip("lxml")
+
+from comprehensive_batc_extractor import ComprehensiveBATCExtractor
+from section_index import SectionBoundaryIndex
+from streaming_batc_parser import BBTSegmenter, html_text
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>BBT-conclusies</title><script>var bbt = "BBT 9. script";</script>
+<style>p { margin: 0 }</style></head>
+<body><!-- opmerking --><div class="eli-container">
+  <p class="oj-normal">BBT 1. Om de algehele milieuprestaties te verbeteren, is de BBT het invoeren van een
+  milieubeheersysteem dat alle volgende kenmerken omvat.</p>
+  <table><tr>  <td>Tabel 1</td>
+  <td>&lt; 5 mg/Nm<sup>3</sup></td></tr></table>
+  <pre>  vaste   opmaak  </pre>
+  <p>BBT 2. Om de emissies naar water te verminderen is de BBT het monitoren van de belangrijkste
+  procesparameters op belangrijke locaties.</p>
+  <p>BBT 1. Herhaalde verwijzing die al eerder voorkwam en niet nog eens wordt opgenomen in de lijst.</p>
+  <p>BBT 3. Om geuremissies te voorkomen, is de BBT het opstellen, uitvoeren en regelmatig herzien van een
+  geurbeheerplan als onderdeel van het milieubeheersysteem.</p>
+  <p>BIJLAGE II</p><p>Referenties</p>
+</div></body></html>"""
+
+
+class TestStreamingText:
+    """Test that the streamed text is what BeautifulSoup's get_text() gives"""
+
+    def test_text_matches_get_text(self):
+        raw = PAGE.encode('utf-8')
+        expected = BeautifulSoup(raw, 'html.parser').get_text()
+        body = expected[expected.index("BBT-conclusies"):]
+        for chunk_size in (5, 64, 1 << 16):
+            text = html_text(raw, chunk_size=chunk_size)
+            assert text[text.index("BBT-conclusies"):] == body
+
+    def test_segmenter_matches_finditer(self):
+        pattern = re.compile(r'(?:BBT|BAT)\s+(\d+)\.?\s+[^.]*\.', re.IGNORECASE)
+        text = BeautifulSoup(PAGE, 'html.parser').get_text()
+        segmenter = BBTSegmenter(pattern, SectionBoundaryIndex([r'BIJLAGE\s+[IVX]+'], max_span=500))
+        segments = []
+        for offset in range(0, len(text), 7):
+            segments.extend(segmenter.feed(text[offset:offset + 7]))
+        segments.extend(segmenter.close())
+        matches = list(pattern.finditer(text))
+        assert [segment.start for segment in segments] == [match.start() for match in matches]
+        assert segments[-1].text.startswith("BBT 3.") and segments[-1].text.endswith("milieubeheersysteem.")
+
+
+class TestStreamingExtraction:
+    """Test that the streaming path gives the same BBTs as the BeautifulSoup path"""
+
+    def test_identical_output(self):
+        extractor = ComprehensiveBATCExtractor()
+        raw = PAGE.encode('utf-8')
+        expected = extractor._extract_bbts_from_html(BeautifulSoup(raw, 'html.parser'), 'url', 'TST', 'Dutch')
+        chunks = (raw[offset:offset + 50] for offset in range(0, len(raw), 50))
+        streamed = extractor._extract_bbts_streaming(chunks, 'url', 'TST', 'Dutch')
+        assert [bbt['bbt_number'] for bbt in streamed] == [1, 2, 3]
+        assert streamed == expected
+
+    def test_fetcher_created_on_first_use(self, monkeypatch):
+        import comprehensive_batc_extractor
+        created = []
+        monkeypatch.setattr(comprehensive_batc_extractor, "get_default_fetcher", lambda: created.append(1) or "shared")
+        extractor = ComprehensiveBATCExtractor()
+        assert created == []
+        assert extractor.fetcher == extractor.fetcher == "shared" and created == [1]
+        assert ComprehensiveBATCExtractor(fetcher="injected").fetcher == "injected"
@@ -0,0 +1,29 @@
+"""
+Test suite for the single-pass text normaliser
+"""
+
+from paged_text import PagedText
+from text_normalizer import TextNormalizer, normalize_text
+
+
+class TestTextNormalizer:
+    """Test the cleaning the extractors share"""
+
+    def test_soft_hyphens_joined_hard_hyphens_kept(self):
+        text = ("BBT 3. Om de afval\u00adwater\u00ad\nstromen te behandelen, zie BBT-\nconclusies "
+                "en stoom-\nen elektriciteit; S2-\nTOC")
+        assert normalize_text(text) == ("BBT 3. Om de afvalwaterstromen te behandelen, zie BBT-conclusies "
+                                         "en stoom- en elektriciteit; S2-\nTOC")
+        joined = TextNormalizer(join_hard_hyphens=True).normalize("afval-\nwater, BBT-\nconclusies")
+        assert joined == "afvalwater, BBT-conclusies"
+
+    def test_page_numbers_whitespace_and_ligatures(self):
+        text = "12\nBAT 5. Use a ﬁlter  to\treduce\n\n\n\n14\ndust\nPage 3\n[PAGE_4]\nemissions \n\nEnd\x0c"
+        assert normalize_text(text) == "BAT 5. Use a filter to reduce\n\ndust\nemissions \n\nEnd"
+
+    def test_normalize_paged_keeps_page_numbers(self):
+        paged = PagedText([(4, "21\nBAT 1. Re\u00ad\nduce dust"), (5, "22\nBAT 2. Monitor")])
+        cleaned = TextNormalizer().normalize_paged(paged)
+        assert cleaned.page_numbers == [4, 5]
+        assert cleaned.page_text(4) == "BAT 1. Reduce dust"
+        assert cleaned.page_at(cleaned.text.index("BAT 2")) == 5
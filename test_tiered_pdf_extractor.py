@@ -0,0 +1,65 @@
+"""
+Test suite for the tiered PDF extractor
+"""
+
+import fitz
+
+from tiered_pdf_extractor import TieredPDFExtractor, classify_page, group_page_spans
+
+PROSE = ("The installation applies an environmental management system that covers the whole site. "
+         "Emissions to air are reduced by a combination of primary and secondary techniques.\n") * 5
+TABLE = "Table 3 BAT-AELs for channelled emissions to air\n" + "\n".join(
+    f"{low}–{low * 2}\nmg/Nm3" for low in range(5, 60, 5))
+
+
+class TestClassifier:
+    """Test the per-page tier choice"""
+
+    def test_prose_table_and_blank_pages(self, make_pdf):
+        with fitz.open(make_pdf([PROSE, TABLE, ""], fontsize=9)) as doc:
+            profiles = [classify_page(page) for page in doc]
+        assert [(profile.tier, profile.reason) for profile in profiles] == [
+            ("text", "plain"), ("docling", "table"), ("docling", "image_only")]
+        assert [profile.page_number for profile in profiles] == [1, 2, 3]
+
+
+class TestEscalation:
+    """Test that escalated pages are converted in runs, not page by page"""
+
+    def test_group_page_spans(self):
+        assert group_page_spans([12, 3, 4, 5, 9, 10]) == [(3, 5), (9, 10), (12, 12)]
+        assert group_page_spans(list(range(1, 8)), max_span=3) == [(1, 3), (4, 6), (7, 7)]
+        assert group_page_spans([]) == []
+
+    def test_one_docling_call_per_span(self, monkeypatch):
+        calls = []
+
+        def fake_docling(pdf_path, page_range):
+            calls.append(page_range)
+            first, last = page_range
+            if first == last:
+                return {"full_text": f"docling {first}", "pages": []}
+            return {"full_text": "", "pages": [{"page_number": number, "text": f"docling {number}"}
+                                               for number in range(first, last + 1) if number != 4]}
+
+        extractor = TieredPDFExtractor(use_cache=False)
+        monkeypatch.setattr(extractor, "_docling_extractor", lambda: fake_docling)
+        pages = [{"page_number": number, "text": f"pymupdf {number}", "tier": "docling"} for number in (2, 3, 4, 7)]
+        extractor._escalate_pages("doc.pdf", pages)
+        assert sorted(calls) == [(2, 4), (7, 7)]
+        assert [page["text"] for page in pages] == ["docling 2", "docling 3", "pymupdf 4", "docling 7"]
+        assert pages[2]["tier"] == "text_fallback"
+
+    def test_range_relative_page_numbers(self, monkeypatch):
+        def relative_docling(pdf_path, page_range):
+            # Older Docling: pages numbered from 1 within the requested range
+            first, last = page_range
+            pages = [{"page_number": number - first + 1, "text": f"docling {number}"} for number in range(first, last + 1)]
+            return {"full_text": f"docling {first}", "pages": pages}
+
+        extractor = TieredPDFExtractor(use_cache=False)
+        monkeypatch.setattr(extractor, "_docling_extractor", lambda: relative_docling)
+        pages = [{"page_number": number, "text": f"pymupdf {number}", "tier": "docling"} for number in (2, 40, 41)]
+        extractor._escalate_pages("doc.pdf", pages)
+        assert [page["text"] for page in pages] == ["docling 2", "docling 40", "docling 41"]
+        assert all(page["tier"] == "docling" for page in pages)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/text_normalizer.py
+
+"""
+Text Normalizer
+One compiled pattern that cleans extracted BAT/BBT text in a single pass:
+words broken across lines are rejoined, ligatures are folded, runs of
+spaces, tabs and form feeds become one space, [PAGE_n] markers and
+standalone page numbers are dropped and blank-line runs are limited to
+one empty line.
+Replaces the chain of 3-5 re.sub() calls each extractor ran per BAT.
+
+Line-end hyphens: the EUR-Lex PDFs break words with a soft hyphen (U+00AD),
+those are joined ("afval\\xad\\nwater" -> "afvalwater"). A hard hyphen at a
+line end is almost always a real compound ("BBT-\\nconclusies", "flue-\\ngas")
+or an elided one ("stoom-\\nen elektriciteit"), so only the line break goes.
+Sources that hyphenate with plain '-' (OCR output) can set join_hard_hyphens.
+
+Usage:
+    python text_normalizer.py [file.pdf ...]    # benchmark against the old chain
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List, Optional
+
+from paged_text import PagedText
+
+LIGATURES = {
+    'ﬀ': 'ff', 'ﬁ': 'fi', 'ﬂ': 'fl', 'ﬃ': 'ffi', 'ﬄ': 'ffl', 'ﬅ': 'st', 'ﬆ': 'st',
+}
+# An elided compound keeps its hyphen and space: "zwavel- en stikstofoxiden"
+CONJUNCTIONS = frozenset({'en', 'of', 'tot', 'and', 'or', 'to'})
+
+# Whitespace-only line; a line that is only a page number, a [PAGE_n] marker or "Page n"
+_BLANK_LINE = r'[ \t\x0c]*'
+_NUMBER_LINE = r'[ \t\x0c]*(?:\d+|\[PAGE_\d+\]|[Pp]age[ \t]+\d+)[ \t\x0c]*'
+_JUNK_LINE = rf'(?:{_NUMBER_LINE}|{_BLANK_LINE})'
+_LINE_BREAK = r'[ \t]*\n[ \t]*'
+_LETTER = r'[^\W\d_]'
+
+# Every branch starts with a literal character, so the regex engine can skip straight to the
+# next space, tab, form feed, line break, hyphen or ligature instead of trying each position.
+# Line breaks followed by text and a lone blank line between paragraphs never reach the callback.
+_NORMALIZE = re.compile(
+    r' (?P<spaces>[ \t\x0c]+)'
+    r'|\t(?P<tabs>[ \t\x0c]*)'
+    r'|\x0c(?P<feed>[ \t\x0c]*)'
+    r'|\n(?=[ \t\x0c]*[\n\d\[Pp])(?:'
+    rf'(?P<numbers>(?:{_NUMBER_LINE}\n)*{_NUMBER_LINE}(?=\n|\Z))'
+    rf'|(?P<numbers_after_blank>(?:{_BLANK_LINE}\n)+{_NUMBER_LINE}(?:\n{_JUNK_LINE})*(?=\n|\Z))'
+    rf'|(?P<blanks>(?:{_BLANK_LINE}\n){{2,}}))'
+    rf'|\u00ad(?:(?<={_LETTER}\u00ad)(?P<soft_break>{_LINE_BREAK})(?={_LETTER})|(?P<soft>))'
+    rf'|-(?=[ \t]*\n)(?<={_LETTER}-)(?:'
+    rf'(?P<elision>{_LINE_BREAK})(?=(?:{"|".join(sorted(CONJUNCTIONS))})\b)'
+    rf'|(?P<hard_break>{_LINE_BREAK})(?={_LETTER}))'
+    # One literal per ligature (a character class here would disable the skip); no group
+    + ''.join(f'|{ligature}' for ligature in LIGATURES)
+)
+# Most branches have a fixed replacement. Page numbers vanish; when an empty line was next to
+# them, '\n' in front of the line break the run stops at keeps one empty line.
+_REPLACEMENTS = {
+    'soft_break': '', 'soft': '', 'elision': '- ', 'hard_break': '-',
+    'numbers': '', 'numbers_after_blank': '\n', 'blanks': '\n\n', 'spaces': ' ', 'tabs': ' ', 'feed': ' ',
+}
+
+
+class TextNormalizer:
+    """Single-pass cleaner shared by the BAT/BBT extractors"""
+
+    def __init__(self, join_hard_hyphens: bool = False):
+        self.join_hard_hyphens = join_hard_hyphens
+
+    def _replace(self, match: re.Match) -> str:
+        kind = match.lastgroup
+        if kind is None:
+            return LIGATURES[match.group(0)]
+        if kind == 'hard_break' and self.join_hard_hyphens:
+            text, start, end = match.string, match.start(), match.end()
+            if text[start - 1].islower() and text[end].islower():
+                return ''
+        return _REPLACEMENTS[kind]
+
+    def _sub(self, text: str) -> str:
+        # The leading newline lets a page number on the first line match the 'numbers' branch
+        return _NORMALIZE.sub(self._replace, '\n' + text)[1:]
+
+    def normalize(self, text: str) -> str:
+        """Cleaned text, stripped at both ends"""
+        return self._sub(text).strip()
+
+    def normalize_paged(self, paged: PagedText) -> PagedText:
+        """Normalise every page (page boundaries and numbers stay the same)"""
+        return PagedText((page_number, self._sub(text)) for page_number, text in paged.iter_pages())
+
+
+_default = TextNormalizer()
+
+
+def normalize_text(text: str) -> str:
+    """Normalise with the default settings (soft hyphens joined, hard hyphens kept)"""
+    return _default.normalize(text)
+
+
+def legacy_clean_chain(text: str) -> str:
+    """The per-extractor cleaning the normaliser replaces (clean_bat_text_comprehensive)"""
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^\s*Page\s+\d+\s*$', '', text, flags=re.MULTILINE | re.IGNORECASE)
+    text = re.sub(r'\x0c', '', text)
+    return text.strip()
+
+
+def benchmark(texts: List[str], repeats: int = 5) -> Dict[str, float]:
+    """Seconds for the old re.sub chain and the single pass over the same texts (best of repeats)"""
+    results = {}
+    for name, clean in (('chain', legacy_clean_chain), ('single_pass', normalize_text)):
+        best: Optional[float] = None
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for text in texts:
+                clean(text)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = best
+    results['chars'] = sum(len(text) for text in texts)
+    return results
+
+
+def _bat_sized_chunks(pdf_paths: Iterable[str], chunk_pages: int = 2) -> List[str]:
+    """Page texts grouped like BAT texts (a BAT usually spans one or two pages)"""
+    import fitz
+    chunks = []
+    for pdf_path in pdf_paths:
+        try:
+            with fitz.open(pdf_path) as doc:
+                pages = [page.get_text() for page in doc]
+        except Exception as e:
+            print(f"❌ {pdf_path}: {e}")
+            continue
+        chunks.extend("".join(pages[i:i + chunk_pages]) for i in range(0, len(pages), chunk_pages))
+    return chunks
+
+
+if __name__ == "__main__":
+    import sys
+    from extraction_benchmark import find_corpus
+
+    texts = _bat_sized_chunks(sys.argv[1:] or find_corpus())
+    timings = benchmark(texts)
+    megabytes = timings['chars'] / 1e6
+    print(f"📊 {len(texts)} texts, {megabytes:.1f} M chars")
+    for name in ('chain', 'single_pass'):
+        print(f"   {name:12} {timings[name]:.3f}s  ({megabytes / timings[name]:.1f} M chars/s)")
+    print(f"   speed-up: {timings['chain'] / timings['single_pass']:.2f}x")
+    joined = sum(text.count('\u00ad\n') for text in texts)
+    print(f"   soft-hyphenated line breaks rejoined: {joined}")
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# /Users/han/Code/MOB-BREF/tiered_pdf_extractor.py
+
+"""
+Tiered PDF Extractor
+Classifies every page cheaply with PyMuPDF (text density, ruling lines, image
+coverage, table likelihood). Plain prose pages are extracted with PyMuPDF;
+image-only pages go to the batched OCR lane and only table-heavy or
+layout-complex pages are escalated to Docling.
+The result has the same shape as pdf_processor.extract_text_and_metadata.
+"""
+
+import importlib.util
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import fitz
+
+from docling_converter_pool import get_converter_pool
+from extraction_cache import get_default_cache, file_sha256
+from ocr_lane import OCRLane, ocr_available, image_page_hash
+from parallel_extraction import to_document_page_numbers
+
+EXTRACTOR_NAME = "tiered"
+EXTRACTOR_VERSION = "3"
+
+# Page classification thresholds
+MIN_TEXT_CHARS = 40             # fewer characters than this = (nearly) image-only page
+IMAGE_COVERAGE_ESCALATE = 0.5   # images covering half the page need layout/OCR
+RULING_LINES_ESCALATE = 6       # table grids are drawn with many straight rules
+TABLE_SCORE_ESCALATE = 0.5
+MAX_DOCLING_SPAN = 20           # escalated pages converted per Docling call
+
+TABLE_KEYWORDS = re.compile(
+    r'BAT-AE[LP]L?|BBT-GEN|BAT-AEPL|mg/Nm|µg/Nm|ng I-TEQ|\b(?:Table|Tabel)\s+\d',
+    re.IGNORECASE
+)
+NUMERIC_LINE = re.compile(r'^[\s\d.,<>≤≥–\-–/%()]+$')
+
+
+@dataclass
+class PageProfile:
+    """Cheap per-page layout profile used to pick an extraction tier"""
+    page_number: int
+    text_chars: int
+    text_density: float
+    ruling_lines: int
+    image_coverage: float
+    table_score: float
+    tier: str
+    reason: str
+
+
+def _count_ruling_lines(page) -> int:
+    """Count straight horizontal/vertical rules (table grid lines)"""
+    rules = 0
+    try:
+        drawings = page.get_drawings()
+    except Exception:
+        return 0
+
+    for drawing in drawings:
+        for item in drawing.get("items", []):
+            kind = item[0]
+            if kind == "l":
+                p1, p2 = item[1], item[2]
+                if abs(p1.x - p2.x) < 1 or abs(p1.y - p2.y) < 1:
+                    rules += 1
+            elif kind == "re":
+                rect = item[1]
+                # Thin filled rectangles are how many PDFs draw table rules
+                if rect.height < 2 or rect.width < 2:
+                    rules += 1
+    return rules
+
+
+def _image_coverage(page, page_area: float) -> float:
+    """Fraction of the page covered by raster images"""
+    if page_area <= 0:
+        return 0.0
+    covered = 0.0
+    try:
+        for info in page.get_image_info():
+            bbox = fitz.Rect(info["bbox"]) & page.rect
+            covered += bbox.width * bbox.height
+    except Exception:
+        return 0.0
+    return min(1.0, covered / page_area)
+
+
+def _table_score(text: str, ruling_lines: int) -> float:
+    """Heuristic 0..1 likelihood that the page carries a (BAT-AEL) table"""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    if not lines:
+        return 0.0
+
+    numeric_lines = sum(1 for line in lines if NUMERIC_LINE.match(line))
+    short_lines = sum(1 for line in lines if len(line) < 25)
+    score = 0.0
+    score += min(0.4, numeric_lines / len(lines))
+    score += 0.2 if short_lines / len(lines) > 0.6 else 0.0
+    score += 0.3 if TABLE_KEYWORDS.search(text) else 0.0
+    score += 0.3 if ruling_lines >= RULING_LINES_ESCALATE else 0.0
+    return min(1.0, score)
+
+
+def group_page_spans(page_numbers: List[int], max_span: int = MAX_DOCLING_SPAN) -> List[Tuple[int, int]]:
+    """Runs of consecutive 1-based page numbers as inclusive (first, last) Docling page ranges"""
+    spans: List[Tuple[int, int]] = []
+    for page_number in sorted(set(page_numbers)):
+        if spans and page_number == spans[-1][1] + 1 and page_number - spans[-1][0] < max_span:
+            spans[-1] = (spans[-1][0], page_number)
+        else:
+            spans.append((page_number, page_number))
+    return spans
+
+
+def classify_page(page, text: Optional[str] = None) -> PageProfile:
+    """Classify one fitz page into the 'text' or 'docling' tier"""
+    if text is None:
+        text = page.get_text()
+    page_area = page.rect.width * page.rect.height
+    text_chars = len(text.strip())
+    ruling_lines = _count_ruling_lines(page)
+    image_coverage = _image_coverage(page, page_area)
+    table_score = _table_score(text, ruling_lines)
+
+    if text_chars < MIN_TEXT_CHARS:
+        tier, reason = "docling", "image_only"
+    elif image_coverage >= IMAGE_COVERAGE_ESCALATE:
+        tier, reason = "docling", "image_heavy"
+    elif table_score >= TABLE_SCORE_ESCALATE:
+        tier, reason = "docling", "table"
+    else:
+        tier, reason = "text", "plain"
+
+    return PageProfile(
+        page_number=page.number + 1,
+        text_chars=text_chars,
+        text_density=round(text_chars / page_area * 1000, 3) if page_area else 0.0,
+        ruling_lines=ruling_lines,
+        image_coverage=round(image_coverage, 3),
+        table_score=round(table_score, 3),
+        tier=tier,
+        reason=reason
+    )
+
+
+class TieredPDFExtractor:
+    """Fast PyMuPDF text path with per-page Docling escalation"""
+
+    def __init__(self, use_docling: bool = True, use_cache: bool = True, use_ocr_lane: bool = True):
+        self.use_docling = use_docling
+        self.use_cache = use_cache
+        # Image-only pages are OCR'd in a separate pool instead of inline by Docling
+        self.use_ocr_lane = use_ocr_lane
+
+    def extract(self, pdf_path: str) -> Dict[str, Any]:
+        """Extract title, full_text and pages; cached per PDF content hash"""
+        if not self.use_cache:
+            return self._extract_tiered(pdf_path)
+
+        cache = get_default_cache()
+        sha256 = file_sha256(pdf_path)
+        version = f"{EXTRACTOR_VERSION}{'' if self.use_docling else '-nodocling'}{'' if self.use_ocr_lane else '-noocr'}"
+        cached = cache.get(pdf_path, EXTRACTOR_NAME, version, sha256=sha256)
+        if cached is not None:
+            return cached
+
+        result = self._extract_tiered(pdf_path)
+        if not result.get("error"):
+            cache.put(pdf_path, EXTRACTOR_NAME, version, result, sha256=sha256)
+        return result
+
+    def _extract_tiered(self, pdf_path: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = {
+            "title": None,
+            "full_text": "",
+            "pages": [],
+            "tiering_stats": {}
+        }
+
+        try:
+            doc = fitz.open(pdf_path)
+        except Exception as e:
+            return {"error": f"Could not open PDF: {e}", "title": None, "full_text": None, "pages": []}
+
+        try:
+            if doc.metadata and doc.metadata.get("title"):
+                result["title"] = doc.metadata["title"]
+
+            use_ocr_lane = self.use_ocr_lane and ocr_available()
+            escalated = []
+            ocr_pages = {}
+            for page in doc:
+                page_text = page.get_text()
+                profile = classify_page(page, page_text)
+                if use_ocr_lane and profile.reason == "image_only" and page.get_images():
+                    profile.tier = "ocr"
+                    ocr_pages[profile.page_number] = image_page_hash(doc, page)
+                page_data = {
+                    "page_number": profile.page_number,
+                    # PyMuPDF text; replaced by Docling output for escalated pages
+                    "text": page_text,
+                    "tier": profile.tier,
+                    "profile": asdict(profile)
+                }
+                result["pages"].append(page_data)
+                if profile.tier == "docling":
+                    escalated.append(page_data)
+        finally:
+            doc.close()
+
+        # OCR runs in its own worker pool while the Docling pages are converted here
+        started_ocr = time.perf_counter()
+        ocr_job = OCRLane().submit(pdf_path, ocr_pages)
+        docling_seconds = self._escalate_pages(pdf_path, escalated)
+        self._merge_ocr_results(result["pages"], ocr_job.wait())
+        ocr_seconds = time.perf_counter() - started_ocr
+
+        result["full_text"] = "\n\n".join(page["text"] for page in result["pages"] if page["text"])
+        tiers = {}
+        for page in result["pages"]:
+            tiers[page["tier"]] = tiers.get(page["tier"], 0) + 1
+        result["tiering_stats"] = {
+            "total_pages": len(result["pages"]),
+            "pages_per_tier": tiers,
+            "escalated_pages": [page["page_number"] for page in escalated],
+            "docling_seconds": round(docling_seconds, 3),
+            "ocr_pages": len(ocr_pages),
+            "ocr_cache_hits": ocr_job.cache_hits,
+            "ocr_seconds": round(ocr_seconds, 3),
+            "total_seconds": round(time.perf_counter() - started, 3)
+        }
+        return result
+
+    @staticmethod
+    def _merge_ocr_results(pages: List[Dict[str, Any]], ocr_results: Dict[int, Dict[str, Any]]):
+        """Put OCR text into the page list; failed pages keep their (near-empty) PyMuPDF text"""
+        for page_data in pages:
+            ocr_result = ocr_results.get(page_data["page_number"])
+            if ocr_result is None:
+                continue
+            if ocr_result.get("error"):
+                page_data["tier"] = "ocr_failed"
+                continue
+            page_data["text"] = ocr_result["text"]
+            page_data["tier"] = ocr_result["source"]
+
+    def _docling_extractor(self) -> Optional[Callable[..., Dict[str, Any]]]:
+        """pdf_processor's Docling conversion, or None when Docling is off or not installed"""
+        if not self.use_docling:
+            return None
+        if importlib.util.find_spec("docling") is None:
+            print("⚠️ Docling not installed, using PyMuPDF text for escalated pages")
+            return None
+        from pdf_processor import _extract_with_docling
+        return _extract_with_docling
+
+    def _escalate_pages(self, pdf_path: str, pages: List[Dict[str, Any]]) -> float:
+        """Convert escalated pages with Docling, one call per run of consecutive pages (PyMuPDF text if unavailable)"""
+        if not pages:
+            return 0.0
+
+        started = time.perf_counter()
+        docling_extract = self._docling_extractor()
+        texts: Dict[int, str] = {}
+        if docling_extract is not None:
+            spans = group_page_spans([page_data["page_number"] for page_data in pages])
+
+            def convert(span: Tuple[int, int]) -> Dict[int, str]:
+                converted = docling_extract(pdf_path, page_range=span)
+                if converted.get("error"):
+                    return {}
+                if span[0] == span[1]:
+                    return {span[0]: converted.get("full_text") or ""}
+                pages_in_span = to_document_page_numbers(converted.get("pages", []), span[0])
+                return {page["page_number"]: page["text"] for page in pages_in_span
+                        if span[0] <= page["page_number"] <= span[1] and not page.get("error_detail")}
+
+            # The converter pool bounds how many spans really convert at once
+            with ThreadPoolExecutor(max_workers=max(1, min(get_converter_pool().size, len(spans)))) as executor:
+                for span_texts in executor.map(convert, spans):
+                    texts.update(span_texts)
+
+        for page_data in pages:
+            if page_data["page_number"] in texts:
+                page_data["text"] = texts[page_data["page_number"]]
+            else:
+                # Keep the PyMuPDF text already stored for this page
+                page_data["tier"] = "text_fallback"
+
+        return time.perf_counter() - started
+
+
+def extract_text_and_metadata_tiered(pdf_path: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Drop-in alternative for pdf_processor.extract_text_and_metadata"""
+    return TieredPDFExtractor(use_cache=use_cache).extract(pdf_path)
+
+
+if __name__ == "__main__":
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "regulatory_data/bat_conclusions/LCP_BBT_conclusies_NL.pdf"
+    if not os.path.exists(pdf_path):
+        print(f"❌ Test file not found: {pdf_path}")
+        sys.exit(1)
+
+    print(f"🔍 Tiered extraction: {pdf_path}")
+    extraction = TieredPDFExtractor(use_cache=False).extract(pdf_path)
+    stats = extraction.get("tiering_stats", {})
+    print(f"  📄 Pages: {stats.get('total_pages')}")
+    print(f"  🗂️ Tiers: {stats.get('pages_per_tier')}")
+    print(f"  📊 Escalated: {stats.get('escalated_pages')}")
+    print(f"  ⏱️ {stats.get('total_seconds')}s total, {stats.get('docling_seconds')}s in Docling")